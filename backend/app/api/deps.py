@@ -1,49 +1,52 @@
-import json
+import asyncio
 from pathlib import Path
-from typing import Dict, Optional
-from loguru import logger
+from typing import Any, Dict, List, Optional, Union
+
+import pandas as pd
+from app.core.config import get_settings
+from app.core.session_store import SessionStore
+from app.services.analysis.sales_frame import SalesFrame, get_sales_store, load_sales
 from app.services.orchestrator import orchestrator
 
-# In-memory session storage with file persistence
-sessions = {}
+# In-memory session storage with write-behind file persistence
 SESSIONS_DIR = Path("data/sessions")
-SESSIONS_DIR.mkdir(parents=True, exist_ok=True)
+session_store = SessionStore(
+    SESSIONS_DIR, flush_delay=float(get_settings().session_flush_delay_seconds)
+)
+sessions = session_store.sessions
 
 def load_session(session_id: str) -> Optional[Dict]:
-    """Get session from memory or load from disk."""
-    # Always try loading from disk to ensure sync with Orchestrator
-    session_file = SESSIONS_DIR / f"{session_id}.json"
-    if session_file.exists():
-        try:
-            with open(session_file, "r") as f:
-                data = json.load(f)
-                sessions[session_id] = data
-                return data
-        except Exception as e:
-            logger.error(f"Failed to load session {session_id}: {e}")
-            return None
-
-    # Fallback to memory if file doesn't exist (unlikely if persisted correctly)
-    if session_id in sessions:
-        return sessions[session_id]
-
-    return None
+    """Get session from memory, reloading from disk only if another worker changed it."""
+    return session_store.load(session_id)
 
 def save_session(session_id: str):
-    """Save session to disk."""
+    """Schedule the session to be written to disk."""
     if session_id in sessions:
-        try:
-            session_file = SESSIONS_DIR / f"{session_id}.json"
-            with open(session_file, "w") as f:
-                # Use default=str to handle datetime objects
-                json.dump(sessions[session_id], f, indent=2, default=str)
-
-            # Invalidate orchestrator cache to ensure it reloads updated data
-            if session_id in orchestrator.active_sessions:
-                del orchestrator.active_sessions[session_id]
-
-        except Exception as e:
-            logger.error(f"Failed to save session {session_id}: {e}")
+        session_store.save(session_id)
+
+        # Invalidate orchestrator cache to ensure it reloads updated data
+        if session_id in orchestrator.active_sessions:
+            del orchestrator.active_sessions[session_id]
+
+def flush_sessions():
+    """Write every pending session to disk (used on shutdown)."""
+    session_store.flush()
+
+async def set_session_sales(
+    session_id: str, data: Union[pd.DataFrame, List[Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """Store a session's sales as a columnar file; the session keeps only a reference."""
+    # Large uploads take a while to serialize; keep the event loop free meanwhile
+    ref = await asyncio.to_thread(get_sales_store().write, session_id, data)
+    sessions[session_id]["sales_ref"] = ref
+    sessions[session_id].pop("sales_data", None)
+    return ref
+
+def get_session_sales(session: Optional[Dict]) -> SalesFrame:
+    """Typed sales table of a session (columnar file, or legacy inline records)."""
+    if not session:
+        return SalesFrame.of(None)
+    return load_sales(session.get("sales_data"), session.get("sales_ref"))
 
 def get_session(session_id: str) -> Optional[Dict]:
     """Dependency wrapper for loading session"""
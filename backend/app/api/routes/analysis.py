@@ -3,8 +3,9 @@ from pathlib import Path
 import aiofiles
 import asyncio
 
+import numpy as np
 import pandas as pd
-from app.api.deps import load_session, save_session, sessions
+from app.api.deps import get_session_sales, load_session, save_session, sessions
 from app.core.config import get_settings
 from app.services.analysis.advanced_analytics import AdvancedAnalyticsService
 from app.services.analysis.bcg import BCGClassifier
@@ -14,12 +15,12 @@ from app.services.analysis.menu_engineering import (
     MenuEngineeringClassifier,
 )
 from app.services.analysis.menu_optimizer import MenuOptimizer
-from app.services.analysis.neural_predictor import NeuralPredictor
+from app.services.analysis.name_matching import match_menu_to_sales
+from app.services.analysis.model_registry import get_model_registry
 from app.services.analysis.pricing import (
     CompetitorIntelligenceService,
     CompetitorSource,
 )
-from app.services.analysis.sales_predictor import SalesPredictor
 from app.services.analysis.sentiment import (
     ReviewData,
     SentimentAnalyzer,
@@ -48,10 +49,8 @@ vibe_agent = VibeEngineeringAgent()
 
 bcg_classifier = BCGClassifier(agent)
 menu_engineering = MenuEngineeringClassifier()
-sales_predictor = SalesPredictor()
 campaign_generator = CampaignGenerator(agent)
 verification_agent = VerificationAgent()
-neural_predictor = NeuralPredictor()
 data_capability_detector = DataCapabilityDetector()
 menu_optimizer = MenuOptimizer()
 advanced_analytics = AdvancedAnalyticsService()
@@ -69,7 +68,7 @@ async def run_bcg_analysis(session_id: str, period: str = "30d", auto_verify: bo
     if not session:
         raise HTTPException(404, "Session not found")
     menu_items = session.get("menu_items", [])
-    sales_data = session.get("sales_data", [])
+    sales = get_session_sales(session)
 
     try:
         analysis_period = AnalysisPeriod(period)
@@ -78,40 +77,47 @@ async def run_bcg_analysis(session_id: str, period: str = "30d", auto_verify: bo
 
     # Merge menu items logic
     existing_menu_names = {item["name"].lower().strip() for item in menu_items}
-    if sales_data:
-        unique_sales_items = set(
-            record.get("item_name", "")
-            for record in sales_data
-            if record.get("item_name")
+    if sales and sales.has("item_name"):
+        units = sales.numeric("units_sold")
+        prices = sales.numeric("price").astype(float)
+        costs = sales.numeric("cost").astype(float)
+        item_sales = pd.DataFrame(
+            {
+                "item_name": sales.text("item_name").to_numpy(),
+                "units": units,
+                "revenue": sales.numeric("revenue"),
+                # Zero prices/costs are left out of the averages
+                "price": np.where(prices != 0, prices, np.nan),
+                "cost": np.where(costs != 0, costs, np.nan),
+                "category": sales.text("category").replace("", np.nan).to_numpy(),
+            }
+        )
+        per_item = (
+            item_sales[item_sales["item_name"] != ""]
+            .groupby("item_name", sort=False)
+            .agg(
+                total_units=("units", "sum"),
+                total_revenue=("revenue", "sum"),
+                avg_price=("price", "mean"),
+                avg_cost=("cost", "mean"),
+                category=("category", "first"),
+            )
         )
         items_added = 0
-        for item_name in unique_sales_items:
+        for item_name, row in zip(per_item.index, per_item.to_dict("records")):
             if item_name.lower().strip() not in existing_menu_names:
-                item_sales = [s for s in sales_data if s.get("item_name") == item_name]
-                total_units = sum(
-                    s.get("units_sold", 0) or s.get("quantity", 0) for s in item_sales
-                )
-
-                prices = [s.get("price", 0) for s in item_sales if s.get("price")]
-                avg_price = sum(prices) / len(prices) if prices else 0.0
-                if not prices:
-                    total_rev = sum(s.get("revenue", 0) for s in item_sales)
-                    avg_price = total_rev / total_units if total_units > 0 else 0.0
-
-                costs = [s.get("cost", 0) for s in item_sales if s.get("cost")]
-                avg_cost = sum(costs) / len(costs) if costs else 0.0
-
-                category = "Uncategorized"
-                for s in item_sales:
-                    if s.get("category"):
-                        category = s.get("category")
-                        break
+                avg_price = row["avg_price"]
+                if pd.isna(avg_price):
+                    total_units = row["total_units"]
+                    avg_price = row["total_revenue"] / total_units if total_units > 0 else 0.0
+                avg_cost = 0.0 if pd.isna(row["avg_cost"]) else row["avg_cost"]
+                category = row["category"] if isinstance(row["category"], str) else "Uncategorized"
 
                 menu_items.append(
                     {
                         "name": item_name,
-                        "price": round(avg_price, 2),
-                        "cost": round(avg_cost, 2),
+                        "price": round(float(avg_price), 2),
+                        "cost": round(float(avg_cost), 2),
                         "category": category,
                         "source": "sales_data",
                     }
@@ -125,11 +131,16 @@ async def run_bcg_analysis(session_id: str, period: str = "30d", auto_verify: bo
     sessions[session_id]["menu_items"] = menu_items
     save_session(session_id)
 
-    if not menu_items and not sales_data:
+    if not menu_items and not sales:
         raise HTTPException(400, "No menu items or sales data found")
 
     try:
-        result = await menu_engineering.analyze(menu_items, sales_data, analysis_period)
+        result = await menu_engineering.analyze(
+            menu_items,
+            sales,
+            analysis_period,
+            name_matches=sessions[session_id].setdefault("name_matches", {}),
+        )
         
         # Vibe Engineering Loop
         vibe_data = None
@@ -140,7 +151,7 @@ async def run_bcg_analysis(session_id: str, period: str = "30d", auto_verify: bo
                     analysis_result=result,
                     source_data={
                         "menu_items_count": len(menu_items), 
-                        "sales_records": len(sales_data),
+                        "sales_records": len(sales),
                         "period": period
                     },
                     auto_improve=True
@@ -189,40 +200,49 @@ async def predict_sales(
         raise HTTPException(404, "Session not found")
 
     menu_items = session.get("menu_items", [])
-    all_sales_data = session.get("sales_data", [])
     image_scores = session.get("image_scores", {})
 
-    from app.services.analysis.menu_engineering import filter_sales_by_period
+    from app.services.analysis.menu_engineering import get_period_days
 
     try:
         analysis_period = AnalysisPeriod(period)
     except ValueError:
         analysis_period = AnalysisPeriod.ALL_TIME
 
-    sales_data, _, _ = filter_sales_by_period(all_sales_data, analysis_period)
+    sales = get_session_sales(session).last_days(get_period_days(analysis_period))
 
     if not menu_items:
         raise HTTPException(400, "No menu items found")
 
     try:
-        if sales_predictor.model is None:
-            await sales_predictor.train(sales_data, menu_items, image_scores)
-
-        items_for_prediction = []
-        for item in menu_items:
-            item_sales = [s for s in sales_data if s.get("item_name") == item["name"]]
-            avg_daily = sum(s.get("units_sold", 0) for s in item_sales) / max(
-                len(item_sales), 1
-            )
-            items_for_prediction.append(
-                {
-                    "name": item["name"],
-                    "price": item.get("price", 0),
-                    "image_score": image_scores.get(item["name"], 0.5),
-                    "avg_daily_units": avg_daily,
-                }
+        name_table = sessions[session_id].setdefault("name_matches", {})
+        models = get_model_registry()
+        sales_predictor = await models.get("sales", session_id)
+        if not sales_predictor.is_trained:
+            sales_predictor = await models.train(
+                "sales", session_id, sales, menu_items, image_scores,
+                name_matches=name_table,
             )
 
+        avg_units = (
+            pd.Series(sales.numeric("units_sold"))
+            .groupby(sales.text("item_name").to_numpy())
+            .mean()
+            .to_dict()
+        )
+        matches = match_menu_to_sales(
+            [item["name"] for item in menu_items], list(avg_units), name_table
+        )
+        items_for_prediction = [
+            {
+                "name": item["name"],
+                "price": item.get("price", 0),
+                "image_score": image_scores.get(item["name"], 0.5),
+                "avg_daily_units": avg_units.get(matches.get(item["name"]) or item["name"], 0),
+            }
+            for item in menu_items
+        ]
+
         scenarios = scenarios or [{"name": "baseline"}]
         result = await sales_predictor.predict_batch(
             items_for_prediction, horizon_days, scenarios
@@ -871,33 +891,38 @@ async def predict_with_neural_network(
         raise HTTPException(404, "Session not found")
 
     menu_items = session.get("menu_items", [])
-    sales_data = session.get("sales_data", [])
     image_scores = session.get("image_scores", {})
 
     if not menu_items:
         raise HTTPException(400, "No menu items found")
 
     try:
+        models = get_model_registry()
+        neural_predictor = await models.get("neural", session_id)
         if not neural_predictor.is_trained:
-            await neural_predictor.train(sales_data, menu_items, epochs=30)
+            neural_predictor = await models.train(
+                "neural", session_id, get_session_sales(session), menu_items, epochs=30
+            )
 
-        predictions = {}
-        for item in menu_items:
-            base_features = {
+        items = [
+            {
+                "name": item["name"],
                 "price": item.get("price", 15),
                 "avg_daily_units": 20,
                 "image_score": image_scores.get(item["name"], 0.5),
             }
-            scenarios = [{"name": "baseline"}]
-            result = await neural_predictor.predict(
-                item["name"],
-                horizon_days,
-                base_features,
-                scenarios,
-                use_ensemble=use_ensemble,
-                uncertainty_samples=uncertainty_samples,
-            )
-            predictions[item["name"]] = result
+            for item in menu_items
+        ]
+        result = await neural_predictor.predict_batch(
+            items,
+            horizon_days,
+            [{"name": "baseline"}],
+            use_ensemble=use_ensemble,
+            uncertainty_samples=uncertainty_samples,
+        )
+        predictions = result["predictions"] or {
+            item["name"]: result for item in menu_items
+        }
 
         sessions[session_id]["neural_predictions"] = predictions
         save_session(session_id)
@@ -919,11 +944,11 @@ async def analyze_data_capabilities(session_id: str = Form(...)):
     if not session:
         raise HTTPException(404, "Session not found")
 
-    sales_data = session.get("sales_data", [])
-    if not sales_data:
+    sales = get_session_sales(session)
+    if not sales:
         return {"available_capabilities": ["bcg_analysis"]}
 
-    df = pd.DataFrame(sales_data)
+    df = sales.df.copy()
     report = data_capability_detector.analyze(df)
 
     session["capability_report"] = {
@@ -946,8 +971,8 @@ async def run_menu_optimization(session_id: str = Form(...)):
     if not session:
         raise HTTPException(404, "Session not found")
 
-    sales_data = session.get("sales_data", [])
-    if not sales_data:
+    sales = get_session_sales(session)
+    if not sales:
         raise HTTPException(400, "No sales data")
 
     cap_report = session.get("capability_report", {})
@@ -958,11 +983,12 @@ async def run_menu_optimization(session_id: str = Form(...)):
 
     try:
         report = await menu_optimizer.analyze(
-            sales_df=pd.DataFrame(sales_data),
+            sales_df=sales.df.copy(),
             menu_items=session.get("menu_items", []),
             session_id=session_id,
             column_mapping=column_mapping,
             bcg_results=session.get("bcg_analysis", {}),
+            name_matches=session.setdefault("name_matches", {}),
         )
 
         session["menu_optimization"] = {"quick_wins": report.quick_wins}
@@ -985,8 +1011,8 @@ async def run_advanced_analytics(session_id: str = Form(...)):
     if not session:
         raise HTTPException(404, "Session not found")
 
-    sales_data = session.get("sales_data", [])
-    if not sales_data:
+    sales = get_session_sales(session)
+    if not sales:
         raise HTTPException(400, "No sales data")
 
     cap_data = session.get("capability_report", {})
@@ -995,7 +1021,7 @@ async def run_advanced_analytics(session_id: str = Form(...)):
 
     try:
         report = await advanced_analytics.analyze(
-            df=pd.DataFrame(sales_data),
+            df=sales.df,
             session_id=session_id,
             column_mapping=column_mapping,
             capabilities=caps_list,
@@ -7,10 +7,20 @@ from pathlib import Path
 from typing import List, Optional
 
 import pandas as pd
-from app.api.deps import load_session, save_session, sessions
+from app.api.deps import (
+    get_session_sales,
+    load_session,
+    save_session,
+    sessions,
+    set_session_sales,
+)
 from app.core.config import get_settings
+from app.core.http_clients import GOOGLE_API_RETRY, get_http_client
+from app.core.image_batch import ImageResult, analyze_image_batch
+from app.core.websocket_manager import send_progress_update
 from app.services.analysis.menu_analyzer import DishImageAnalyzer, MenuExtractor
 from app.services.analysis.period_calculator import PeriodCalculator
+from app.services.analysis.sales_ingest import SalesFileError, read_sales_file
 from app.services.gemini.base_agent import GeminiAgent
 from app.services.intelligence.data_enrichment import CompetitorEnrichmentService
 from fastapi import APIRouter, File, Form, HTTPException, UploadFile
@@ -74,6 +84,7 @@ async def ingest_menu_image(
         total_files_processed = 0
         file_errors = []
 
+        saved_files = []
         for file in files:
             # Validate file
             ext = file.filename.split(".")[-1].lower() if file.filename else ""
@@ -85,25 +96,38 @@ async def ingest_menu_image(
             file_path = upload_dir / f"menu_{file.filename}"
             with open(file_path, "wb") as f:
                 shutil.copyfileobj(file.file, f)
+            saved_files.append((file.filename, str(file_path)))
 
-            # Extract menu items
-            try:
-                # Use PDF-specific extraction for PDFs to handle multiple pages
-                if ext == "pdf":
-                    result = await menu_extractor.extract_from_pdf_all_pages(
-                        str(file_path), use_ocr=True, business_context=business_context
-                    )
-                else:
-                    result = await menu_extractor.extract_from_image(
-                        str(file_path), use_ocr=True, business_context=business_context
-                    )
+        # Extract menu items (PDFs are handled page by page by the extractor)
+        async def _extract(path: str):
+            return await menu_extractor.extract_from_image(
+                path, use_ocr=True, business_context=business_context
+            )
 
-                all_items.extend(result.get("items", []))
-                total_files_processed += 1
-            except Exception as e:
-                logger.error(f"Failed to process {file.filename}: {e}")
-                file_errors.append(f"{file.filename}: {str(e)[:100]}")
+        async def _report(image: ImageResult, completed: int, total: int):
+            await send_progress_update(
+                session_id=session_id,
+                stage="menu_extraction",
+                progress=(completed / total) * 100,
+                message=f"Processed menu file {completed}/{total}...",
+                data={
+                    "file": saved_files[image.index][0],
+                    "items_count": len(image.result.get("items", [])) if image.ok else 0,
+                    "error": None if image.ok else str(image.error)[:100],
+                },
+            )
+
+        # Files are extracted concurrently; items are kept in upload order
+        extracted = await analyze_image_batch(
+            [path for _, path in saved_files], _extract, on_result=_report
+        )
+        for (filename, _), image in zip(saved_files, extracted):
+            if not image.ok:
+                logger.error(f"Failed to process {filename}: {image.error}")
+                file_errors.append(f"{filename}: {str(image.error)[:100]}")
                 continue
+            all_items.extend(image.result.get("items", []))
+            total_files_processed += 1
 
         # Store in session - deduplicate items by name
         existing_menu = sessions[session_id].get("menu_items", [])
@@ -204,8 +228,18 @@ async def ingest_dish_images(
             logger.info(
                 f"Analyzing {len(saved_image_paths)} images with Gemini Vision..."
             )
+
+            async def _report(image: ImageResult, completed: int, total: int):
+                await send_progress_update(
+                    session_id=session_id,
+                    stage="image_analysis",
+                    progress=(completed / total) * 100,
+                    message=f"Analyzed dish photo {completed}/{total}...",
+                    data={"image_index": image.index, "analysis": image.result},
+                )
+
             image_result = await dish_analyzer.analyze_images(
-                saved_image_paths, menu_item_names
+                saved_image_paths, menu_item_names, on_result=_report
             )
             all_analyses.extend(image_result["analyses"])
 
@@ -426,82 +460,39 @@ async def ingest_sales_data(file: UploadFile = File(...), session_id: str = Form
         shutil.copyfileobj(file.file, f)
 
     try:
-        if ext == "csv":
-            df = pd.read_csv(file_path)
-        else:
-            df = pd.read_excel(file_path)
-
-        df.columns = df.columns.str.lower().str.strip().str.replace(" ", "_")
-
-        required = ["date", "item_name", "units_sold"]
-        missing = [c for c in required if c not in df.columns]
-        if missing:
-            alt_names = {
-                "date": ["sale_date", "fecha"],
-                "item_name": ["item", "producto", "plato"],
-                "units_sold": ["units", "cantidad", "vendidos"],
-            }
-            for col in missing:
-                for alt in alt_names.get(col, []):
-                    if alt in df.columns:
-                        df = df.rename(columns={alt: col})
-                        break
-
-        missing = [c for c in required if c not in df.columns]
-        if missing:
-            raise HTTPException(400, f"Missing required columns: {missing}")
-
-        def parse_date(date_val):
-            if pd.isna(date_val):
-                return None
-            date_str = str(date_val).strip()
-            formats = [
-                "%d-%m-%y",
-                "%d-%m-%Y",
-                "%Y-%m-%d",
-                "%d/%m/%y",
-                "%d/%m/%Y",
-                "%m/%d/%Y",
-                "%Y/%m/%d",
-            ]
-            for fmt in formats:
-                try:
-                    return pd.to_datetime(date_str, format=fmt).date()
-                except (ValueError, TypeError):
-                    continue
-            try:
-                return pd.to_datetime(date_str, dayfirst=True).date()
-            except Exception:
-                return None
-
-        df["date"] = df["date"].apply(parse_date)
-        invalid_dates = df["date"].isna().sum()
-        df = df.dropna(subset=["date"])
-        df["date"] = df["date"].astype(str)
+        try:
+            ingest = await asyncio.to_thread(
+                read_sales_file, file_path, int(settings.sales_ingest_chunk_rows)
+            )
+        except SalesFileError as e:
+            raise HTTPException(400, str(e))
+        df = ingest.df
+        invalid_dates = ingest.invalid_dates
 
-        sales_records = df.to_dict("records")
-        sessions[session_id]["sales_data"] = sales_records
+        await set_session_sales(session_id, df)
         save_session(session_id)
 
         total_units = df["units_sold"].sum()
-        date_range = {"start": df["date"].min(), "end": df["date"].max()}
-        unique_items = df["item_name"].nunique()
-
-        try:
-            start_dt = pd.to_datetime(date_range["start"])
-            end_dt = pd.to_datetime(date_range["end"])
+        if len(df):
+            start_dt, end_dt = df["date"].min(), df["date"].max()
+            date_range = {
+                "start": start_dt.date().isoformat(),
+                "end": end_dt.date().isoformat(),
+            }
             days_span = (end_dt - start_dt).days + 1
-        except Exception:
+        else:
+            date_range = {"start": None, "end": None}
             days_span = 0
+        unique_items = df["item_name"].nunique()
 
         warnings = []
         if invalid_dates > 0:
             warnings.append(f"{invalid_dates} rows had invalid dates and were skipped")
         if days_span < 30:
             warnings.append(f"Only {days_span} days of data. Recommend 30-90 days.")
-        if len(sales_records) < 100:
+        if len(df) < 100:
             warnings.append(
-                f"Only {len(sales_records)} records. More data improves accuracy."
+                f"Only {len(df)} records. More data improves accuracy."
             )
 
         available_columns = list(df.columns)
@@ -511,13 +502,13 @@ async def ingest_sales_data(file: UploadFile = File(...), session_id: str = Form
 
         thought = await agent.create_thought_signature(
             "Process uploaded sales data",
-            {"records": len(sales_records), "date_range": date_range},
+            {"records": len(df), "date_range": date_range},
         )
 
         return {
             "session_id": session_id,
             "status": "success",
-            "records_imported": len(sales_records),
+            "records_imported": len(df),
             "date_range": date_range,
             "days_span": days_span,
             "unique_items": unique_items,
@@ -579,7 +570,7 @@ async def get_demo_session():
     sales_file = Path("data/demo/sales.json")
     if sales_file.exists():
         with open(sales_file, "r") as f:
-            sessions[session_id]["sales_data"] = json.load(f)
+            await set_session_sales(session_id, json.load(f))
             
     save_session(session_id)
 
@@ -628,7 +619,7 @@ async def load_demo_into_session():
         from app.services.orchestrator import orchestrator
         orchestrator.active_sessions.pop(session_id, None)
         orchestrator.completed_sessions.pop(session_id, None)
-        orch_file = Path(f"data/orchestrator_states/{session_id}.json")
+        orch_file = orchestrator.storage_dir / f"{session_id}.json"
         if orch_file.exists():
             orch_file.unlink()
         logger.info(f"Cleared stale orchestrator state for demo session {session_id}")
@@ -652,7 +643,7 @@ async def load_demo_into_session():
     sales_file = Path("data/demo/sales.json")
     if sales_file.exists():
         with open(sales_file, "r") as f:
-            sessions[session_id]["sales_data"] = json.load(f)
+            await set_session_sales(session_id, json.load(f))
             
     save_session(session_id)
 
@@ -670,8 +661,10 @@ async def get_session(session_id: str):
     """Get full session data including all analysis results."""
     from app.services.orchestrator import orchestrator
     
-    # 1. Try loading legacy/business session (from data/sessions)
-    session = load_session(session_id) or {}
+    # 1. Try loading legacy/business session (from data/sessions). Merge into a
+    # copy: the loaded dict is the cached one, and read-only orchestrator
+    # results must not be persisted with the session on its next save.
+    session = dict(load_session(session_id) or {})
     
     # 2. Check Orchestrator state (from memory or data/orchestrator_states)
     orch_state = orchestrator.get_session_status(session_id)
@@ -720,12 +713,12 @@ async def get_session(session_id: str):
         # Embed full orchestrator state for debug/advanced usage
         session["data"] = orch_state
 
-    sales_data = session.get("sales_data") or []
+    sales = get_session_sales(session)
     
     # Safe period calculation
     try:
         period_calc = PeriodCalculator()
-        available_periods_info = period_calc.calculate_available_periods(sales_data)
+        available_periods_info = period_calc.calculate_available_periods(sales)
     except Exception as e:
         logger.error(f"Error calculating periods for session {session_id}: {e}")
         available_periods_info = {}
@@ -743,7 +736,7 @@ async def get_session(session_id: str):
         "created_at": session.get("created_at"),
         "status": session.get("status", "unknown"),
         "menu_items_count": len(session.get("menu_items") or []),
-        "sales_records_count": len(sales_data),
+        "sales_records_count": len(sales),
         "has_bcg_analysis": bool(bcg),
         "has_predictions": bool(predictions),
         "campaigns_count": len(campaigns) if isinstance(campaigns, list) else len(campaigns.get("campaigns", [])) if isinstance(campaigns, dict) else 0,
@@ -776,6 +769,7 @@ async def export_session(session_id: str, format: str = "json"):
         raise HTTPException(404, "Session not found")
 
     bcg_data = session.get("bcg_analysis") or session.get("menu_engineering", {})
+    sales = get_session_sales(session)
 
     report = {
         "export_info": {
@@ -786,12 +780,12 @@ async def export_session(session_id: str, format: str = "json"):
         },
         "data_summary": {
             "menu_items_count": len(session.get("menu_items", [])),
-            "sales_records_count": len(session.get("sales_data", [])),
+            "sales_records_count": len(sales),
             "analysis_period": bcg_data.get("period", "unknown"),
             "date_range": bcg_data.get("date_range", {}),
         },
         "menu_catalog": session.get("menu_items", []),
-        "sales_data_sample": session.get("sales_data", [])[:100],
+        "sales_data_sample": sales.to_records(limit=100),
         "bcg_analysis": {
             "methodology": bcg_data.get("methodology", "Menu Engineering"),
             "period": bcg_data.get("period"),
@@ -837,61 +831,60 @@ async def export_session(session_id: str, format: str = "json"):
 @router.post("/location/search", tags=["Location"])
 async def search_location(query: str = Form(...)):
     """Search for a restaurant location using address or name."""
-    import httpx
 
     logger.info(f"Location search request: '{query}'")
     google_api_key = settings.google_maps_api_key
 
     if google_api_key:
         try:
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                response = await client.get(
-                    "https://maps.googleapis.com/maps/api/geocode/json",
-                    params={"address": query, "key": google_api_key},
-                )
-                data = response.json()
-                if data.get("results"):
-                    result = data["results"][0]
-                    location = result["geometry"]["location"]
-                    return {
-                        "location": {
-                            "lat": location["lat"],
-                            "lng": location["lng"],
-                            "address": result["formatted_address"],
-                            "place_id": result.get("place_id"),
-                        },
-                        "status": "ok",
-                        "source": "google",
-                    }
-        except Exception as e:
-            logger.warning(f"Google geocoding failed: {e}")
-
-    # Fallback to Nominatim
-    try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
+            client = get_http_client("google_apis", retry=GOOGLE_API_RETRY)
             response = await client.get(
-                "https://nominatim.openstreetmap.org/search",
-                params={
-                    "q": query,
-                    "format": "json",
-                    "limit": 1,
-                    "addressdetails": 1,
-                },
-                headers={"User-Agent": "RestoPilotAI/1.0"},
+                "https://maps.googleapis.com/maps/api/geocode/json",
+                params={"address": query, "key": google_api_key},
             )
             data = response.json()
-            if data:
-                result = data[0]
+            if data.get("results"):
+                result = data["results"][0]
+                location = result["geometry"]["location"]
                 return {
                     "location": {
-                        "lat": float(result["lat"]),
-                        "lng": float(result["lon"]),
-                        "address": result.get("display_name", query),
-                        "place_id": f"osm_{result.get('osm_id', 'unknown')}",
+                        "lat": location["lat"],
+                        "lng": location["lng"],
+                        "address": result["formatted_address"],
+                        "place_id": result.get("place_id"),
                     },
                     "status": "ok",
-                    "source": "nominatim",
+                    "source": "google",
                 }
+        except Exception as e:
+            logger.warning(f"Google geocoding failed: {e}")
+
+    # Fallback to Nominatim
+    try:
+        client = get_http_client("default", timeout=15.0)
+        response = await client.get(
+            "https://nominatim.openstreetmap.org/search",
+            params={
+                "q": query,
+                "format": "json",
+                "limit": 1,
+                "addressdetails": 1,
+            },
+            headers={"User-Agent": "RestoPilotAI/1.0"},
+        )
+        data = response.json()
+        if data:
+            result = data[0]
+            return {
+                "location": {
+                    "lat": float(result["lat"]),
+                    "lng": float(result["lon"]),
+                    "address": result.get("display_name", query),
+                    "place_id": f"osm_{result.get('osm_id', 'unknown')}",
+                },
+                "status": "ok",
+                "source": "nominatim",
+            }
     except Exception as e:
         logger.error(f"Location search error: {e}")
         raise HTTPException(500, f"Location search error: {str(e)}")
@@ -909,7 +902,6 @@ async def get_nearby_restaurants(
     session_id: Optional[str] = Form(None),
 ):
     """Find nearby restaurants."""
-    import httpx
 
     google_api_key = settings.google_maps_api_key
     found_restaurants = []
@@ -917,30 +909,30 @@ async def get_nearby_restaurants(
 
     if google_api_key:
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    "https://maps.googleapis.com/maps/api/place/nearbysearch/json",
-                    params={
-                        "location": f"{lat},{lng}",
-                        "radius": radius,
-                        "type": "restaurant",
-                        "key": google_api_key,
-                    },
+            client = get_http_client("google_apis", retry=GOOGLE_API_RETRY)
+            response = await client.get(
+                "https://maps.googleapis.com/maps/api/place/nearbysearch/json",
+                params={
+                    "location": f"{lat},{lng}",
+                    "radius": radius,
+                    "type": "restaurant",
+                    "key": google_api_key,
+                },
+            )
+            data = response.json()
+            for place in data.get("results", [])[:10]:
+                found_restaurants.append(
+                    {
+                        "name": place.get("name"),
+                        "address": place.get("vicinity"),
+                        "rating": place.get("rating"),
+                        "userRatingsTotal": place.get("user_ratings_total"),
+                        "placeId": place.get("place_id"),
+                        "types": place.get("types", []),
+                        "location": place.get("geometry", {}).get("location", {}),
+                    }
                 )
-                data = response.json()
-                for place in data.get("results", [])[:10]:
-                    found_restaurants.append(
-                        {
-                            "name": place.get("name"),
-                            "address": place.get("vicinity"),
-                            "rating": place.get("rating"),
-                            "userRatingsTotal": place.get("user_ratings_total"),
-                            "placeId": place.get("place_id"),
-                            "types": place.get("types", []),
-                            "location": place.get("geometry", {}).get("location", {}),
-                        }
-                    )
-                source_used = "google_places"
+            source_used = "google_places"
         except Exception as e:
             logger.warning(f"Google Places failed: {e}")
 
@@ -993,16 +985,12 @@ async def get_nearby_restaurants(
             google_maps_api_key=settings.google_maps_api_key,
             gemini_agent=agent,
         )
-        enriched_profiles = []
-        for restaurant in found_restaurants[:5]:
-            try:
-                profile = await enrichment_service.enrich_competitor_profile(
-                    place_id=restaurant.get("placeId") or restaurant.get("place_id"),
-                    basic_info=restaurant,
-                )
-                enriched_profiles.append(profile.to_dict())
-            except Exception:
-                enriched_profiles.append({"basic_info": restaurant})
+        targets = found_restaurants[:5]
+        results = await enrichment_service.enrich_competitors(targets)
+        enriched_profiles = [
+            {"basic_info": restaurant} if isinstance(result, Exception) else result.to_dict()
+            for restaurant, result in zip(targets, results)
+        ]
 
         await enrichment_service.close()
 
@@ -1032,7 +1020,6 @@ async def identify_business(
     lng: Optional[float] = Form(None),
 ):
     """Identify a specific business in Google Maps."""
-    import httpx
 
     google_api_key = settings.google_maps_api_key
 
@@ -1049,103 +1036,103 @@ async def identify_business(
     try:
         logger.info(f"Using Google Maps API Key: {google_api_key[:5]}...{google_api_key[-4:] if google_api_key else 'None'}")
         
-        async with httpx.AsyncClient() as client:
-            params = {"query": query, "key": google_api_key, "language": "es"}
-            if lat and lng:
-                params["location"] = f"{lat},{lng}"
-                params["radius"] = 500
+        client = get_http_client("google_apis", retry=GOOGLE_API_RETRY)
+        params = {"query": query, "key": google_api_key, "language": "es"}
+        if lat and lng:
+            params["location"] = f"{lat},{lng}"
+            params["radius"] = 500
+
+        response = await client.get(
+            "https://maps.googleapis.com/maps/api/place/textsearch/json",
+            params=params,
+        )
+        
+        if response.status_code != 200:
+            logger.error(f"Google Places API returned status {response.status_code}: {response.text}")
+            raise HTTPException(502, f"Google Maps API error: {response.status_code} - {response.text[:200]}")
 
-            response = await client.get(
-                "https://maps.googleapis.com/maps/api/place/textsearch/json",
-                params=params,
-            )
+        try:
+            data = response.json()
+        except Exception as json_err:
+            logger.error(f"Failed to parse Google API response: {response.text}")
+            raise HTTPException(502, f"Invalid JSON from Google API: {str(json_err)}")
+        
+        if data.get("status") not in ["OK", "ZERO_RESULTS"]:
+            error_msg = data.get("error_message", "Unknown Google API error")
+            logger.error(f"Google Places API logic error: {data.get('status')} - {error_msg}")
+            # If API is not authorized, fallback to Gemini or raise distinct error
+            if data.get("status") in ["REQUEST_DENIED", "OVER_QUERY_LIMIT"]:
+                 raise HTTPException(403, f"Google Maps API Error: {error_msg} (Status: {data.get('status')})")
+            
+        candidates = []
+        
+        # Process initial results
+        for place in data.get("results", [])[:5]:
+            loc = place.get("geometry", {}).get("location", {})
+            types = place.get("types", [])
             
-            if response.status_code != 200:
-                logger.error(f"Google Places API returned status {response.status_code}: {response.text}")
-                raise HTTPException(502, f"Google Maps API error: {response.status_code} - {response.text[:200]}")
+            # Add the direct match
+            candidates.append(
+                {
+                    "name": place.get("name"),
+                    "address": place.get("formatted_address"),
+                    "placeId": place.get("place_id"),
+                    "lat": loc.get("lat"),
+                    "lng": loc.get("lng"),
+                    "rating": place.get("rating"),
+                    "types": types,
+                    "is_establishment": "establishment" in types or "point_of_interest" in types
+                }
+            )
 
-            try:
-                data = response.json()
-            except Exception as json_err:
-                logger.error(f"Failed to parse Google API response: {response.text}")
-                raise HTTPException(502, f"Invalid JSON from Google API: {str(json_err)}")
+            # If the result is a generic location (address, route, locality) and not a specific business,
+            # search for restaurants at this location to help the user find their business.
+            generic_types = [
+                "street_address", "route", "locality", "sublocality", "postal_code", 
+                "intersection", "premise", "subpremise", "neighborhood",
+                "administrative_area_level_1", "administrative_area_level_2", "political"
+            ]
+            is_general_location = any(t in types for t in generic_types)
             
-            if data.get("status") not in ["OK", "ZERO_RESULTS"]:
-                error_msg = data.get("error_message", "Unknown Google API error")
-                logger.error(f"Google Places API logic error: {data.get('status')} - {error_msg}")
-                # If API is not authorized, fallback to Gemini or raise distinct error
-                if data.get("status") in ["REQUEST_DENIED", "OVER_QUERY_LIMIT"]:
-                     raise HTTPException(403, f"Google Maps API Error: {error_msg} (Status: {data.get('status')})")
-                
-            candidates = []
+            # Also trigger if it's not explicitly an establishment (though premise is sometimes an establishment in G-Maps)
+            # But if the name looks like an address, we should definitely look deeper.
             
-            # Process initial results
-            for place in data.get("results", [])[:5]:
-                loc = place.get("geometry", {}).get("location", {})
-                types = place.get("types", [])
-                
-                # Add the direct match
-                candidates.append(
-                    {
-                        "name": place.get("name"),
-                        "address": place.get("formatted_address"),
-                        "placeId": place.get("place_id"),
-                        "lat": loc.get("lat"),
-                        "lng": loc.get("lng"),
-                        "rating": place.get("rating"),
-                        "types": types,
-                        "is_establishment": "establishment" in types or "point_of_interest" in types
+            if is_general_location and loc.get("lat") and loc.get("lng"):
+                try:
+                    # Search for businesses at this coordinate
+                    nearby_url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
+                    nearby_params = {
+                        "location": f"{loc['lat']},{loc['lng']}",
+                        "radius": "50",  # Very tight radius to find businesses AT this address
+                        "type": "restaurant", # Prioritize restaurants
+                        "key": google_api_key,
+                        "language": "es"
                     }
-                )
-
-                # If the result is a generic location (address, route, locality) and not a specific business,
-                # search for restaurants at this location to help the user find their business.
-                generic_types = [
-                    "street_address", "route", "locality", "sublocality", "postal_code", 
-                    "intersection", "premise", "subpremise", "neighborhood",
-                    "administrative_area_level_1", "administrative_area_level_2", "political"
-                ]
-                is_general_location = any(t in types for t in generic_types)
-                
-                # Also trigger if it's not explicitly an establishment (though premise is sometimes an establishment in G-Maps)
-                # But if the name looks like an address, we should definitely look deeper.
-                
-                if is_general_location and loc.get("lat") and loc.get("lng"):
-                    try:
-                        # Search for businesses at this coordinate
-                        nearby_url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-                        nearby_params = {
-                            "location": f"{loc['lat']},{loc['lng']}",
-                            "radius": "50",  # Very tight radius to find businesses AT this address
-                            "type": "restaurant", # Prioritize restaurants
-                            "key": google_api_key,
-                            "language": "es"
-                        }
-                        
-                        nearby_res = await client.get(nearby_url, params=nearby_params)
-                        if nearby_res.status_code == 200:
-                            nearby_data = nearby_res.json()
-                            for biz in nearby_data.get("results", [])[:5]:
-                                # Avoid duplicates
-                                if any(c["placeId"] == biz.get("place_id") for c in candidates):
-                                    continue
-                                    
-                                biz_loc = biz.get("geometry", {}).get("location", {})
-                                candidates.append({
-                                    "name": biz.get("name"),
-                                    "address": biz.get("vicinity"), # nearbysearch uses vicinity
-                                    "placeId": biz.get("place_id"),
-                                    "lat": biz_loc.get("lat"),
-                                    "lng": biz_loc.get("lng"),
-                                    "rating": biz.get("rating"),
-                                    "types": biz.get("types", []),
-                                    "is_establishment": True,
-                                    "parent_address": place.get("formatted_address") # Link to the address searched
-                                })
-                    except Exception as nearby_err:
-                        logger.warning(f"Failed to fetch businesses at address location: {nearby_err}")
-
-            return {"status": "success", "candidates": candidates}
+                    
+                    nearby_res = await client.get(nearby_url, params=nearby_params)
+                    if nearby_res.status_code == 200:
+                        nearby_data = nearby_res.json()
+                        for biz in nearby_data.get("results", [])[:5]:
+                            # Avoid duplicates
+                            if any(c["placeId"] == biz.get("place_id") for c in candidates):
+                                continue
+                                
+                            biz_loc = biz.get("geometry", {}).get("location", {})
+                            candidates.append({
+                                "name": biz.get("name"),
+                                "address": biz.get("vicinity"), # nearbysearch uses vicinity
+                                "placeId": biz.get("place_id"),
+                                "lat": biz_loc.get("lat"),
+                                "lng": biz_loc.get("lng"),
+                                "rating": biz.get("rating"),
+                                "types": biz.get("types", []),
+                                "is_establishment": True,
+                                "parent_address": place.get("formatted_address") # Link to the address searched
+                            })
+                except Exception as nearby_err:
+                    logger.warning(f"Failed to fetch businesses at address location: {nearby_err}")
+
+        return {"status": "success", "candidates": candidates}
     except HTTPException:
         raise
     except Exception as e:
@@ -1179,32 +1166,31 @@ async def set_business_location(
         }
     else:
         # Google Maps API
-        import httpx
 
         if not settings.google_maps_api_key:
             raise HTTPException(400, "API key missing")
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://maps.googleapis.com/maps/api/place/details/json",
-                params={
-                    "place_id": place_id,
-                    "fields": "name,formatted_address,geometry,rating,user_ratings_total,formatted_phone_number,website",
-                    "key": settings.google_maps_api_key,
-                },
-            )
-            data = response.json()
-            res = data.get("result", {})
-            loc = res.get("geometry", {}).get("location", {})
-            business_info = {
+        client = get_http_client("google_apis", retry=GOOGLE_API_RETRY)
+        response = await client.get(
+            "https://maps.googleapis.com/maps/api/place/details/json",
+            params={
                 "place_id": place_id,
-                "name": res.get("name"),
-                "address": res.get("formatted_address"),
-                "lat": loc.get("lat"),
-                "lng": loc.get("lng"),
-                "phone": res.get("formatted_phone_number"),
-                "website": res.get("website"),
-            }
+                "fields": "name,formatted_address,geometry,rating,user_ratings_total,formatted_phone_number,website",
+                "key": settings.google_maps_api_key,
+            },
+        )
+        data = response.json()
+        res = data.get("result", {})
+        loc = res.get("geometry", {}).get("location", {})
+        business_info = {
+            "place_id": place_id,
+            "name": res.get("name"),
+            "address": res.get("formatted_address"),
+            "lat": loc.get("lat"),
+            "lng": loc.get("lng"),
+            "phone": res.get("formatted_phone_number"),
+            "website": res.get("website"),
+        }
 
     sessions[session_id]["business_location"] = business_info
     sessions[session_id]["location"] = business_info
@@ -1434,7 +1420,7 @@ async def setup_wizard(
         session["menu_items"] = all_menu_items
         
         # Process sales files
-        all_sales_data = []
+        sales_frames = []
         for file in sales_files:
             if not file.filename:
                 continue
@@ -1451,11 +1437,14 @@ async def setup_wizard(
                     df = pd.read_csv(str(file_path))
                 else:
                     df = pd.read_excel(str(file_path))
-                all_sales_data.extend(df.to_dict(orient="records"))
+                sales_frames.append(df)
             except Exception as e:
                 logger.error(f"Failed to process sales file {file.filename}: {e}")
         
-        session["sales_data"] = all_sales_data
+        sales_ref = await set_session_sales(
+            session_id,
+            pd.concat(sales_frames, ignore_index=True) if sales_frames else [],
+        )
         
         # Store photo file paths
         photo_paths = []
@@ -1506,7 +1495,7 @@ async def setup_wizard(
         
         logger.info(f"Setup wizard completed for session {session_id}")
         logger.info(f"  - Menu items: {len(all_menu_items)}")
-        logger.info(f"  - Sales records: {len(all_sales_data)}")
+        logger.info(f"  - Sales records: {sales_ref['rows']}")
         logger.info(f"  - Photos: {len(photo_paths)}")
         logger.info(f"  - Audio files: {len(audio_paths)}")
         logger.info(f"  - Video files: {len(video_paths)}")
@@ -1516,7 +1505,7 @@ async def setup_wizard(
             "session_id": session_id,
             "summary": {
                 "menu_items_extracted": len(all_menu_items),
-                "sales_records": len(all_sales_data),
+                "sales_records": sales_ref["rows"],
                 "photos_uploaded": len(photo_paths),
                 "audio_files": len(audio_paths),
                 "video_files": len(video_paths),
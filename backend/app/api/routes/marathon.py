@@ -107,6 +107,7 @@ async def start_marathon_task(
                 thought_traces=[],
                 menu_items=business_session.get("menu_items", []) if business_session else [],
                 sales_data=business_session.get("sales_data", []) if business_session else [],
+                sales_ref=business_session.get("sales_ref") if business_session else None,
                 restaurant_name=restaurant_info.get("name", "Restaurant"),
                 business_profile_enriched=business_session.get("business_profile_enriched") if business_session else None,
                 social_media=restaurant_info.get("social_media", {}),
@@ -115,7 +116,7 @@ async def start_marathon_task(
             )
             orchestrator.active_sessions[session_id] = state
             orchestrator._save_session_to_disk(state)
-            logger.info(f"Initialized fresh orchestrator state for session {session_id} with {len(state.menu_items)} menu items and {len(state.sales_data)} sales records")
+            logger.info(f"Initialized fresh orchestrator state for session {session_id} with {len(state.menu_items)} menu items and {state.sales_count} sales records")
         
         # Dispatch based on task_type
         if config.task_type == "full_analysis":
@@ -5,13 +5,18 @@ Provides real-time visibility into:
 - Cost tracking
 - Model health and fallback status
 - Token usage statistics
+- Request executor queue depth
+- Response cache hit rate and savings
 """
 
 from fastapi import APIRouter, HTTPException
 from typing import Dict, Any
 
+from app.core.gemini_executor import get_gemini_executor
 from app.core.rate_limiter import get_rate_limiter
+from app.core.single_flight import get_single_flight
 from app.core.model_fallback import get_fallback_handler
+from app.services.gemini.base_agent import get_response_cache
 
 router = APIRouter(prefix="/monitoring", tags=["monitoring"])
 
@@ -42,7 +47,11 @@ async def get_gemini_usage() -> Dict[str, Any]:
                 "tpm_usage_pct": round(
                     (stats["tokens_in_window"] / stats["tpm_limit"]) * 100, 2
                 ),
+                "queued_requests": stats["queued_requests"],
             },
+            "executor": get_gemini_executor().get_stats(),
+            "response_cache": get_response_cache().get_stats(),
+            "single_flight": get_single_flight().get_stats(),
             "cost_tracking": {
                 "daily_cost_usd": stats["daily_cost_usd"],
                 "budget_limit_usd": stats["budget_limit_usd"],
@@ -2,7 +2,7 @@ from typing import Dict
 from fastapi import APIRouter, HTTPException, BackgroundTasks
 from pydantic import BaseModel
 
-from app.api.deps import load_session, save_session, sessions
+from app.api.deps import get_session_sales, load_session, save_session, sessions
 from app.services.gemini.vibe_engineering import VibeEngineeringAgent
 from loguru import logger
 
@@ -35,7 +35,7 @@ async def verify_analysis(request: VerifyRequest, background_tasks: BackgroundTa
         analysis_result = session.get('bcg_analysis')
         source_data = {
             "menu_items": session.get('menu_items', []),
-            "sales_data": session.get('sales_data', [])
+            "sales_data": get_session_sales(session).to_records()
         }
     elif request.analysis_type == 'competitive_analysis':
         analysis_result = session.get('competitor_analysis')
@@ -9,7 +9,7 @@ Contains cross-cutting concerns:
 """
 
 from app.core.logging_config import configure_logging, get_logger, LogContext
-from app.core.cache import RedisCache, InMemoryCache, CacheManager
+from app.core.cache import RedisCache, InMemoryCache, DiskCache, CacheManager
 
 __all__ = [
     "configure_logging",
@@ -17,5 +17,6 @@ __all__ = [
     "LogContext",
     "RedisCache",
     "InMemoryCache",
+    "DiskCache",
     "CacheManager",
 ]
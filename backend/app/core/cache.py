@@ -4,6 +4,7 @@ Caching System for RestoPilotAI.
 Provides:
 - In-memory cache with TTL
 - Redis-compatible cache interface
+- Persistent on-disk (SQLite) cache for deployments without Redis
 - Cache manager for multi-tier caching
 - Gemini response caching
 - Menu/competitor data caching
@@ -15,11 +16,14 @@ import json
 import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, Generic, Optional, TypeVar
+from pathlib import Path
+from typing import Any, Callable, Dict, Generic, Optional, Tuple, TypeVar
 
 from loguru import logger
 
 from app.core.config import get_settings
+from app.core.disk_cache import DiskStore
+from app.core.single_flight import SingleFlight
 
 T = TypeVar("T")
 
@@ -112,6 +116,10 @@ class BaseCache(ABC):
         """Get cache statistics."""
         pass
 
+    async def get_with_tags(self, key: str) -> Tuple[Optional[Any], list]:
+        """Get value together with its tags (backends without tag lookup return none)."""
+        return await self.get(key), []
+
     @staticmethod
     def generate_key(*args, **kwargs) -> str:
         """Generate cache key from arguments."""
@@ -481,12 +489,133 @@ class RedisCache(BaseCache):
         return self._stats
 
 
+class DiskCache(BaseCache):
+    """
+    Persistent SQLite-backed cache.
+
+    Survives process restarts, so it is used as L2 when Redis is not
+    deployed. Blocking SQLite work runs on a worker thread.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 256 * 1024 * 1024,
+        default_ttl: int = 3600,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+
+        self._store: Optional[DiskStore] = None
+        self._stats = CacheStats()
+
+    async def connect(self) -> bool:
+        """Open the store and purge anything that expired while offline."""
+        try:
+            self._store = await asyncio.to_thread(DiskStore, self.path, self.max_bytes)
+            await asyncio.to_thread(self._store.compact)
+            self._stats.size = (await asyncio.to_thread(self._store.stats))["entries"]
+            logger.info(f"Disk cache opened at {self.path}")
+            return True
+        except Exception as e:
+            logger.warning(f"Disk cache unavailable at {self.path}: {e}")
+            self._store = None
+            return False
+
+    async def disconnect(self) -> None:
+        """Close the store."""
+        if self._store:
+            await asyncio.to_thread(self._store.close)
+            self._store = None
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get value from cache."""
+        value, _ = await self.get_with_tags(key)
+        return value
+
+    async def get_with_tags(self, key: str) -> Tuple[Optional[Any], list]:
+        """Get value and tags so promoted L1 copies stay invalidatable."""
+        if not self._store:
+            self._stats.misses += 1
+            return None, []
+
+        try:
+            entry = await asyncio.to_thread(self._store.get, key)
+        except Exception as e:
+            logger.error(f"Disk cache get error: {e}")
+            entry = None
+
+        if entry is None:
+            self._stats.misses += 1
+            return None, []
+
+        self._stats.hits += 1
+        return entry.value, entry.tags
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[int] = None,
+        tags: Optional[list] = None,
+    ) -> bool:
+        """Set value in cache."""
+        if not self._store:
+            return False
+
+        try:
+            ttl = ttl if ttl is not None else self.default_ttl
+            evictions_before = self._store.evictions
+            stored = await asyncio.to_thread(self._store.set, key, value, ttl, tags)
+            self._stats.evictions += self._store.evictions - evictions_before
+            return stored
+        except Exception as e:
+            logger.error(f"Disk cache set error: {e}")
+            return False
+
+    async def delete(self, key: str) -> bool:
+        """Delete key from cache."""
+        if not self._store:
+            return False
+        return await asyncio.to_thread(self._store.delete, key)
+
+    async def exists(self, key: str) -> bool:
+        """Check if key exists and is not expired."""
+        if not self._store:
+            return False
+        return await asyncio.to_thread(self._store.get, key) is not None
+
+    async def clear(self, pattern: Optional[str] = None) -> int:
+        """Clear all entries, or only keys matching a glob pattern."""
+        if not self._store:
+            return 0
+        count = await asyncio.to_thread(self._store.clear, pattern)
+        logger.info(f"Disk cache cleared: {count} entries removed")
+        return count
+
+    async def invalidate_by_tag(self, tag: str) -> int:
+        """Invalidate all entries with a specific tag."""
+        if not self._store:
+            return 0
+        keys = await asyncio.to_thread(self._store.invalidate_by_tag, tag)
+        return len(keys)
+
+    def get_stats(self) -> CacheStats:
+        """Get cache statistics."""
+        if self._store:
+            store_stats = self._store.stats()
+            self._stats.size = store_stats["entries"]
+        self._stats.max_size = self.max_bytes
+        return self._stats
+
+
 class CacheManager:
     """
     Multi-tier cache manager.
 
     Features:
-    - L1 (in-memory) + L2 (Redis) caching
+    - L1 (in-memory) + L2 (Redis, or SQLite on disk without Redis) caching
     - Automatic fallback
     - Cache-aside pattern helpers
     - Gemini response caching
@@ -498,9 +627,15 @@ class CacheManager:
         l1_ttl: int = 300,
         redis_url: Optional[str] = None,
         redis_ttl: int = 3600,
+        disk_path: Optional[str] = None,
+        disk_max_bytes: int = 256 * 1024 * 1024,
     ):
         self.l1 = InMemoryCache(max_size=l1_max_size, default_ttl=l1_ttl)
-        self.l2: Optional[RedisCache] = None
+        self.l2: Optional[BaseCache] = None
+        self._inflight = SingleFlight()
+        self.redis_ttl = redis_ttl
+        self.disk_path = disk_path
+        self.disk_max_bytes = disk_max_bytes
 
         if redis_url:
             self.l2 = RedisCache(url=redis_url, default_ttl=redis_ttl)
@@ -509,8 +644,20 @@ class CacheManager:
         """Initialize cache connections."""
         await self.l1.start()
 
-        if self.l2:
-            await self.l2.connect()
+        if isinstance(self.l2, RedisCache) and not await self.l2.connect():
+            # Redis' own fallback is memory-only; prefer the persistent disk tier
+            if self.disk_path:
+                await self.l2.disconnect()
+                self.l2 = None
+
+        if self.l2 is None and self.disk_path:
+            disk = DiskCache(
+                self.disk_path,
+                max_bytes=self.disk_max_bytes,
+                default_ttl=self.redis_ttl,
+            )
+            if await disk.connect():
+                self.l2 = disk
 
     async def stop(self) -> None:
         """Close cache connections."""
@@ -530,10 +677,10 @@ class CacheManager:
 
         # Try L2 if available
         if self.l2:
-            value = await self.l2.get(key)
+            value, tags = await self.l2.get_with_tags(key)
             if value is not None:
-                # Populate L1
-                await self.l1.set(key, value)
+                # Populate L1, keeping tags so tag invalidation reaches it
+                await self.l1.set(key, value, tags=tags)
                 return value
 
         return None
@@ -587,21 +734,29 @@ class CacheManager:
     ) -> Any:
         """
         Cache-aside pattern: get from cache or compute and store.
+
+        Concurrent callers on a cold key share one factory call.
         """
         value = await self.get(key)
         if value is not None:
             return value
 
-        # Compute value
-        if asyncio.iscoroutinefunction(factory):
-            value = await factory()
-        else:
-            value = factory()
+        async def _compute() -> Any:
+            # Another caller may have filled the key while we were scheduled
+            value = await self.get(key)
+            if value is not None:
+                return value
 
-        # Store in cache
-        await self.set(key, value, ttl, ttl, tags)
+            if asyncio.iscoroutinefunction(factory):
+                value = await factory()
+            else:
+                value = factory()
 
-        return value
+            # Store in cache
+            await self.set(key, value, ttl, ttl, tags)
+            return value
+
+        return await self._inflight.do(key, _compute)
 
     def get_stats(self) -> Dict[str, Any]:
         """Get combined cache statistics."""
@@ -669,7 +824,11 @@ async def get_cache_manager() -> CacheManager:
 
     if _cache_manager is None:
         settings = get_settings()
-        _cache_manager = CacheManager(redis_url=settings.redis_url)
+        _cache_manager = CacheManager(
+            redis_url=settings.redis_url,
+            disk_path=str(Path(settings.cache_dir) / "app_cache.db"),
+            disk_max_bytes=settings.cache_disk_max_size_mb * 1024 * 1024,
+        )
         await _cache_manager.start()
 
     return _cache_manager
@@ -59,6 +59,12 @@ class Settings(BaseSettings):
     # ==================== Database ====================
     database_url: str = "sqlite+aiosqlite:///./data/RestoPilotAI.db"
     redis_url: str = "redis://localhost:6379"
+    cache_dir: str = "data/cache"  # On-disk L2 cache used when Redis is unavailable
+    cache_disk_max_size_mb: int = 256
+    session_flush_delay_seconds: float = 0.5  # Coalescing window for session file writes
+    sales_data_dir: str = "data/sales"  # Columnar sales tables, one file per session
+    sales_frame_cache_size: int = 8  # Sales tables kept decoded in memory
+    sales_ingest_chunk_rows: int = 100_000  # Rows per chunk when reading sales uploads
 
     # ==================== Gemini 3 Configuration ====================
     # CRITICAL: Use only Gemini 3 models
@@ -80,7 +86,10 @@ class Settings(BaseSettings):
     gemini_rate_limit_rpm: int = 15  # Requests per minute
     gemini_rate_limit_tpm: int = 1_000_000  # Tokens per minute
     gemini_rate_limit_window: int = 60  # Window in seconds
-    gemini_max_concurrent_requests: int = 3  # Avoid throttling
+    gemini_max_concurrent_requests: int = 3  # Per-model in-flight requests (shared executor)
+    gemini_executor_max_workers: int = 16  # Dedicated thread pool for the sync genai client
+    gemini_batch_max_concurrency: int = 5  # Items of one agent batch in flight
+    gemini_batch_item_timeout_seconds: float = 180.0  # Deadline per batch item
     
     # Token Limits (differentiated by task)
     gemini_max_input_tokens: int = 128000  # Context window
@@ -112,6 +121,8 @@ class Settings(BaseSettings):
     gemini_enable_safety_checks: bool = True
     gemini_min_confidence_score: float = 0.7
     gemini_enable_hallucination_detection: bool = True
+    gemini_validation_pack_size: int = 1  # Small validation targets per request (1 = no packing)
+    gemini_validation_pack_max_chars: int = 4000  # Only targets up to this size are packed
     
     # Features
     gemini_enable_grounding: bool = True
@@ -136,6 +147,11 @@ class Settings(BaseSettings):
     marathon_enable_recovery: bool = True
     marathon_enable_checkpoints: bool = True
     marathon_max_task_duration: int = 3600  # 1 hour max per task
+    marathon_max_concurrent_stages: int = 4  # Independent pipeline stages run in parallel
+    marathon_checkpoint_retained_states: int = 3  # Latest restorable checkpoints kept per session
+    marathon_checkpoint_compact_every: int = 50  # Garbage-collect unreferenced state blobs
+    debate_max_rounds: int = 1  # >1 enables rebuttal rounds (3 more LLM calls each, until consensus)
+    debate_consensus_confidence: float = 0.7  # Min agent confidence for early consensus
     
     # ==================== Thought Signatures Configuration ====================
     # Transparent reasoning levels
@@ -156,11 +172,26 @@ class Settings(BaseSettings):
     
     # ==================== External APIs ====================
     places_rate_limit: int = 100
+    http_timeout_seconds: float = 15.0  # Default timeout of the shared HTTP clients
+    http_max_connections: int = 100  # Open connections per shared client
+    http_max_keepalive_connections: int = 20  # Idle connections kept per shared client
+    http_keepalive_expiry_seconds: float = 30.0  # Idle time before a pooled connection closes
+    http_per_host_limit: int = 10  # Concurrent requests per host and client
+    http_retry_attempts: int = 3  # Tries per request on connection errors and 429/5xx
+    http_dns_cache_ttl_seconds: float = 300.0  # Resolved addresses reused for new connections
 
     # ==================== Analysis Configuration ====================
     max_competitors: int = 5
     competitor_search_radius: int = 1000 # meters
     max_images_per_competitor: int = 10
+    enrichment_max_concurrent_competitors: int = 4  # Competitors enriched in parallel
+    enrichment_step_timeout_seconds: float = 45.0  # Deadline per enrichment step
+    enrichment_per_host_limit: int = 2  # Concurrent requests per external host
+    enrichment_places_concurrency: int = 5  # Concurrent Places API requests
+    competitor_url_cache_ttl_seconds: int = 604800  # Extracted competitor menus kept per URL (revalidated)
+    geocode_cache_ttl_seconds: int = 2592000  # Geocoded addresses kept (30 days)
+    places_nearby_cache_ttl_seconds: int = 604800  # Nearby-search tiles kept
+    place_details_cache_ttl_seconds: int = 604800  # Place details kept per place_id
     
     # ==================== WebSocket ====================
     ws_heartbeat_interval: int = 30
@@ -168,6 +199,8 @@ class Settings(BaseSettings):
     # ==================== File Upload ====================
     max_upload_size_mb: int = 50
     max_pdf_pages: int = 30
+    pdf_render_workers: int = 4  # Processes for PDF page rendering and OCR
+    image_batch_concurrency: int = 4  # Vision calls in flight per uploaded image batch
     allowed_image_extensions: str = "jpg,jpeg,png,webp,pdf"
     allowed_data_extensions: str = "csv,xlsx"
     allowed_audio_extensions: str = "mp3,wav,m4a,ogg,webm,flac,aac"
@@ -178,6 +211,8 @@ class Settings(BaseSettings):
     bcg_high_growth_percentile: int = 75
     neural_predictor_epochs: int = 30
     neural_predictor_batch_size: int = 32
+    model_registry_max_size_mb: int = 512  # Warm predictors kept in memory
+    model_registry_idle_ttl_seconds: int = 3600  # Unused models are unloaded after this
 
     @property
     def allowed_image_ext_list(self) -> List[str]:
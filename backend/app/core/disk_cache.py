@@ -0,0 +1,282 @@
+"""
+On-disk cache store backed by SQLite.
+
+Used as the persistent L2 tier behind the in-memory caches when Redis is
+not deployed, so cached Gemini responses and analysis results survive
+container restarts and cold starts.
+
+Provides:
+- Atomic writes (each set/delete runs in a single transaction)
+- TTL expiry
+- Tag-based invalidation
+- Glob-pattern clearing (same syntax as Redis ``KEYS``)
+- Size-bounded compaction with least-recently-used eviction
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+# Reads only refresh the LRU timestamp once per interval to avoid a write per hit
+_TOUCH_INTERVAL_SECONDS = 60.0
+
+# Compaction trims down to this fraction of the budget to avoid thrashing
+_COMPACT_TARGET_RATIO = 0.9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL,
+    last_accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_expires ON entries(expires_at);
+CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(last_accessed);
+CREATE TABLE IF NOT EXISTS tags (
+    tag TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (tag, key)
+);
+CREATE INDEX IF NOT EXISTS idx_tags_key ON tags(key);
+"""
+
+
+@dataclass
+class StoredEntry:
+    """A value read back from the store with its metadata."""
+
+    value: Any
+    expires_at: Optional[float] = None
+    tags: List[str] = field(default_factory=list)
+
+
+class DiskStore:
+    """
+    Synchronous SQLite key-value store with TTL, tags and a byte budget.
+
+    Values must be JSON-serializable. All methods are thread-safe; async
+    callers should run them via ``asyncio.to_thread``.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.compactions = 0
+        self.evictions = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.path), check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        self._bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+
+    def get(self, key: str) -> Optional[StoredEntry]:
+        """Return the entry for ``key`` or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at, last_accessed FROM entries WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, expires_at, last_accessed = row
+            if expires_at is not None and expires_at <= now:
+                self._delete_keys([key])
+                return None
+
+            if now - last_accessed > _TOUCH_INTERVAL_SECONDS:
+                self._conn.execute(
+                    "UPDATE entries SET last_accessed = ? WHERE key = ?", (now, key)
+                )
+
+            tags = [
+                tag
+                for (tag,) in self._conn.execute(
+                    "SELECT tag FROM tags WHERE key = ?", (key,)
+                )
+            ]
+
+        return StoredEntry(value=json.loads(value), expires_at=expires_at, tags=tags)
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        tags: Optional[List[str]] = None,
+    ) -> bool:
+        """Store ``value`` atomically; ``ttl`` of None or <= 0 never expires."""
+        payload = json.dumps(value, default=str)
+        size = len(payload.encode("utf-8"))
+        if size > self.max_bytes:
+            logger.warning(f"Disk cache entry {key[:24]} exceeds budget, not stored")
+            return False
+
+        now = time.time()
+        expires_at = now + ttl if ttl and ttl > 0 else None
+
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                row = self._conn.execute(
+                    "SELECT size FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                self._conn.execute(
+                    """
+                    INSERT INTO entries (key, value, size, expires_at, last_accessed)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(key) DO UPDATE SET
+                        value = excluded.value,
+                        size = excluded.size,
+                        expires_at = excluded.expires_at,
+                        last_accessed = excluded.last_accessed
+                    """,
+                    (key, payload, size, expires_at, now),
+                )
+                self._conn.execute("DELETE FROM tags WHERE key = ?", (key,))
+                if tags:
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO tags (tag, key) VALUES (?, ?)",
+                        [(tag, key) for tag in tags],
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            self._bytes += size - (row[0] if row else 0)
+            if self._bytes > self.max_bytes:
+                self._compact()
+
+        return True
+
+    def delete(self, key: str) -> bool:
+        """Delete a single key."""
+        with self._lock:
+            return self._delete_keys([key]) > 0
+
+    def clear(self, pattern: Optional[str] = None) -> int:
+        """Delete keys matching a Redis-style glob (all keys if None)."""
+        with self._lock:
+            if pattern is None or pattern == "*":
+                keys = [key for (key,) in self._conn.execute("SELECT key FROM entries")]
+            else:
+                keys = [
+                    key
+                    for (key,) in self._conn.execute(
+                        "SELECT key FROM entries WHERE key GLOB ?", (pattern,)
+                    )
+                ]
+            return self._delete_keys(keys)
+
+    def invalidate_by_tag(self, tag: str) -> List[str]:
+        """Delete every entry carrying ``tag`` and return the deleted keys."""
+        with self._lock:
+            keys = [
+                key
+                for (key,) in self._conn.execute(
+                    "SELECT key FROM tags WHERE tag = ?", (tag,)
+                )
+            ]
+            self._delete_keys(keys)
+            return keys
+
+    def compact(self) -> int:
+        """Purge expired entries and trim to the byte budget."""
+        with self._lock:
+            return self._compact()
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and eviction counters."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "compactions": self.compactions,
+        }
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _delete_keys(self, keys: List[str]) -> int:
+        """Delete ``keys`` in one transaction. Caller holds the lock."""
+        if not keys:
+            return 0
+
+        deleted = 0
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                marks = ",".join("?" * len(batch))
+                freed = self._conn.execute(
+                    f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries WHERE key IN ({marks})",
+                    batch,
+                ).fetchone()
+                self._conn.execute(f"DELETE FROM entries WHERE key IN ({marks})", batch)
+                self._conn.execute(f"DELETE FROM tags WHERE key IN ({marks})", batch)
+                deleted += freed[0]
+                self._bytes -= freed[1]
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+        return deleted
+
+    def _compact(self) -> int:
+        """Drop expired then least-recently-used entries. Caller holds the lock."""
+        expired = [
+            key
+            for (key,) in self._conn.execute(
+                "SELECT key FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            )
+        ]
+        removed = self._delete_keys(expired)
+
+        target = int(self.max_bytes * _COMPACT_TARGET_RATIO)
+        while self._bytes > target:
+            victims = []
+            projected = self._bytes
+            for key, size in self._conn.execute(
+                "SELECT key, size FROM entries ORDER BY last_accessed LIMIT 100"
+            ):
+                victims.append(key)
+                projected -= size
+                if projected <= target:
+                    break
+            if not victims:
+                break
+            evicted = self._delete_keys(victims)
+            self.evictions += evicted
+            removed += evicted
+
+        self._conn.execute("PRAGMA incremental_vacuum").fetchall()
+        self.compactions += 1
+        if removed:
+            logger.debug(f"Disk cache compacted: {removed} entries removed from {self.path}")
+        return removed
@@ -2,22 +2,31 @@
 Intelligent Caching System for Gemini 3 API calls.
 
 Reduces costs and improves performance by caching responses.
-Uses Redis for distributed caching with TTL support.
+Uses Redis for distributed caching with TTL support. Without Redis, an
+in-process L1 sits in front of a persistent SQLite L2 under ``data/`` so
+cached responses survive restarts.
 """
 
+import fnmatch
 import hashlib
 import json
-from typing import Any, Dict, Optional
-from datetime import datetime, timedelta
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from datetime import datetime
 
 from loguru import logger
 
+from app.core.config import get_settings
+from app.core.disk_cache import DiskStore
+
 try:
     import redis
     REDIS_AVAILABLE = True
 except ImportError:
     REDIS_AVAILABLE = False
-    logger.warning("Redis not available - using in-memory cache fallback")
+    logger.warning("Redis not available - using local memory + disk cache fallback")
 
 
 # ==================== Cache Statistics ====================
@@ -63,6 +72,63 @@ class CacheStatistics:
         }
 
 
+# ==================== Cache Keys ====================
+
+def build_cache_key(
+    prompt: str,
+    model: str,
+    thinking_level: Optional[str] = None,
+    images: Optional[list] = None,
+    **kwargs
+) -> str:
+    """
+    Generate unique cache key from request parameters.
+    
+    Args:
+        prompt: The prompt text
+        model: Model name
+        thinking_level: Thinking level if applicable
+        images: List of images (will hash)
+        **kwargs: Additional parameters
+        
+    Returns:
+        SHA256 hash as cache key
+    """
+    
+    # Build cache key components
+    key_components = {
+        "prompt": prompt,
+        "model": model,
+        "thinking_level": thinking_level,
+        "enable_grounding": kwargs.get("enable_grounding", False),
+        "response_schema": str(kwargs.get("response_schema")),
+    }
+    
+    # Hash images if present
+    if images:
+        image_hashes = []
+        for img in images:
+            if isinstance(img, bytes):
+                img_hash = hashlib.md5(img).hexdigest()
+                image_hashes.append(img_hash)
+            elif isinstance(img, tuple) and img and isinstance(img[0], bytes):
+                # (bytes, mime_type) pairs
+                img_hash = hashlib.md5(img[0]).hexdigest()
+                image_hashes.append(":".join([img_hash, *map(str, img[1:])]))
+            else:
+                image_hashes.append(str(img))
+        key_components["images"] = image_hashes
+    
+    # Create deterministic string
+    key_string = json.dumps(key_components, sort_keys=True)
+    
+    # Generate SHA256 hash
+    cache_key = hashlib.sha256(key_string.encode()).hexdigest()
+    
+    # Add prefix for namespacing
+    return f"gemini:cache:{cache_key}"
+
+
 # ==================== Gemini Cache ====================
 
 class GeminiCache:
@@ -71,10 +137,11 @@ class GeminiCache:
     
     Features:
     - Redis-backed distributed cache
+    - Two-tier local fallback: in-memory L1 + SQLite L2 on disk
     - Automatic cache key generation
     - TTL support (default 7 days)
+    - Tag-based invalidation
     - Cache statistics tracking
-    - In-memory fallback if Redis unavailable
     - Cost and token tracking
     """
     
@@ -83,12 +150,19 @@ class GeminiCache:
         redis_host: str = "localhost",
         redis_port: int = 6379,
         redis_db: int = 0,
-        default_ttl: int = 604800  # 7 days
+        default_ttl: int = 604800,  # 7 days
+        disk_path: Optional[str] = None,
+        disk_max_bytes: Optional[int] = None,
+        l1_max_entries: int = 256
     ):
         self.default_ttl = default_ttl
         self.stats = CacheStatistics()
+        self.redis = None
+        self.disk: Optional[DiskStore] = None
+        self.l1_max_entries = l1_max_entries
+        self._memory_cache: "OrderedDict[str, tuple]" = OrderedDict()  # (value, expiry, tags)
         
-        # Initialize Redis or fallback to in-memory
+        # Initialize Redis or fallback to local tiers
         if REDIS_AVAILABLE:
             try:
                 self.redis = redis.Redis(
@@ -101,17 +175,22 @@ class GeminiCache:
                 self.redis.ping()
                 self.backend = "redis"
                 logger.info("gemini_cache_initialized", backend="redis")
+                return
             except Exception as e:
                 logger.warning("redis_connection_failed", error=str(e))
                 self.redis = None
-                self.backend = "memory"
-                self._memory_cache: Dict[str, tuple] = {}  # (value, expiry)
-                logger.info("gemini_cache_initialized", backend="memory_fallback")
-        else:
-            self.redis = None
+        
+        settings = get_settings()
+        try:
+            self.disk = DiskStore(
+                disk_path or str(Path(settings.cache_dir) / "gemini_cache.db"),
+                max_bytes=disk_max_bytes or settings.cache_disk_max_size_mb * 1024 * 1024,
+            )
+            self.backend = "disk"
+        except Exception as e:
+            logger.warning("disk_cache_unavailable", error=str(e))
             self.backend = "memory"
-            self._memory_cache: Dict[str, tuple] = {}
-            logger.info("gemini_cache_initialized", backend="memory_fallback")
+        logger.info("gemini_cache_initialized", backend=self.backend)
     
     def generate_cache_key(
         self,
@@ -124,43 +203,10 @@ class GeminiCache:
         """
         Generate unique cache key from request parameters.
         
-        Args:
-            prompt: The prompt text
-            model: Model name
-            thinking_level: Thinking level if applicable
-            images: List of images (will hash)
-            **kwargs: Additional parameters
-            
-        Returns:
-            SHA256 hash as cache key
+        See ``build_cache_key``; the same key is used for single-flight
+        coalescing of identical in-flight requests.
         """
-        
-        # Build cache key components
-        key_components = {
-            "prompt": prompt,
-            "model": model,
-            "thinking_level": thinking_level,
-            "enable_grounding": kwargs.get("enable_grounding", False),
-            "response_schema": str(kwargs.get("response_schema")),
-        }
-        
-        # Hash images if present
-        if images:
-            image_hashes = []
-            for img in images:
-                if isinstance(img, bytes):
-                    img_hash = hashlib.md5(img).hexdigest()
-                    image_hashes.append(img_hash)
-            key_components["images"] = image_hashes
-        
-        # Create deterministic string
-        key_string = json.dumps(key_components, sort_keys=True)
-        
-        # Generate SHA256 hash
-        cache_key = hashlib.sha256(key_string.encode()).hexdigest()
-        
-        # Add prefix for namespacing
-        return f"gemini:cache:{cache_key}"
+        return build_cache_key(prompt, model, thinking_level, images, **kwargs)
     
     def get(self, key: str) -> Optional[Dict[str, Any]]:
         """
@@ -178,29 +224,25 @@ class GeminiCache:
                 data = self.redis.get(key)
                 if data:
                     result = json.loads(data)
-                    
-                    # Record hit
-                    tokens_saved = result.get("usage", {}).get("total_tokens", 0)
-                    cost_saved = result.get("usage", {}).get("cost_usd", 0.0)
-                    self.stats.record_hit(tokens_saved, cost_saved)
-                    
+                    self._record_hit(result)
                     logger.debug("cache_hit", key=key[:16])
                     return result
             else:
-                # Memory fallback
-                if key in self._memory_cache:
-                    value, expiry = self._memory_cache[key]
-                    if datetime.utcnow() < expiry:
-                        # Record hit
-                        tokens_saved = value.get("usage", {}).get("total_tokens", 0)
-                        cost_saved = value.get("usage", {}).get("cost_usd", 0.0)
-                        self.stats.record_hit(tokens_saved, cost_saved)
-                        
-                        logger.debug("cache_hit", key=key[:16], backend="memory")
-                        return value
-                    else:
-                        # Expired, remove
-                        del self._memory_cache[key]
+                value = self._l1_get(key)
+                if value is not None:
+                    self._record_hit(value)
+                    logger.debug("cache_hit", key=key[:16], backend="memory")
+                    return value
+                
+                if self.disk:
+                    entry = self.disk.get(key)
+                    if entry is not None:
+                        # Promote to L1 with the remaining TTL and tags
+                        expiry = entry.expires_at or time.time() + self.default_ttl
+                        self._l1_put(key, entry.value, expiry, entry.tags)
+                        self._record_hit(entry.value)
+                        logger.debug("cache_hit", key=key[:16], backend="disk")
+                        return entry.value
             
             # Cache miss
             self.stats.record_miss()
@@ -216,7 +258,8 @@ class GeminiCache:
         self,
         key: str,
         value: Dict[str, Any],
-        ttl: Optional[int] = None
+        ttl: Optional[int] = None,
+        tags: Optional[List[str]] = None
     ) -> bool:
         """
         Store value in cache.
@@ -225,6 +268,7 @@ class GeminiCache:
             key: Cache key
             value: Value to cache
             ttl: Time to live in seconds (default: 7 days)
+            tags: Optional tags for grouped invalidation
             
         Returns:
             True if successful
@@ -246,12 +290,16 @@ class GeminiCache:
                     ttl,
                     json.dumps(cached_value)
                 )
+                for tag in tags or []:
+                    self.redis.sadd(self._tag_key(tag), key)
+                    self.redis.expire(self._tag_key(tag), ttl)
                 logger.debug("cache_set", key=key[:16], ttl=ttl)
             else:
-                # Memory fallback
-                expiry = datetime.utcnow() + timedelta(seconds=ttl)
-                self._memory_cache[key] = (cached_value, expiry)
-                logger.debug("cache_set", key=key[:16], ttl=ttl, backend="memory")
+                # Write-through: disk first so L1 never holds what L2 rejected
+                if self.disk and not self.disk.set(key, cached_value, ttl, tags):
+                    return False
+                self._l1_put(key, cached_value, time.time() + ttl, tags or [])
+                logger.debug("cache_set", key=key[:16], ttl=ttl, backend=self.backend)
             
             return True
             
@@ -265,8 +313,9 @@ class GeminiCache:
             if self.backend == "redis" and self.redis:
                 self.redis.delete(key)
             else:
-                if key in self._memory_cache:
-                    del self._memory_cache[key]
+                self._memory_cache.pop(key, None)
+                if self.disk:
+                    self.disk.delete(key)
             
             logger.debug("cache_delete", key=key[:16])
             return True
@@ -279,7 +328,7 @@ class GeminiCache:
         Clear cache entries matching pattern.
         
         Args:
-            pattern: Redis pattern to match
+            pattern: Redis-style glob pattern to match
             
         Returns:
             Number of keys deleted
@@ -292,10 +341,12 @@ class GeminiCache:
                     logger.info("cache_cleared", keys_deleted=deleted)
                     return deleted
             else:
-                # Memory fallback - clear all
-                count = len(self._memory_cache)
-                self._memory_cache.clear()
-                logger.info("cache_cleared", keys_deleted=count, backend="memory")
+                matches = [k for k in self._memory_cache if fnmatch.fnmatchcase(k, pattern)]
+                for k in matches:
+                    del self._memory_cache[k]
+                # L1 is a subset of L2, so the disk count is the total
+                count = self.disk.clear(pattern) if self.disk else len(matches)
+                logger.info("cache_cleared", keys_deleted=count, backend=self.backend)
                 return count
             
             return 0
@@ -303,18 +354,73 @@ class GeminiCache:
             logger.error("cache_clear_error", error=str(e))
             return 0
     
+    def invalidate_by_tag(self, tag: str) -> int:
+        """
+        Delete every entry stored with ``tag``.
+        
+        Returns:
+            Number of keys deleted
+        """
+        try:
+            if self.backend == "redis" and self.redis:
+                keys = self.redis.smembers(self._tag_key(tag))
+                if keys:
+                    self.redis.delete(*keys, self._tag_key(tag))
+                count = len(keys)
+            else:
+                matches = [k for k, (_, _, tags) in self._memory_cache.items() if tag in tags]
+                for k in matches:
+                    del self._memory_cache[k]
+                count = len(self.disk.invalidate_by_tag(tag)) if self.disk else len(matches)
+            
+            logger.info("cache_tag_invalidated", tag=tag, keys_deleted=count)
+            return count
+        except Exception as e:
+            logger.error("cache_invalidate_error", error=str(e))
+            return 0
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
         stats = self.stats.to_dict()
         stats["backend"] = self.backend
         stats["default_ttl_seconds"] = self.default_ttl
         
-        # Add size info if memory backend
-        if self.backend == "memory":
+        # Local tiers report their sizes
+        if self.backend != "redis":
             stats["cache_size"] = len(self._memory_cache)
+            if self.disk:
+                stats["l2"] = self.disk.stats()
+                stats["cache_size"] = stats["l2"]["entries"]
+            stats["l1_size"] = len(self._memory_cache)
         
         return stats
     
+    def _record_hit(self, value: Dict[str, Any]):
+        usage = value.get("usage", {}) if isinstance(value, dict) else {}
+        self.stats.record_hit(usage.get("total_tokens", 0), usage.get("cost_usd", 0.0))
+    
+    def _l1_get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._memory_cache.get(key)
+        if entry is None:
+            return None
+        value, expiry, _ = entry
+        if time.time() >= expiry:
+            del self._memory_cache[key]
+            return None
+        self._memory_cache.move_to_end(key)
+        return value
+    
+    def _l1_put(self, key: str, value: Dict[str, Any], expiry: float, tags: List[str]):
+        self._memory_cache[key] = (value, expiry, list(tags))
+        self._memory_cache.move_to_end(key)
+        # Without a disk tier L1 is the only copy, so it is left unbounded
+        while self.disk and len(self._memory_cache) > self.l1_max_entries:
+            self._memory_cache.popitem(last=False)
+    
+    @staticmethod
+    def _tag_key(tag: str) -> str:
+        return f"gemini:tag:{tag}"
+    
     def reset_stats(self):
         """Reset cache statistics."""
         self.stats = CacheStatistics()
@@ -0,0 +1,272 @@
+"""Shared bounded-concurrency executor for outbound Gemini requests.
+
+The google-genai client used across ``services/gemini`` is synchronous, so
+every call has to run on a worker thread. Instead of each agent dispatching
+its own ``asyncio.to_thread`` call onto the default pool, all calls go
+through this executor, which provides:
+- A dedicated, bounded thread pool
+- Per-model concurrency slots (``gemini_max_concurrent_requests``)
+- Priority classes so interactive requests overtake background stages;
+  callers pass ``priority=`` or mark a whole block with ``request_priority()``
+- Queue-depth and latency metrics
+"""
+
+import asyncio
+import contextvars
+import functools
+import heapq
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+from app.core.config import get_settings
+
+
+class RequestPriority(IntEnum):
+    """Scheduling class for a Gemini request; lower values run first."""
+
+    INTERACTIVE = 0  # Chat and other user-facing requests
+    STANDARD = 1  # Regular route handlers
+    BACKGROUND = 2  # Marathon pipeline stages and enrichment
+
+
+# Priority for requests that don't pass one explicitly
+_current_priority: contextvars.ContextVar[RequestPriority] = contextvars.ContextVar(
+    "gemini_request_priority", default=RequestPriority.STANDARD
+)
+
+
+@contextmanager
+def request_priority(priority: RequestPriority) -> Iterator[None]:
+    """Schedule Gemini calls made inside the block (and tasks it spawns) at ``priority``."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+@dataclass
+class ModelSlotStats:
+    """Counters for one model's concurrency slots."""
+
+    in_flight: int = 0
+    started: int = 0
+    completed: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    max_queue_depth: int = 0
+    total_wait_ms: float = 0.0
+    queued_by_priority: Dict[str, int] = field(
+        default_factory=lambda: {p.name.lower(): 0 for p in RequestPriority}
+    )
+
+
+class _ModelSlots:
+    """Priority-ordered concurrency slots for a single model."""
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self.stats = ModelSlotStats()
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, fut in self._waiters if not fut.done())
+
+    async def acquire(self, priority: RequestPriority):
+        """Wait for a free slot; higher-priority waiters are served first."""
+        if self.stats.in_flight < self.capacity and not self.queue_depth:
+            self.stats.in_flight += 1
+            return
+
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._counter), fut))
+        self.stats.queued_by_priority[priority.name.lower()] += 1
+        self.stats.max_queue_depth = max(self.stats.max_queue_depth, self.queue_depth)
+
+        try:
+            await fut
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before cancellation
+            if fut.done() and not fut.cancelled():
+                self.release()
+            raise
+        finally:
+            self.stats.queued_by_priority[priority.name.lower()] -= 1
+
+    def release(self):
+        """Free a slot, handing it directly to the next live waiter."""
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                # Slot ownership transfers without touching in_flight
+                fut.set_result(None)
+                return
+        self.stats.in_flight -= 1
+
+
+class GeminiRequestExecutor:
+    """Runs blocking Gemini client calls under global concurrency limits."""
+
+    def __init__(
+        self,
+        max_concurrent_per_model: Optional[int] = None,
+        max_workers: Optional[int] = None,
+    ):
+        settings = get_settings()
+        self.max_concurrent_per_model = (
+            max_concurrent_per_model or settings.gemini_max_concurrent_requests
+        )
+        self.max_workers = max_workers or settings.gemini_executor_max_workers
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="gemini"
+        )
+        self._slots: Dict[str, _ModelSlots] = {}
+
+    def _slots_for(self, model: str) -> _ModelSlots:
+        if model not in self._slots:
+            self._slots[model] = _ModelSlots(self.max_concurrent_per_model)
+        return self._slots[model]
+
+    async def run(
+        self,
+        func: Callable[..., Any],
+        *args,
+        model: str,
+        priority: Optional[RequestPriority] = None,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> Any:
+        """
+        Run a blocking client call on the Gemini thread pool.
+
+        Args:
+            func: Synchronous callable (e.g. ``client.models.generate_content``)
+            model: Model name used to pick the concurrency slots
+            priority: Scheduling class for this request; defaults to the
+                one set by ``request_priority()``, else STANDARD
+            timeout: Seconds to wait for the result (None waits forever)
+
+        Returns:
+            Whatever ``func`` returns
+
+        Raises:
+            asyncio.TimeoutError: If the call does not finish within ``timeout``
+        """
+        if priority is None:
+            priority = _current_priority.get()
+        slots = self._slots_for(model)
+        queued_at = time.perf_counter()
+        await slots.acquire(priority)
+        slots.stats.started += 1
+        slots.stats.total_wait_ms += (time.perf_counter() - queued_at) * 1000
+
+        loop = asyncio.get_running_loop()
+        try:
+            call = loop.run_in_executor(self._pool, functools.partial(func, *args, **kwargs))
+        except BaseException:
+            slots.release()
+            raise
+
+        def _on_done(done: asyncio.Future):
+            # The worker thread keeps running after a timeout, so the slot is
+            # only released once the call has actually finished.
+            if done.cancelled() or done.exception() is not None:
+                slots.stats.failed += 1
+            else:
+                slots.stats.completed += 1
+            slots.release()
+
+        call.add_done_callback(_on_done)
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(call), timeout=timeout)
+        except asyncio.TimeoutError:
+            slots.stats.timed_out += 1
+            logger.warning(f"Gemini request on {model} timed out after {timeout}s")
+            raise
+
+    async def stream(
+        self,
+        func: Callable[..., Any],
+        *args,
+        model: str,
+        priority: Optional[RequestPriority] = None,
+        **kwargs,
+    ) -> AsyncIterator[Any]:
+        """
+        Run a blocking streaming call and yield its chunks.
+
+        The call and each ``next()`` on the iterator it returns go through
+        ``run()``, so reading the stream never blocks the event loop and
+        every chunk fetch holds a slot of ``model``.
+
+        Args:
+            func: Synchronous callable returning an iterator
+                (e.g. ``client.models.generate_content_stream``)
+            model: Model name used to pick the concurrency slots
+            priority: Scheduling class; resolved once, when the stream starts
+        """
+        if priority is None:
+            priority = _current_priority.get()
+        chunks = iter(await self.run(func, *args, model=model, priority=priority, **kwargs))
+        done = object()
+        while True:
+            chunk = await self.run(next, chunks, done, model=model, priority=priority)
+            if chunk is done:
+                return
+            yield chunk
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue-depth and throughput metrics per model."""
+        return {
+            "max_workers": self.max_workers,
+            "max_concurrent_per_model": self.max_concurrent_per_model,
+            "models": {
+                model: {
+                    "in_flight": slots.stats.in_flight,
+                    "queue_depth": slots.queue_depth,
+                    "queued_by_priority": dict(slots.stats.queued_by_priority),
+                    "max_queue_depth": slots.stats.max_queue_depth,
+                    "completed": slots.stats.completed,
+                    "failed": slots.stats.failed,
+                    "timed_out": slots.stats.timed_out,
+                    "avg_wait_ms": round(
+                        slots.stats.total_wait_ms / max(1, slots.stats.started), 2
+                    ),
+                }
+                for model, slots in self._slots.items()
+            },
+        }
+
+    def shutdown(self):
+        """Stop accepting work and release the worker threads."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Global executor instance
+_gemini_executor: Optional[GeminiRequestExecutor] = None
+
+
+def get_gemini_executor() -> GeminiRequestExecutor:
+    """Get or create the global Gemini request executor."""
+    global _gemini_executor
+    if _gemini_executor is None:
+        _gemini_executor = GeminiRequestExecutor()
+    return _gemini_executor
+
+
+def shutdown_gemini_executor():
+    """Shut down the global executor; the next call creates a fresh one."""
+    global _gemini_executor
+    if _gemini_executor is not None:
+        _gemini_executor.shutdown()
+        _gemini_executor = None
@@ -0,0 +1,402 @@
+"""Application-scoped pooled HTTP clients for external APIs and scraping.
+
+Opening an ``httpx.AsyncClient`` per call pays DNS, TCP and TLS setup on
+every Places, geocoding or page request. Services instead take a named,
+long-lived client from this registry, which provides:
+- Keep-alive connection pools shared by every caller of the same client
+- HTTP/2 when the optional ``h2`` package is installed
+- Per-host concurrency limits (``http_per_host_limit``)
+- Cached DNS resolution (``http_dns_cache_ttl_seconds``)
+- Retries with exponential backoff and full jitter on connection errors
+  and retryable statuses (429, 502, 503, 504)
+- A single ``shutdown_http_clients()`` called from the app lifespan
+"""
+
+import asyncio
+import ipaddress
+import random
+import socket
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import httpcore
+import httpx
+from loguru import logger
+
+from app.core.config import get_settings
+from app.core.single_flight import SingleFlight
+
+try:
+    import h2  # noqa: F401  (required by httpx for HTTP/2)
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """When and how a client retries a request."""
+
+    attempts: int = 3  # Total tries, including the first
+    backoff_base: float = 0.25  # Seconds; doubled on every retry
+    backoff_max: float = 4.0
+    statuses: FrozenSet[int] = frozenset({429, 502, 503, 504})
+    methods: FrozenSet[str] = frozenset({"GET", "HEAD", "OPTIONS"})
+
+    def delay(self, retry: int, retry_after: Optional[str] = None) -> float:
+        """Seconds to wait before retry number ``retry`` (starting at 1)."""
+        if retry_after:
+            try:
+                return min(self.backoff_max, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+        # Full jitter: uniform over the exponential window
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (retry - 1)))
+
+
+# Places searchNearby is a read-only POST, so Google API calls retry it too
+GOOGLE_API_RETRY = RetryPolicy(methods=frozenset({"GET", "HEAD", "OPTIONS", "POST"}))
+
+# httpcore releases (pinned in requirements.txt) whose connection pool keeps
+# its network backend in ``_network_backend``: [min, max)
+HTTPCORE_BACKEND_VERSIONS = ((1, 0), (2, 0))
+
+
+class CachingResolverBackend(httpcore.AsyncNetworkBackend):
+    """Network backend that caches ``getaddrinfo`` results per host.
+
+    Only the TCP connect goes to the resolved address; TLS still verifies
+    and sends SNI for the original host name.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._backend = httpcore.AnyIOBackend()
+        self._cache: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+        self._lookups = SingleFlight()
+        self.lookups = 0
+        self.hits = 0
+
+    async def resolve(self, host: str, port: int) -> List[str]:
+        try:
+            ipaddress.ip_address(host)
+            return [host]
+        except ValueError:
+            pass
+
+        key = (host, port)
+        cached = self._cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            self.hits += 1
+            return cached[1]
+
+        # Connections opened together share one lookup
+        return await self._lookups.do(f"{host}:{port}", lambda: self._lookup(host, port))
+
+    async def _lookup(self, host: str, port: int) -> List[str]:
+        self.lookups += 1
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            host, port, type=socket.SOCK_STREAM
+        )
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        if self.ttl_seconds > 0:
+            self._cache[(host, port)] = (time.monotonic() + self.ttl_seconds, addresses)
+        return addresses
+
+    def forget(self, host: str, port: int):
+        self._cache.pop((host, port), None)
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: Optional[float] = None,
+        local_address: Optional[str] = None,
+        socket_options: Optional[Iterable[Any]] = None,
+    ) -> httpcore.AsyncNetworkStream:
+        try:
+            addresses = await self.resolve(host, port)
+        except OSError as e:
+            raise httpcore.ConnectError(str(e)) from e
+
+        last_error: Optional[Exception] = None
+        for address in addresses:
+            try:
+                return await self._backend.connect_tcp(
+                    address,
+                    port,
+                    timeout=timeout,
+                    local_address=local_address,
+                    socket_options=socket_options,
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                last_error = e
+        # Every cached address failed: resolve afresh on the next attempt
+        self.forget(host, port)
+        raise last_error or httpcore.ConnectError(f"No addresses for {host}")
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(
+            path, timeout=timeout, socket_options=socket_options
+        )
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that frees its host slot once the body is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class PooledTransport(httpx.AsyncBaseTransport):
+    """Wraps a pooled transport with per-host limits and retries."""
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        retry: RetryPolicy,
+        per_host_limit: int,
+    ):
+        self._transport = transport
+        self.retry = retry
+        self.per_host_limit = max(1, per_host_limit)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.retries = 0
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._semaphores[host]
+
+    async def _send_once(self, request: httpx.Request) -> httpx.Response:
+        semaphore = self._semaphore(request.url.host)
+        await semaphore.acquire()
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                semaphore.release()
+
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+        if isinstance(response.stream, httpx.ByteStream):
+            # Body already in memory: nothing left on the wire
+            release()
+        else:
+            # The slot is held until the body has been read or closed
+            response.stream = _ReleasingStream(response.stream, release)
+        return response
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        retryable = request.method in self.retry.methods
+        attempt = 1
+        while True:
+            try:
+                response = await self._send_once(request)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError) as e:
+                if not retryable or attempt >= self.retry.attempts:
+                    raise
+                wait = self.retry.delay(attempt)
+                logger.debug(f"{request.method} {request.url.host} failed ({e!r}); retrying in {wait:.2f}s")
+            else:
+                if (
+                    not retryable
+                    or response.status_code not in self.retry.statuses
+                    or attempt >= self.retry.attempts
+                ):
+                    return response
+                wait = self.retry.delay(attempt, response.headers.get("Retry-After"))
+                await response.aclose()
+                logger.debug(
+                    f"{request.method} {request.url.host} returned {response.status_code}; "
+                    f"retrying in {wait:.2f}s"
+                )
+            self.retries += 1
+            attempt += 1
+            await asyncio.sleep(wait)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+@dataclass
+class _ClientEntry:
+    client: httpx.AsyncClient
+    transport: PooledTransport
+    resolver: CachingResolverBackend
+    loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def install_network_backend(
+    transport: httpx.AsyncHTTPTransport, backend: httpcore.AsyncNetworkBackend
+) -> bool:
+    """
+    Route a transport's connections through ``backend``.
+
+    httpx has no resolver hook, so the backend replaces the one on the
+    underlying httpcore pool. That attribute is private, so it is only set
+    on the httpcore versions in ``HTTPCORE_BACKEND_VERSIONS``; on any other
+    version DNS lookups are simply not cached.
+
+    Returns:
+        Whether the backend was installed
+    """
+    version = tuple(int(part) for part in httpcore.__version__.split(".")[:2])
+    pool = getattr(transport, "_pool", None)
+    low, high = HTTPCORE_BACKEND_VERSIONS
+    if not low <= version < high or not hasattr(pool, "_network_backend"):
+        logger.warning(
+            f"httpcore {httpcore.__version__} is not supported for DNS caching; "
+            "using the default network backend"
+        )
+        return False
+    pool._network_backend = backend
+    return True
+
+
+class HTTPClientRegistry:
+    """Named, application-scoped ``httpx.AsyncClient`` instances."""
+
+    def __init__(self):
+        self._clients: Dict[str, _ClientEntry] = {}
+
+    def get(
+        self,
+        name: str = "default",
+        retry: Optional[RetryPolicy] = None,
+        per_host_limit: Optional[int] = None,
+        **client_options: Any,
+    ) -> httpx.AsyncClient:
+        """
+        Get the shared client called ``name``, creating it on first use.
+
+        Args:
+            name: Registry key; callers with the same name share one pool
+            retry: Retry policy (defaults to ``RetryPolicy()`` sized by settings)
+            per_host_limit: Concurrent requests per host
+                (defaults to ``http_per_host_limit``)
+            **client_options: ``httpx.AsyncClient`` options such as
+                ``headers``, ``timeout`` or ``follow_redirects``
+
+        Options only apply when the client is created; later calls with the
+        same name get the existing client.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        entry = self._clients.get(name)
+        # Pooled connections belong to the loop that opened them
+        if entry is not None and entry.loop is not None and loop is not None and entry.loop is not loop:
+            entry = None
+        if entry is not None and not entry.client.is_closed:
+            if entry.loop is None:
+                entry.loop = loop
+            return entry.client
+
+        entry = self._create(name, retry, per_host_limit, client_options)
+        entry.loop = loop
+        self._clients[name] = entry
+        return entry.client
+
+    def _create(
+        self,
+        name: str,
+        retry: Optional[RetryPolicy],
+        per_host_limit: Optional[int],
+        client_options: Dict[str, Any],
+    ) -> _ClientEntry:
+        settings = get_settings()
+        if retry is None:
+            retry = RetryPolicy(attempts=int(settings.http_retry_attempts))
+        if per_host_limit is None:
+            per_host_limit = int(settings.http_per_host_limit)
+
+        transport = httpx.AsyncHTTPTransport(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=int(settings.http_max_connections),
+                max_keepalive_connections=int(settings.http_max_keepalive_connections),
+                keepalive_expiry=float(settings.http_keepalive_expiry_seconds),
+            ),
+        )
+        resolver = CachingResolverBackend(float(settings.http_dns_cache_ttl_seconds))
+        install_network_backend(transport, resolver)
+
+        pooled = PooledTransport(transport, retry=retry, per_host_limit=per_host_limit)
+        client_options.setdefault("timeout", float(settings.http_timeout_seconds))
+        client = httpx.AsyncClient(transport=pooled, **client_options)
+        logger.debug(f"HTTP client '{name}' created (http2={HTTP2_AVAILABLE})")
+        return _ClientEntry(client=client, transport=pooled, resolver=resolver)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "closed": entry.client.is_closed,
+                "retries": entry.transport.retries,
+                "dns_lookups": entry.resolver.lookups,
+                "dns_cache_hits": entry.resolver.hits,
+            }
+            for name, entry in self._clients.items()
+        }
+
+    async def aclose(self):
+        """Close every client created on the running loop."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        for name, entry in list(self._clients.items()):
+            if entry.loop is None or entry.loop is loop:
+                try:
+                    await entry.client.aclose()
+                except Exception as e:
+                    logger.debug(f"Closing HTTP client '{name}' failed: {e}")
+        self._clients.clear()
+
+
+# Global registry instance
+_http_registry: Optional[HTTPClientRegistry] = None
+
+
+def get_http_registry() -> HTTPClientRegistry:
+    """Get or create the global HTTP client registry."""
+    global _http_registry
+    if _http_registry is None:
+        _http_registry = HTTPClientRegistry()
+    return _http_registry
+
+
+def get_http_client(name: str = "default", **options: Any) -> httpx.AsyncClient:
+    """Get the shared HTTP client called ``name`` (see ``HTTPClientRegistry.get``)."""
+    return get_http_registry().get(name, **options)
+
+
+async def shutdown_http_clients():
+    """Close every shared client; the next call creates fresh ones."""
+    global _http_registry
+    if _http_registry is not None:
+        await _http_registry.aclose()
+        _http_registry = None
@@ -0,0 +1,123 @@
+"""Bounded-concurrency batch analysis of uploaded images.
+
+Restaurants upload menus and dish photos in batches (often 10-40 files),
+and every image costs one vision call. Instead of each caller awaiting them
+back to back, ``analyze_image_batch`` runs them concurrently:
+- At most ``image_batch_concurrency`` analyses in flight per batch, on top
+  of the per-model slots of the shared Gemini executor
+- Identical images (same content hash) are analyzed once; duplicates get
+  a copy of the result
+- Each finished image is reported through ``on_result`` as soon as it
+  completes, so routes and pipeline stages can stream it
+- A failed image yields an error entry; the rest of the batch goes on
+- Results come back in input order
+"""
+
+import asyncio
+import copy
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Union
+
+from loguru import logger
+
+from app.core.config import get_settings
+
+ImageSource = Union[str, Path, bytes]
+
+
+@dataclass
+class ImageResult:
+    """Outcome of analyzing one image of a batch."""
+
+    index: int
+    digest: str
+    result: Any = None
+    error: Optional[BaseException] = None
+    duplicate_of: Optional[int] = None  # Index of the image analyzed in its place
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def image_digest(image: ImageSource) -> str:
+    """Content hash of an image given as bytes or a file path."""
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        data = bytes(image)
+    else:
+        path = Path(image)
+        # Unreadable paths are keyed by name; the analysis reports the error
+        data = path.read_bytes() if path.is_file() else str(image).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+async def analyze_image_batch(
+    images: Sequence[ImageSource],
+    analyze: Callable[[ImageSource], Awaitable[Any]],
+    max_concurrency: Optional[int] = None,
+    on_result: Optional[Callable[[ImageResult, int, int], Awaitable[None]]] = None,
+) -> List[ImageResult]:
+    """
+    Run ``analyze`` over a batch of images concurrently.
+
+    Args:
+        images: Image bytes or file paths
+        analyze: Coroutine function analyzing one image
+        max_concurrency: Analyses in flight (defaults to ``image_batch_concurrency``)
+        on_result: Optional ``await on_result(result, completed, total)`` hook,
+            called for every image as soon as its analysis finishes
+
+    Returns:
+        One ImageResult per image, in input order
+    """
+    if max_concurrency is None:
+        max_concurrency = int(get_settings().image_batch_concurrency)
+    total = len(images)
+    if not total:
+        return []
+
+    if all(isinstance(image, (bytes, bytearray, memoryview)) for image in images):
+        digests = [image_digest(image) for image in images]
+    else:
+        digests = await asyncio.to_thread(lambda: [image_digest(i) for i in images])
+
+    # First occurrence of each distinct image does the work
+    groups: Dict[str, List[int]] = {}
+    for index, digest in enumerate(digests):
+        groups.setdefault(digest, []).append(index)
+    if len(groups) < total:
+        logger.info(f"Image batch: {total - len(groups)} duplicate images skipped")
+
+    results: List[Optional[ImageResult]] = [None] * total
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    completed = 0
+
+    async def _run(indices: List[int]):
+        nonlocal completed
+        first = indices[0]
+        async with semaphore:
+            try:
+                value, error = await analyze(images[first]), None
+            except Exception as e:
+                logger.warning(f"Image {first + 1}/{total} analysis failed: {e}")
+                value, error = None, e
+
+        for index in indices:
+            results[index] = ImageResult(
+                index=index,
+                digest=digests[index],
+                result=value if index == first else copy.deepcopy(value),
+                error=error,
+                duplicate_of=None if index == first else first,
+            )
+            completed += 1
+            if on_result:
+                try:
+                    await on_result(results[index], completed, total)
+                except Exception as e:
+                    logger.debug(f"Image batch result hook failed: {e}")
+
+    await asyncio.gather(*(_run(indices) for indices in groups.values()))
+    return results
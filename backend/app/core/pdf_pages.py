@@ -0,0 +1,187 @@
+"""
+Page-level PDF rasterization and OCR.
+
+Rendering a PDF page with PyMuPDF and running Tesseract on it are CPU-bound
+blocking calls. Running them inline in a request handler stalls the event
+loop for every page of an uploaded menu. Instead, pages go to a shared
+process pool:
+- Each worker opens the PDF, renders one page to an in-memory JPEG and
+  reads its selectable text layer
+- OCR (optional) runs in the same worker on the raw page pixels
+- Results come back as ``PageImage`` buffers in page order, nothing is
+  written to disk
+"""
+
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+import fitz  # PyMuPDF
+import pytesseract
+from loguru import logger
+from PIL import Image
+
+from app.core.config import get_settings
+
+# Default render scale for vision analysis (2x = 144 dpi)
+DEFAULT_ZOOM = 2.0
+JPEG_QUALITY = 85
+
+
+@dataclass
+class PageImage:
+    """One rendered PDF page."""
+
+    index: int  # 0-based page number
+    image: bytes  # JPEG
+    text: str  # Selectable text layer ("" for scanned pages)
+    ocr_text: str = ""
+    mime_type: str = "image/jpeg"
+
+
+def ocr_image(image: Image.Image) -> str:
+    """Run Tesseract OCR (Spanish and English) on an image."""
+    try:
+        # Preprocess for better OCR
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+
+        return pytesseract.image_to_string(
+            image, lang="spa+eng", config="--psm 6"  # Assume uniform block of text
+        )
+    except Exception as e:
+        logger.debug(f"OCR skipped (tesseract not available): {e}")
+        return ""
+
+
+def ocr_image_file(image_path: str) -> str:
+    """Run Tesseract OCR on an image file."""
+    try:
+        with Image.open(image_path) as image:
+            return ocr_image(image)
+    except Exception as e:
+        logger.debug(f"OCR skipped for {image_path}: {e}")
+        return ""
+
+
+def page_count(pdf_path: str) -> int:
+    with fitz.open(pdf_path) as doc:
+        return len(doc)
+
+
+def render_page(
+    pdf_path: str,
+    index: int,
+    zoom: float = DEFAULT_ZOOM,
+    ocr: bool = False,
+) -> PageImage:
+    """Render one page to JPEG bytes with its text layer (and OCR text)."""
+    with fitz.open(pdf_path) as doc:
+        page = doc[index]
+        text = page.get_text("text") or ""
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+
+    ocr_text = ""
+    if ocr:
+        # OCR the rendered pixels directly instead of the lossy JPEG
+        image = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+        ocr_text = ocr_image(image)
+
+    return PageImage(
+        index=index,
+        image=pix.tobytes("jpeg", jpg_quality=JPEG_QUALITY),
+        text=text,
+        ocr_text=ocr_text,
+    )
+
+
+class PageRenderPool:
+    """Process pool for page rendering and OCR."""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max(1, max_workers or int(get_settings().pdf_render_workers))
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawned workers do not inherit the server's threads and locks
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a picklable function in the pool.
+
+        Falls back to a worker thread if the pool cannot be used (a worker
+        crashed or processes cannot be started).
+        """
+        call = functools.partial(func, *args, **kwargs)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor(), call)
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning(f"Page render pool unavailable ({e}), using a thread")
+            self.shutdown()
+            return await asyncio.to_thread(call)
+
+    async def render(
+        self,
+        pdf_path: str,
+        max_pages: Optional[int] = None,
+        zoom: float = DEFAULT_ZOOM,
+        ocr: bool = False,
+    ) -> List[PageImage]:
+        """
+        Render the pages of a PDF concurrently.
+
+        Pages that fail to render are logged and left out; the rest come
+        back in page order.
+        """
+        count = await asyncio.to_thread(page_count, pdf_path)
+        if max_pages is not None:
+            count = min(count, max_pages)
+
+        results = await asyncio.gather(
+            *(self.run(render_page, pdf_path, i, zoom, ocr) for i in range(count)),
+            return_exceptions=True,
+        )
+
+        pages = []
+        for i, result in enumerate(results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Rendering page {i + 1} of {pdf_path} failed: {result}")
+            else:
+                pages.append(result)
+        return pages
+
+    def shutdown(self):
+        """Stop the worker processes; the next call starts a fresh pool."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# Global pool instance
+_page_pool: Optional[PageRenderPool] = None
+
+
+def get_page_pool() -> PageRenderPool:
+    """Get or create the global page render pool."""
+    global _page_pool
+    if _page_pool is None:
+        _page_pool = PageRenderPool()
+    return _page_pool
+
+
+def shutdown_page_pool():
+    """Shut down the global pool's worker processes."""
+    global _page_pool
+    if _page_pool is not None:
+        _page_pool.shutdown()
+        _page_pool = None
@@ -1,10 +1,10 @@
 """Rate limiting and cost tracking for Gemini API calls.
 
 Implements:
-- Token-based rate limiting (TPM)
-- Request-based rate limiting (RPM)
+- Sliding-window token bucket for requests (RPM) and tokens (TPM)
+- FIFO admission of throttled callers without holding a lock while sleeping
+- Reconciliation of estimated token reservations against actual usage
 - Cost tracking and budget enforcement
-- Exponential backoff retry logic
 """
 
 import asyncio
@@ -12,7 +12,7 @@ import time
 from collections import deque
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Deque, Optional
 
 from app.core.config import get_settings
 
@@ -27,27 +27,41 @@ class APICall:
     model: str
 
 
+@dataclass
+class TokenReservation:
+    """Slot in the sliding window held by one admitted request."""
+    timestamp: float
+    tokens: int
+
+
 class RateLimiter:
-    """Rate limiter for Gemini API with cost tracking."""
+    """
+    Async RPM + TPM limiter for the Gemini API with cost tracking.
+
+    Admitted requests are kept in a sliding window together with running
+    request and token totals, so admission is O(1) amortized. Callers that do
+    not fit wait in FIFO order; only the head of the queue sleeps, and it does
+    so without holding any lock, so other coroutines are never blocked by it.
+    """
     
     def __init__(self):
         self.settings = get_settings()
         
-        # Request tracking (RPM)
-        self.requests: deque = deque()
+        # Sliding window of admitted requests (RPM) and their token totals (TPM)
+        self._window: Deque[TokenReservation] = deque()
+        self._tokens_in_window: int = 0
         
-        # Token tracking (TPM)
-        self.tokens: deque = deque()
+        # FIFO queue of callers waiting for capacity
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._capacity_released: Optional[asyncio.Event] = None
         
         # Cost tracking (daily budget)
         self.calls_today: list[APICall] = []
         self.daily_cost: float = 0.0
         self.budget_exceeded: bool = False
-        
-        # Lock for thread safety
-        self._lock = asyncio.Lock()
+        self._day_start: float = self._today_start()
     
-    async def acquire(self, estimated_tokens: int = 1000) -> bool:
+    async def acquire(self, estimated_tokens: int = 1000) -> Optional[TokenReservation]:
         """
         Acquire permission to make an API call.
         
@@ -55,46 +69,69 @@ class RateLimiter:
             estimated_tokens: Estimated tokens for this request
             
         Returns:
-            True if call is allowed, False if budget exceeded
+            A reservation (truthy) if the call is allowed, None if the daily
+            budget is exceeded. Pass the reservation to ``record_call`` or
+            ``reconcile`` once the real token count is known.
         """
-        async with self._lock:
-            now = time.time()
-            window = self.settings.gemini_rate_limit_window
-            
-            # Clean old entries
-            self._clean_old_entries(now, window)
-            
-            # Check budget
-            if self.settings.gemini_enable_cost_tracking:
-                self._update_daily_cost()
-                if self.daily_cost >= self.settings.gemini_budget_limit_usd:
-                    self.budget_exceeded = True
-                    return False
-            
-            # Check RPM limit
-            if len(self.requests) >= self.settings.gemini_rate_limit_rpm:
-                wait_time = self._calculate_wait_time(self.requests, window)
-                await asyncio.sleep(wait_time)
-                self._clean_old_entries(time.time(), window)
-            
-            # Check TPM limit
-            total_tokens = sum(self.tokens)
-            if total_tokens + estimated_tokens > self.settings.gemini_rate_limit_tpm:
-                wait_time = self._calculate_wait_time(self.tokens, window)
-                await asyncio.sleep(wait_time)
-                self._clean_old_entries(time.time(), window)
-            
-            # Record request
-            self.requests.append(now)
-            self.tokens.append(estimated_tokens)
-            
-            return True
+        if self.settings.gemini_enable_cost_tracking:
+            self._update_daily_cost()
+            if self.daily_cost >= self.settings.gemini_budget_limit_usd:
+                self.budget_exceeded = True
+                return None
+        
+        # A single request larger than the TPM budget could never fit
+        tokens = max(0, min(estimated_tokens, self.settings.gemini_rate_limit_tpm))
+        
+        # Fast path: nobody queued ahead of us and the request fits now
+        if not self._waiters:
+            reservation = self._try_reserve(tokens)
+            if reservation:
+                return reservation
+        
+        turn = asyncio.get_running_loop().create_future()
+        self._waiters.append(turn)
+        if len(self._waiters) == 1:
+            turn.set_result(None)
+        
+        try:
+            await turn
+            while True:
+                reservation = self._try_reserve(tokens)
+                if reservation:
+                    return reservation
+                await self._wait_for_capacity(self._time_until_fits(tokens))
+        finally:
+            self._waiters.remove(turn)
+            if self._waiters and not self._waiters[0].done():
+                self._waiters[0].set_result(None)
+    
+    def reconcile(self, reservation: Optional[TokenReservation], actual_tokens: int):
+        """
+        Replace a reservation's estimated token count with the real one.
+        
+        Args:
+            reservation: Reservation returned by ``acquire``
+            actual_tokens: Total tokens reported by ``usage_metadata``
+        """
+        if reservation is None or actual_tokens <= 0:
+            return
+        
+        delta = actual_tokens - reservation.tokens
+        reservation.tokens = actual_tokens
+        
+        # Expired reservations are no longer part of the running total
+        if self._window and reservation.timestamp >= self._window[0].timestamp:
+            self._tokens_in_window += delta
+        
+        if delta < 0 and self._capacity_released is not None:
+            self._capacity_released.set()
     
     def record_call(
         self,
         input_tokens: int,
         output_tokens: int,
-        model: str
+        model: str,
+        reservation: Optional[TokenReservation] = None,
     ) -> float:
         """
         Record an API call and calculate cost.
@@ -103,10 +140,13 @@ class RateLimiter:
             input_tokens: Number of input tokens used
             output_tokens: Number of output tokens generated
             model: Model name used
+            reservation: Reservation from ``acquire`` to reconcile, if any
             
         Returns:
             Cost in USD
         """
+        self.reconcile(reservation, input_tokens + output_tokens)
+        
         # Calculate cost
         input_cost = (input_tokens / 1000) * self.settings.gemini_cost_per_1k_input_tokens
         output_cost = (output_tokens / 1000) * self.settings.gemini_cost_per_1k_output_tokens
@@ -127,19 +167,16 @@ class RateLimiter:
     
     def get_usage_stats(self) -> dict:
         """Get current usage statistics."""
-        now = time.time()
-        window = self.settings.gemini_rate_limit_window
-        
-        # Clean old entries
-        self._clean_old_entries(now, window)
+        self._expire(time.time())
         
         # Calculate stats
         total_input_tokens = sum(call.input_tokens for call in self.calls_today)
         total_output_tokens = sum(call.output_tokens for call in self.calls_today)
         
         return {
-            "requests_in_window": len(self.requests),
-            "tokens_in_window": sum(self.tokens),
+            "requests_in_window": len(self._window),
+            "tokens_in_window": self._tokens_in_window,
+            "queued_requests": len(self._waiters),
             "rpm_limit": self.settings.gemini_rate_limit_rpm,
             "tpm_limit": self.settings.gemini_rate_limit_tpm,
             "daily_cost_usd": round(self.daily_cost, 4),
@@ -158,46 +195,81 @@ class RateLimiter:
         self.calls_today.clear()
         self.daily_cost = 0.0
         self.budget_exceeded = False
+        self._day_start = self._today_start()
     
-    def _clean_old_entries(self, now: float, window: int):
-        """Remove entries older than the time window."""
-        cutoff = now - window
+    def _try_reserve(self, tokens: int) -> Optional[TokenReservation]:
+        """Admit a request if it fits in both budgets. Never awaits."""
+        now = time.time()
+        self._expire(now)
         
-        # Clean requests
-        while self.requests and self.requests[0] < cutoff:
-            self.requests.popleft()
+        if len(self._window) >= self.settings.gemini_rate_limit_rpm:
+            return None
+        if self._tokens_in_window + tokens > self.settings.gemini_rate_limit_tpm:
+            return None
         
-        # Clean tokens (paired with requests)
-        while len(self.tokens) > len(self.requests):
-            self.tokens.popleft()
+        reservation = TokenReservation(timestamp=now, tokens=tokens)
+        self._window.append(reservation)
+        self._tokens_in_window += tokens
+        return reservation
+    
+    def _expire(self, now: float):
+        """Drop reservations that have left the sliding window."""
+        cutoff = now - self.settings.gemini_rate_limit_window
+        while self._window and self._window[0].timestamp < cutoff:
+            self._tokens_in_window -= self._window.popleft().tokens
+    
+    def _time_until_fits(self, tokens: int) -> float:
+        """Seconds until a request of ``tokens`` fits in both budgets."""
+        now = time.time()
+        window = self.settings.gemini_rate_limit_window
+        wait = 0.0
+        
+        # RPM: enough of the oldest requests must expire
+        excess_requests = len(self._window) - self.settings.gemini_rate_limit_rpm + 1
+        if excess_requests > 0:
+            wait = self._window[excess_requests - 1].timestamp + window - now
+        
+        # TPM: enough of the oldest tokens must expire
+        excess_tokens = self._tokens_in_window + tokens - self.settings.gemini_rate_limit_tpm
+        if excess_tokens > 0:
+            freed = 0
+            for entry in self._window:
+                freed += entry.tokens
+                if freed >= excess_tokens:
+                    wait = max(wait, entry.timestamp + window - now)
+                    break
+        
+        return max(wait, 0.0) + 0.01  # Small buffer past the expiry edge
+    
+    async def _wait_for_capacity(self, timeout: float):
+        """Sleep until capacity is released by reconciliation or time passes."""
+        if self._capacity_released is None:
+            self._capacity_released = asyncio.Event()
+        self._capacity_released.clear()
+        try:
+            await asyncio.wait_for(self._capacity_released.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
     
     def _update_daily_cost(self):
-        """Update daily cost, removing calls from previous days."""
-        now = datetime.now()
-        today_start = datetime(now.year, now.month, now.day)
-        cutoff = today_start.timestamp()
+        """Drop calls from previous days once the day rolls over."""
+        today_start = self._today_start()
+        if today_start == self._day_start:
+            return
         
-        # Remove old calls
+        self._day_start = today_start
         self.calls_today = [
             call for call in self.calls_today
-            if call.timestamp >= cutoff
+            if call.timestamp >= today_start
         ]
-        
-        # Recalculate daily cost
         self.daily_cost = sum(call.cost_usd for call in self.calls_today)
+        self.budget_exceeded = False
     
-    def _calculate_wait_time(self, queue: deque, window: int) -> float:
-        """Calculate how long to wait before next request."""
-        if not queue:
-            return 0.0
-        
-        oldest = queue[0]
-        elapsed = time.time() - oldest
-        
-        if elapsed >= window:
-            return 0.0
-        
-        return window - elapsed + 0.1  # Add small buffer
+    @staticmethod
+    def _today_start() -> float:
+        """Timestamp of local midnight."""
+        now = datetime.now()
+        return datetime(now.year, now.month, now.day).timestamp()
 
 
 # Global rate limiter instance
@@ -214,19 +286,20 @@ def get_rate_limiter() -> RateLimiter:
 
 async def with_rate_limit(estimated_tokens: int = 1000):
     """
-    Decorator/context manager for rate-limited API calls.
+    Acquire a rate-limit slot or raise if the daily budget is exhausted.
     
     Usage:
-        async with with_rate_limit(estimated_tokens=2000):
-            response = await gemini_api_call()
+        reservation = await with_rate_limit(estimated_tokens=2000)
+        response = await gemini_api_call()
+        get_rate_limiter().record_call(..., reservation=reservation)
     """
     limiter = get_rate_limiter()
-    allowed = await limiter.acquire(estimated_tokens)
+    reservation = await limiter.acquire(estimated_tokens)
     
-    if not allowed:
+    if not reservation:
         raise Exception(
             f"Daily budget limit of ${limiter.settings.gemini_budget_limit_usd} exceeded. "
             f"Current spend: ${limiter.daily_cost:.4f}"
         )
     
-    return limiter
+    return reservation
@@ -0,0 +1,167 @@
+"""
+Write-behind session store for API session dictionaries.
+
+Routes mutate ``sessions[session_id]`` in place and call ``save()``
+several times per request. Rewriting the whole JSON file on each call made
+route latency grow with the session's sales data, so instead:
+- The in-memory dict is the authoritative copy
+- ``save()`` only marks the session dirty and schedules a flush; repeated
+  saves within the flush delay coalesce into a single write
+- Flushes write to a temp file and atomically rename it into place
+- ``load()`` re-reads the file only when its mtime shows another worker
+  changed it
+"""
+
+import asyncio
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+
+from loguru import logger
+
+
+class SessionStore:
+    """In-memory session dicts persisted to ``<directory>/<id>.json``."""
+
+    def __init__(self, directory: Path, flush_delay: float = 0.5):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.flush_delay = flush_delay
+        self.sessions: Dict[str, Dict[str, Any]] = {}
+
+        self._mtimes: Dict[str, int] = {}  # mtime_ns of the file we last read or wrote
+        self._dirty: Set[str] = set()
+        self._writing: Set[str] = set()  # Serialized, rename not yet recorded
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.flushes = 0
+        self.coalesced = 0
+
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return the session, reloading from disk only if the file changed."""
+        path = self._path(session_id)
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return self.sessions.get(session_id)
+
+        cached = self.sessions.get(session_id)
+        if cached is not None and (
+            self._mtimes.get(session_id) == mtime
+            or session_id in self._dirty
+            or session_id in self._writing
+        ):
+            if self._mtimes.get(session_id) != mtime and session_id in self._dirty:
+                logger.warning(
+                    f"Session {session_id} changed on disk while it has unsaved "
+                    "changes; keeping the in-memory copy"
+                )
+            return cached
+
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to load session {session_id}: {e}")
+            return None
+
+        self.sessions[session_id] = data
+        self._mtimes[session_id] = mtime
+        return data
+
+    def save(self, session_id: str):
+        """Mark a session dirty; it is written by the next flush."""
+        if session_id not in self.sessions:
+            return
+        if session_id in self._dirty:
+            self.coalesced += 1
+        self._dirty.add(session_id)
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts, sync tests): write through
+            self.flush()
+            return
+
+        self._schedule(loop)
+
+    def flush(self, session_id: Optional[str] = None):
+        """Synchronously write dirty sessions (all, or just ``session_id``)."""
+        targets = [session_id] if session_id else list(self._dirty)
+        for sid in targets:
+            if sid not in self._dirty:
+                continue
+            self._dirty.discard(sid)
+            data = self.sessions.get(sid)
+            if data is None:
+                continue
+            try:
+                # default=str handles datetime objects
+                self._write(sid, json.dumps(data, default=str))
+            except Exception as e:
+                self._dirty.add(sid)
+                logger.error(f"Failed to save session {sid}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self.sessions),
+            "dirty": len(self._dirty),
+            "flushes": self.flushes,
+            "coalesced_saves": self.coalesced,
+        }
+
+    def _schedule(self, loop: asyncio.AbstractEventLoop):
+        # A handle from a loop that has since closed will never fire
+        if self._flush_handle is not None and self._flush_loop is loop:
+            return
+        self._flush_loop = loop
+        self._flush_handle = loop.call_later(self.flush_delay, self._flush_soon)
+
+    def _flush_soon(self):
+        """Timer callback: serialize on the loop, write in a worker thread."""
+        self._flush_handle = None
+        payloads = {}
+        for sid in list(self._dirty):
+            if sid in self._writing:
+                continue  # Keep writes to one file ordered; retried next flush
+            self._dirty.discard(sid)
+            data = self.sessions.get(sid)
+            if data is None:
+                continue
+            try:
+                # Serialized here so routes cannot mutate the dict mid-dump
+                payloads[sid] = json.dumps(data, default=str)
+                self._writing.add(sid)
+            except Exception as e:
+                logger.error(f"Failed to serialize session {sid}: {e}")
+        if payloads:
+            asyncio.ensure_future(self._write_all(payloads))
+        if self._dirty:
+            self._schedule(asyncio.get_running_loop())
+
+    async def _write_all(self, payloads: Dict[str, str]):
+        for sid, payload in payloads.items():
+            try:
+                await asyncio.to_thread(self._write, sid, payload)
+            except Exception as e:
+                self._dirty.add(sid)
+                logger.error(f"Failed to save session {sid}: {e}")
+            finally:
+                self._writing.discard(sid)
+
+    def _write(self, session_id: str, payload: str):
+        path = self._path(session_id)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        self._mtimes[session_id] = path.stat().st_mtime_ns
+        self.flushes += 1
+
+    def _path(self, session_id: str) -> Path:
+        return self.directory / f"{session_id}.json"
@@ -0,0 +1,87 @@
+"""Single-flight coalescing for identical in-flight async calls.
+
+When several coroutines ask for the same key at once (e.g. two WebSocket
+clients requesting the same menu extraction), only the first one runs the
+work; the rest await its shared result. Failures propagate to every waiter,
+and the key is forgotten as soon as the call finishes, so later requests
+start a fresh call (or hit whatever cache the caller populated).
+"""
+
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key."""
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``factory()`` once per key among concurrent callers.
+
+        Args:
+            key: Content hash identifying the request
+            factory: Zero-argument coroutine function doing the real work
+
+        Returns:
+            The shared result of the single underlying call
+        """
+        task = self._calls.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(factory())
+            self._calls[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(functools.partial(self._forget, key))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # Abandon the shared call only once nobody is waiting for it
+            if self._waiters.get(key) == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            if self._calls.get(key) is task:
+                self._waiters[key] -= 1
+
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running."""
+        return len(self._calls)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight(),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+            del self._waiters[key]
+        if not task.cancelled():
+            task.exception()  # Mark retrieved; waiters re-raise it themselves
+
+
+# Global instance shared by all Gemini agents
+_single_flight: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> SingleFlight:
+    """Get or create the global single-flight group for Gemini calls."""
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
@@ -14,6 +14,7 @@ from fastapi.staticfiles import StaticFiles
 from loguru import logger
 
 from app import __version__
+from app.api.deps import flush_sessions
 from app.api.routes.analysis import router as analysis_router
 from app.api.routes.business import router as business_router
 from app.api.routes.creative import router as creative_router
@@ -26,6 +27,9 @@ from app.api.routes.grounding import router as grounding_router
 from app.api.routes.video import router as video_router
 from app.api.routes.campaigns import router as campaigns_router
 from app.core.config import get_settings
+from app.core.gemini_executor import shutdown_gemini_executor
+from app.core.http_clients import shutdown_http_clients
+from app.core.pdf_pages import shutdown_page_pool
 from app.models.database import init_db
 
 try:
@@ -56,6 +60,10 @@ async def lifespan(app: FastAPI):
     yield
 
     logger.info("RestoPilotAI shutting down")
+    flush_sessions()
+    shutdown_gemini_executor()
+    shutdown_page_pool()
+    await shutdown_http_clients()
 
 
 app = FastAPI(
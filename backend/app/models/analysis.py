@@ -431,7 +431,8 @@ class MarathonCheckpoint(Base):
     stage: Mapped[str] = mapped_column(String(50))
     status: Mapped[str] = mapped_column(String(20)) # running, completed, failed
     
-    # State storage (Snapshot of AnalysisState)
+    # State storage: manifest of per-field content digests (see CheckpointBlob).
+    # Legacy rows hold a full snapshot of AnalysisState instead.
     state_data: Mapped[Dict[str, Any]] = mapped_column(JSON)
     
     # Execution logs for this stage
@@ -442,3 +443,18 @@ class MarathonCheckpoint(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     timestamp: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
+
+class CheckpointBlob(Base):
+    """
+    Content-addressed value of one AnalysisState field.
+
+    Checkpoints reference blobs by digest, so a field that did not change
+    between checkpoints (e.g. sales data) is stored only once.
+    """
+
+    __tablename__ = "checkpoint_blobs"
+
+    digest: Mapped[str] = mapped_column(String(64), primary_key=True)
+    data: Mapped[str] = mapped_column(Text)  # JSON-encoded field value
+    size: Mapped[int] = mapped_column(Integer)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
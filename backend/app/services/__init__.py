@@ -9,9 +9,11 @@ Includes core services and enhanced agentic capabilities:
 - Sentiment Analyzer: Multi-modal customer sentiment analysis
 """
 
+import importlib
+
 from app.services.analysis.bcg import BCGClassifier
 from app.services.analysis.menu_analyzer import MenuExtractor
-from app.services.analysis.neural_predictor import NeuralPredictor
+from app.services.analysis.model_registry import ModelRegistry, get_model_registry
 
 # New WOW factor services
 from app.services.analysis.pricing import (
@@ -39,6 +41,19 @@ from app.services.intelligence.data_enrichment import (
 )
 from app.services.orchestrator import AnalysisOrchestrator
 
+# Importing NeuralPredictor pulls in torch, so it is resolved on first access
+_LAZY_IMPORTS = {
+    "NeuralPredictor": "app.services.analysis.neural_predictor",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 __all__ = [
     # Core services
     "GeminiAgent",
@@ -49,6 +64,8 @@ __all__ = [
     "VerificationAgent",
     "ThinkingLevel",
     "NeuralPredictor",
+    "ModelRegistry",
+    "get_model_registry",
     "AnalysisOrchestrator",
     # Competitor Enrichment
     "CompetitorEnrichmentService",
@@ -3,10 +3,11 @@ Advanced Analytics Service for RestoPilotAI.
 Provides demand prediction, seasonal trends, and product analytics.
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
 from enum import Enum
+import numpy as np
 import pandas as pd
 import logging
 
@@ -128,11 +129,20 @@ class AdvancedAnalyticsService:
     """
     Advanced analytics engine for restaurant data.
     Provides demand prediction, seasonal analysis, and product insights.
+
+    Dates are parsed once per run and the sales are aggregated into a single
+    cube of sums and counts per (item, category, hour, weekday, month, half)
+    combination. Every pattern is then rolled up from that cube instead of
+    regrouping and refiltering the full sales table.
     """
     
     def __init__(self):
         self.df: Optional[pd.DataFrame] = None
         self.column_mapping: Dict[str, str] = {}
+        self._dates: Optional[pd.Series] = None
+        self._cube: Optional[pd.DataFrame] = None
+        self._labels: Dict[str, pd.Index] = {}
+        self._tickets_by_dow: Optional[pd.Series] = None
     
     async def analyze(
         self,
@@ -145,7 +155,7 @@ class AdvancedAnalyticsService:
         Run advanced analytics based on available capabilities.
         
         Args:
-            df: Sales DataFrame
+            df: Sales DataFrame (not modified)
             session_id: Session ID
             column_mapping: Mapping of semantic columns to actual column names
             capabilities: List of available analytics capabilities
@@ -156,6 +166,8 @@ class AdvancedAnalyticsService:
         logger.info(f"Running advanced analytics for session {session_id}")
         logger.info(f"Available capabilities: {capabilities}")
         
+        self._prepare()
+        
         hourly_patterns = []
         daily_patterns = []
         seasonal_trends = []
@@ -210,48 +222,135 @@ class AdvancedAnalyticsService:
             data_quality_notes=data_notes
         )
     
+    def _prepare(self):
+        """Parse dates once and build the aggregate cube all analyses read."""
+        df = self.df
+        mapping = self.column_mapping
+        parsed: Dict[Tuple[str, Optional[str]], Optional[pd.Series]] = {}
+
+        def to_datetime(col: Optional[str], fmt: Optional[str] = None) -> Optional[pd.Series]:
+            if not col or col not in df.columns:
+                return None
+            if (col, fmt) not in parsed:
+                try:
+                    parsed[(col, fmt)] = pd.to_datetime(df[col], format=fmt)
+                except Exception:
+                    parsed[(col, fmt)] = None
+            return parsed[(col, fmt)]
+
+        self._dates = to_datetime(mapping.get('date_col') or mapping.get('datetime_col'))
+
+        keys: Dict[str, pd.Series] = {}
+        for key, col in (('_item', 'item_name_col'), ('_category', 'category_col')):
+            if mapping.get(col) in df.columns:
+                keys[key] = df[mapping[col]]
+
+        if mapping.get('hour_col') in df.columns:
+            keys['_hour'] = df[mapping['hour_col']]
+        else:
+            times = to_datetime(mapping.get('datetime_col'))
+            if times is None and 'datetime_col' not in mapping:
+                times = to_datetime(mapping.get('time_col'), '%H:%M:%S')
+            if times is not None:
+                keys['_hour'] = times.dt.hour
+
+        if self._dates is not None:
+            dates = self._dates
+            keys['_dow'] = dates.dt.dayofweek
+            keys['_month'] = dates.dt.month
+            # Trend halves: 0 before the median date, 1 from it on, -1 undated
+            keys['_half'] = pd.Series(
+                np.where(dates.isna(), -1, dates >= dates.median()).astype(np.int8),
+                index=df.index,
+            )
+
+        self._cube = None
+        self._labels = {}
+        self._tickets_by_dow = None
+        if not keys:
+            return
+
+        # Group on integer codes (sorted labels, -1 for missing) rather than
+        # on the raw object columns
+        codes = {}
+        for key, column in keys.items():
+            codes[key], self._labels[key] = pd.factorize(column, sort=True)
+
+        values = {
+            name: df[mapping.get(col, default)]
+            for name, col, default in (
+                ('qty', 'quantity_col', 'quantity'),
+                ('rev', 'revenue_col', 'revenue'),
+            )
+            if mapping.get(col, default) in df.columns
+        }
+        frame = pd.DataFrame({**codes, **values}, index=df.index)
+        grouped = frame.groupby(list(codes), sort=False)
+
+        cube = grouped.size().rename('rows').to_frame()
+        for name in values:
+            cube[f'{name}_sum'] = grouped[name].sum()
+            cube[f'{name}_count'] = grouped[name].count()
+        self._cube = cube.reset_index()
+
+        # Distinct counts do not roll up, so tickets get their own pass
+        ticket_col = mapping.get('ticket_id_col')
+        if '_dow' in keys and ticket_col in df.columns:
+            tickets = df[ticket_col].groupby(codes['_dow']).nunique()
+            tickets = tickets[tickets.index >= 0]
+            tickets.index = self._labels['_dow'].take(tickets.index)
+            self._tickets_by_dow = tickets
+
+    def _rollup(self, *keys: str) -> Optional[pd.DataFrame]:
+        """Cube totals per ``keys`` (sorted, rows with missing keys dropped)."""
+        if self._cube is None or any(key not in self._cube.columns for key in keys):
+            return None
+        cube = self._cube[(self._cube[list(keys)] >= 0).all(axis=1)]
+        values = [c for c in cube.columns if c == 'rows' or c.endswith(('_sum', '_count'))]
+        table = cube.groupby(list(keys))[values].sum()
+        labels = [self._labels[key].take(table.index.get_level_values(key)) for key in keys]
+        table.index = labels[0] if len(keys) == 1 else pd.MultiIndex.from_arrays(labels, names=keys)
+        return table
+
+    def _first_seen(self, key: str) -> list:
+        """Labels of ``key`` in order of first appearance in the sales."""
+        codes = pd.unique(self._cube[key].to_numpy())
+        return self._labels[key].take(codes[codes >= 0]).tolist()
+
+    @staticmethod
+    def _mean(table: pd.DataFrame, name: str) -> pd.Series:
+        """Per-group mean of a value; the row count when the column is missing."""
+        if f'{name}_sum' not in table.columns:
+            return table['rows'].astype(float)
+        count = table[f'{name}_count'].where(table[f'{name}_count'] > 0)
+        return table[f'{name}_sum'] / count
+
+    @staticmethod
+    def _total(table: pd.DataFrame, name: str) -> pd.Series:
+        if f'{name}_sum' not in table.columns:
+            return pd.Series(0, index=table.index)
+        return table[f'{name}_sum']
+
     def _analyze_hourly_demand(self) -> List[HourlyDemandPattern]:
         """Analyze demand patterns by hour."""
-        patterns = []
+        hourly = self._rollup('_hour')
+        if hourly is None:
+            return []
         
-        # Try to get hour from datetime or time column
-        hour_col = None
-        if 'hour_col' in self.column_mapping:
-            hour_col = self.column_mapping['hour_col']
-        elif 'datetime_col' in self.column_mapping:
-            try:
-                self.df['_hour'] = pd.to_datetime(self.df[self.column_mapping['datetime_col']]).dt.hour
-                hour_col = '_hour'
-            except Exception:
-                pass
-        elif 'time_col' in self.column_mapping:
-            try:
-                self.df['_hour'] = pd.to_datetime(self.df[self.column_mapping['time_col']], format='%H:%M:%S').dt.hour
-                hour_col = '_hour'
-            except Exception:
-                pass
-        
-        if not hour_col:
-            return patterns
-        
-        qty_col = self.column_mapping.get('quantity_col', 'quantity')
-        rev_col = self.column_mapping.get('revenue_col', 'revenue')
-        
-        # Group by hour
-        hourly = self.df.groupby(hour_col).agg({
-            qty_col: 'mean' if qty_col in self.df.columns else 'count',
-            rev_col: 'mean' if rev_col in self.df.columns else 'count'
-        }).reset_index()
+        avg_qty = self._mean(hourly, 'qty')
+        avg_rev = self._mean(hourly, 'rev')
         
         # Identify peak hours (top 25%)
-        qty_threshold = hourly[qty_col].quantile(0.75) if qty_col in hourly.columns else 0
+        is_peak = avg_qty >= avg_qty.quantile(0.75)
         
-        for _, row in hourly.iterrows():
-            hour = int(row[hour_col])
-            is_peak = row[qty_col] >= qty_threshold if qty_col in hourly.columns else False
+        patterns = []
+        for hour, qty, rev, peak in zip(
+            hourly.index.tolist(), avg_qty.tolist(), avg_rev.tolist(), is_peak.tolist()
+        ):
+            hour = int(hour)
             
             # Staffing recommendation
-            if is_peak:
+            if peak:
                 staffing = "Maximum staffing recommended"
             elif hour < 11 or hour > 21:
                 staffing = "Minimum staffing"
@@ -260,208 +359,164 @@ class AdvancedAnalyticsService:
             
             patterns.append(HourlyDemandPattern(
                 hour=hour,
-                avg_quantity=round(row[qty_col], 1) if qty_col in hourly.columns else 0,
-                avg_revenue=round(row[rev_col], 2) if rev_col in hourly.columns else 0,
-                peak_indicator=is_peak,
+                avg_quantity=round(qty, 1),
+                avg_revenue=round(rev, 2),
+                peak_indicator=peak,
                 staffing_recommendation=staffing
             ))
         
-        return sorted(patterns, key=lambda x: x.hour)
+        return patterns
     
     def _analyze_daily_patterns(self) -> List[DailyPattern]:
         """Analyze patterns by day of week."""
-        patterns = []
         day_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
         
-        date_col = self.column_mapping.get('date_col') or self.column_mapping.get('datetime_col')
-        if not date_col:
-            return patterns
-        
-        qty_col = self.column_mapping.get('quantity_col', 'quantity')
-        rev_col = self.column_mapping.get('revenue_col', 'revenue')
-        ticket_col = self.column_mapping.get('ticket_id_col')
-        
-        try:
-            self.df['_dow'] = pd.to_datetime(self.df[date_col]).dt.dayofweek
-        except Exception:
-            return patterns
+        daily = self._rollup('_dow')
+        if daily is None:
+            return []
         
-        # Group by day of week
-        daily = self.df.groupby('_dow').agg({
-            qty_col: 'mean' if qty_col in self.df.columns else 'count',
-            rev_col: 'mean' if rev_col in self.df.columns else 'count'
-        }).reset_index()
-        
-        # Add ticket count if available
-        if ticket_col and ticket_col in self.df.columns:
-            ticket_daily = self.df.groupby('_dow')[ticket_col].nunique().reset_index()
-            ticket_daily.columns = ['_dow', 'tickets']
-            daily = daily.merge(ticket_daily, on='_dow', how='left')
+        avg_qty = self._mean(daily, 'qty')
+        avg_rev = self._mean(daily, 'rev')
+        if self._tickets_by_dow is not None:
+            tickets = self._tickets_by_dow.reindex(daily.index).astype(float).round(1).tolist()
+        else:
+            tickets = [None] * len(daily)
         
         # Identify peak days
-        qty_threshold = daily[qty_col].quantile(0.6) if qty_col in daily.columns else 0
-        
-        for _, row in daily.iterrows():
-            dow = int(row['_dow'])
-            patterns.append(DailyPattern(
-                day_of_week=dow,
-                day_name=day_names[dow],
-                avg_quantity=round(row[qty_col], 1) if qty_col in daily.columns else 0,
-                avg_revenue=round(row[rev_col], 2) if rev_col in daily.columns else 0,
-                avg_tickets=round(row['tickets'], 1) if 'tickets' in daily.columns else None,
-                is_peak_day=row[qty_col] >= qty_threshold if qty_col in daily.columns else False
-            ))
-        
-        return sorted(patterns, key=lambda x: x.day_of_week)
+        is_peak = avg_qty >= avg_qty.quantile(0.6)
+        
+        return [
+            DailyPattern(
+                day_of_week=int(dow),
+                day_name=day_names[int(dow)],
+                avg_quantity=round(qty, 1),
+                avg_revenue=round(rev, 2),
+                avg_tickets=ticket,
+                is_peak_day=peak
+            )
+            for dow, qty, rev, ticket, peak in zip(
+                daily.index.tolist(), avg_qty.tolist(), avg_rev.tolist(), tickets, is_peak.tolist()
+            )
+        ]
     
     def _analyze_seasonal_trends(self) -> List[SeasonalTrend]:
         """Analyze seasonal patterns."""
         trends = []
         
-        date_col = self.column_mapping.get('date_col') or self.column_mapping.get('datetime_col')
-        if not date_col:
-            return trends
-        
-        rev_col = self.column_mapping.get('revenue_col', 'revenue')
-        
-        try:
-            self.df['_date'] = pd.to_datetime(self.df[date_col])
-            self.df['_month'] = self.df['_date'].dt.month
-            self.df['_is_weekend'] = self.df['_date'].dt.dayofweek >= 5
-        except Exception:
+        daily = self._rollup('_dow')
+        if daily is None or 'rev_sum' not in daily.columns:
             return trends
         
         # Weekday vs Weekend pattern
-        if '_is_weekend' in self.df.columns and rev_col in self.df.columns:
-            weekend_rev = self.df[self.df['_is_weekend']][rev_col].mean()
-            weekday_rev = self.df[~self.df['_is_weekend']][rev_col].mean()
+        weekend = daily[daily.index >= 5]
+        weekday = daily[daily.index < 5]
+        weekend_rev = self._mean(weekend.sum().to_frame().T, 'rev').iloc[0]
+        weekday_rev = self._mean(weekday.sum().to_frame().T, 'rev').iloc[0]
+        
+        if weekday_rev > 0:
+            variance = abs(weekend_rev - weekday_rev) / weekday_rev * 100
             
-            if weekday_rev > 0:
-                variance = abs(weekend_rev - weekday_rev) / weekday_rev * 100
-                
-                if weekend_rev > weekday_rev:
-                    trends.append(SeasonalTrend(
-                        season_type=SeasonType.WEEKDAY_WEEKEND,
-                        pattern_description=f"Weekend sales are {variance:.0f}% higher than weekdays",
-                        peak_periods=["Saturday", "Sunday"],
-                        low_periods=["Monday", "Tuesday"],
-                        variance_pct=round(variance, 1)
-                    ))
-                else:
-                    trends.append(SeasonalTrend(
-                        season_type=SeasonType.WEEKDAY_WEEKEND,
-                        pattern_description=f"Weekday sales are {variance:.0f}% higher than weekends",
-                        peak_periods=["Wednesday", "Thursday", "Friday"],
-                        low_periods=["Saturday", "Sunday"],
-                        variance_pct=round(variance, 1)
-                    ))
+            if weekend_rev > weekday_rev:
+                trends.append(SeasonalTrend(
+                    season_type=SeasonType.WEEKDAY_WEEKEND,
+                    pattern_description=f"Weekend sales are {variance:.0f}% higher than weekdays",
+                    peak_periods=["Saturday", "Sunday"],
+                    low_periods=["Monday", "Tuesday"],
+                    variance_pct=round(variance, 1)
+                ))
+            else:
+                trends.append(SeasonalTrend(
+                    season_type=SeasonType.WEEKDAY_WEEKEND,
+                    pattern_description=f"Weekday sales are {variance:.0f}% higher than weekends",
+                    peak_periods=["Wednesday", "Thursday", "Friday"],
+                    low_periods=["Saturday", "Sunday"],
+                    variance_pct=round(variance, 1)
+                ))
         
         # Monthly pattern
-        if '_month' in self.df.columns and rev_col in self.df.columns:
-            monthly = self.df.groupby('_month')[rev_col].mean()
-            if len(monthly) >= 3:
-                month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 
-                              'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-                
-                avg_monthly = monthly.mean()
-                peak_months = monthly[monthly > avg_monthly * 1.1].index.tolist()
-                low_months = monthly[monthly < avg_monthly * 0.9].index.tolist()
-                
-                if peak_months or low_months:
-                    variance = (monthly.max() - monthly.min()) / avg_monthly * 100
-                    trends.append(SeasonalTrend(
-                        season_type=SeasonType.MONTHLY,
-                        pattern_description=f"Monthly variation of {variance:.0f}% between high and low periods",
-                        peak_periods=[month_names[m-1] for m in peak_months],
-                        low_periods=[month_names[m-1] for m in low_months],
-                        variance_pct=round(variance, 1)
-                    ))
+        monthly = self._mean(self._rollup('_month'), 'rev')
+        if len(monthly) >= 3:
+            month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 
+                          'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+            
+            avg_monthly = monthly.mean()
+            peak_months = monthly[monthly > avg_monthly * 1.1].index.tolist()
+            low_months = monthly[monthly < avg_monthly * 0.9].index.tolist()
+            
+            if peak_months or low_months:
+                variance = (monthly.max() - monthly.min()) / avg_monthly * 100
+                trends.append(SeasonalTrend(
+                    season_type=SeasonType.MONTHLY,
+                    pattern_description=f"Monthly variation of {variance:.0f}% between high and low periods",
+                    peak_periods=[month_names[int(m)-1] for m in peak_months],
+                    low_periods=[month_names[int(m)-1] for m in low_months],
+                    variance_pct=round(variance, 1)
+                ))
         
         return trends
     
     def _analyze_products(self) -> List[ProductAnalytics]:
         """Analyze individual product performance."""
-        analytics = []
-        
-        item_col = self.column_mapping.get('item_name_col')
-        if not item_col:
-            return analytics
-        
-        qty_col = self.column_mapping.get('quantity_col', 'quantity')
-        rev_col = self.column_mapping.get('revenue_col', 'revenue')
-        cat_col = self.column_mapping.get('category_col')
-        date_col = self.column_mapping.get('date_col') or self.column_mapping.get('datetime_col')
-        
-        # Basic aggregation
-        agg_dict = {}
-        if qty_col in self.df.columns:
-            agg_dict[qty_col] = 'sum'
-        if rev_col in self.df.columns:
-            agg_dict[rev_col] = 'sum'
-        
-        if not agg_dict:
-            return analytics
-        
-        product_data = self.df.groupby(item_col).agg(agg_dict).reset_index()
+        product_data = self._rollup('_item')
+        if product_data is None or product_data.columns.tolist() == ['rows']:
+            return []
         
         # Calculate daily average if date available
-        if date_col:
-            try:
-                days = (pd.to_datetime(self.df[date_col]).max() - 
-                       pd.to_datetime(self.df[date_col]).min()).days + 1
-            except Exception:
-                days = 30
-        else:
-            days = 30
+        days = 30
+        if self._dates is not None:
+            days = (self._dates.max() - self._dates.min()).days + 1
+        
+        # First non-empty category per item (the cube keeps first-seen order)
+        cat_map = {}
+        if '_category' in self._cube.columns:
+            pairs = self._cube[(self._cube['_item'] >= 0) & (self._cube['_category'] >= 0)]
+            pairs = pairs.drop_duplicates('_item')
+            cat_map = dict(zip(
+                self._labels['_item'].take(pairs['_item']).tolist(),
+                self._labels['_category'].take(pairs['_category']).tolist(),
+            ))
         
-        # Add category
-        if cat_col and cat_col in self.df.columns:
-            cat_map = self.df.groupby(item_col)[cat_col].first().to_dict()
-        else:
-            cat_map = {}
+        total_qty = self._total(product_data, 'qty')
+        total_rev = self._total(product_data, 'rev')
         
         # Calculate trend (simplified - compare first half to second half)
-        if date_col:
-            try:
-                median_date = pd.to_datetime(self.df[date_col]).median()
-                first_half = self.df[pd.to_datetime(self.df[date_col]) < median_date]
-                second_half = self.df[pd.to_datetime(self.df[date_col]) >= median_date]
-                
-                first_sales = first_half.groupby(item_col)[qty_col].sum() if qty_col in self.df.columns else {}
-                second_sales = second_half.groupby(item_col)[qty_col].sum() if qty_col in self.df.columns else {}
-            except Exception:
-                first_sales = {}
-                second_sales = {}
+        halves = self._rollup('_item', '_half')
+        if halves is not None and 'qty_sum' in halves.columns:
+            by_half = halves['qty_sum'].unstack(fill_value=0)
+            first = by_half.get(0, pd.Series(0, index=by_half.index)).reindex(product_data.index, fill_value=0)
+            second = by_half.get(1, pd.Series(0, index=by_half.index)).reindex(product_data.index, fill_value=0)
         else:
-            first_sales = {}
-            second_sales = {}
+            first = second = pd.Series(0, index=product_data.index)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            trend_pct = np.where(first > 0, (second - first) / first * 100, 0.0)
+        trend = np.select(
+            [(first > 0) & (trend_pct > 10), (first > 0) & (trend_pct < -10)],
+            ["increasing", "decreasing"],
+            "stable",
+        )
         
-        for _, row in product_data.iterrows():
-            item = row[item_col]
-            
-            # Calculate trend
-            first = first_sales.get(item, 0) if isinstance(first_sales, dict) else first_sales.get(item, 0)
-            second = second_sales.get(item, 0) if isinstance(second_sales, dict) else second_sales.get(item, 0)
-            
-            if first > 0:
-                trend_pct = (second - first) / first * 100
-                trend = "increasing" if trend_pct > 10 else "decreasing" if trend_pct < -10 else "stable"
-            else:
-                trend_pct = 0
-                trend = "stable"
-            
-            analytics.append(ProductAnalytics(
+        analytics = [
+            ProductAnalytics(
                 item_name=item,
-                total_quantity=int(row[qty_col]) if qty_col in product_data.columns else 0,
-                total_revenue=round(row[rev_col], 2) if rev_col in product_data.columns else 0,
-                avg_daily_sales=round(row[qty_col] / days, 1) if qty_col in product_data.columns else 0,
-                sales_trend=trend,
-                trend_pct=round(trend_pct, 1),
+                total_quantity=int(qty),
+                total_revenue=round(rev, 2),
+                avg_daily_sales=round(qty / days, 1),
+                sales_trend=item_trend,
+                trend_pct=round(pct, 1),
                 best_selling_hour=None,  # Would need hourly data per item
                 best_selling_day=None,   # Would need daily data per item
                 category=cat_map.get(item),
                 pair_suggestions=[]  # Would need basket analysis
-            ))
+            )
+            for item, qty, rev, item_trend, pct in zip(
+                product_data.index.tolist(),
+                total_qty.tolist(),
+                total_rev.tolist(),
+                trend.tolist(),
+                trend_pct.tolist(),
+            )
+        ]
         
         # Sort by revenue
         analytics.sort(key=lambda x: x.total_revenue, reverse=True)
@@ -469,40 +524,41 @@ class AdvancedAnalyticsService:
     
     def _analyze_categories(self) -> List[CategoryAnalytics]:
         """Analyze category performance."""
-        analytics = []
-        
-        cat_col = self.column_mapping.get('category_col')
-        item_col = self.column_mapping.get('item_name_col')
-        rev_col = self.column_mapping.get('revenue_col', 'revenue')
-        
-        if not cat_col or cat_col not in self.df.columns:
-            return analytics
+        categories = self._rollup('_category')
+        if categories is None:
+            return []
+        
+        has_items = '_item' in self._cube.columns
+        has_revenue = 'rev_sum' in categories.columns
+        # Share of all sales, including rows without a category
+        total_revenue = self._cube['rev_sum'].sum() if has_revenue else 1
+        cat_revenue = self._total(categories, 'rev')
+        
+        if has_items:
+            item_rev = self._rollup('_category', '_item')
+            item_counts = item_rev.groupby(level=0).size().reindex(categories.index, fill_value=0)
+        else:
+            item_counts = categories['rows']
         
-        total_revenue = self.df[rev_col].sum() if rev_col in self.df.columns else 1
+        top = worst = {}
+        if has_items and has_revenue:
+            item_rev = item_rev['rev_sum']
+            top = {cat: item for cat, item in item_rev.groupby(level=0).idxmax().tolist()}
+            worst = {cat: item for cat, item in item_rev.groupby(level=0).idxmin().tolist()}
         
-        for category in self.df[cat_col].dropna().unique():
-            cat_data = self.df[self.df[cat_col] == category]
-            
-            cat_revenue = cat_data[rev_col].sum() if rev_col in cat_data.columns else 0
-            item_count = cat_data[item_col].nunique() if item_col else len(cat_data)
-            
-            # Top and worst performers
-            if item_col and item_col in cat_data.columns and rev_col in cat_data.columns:
-                item_rev = cat_data.groupby(item_col)[rev_col].sum()
-                top_performer = item_rev.idxmax() if len(item_rev) > 0 else "N/A"
-                worst_performer = item_rev.idxmin() if len(item_rev) > 0 else "N/A"
-            else:
-                top_performer = "N/A"
-                worst_performer = "N/A"
-            
+        analytics = []
+        # Categories in order of first appearance, as ties keep that order
+        for category in self._first_seen('_category'):
+            revenue = cat_revenue[category]
+            item_count = int(item_counts[category])
             analytics.append(CategoryAnalytics(
                 category=category,
                 item_count=item_count,
-                total_revenue=round(cat_revenue, 2),
-                revenue_share=round(cat_revenue / total_revenue * 100, 1) if total_revenue > 0 else 0,
-                avg_item_price=round(cat_revenue / item_count, 2) if item_count > 0 else 0,
-                top_performer=top_performer,
-                worst_performer=worst_performer,
+                total_revenue=round(revenue, 2),
+                revenue_share=round(revenue / total_revenue * 100, 1) if total_revenue > 0 else 0,
+                avg_item_price=round(revenue / item_count, 2) if item_count > 0 else 0,
+                top_performer=top.get(category, "N/A"),
+                worst_performer=worst.get(category, "N/A"),
                 growth_trend="stable"  # Would need historical comparison
             ))
         
@@ -513,53 +569,42 @@ class AdvancedAnalyticsService:
         """Generate simple demand forecast for next 7 days."""
         forecasts = []
         
-        date_col = self.column_mapping.get('date_col') or self.column_mapping.get('datetime_col')
-        qty_col = self.column_mapping.get('quantity_col', 'quantity')
-        rev_col = self.column_mapping.get('revenue_col', 'revenue')
-        
-        if not date_col:
+        daily = self._rollup('_dow')
+        if daily is None:
             return forecasts
         
-        try:
-            # Calculate daily averages by day of week
-            self.df['_date'] = pd.to_datetime(self.df[date_col])
-            self.df['_dow'] = self.df['_date'].dt.dayofweek
-            
-            daily_avg = self.df.groupby('_dow').agg({
-                qty_col: 'mean' if qty_col in self.df.columns else 'count',
-                rev_col: 'mean' if rev_col in self.df.columns else 'count'
-            })
-            
-            # Forecast next 7 days
-            today = datetime.now(timezone.utc).date()
-            day_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+        # Daily averages by day of week
+        avg_qty = self._mean(daily, 'qty')
+        avg_rev = self._mean(daily, 'rev')
+        
+        # Forecast next 7 days
+        today = datetime.now(timezone.utc).date()
+        day_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+        
+        for i in range(7):
+            forecast_date = today + timedelta(days=i)
+            dow = forecast_date.weekday()
             
-            for i in range(7):
-                forecast_date = today + timedelta(days=i)
-                dow = forecast_date.weekday()
-                
-                if dow in daily_avg.index:
-                    pred_qty = daily_avg.loc[dow, qty_col] if qty_col in daily_avg.columns else 0
-                    pred_rev = daily_avg.loc[dow, rev_col] if rev_col in daily_avg.columns else 0
-                else:
-                    pred_qty = daily_avg[qty_col].mean() if qty_col in daily_avg.columns else 0
-                    pred_rev = daily_avg[rev_col].mean() if rev_col in daily_avg.columns else 0
-                
-                # Simple confidence interval (±20%)
-                forecasts.append(DemandForecast(
-                    period=f"{forecast_date.strftime('%Y-%m-%d')} ({day_names[dow]})",
-                    predicted_quantity=round(pred_qty, 0),
-                    predicted_revenue=round(pred_rev, 2),
-                    confidence_lower=round(pred_rev * 0.8, 2),
-                    confidence_upper=round(pred_rev * 1.2, 2),
-                    factors=[f"Based on historical {day_names[dow]} averages"]
-                ))
+            if dow in avg_qty.index:
+                pred_qty = float(avg_qty[dow])
+                pred_rev = float(avg_rev[dow])
+            else:
+                pred_qty = float(avg_qty.mean())
+                pred_rev = float(avg_rev.mean())
             
-        except Exception as e:
-            logger.error(f"Error generating forecast: {e}")
+            # Simple confidence interval (±20%)
+            forecasts.append(DemandForecast(
+                period=f"{forecast_date.strftime('%Y-%m-%d')} ({day_names[dow]})",
+                predicted_quantity=round(pred_qty, 0),
+                predicted_revenue=round(pred_rev, 2),
+                confidence_lower=round(pred_rev * 0.8, 2),
+                confidence_upper=round(pred_rev * 1.2, 2),
+                factors=[f"Based on historical {day_names[dow]} averages"]
+            ))
         
         return forecasts
     
+
     def _generate_hourly_insights(self, patterns: List[HourlyDemandPattern]) -> List[str]:
         """Generate insights from hourly patterns."""
         insights = []
@@ -689,15 +734,10 @@ class AdvancedAnalyticsService:
             if len(self.df) < 100:
                 notes.append("⚠️ Limited data sample - insights may have lower confidence")
             
-            date_col = self.column_mapping.get('date_col') or self.column_mapping.get('datetime_col')
-            if date_col:
-                try:
-                    days = (pd.to_datetime(self.df[date_col]).max() - 
-                           pd.to_datetime(self.df[date_col]).min()).days
-                    if days < 30:
-                        notes.append(f"📅 Data covers {days} days - longer history improves accuracy")
-                except Exception:
-                    pass
+            if self._dates is not None and self._dates.notna().any():
+                days = (self._dates.max() - self._dates.min()).days
+                if days < 30:
+                    notes.append(f"📅 Data covers {days} days - longer history improves accuracy")
         
         return notes
 
@@ -20,8 +20,11 @@ from enum import Enum
 from typing import Any, Dict, List, Optional
 
 import numpy as np
+import pandas as pd
 from app.core.config import get_settings
 from app.core.cache import get_cache_manager
+from app.services.analysis.name_matching import match_menu_to_sales
+from app.services.analysis.sales_frame import SalesData, SalesFrame
 from app.services.gemini.base_agent import GeminiAgent
 from loguru import logger
 
@@ -78,8 +81,9 @@ class BCGClassifier:
     async def classify(
         self,
         menu_items: List[Dict[str, Any]],
-        sales_data: List[Dict[str, Any]],
+        sales_data: SalesData,
         image_scores: Optional[Dict[str, float]] = None,
+        name_matches: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
         Classify all menu items according to BCG matrix.
@@ -89,6 +93,8 @@ class BCGClassifier:
             menu_items: List of menu items with price and cost
             sales_data: Historical sales records
             image_scores: Optional image attractiveness scores by item name
+            name_matches: Optional session table of menu -> sales name
+                matches (see ``match_menu_to_sales``)
 
         Returns:
             Complete BCG analysis with classifications and insights
@@ -108,7 +114,7 @@ class BCGClassifier:
         )
 
         # Calculate metrics for each item
-        item_metrics = self._calculate_item_metrics(menu_items, sales_data)
+        item_metrics = self._calculate_item_metrics(menu_items, sales_data, name_matches)
 
         # Add image scores if available
         if image_scores:
@@ -145,7 +151,10 @@ class BCGClassifier:
         return result
 
     def _calculate_item_metrics(
-        self, menu_items: List[Dict[str, Any]], sales_data: List[Dict[str, Any]]
+        self,
+        menu_items: List[Dict[str, Any]],
+        sales_data: SalesData,
+        name_matches: Optional[Dict[str, Any]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Calculate professional BCG metrics for each menu item.
@@ -155,103 +164,40 @@ class BCGClassifier:
         - Calculates relative market share vs portfolio average
         - Applies professional financial metrics
 
-        Optimized for large datasets (3+ years of data):
-        - Samples data if exceeds threshold for faster processing
-        - Uses efficient aggregation with dictionary comprehensions
+        Sales are aggregated column-wise, so the full history is used even
+        for several years of data.
         """
+        sales_by_item = self._aggregate_sales(SalesFrame.of(sales_data))
 
-        # OPTIMIZATION: Sample large datasets to prevent timeout
-        MAX_RECORDS = 50000  # Process at most 50k records
-        if len(sales_data) > MAX_RECORDS:
-            logger.info(
-                f"Sampling {MAX_RECORDS} from {len(sales_data)} records for BCG analysis"
-            )
-            # Use stratified sampling - take most recent data + sample from older
-            sorted_data = sorted(
-                sales_data,
-                key=lambda x: x.get("sale_date", x.get("date", "")),
-                reverse=True,
-            )
-            recent = sorted_data[: MAX_RECORDS // 2]  # Most recent 50%
-            older_sample = sorted_data[
-                MAX_RECORDS // 2 :: max(1, len(sorted_data) // (MAX_RECORDS // 2))
-            ][: MAX_RECORDS // 2]
-            sales_data = recent + older_sample
-            logger.info(f"Using {len(sales_data)} sampled records")
-
-        # Aggregate sales by item with cost tracking
-        sales_by_item = {}
-        for record in sales_data:
-            item_name = record.get("item_name")
-            if not item_name:
-                continue
-
-            if item_name not in sales_by_item:
-                sales_by_item[item_name] = {
-                    "units": [],
-                    "dates": [],
-                    "revenues": [],
-                    "costs": [],
-                    "gross_profits": [],
-                }
-
-            units = record.get("units_sold", 0) or record.get("quantity", 0) or 0
-            # Calculate revenue: prefer explicit revenue, otherwise price * units
-            unit_price = record.get("price", 0) or 0
-            revenue = record.get("revenue", 0)
-            if not revenue and unit_price and units:
-                revenue = unit_price * units
-
-            # Get cost from sales data if available
-            unit_cost = record.get("cost", record.get("unit_cost", 0)) or 0
-
-            sales_by_item[item_name]["units"].append(units)
-            sales_by_item[item_name]["dates"].append(
-                record.get("sale_date", record.get("date"))
-            )
-            sales_by_item[item_name]["revenues"].append(revenue)
-            sales_by_item[item_name]["costs"].append(
-                unit_cost * units if unit_cost else 0
-            )
-
-            # Calculate gross profit for this transaction
-            if unit_cost and units:
-                gross_profit = revenue - (unit_cost * units)
-            elif revenue:
-                gross_profit = revenue * 0.65  # Assume 35% food cost default
-            else:
-                gross_profit = 0
-            sales_by_item[item_name]["gross_profits"].append(gross_profit)
-
-        # Build fuzzy lookup index for name matching
-        sales_name_index = self._build_name_index(sales_by_item)
+        # Menu names -> sales names (exact, normalized or fuzzy match)
+        matches = match_menu_to_sales(
+            [item.get("name") for item in menu_items], sales_by_item, name_matches
+        )
 
         # Calculate TOTAL GROSS PROFIT for the portfolio (key BCG metric)
-        total_gross_profit = sum(
-            sum(s["gross_profits"]) for s in sales_by_item.values()
-        )
-        total_units = sum(sum(s["units"]) for s in sales_by_item.values())
-        # total_revenue calculated but reserved for future revenue-based analysis
-        _ = sum(sum(s["revenues"]) for s in sales_by_item.values())
+        total_gross_profit = sum(s["total_gross_profit"] for s in sales_by_item.values())
+        total_units = sum(s["total_units"] for s in sales_by_item.values())
+        max_units = max((s["total_units"] for s in sales_by_item.values()), default=1)
 
         # Calculate metrics for each item
         metrics = []
-        empty_sales = {"units": [], "dates": [], "revenues": [], "costs": [], "gross_profits": []}
+        empty_sales = {
+            "units": np.zeros(0),
+            "gross_profits": np.zeros(0),
+            "total_units": 0,
+            "total_revenue": 0,
+            "total_cost": 0,
+            "total_gross_profit": 0,
+        }
         for item in menu_items:
             item_name = item.get("name")
-            # Try exact match first, then fuzzy match via normalized index
-            sales = sales_by_item.get(item_name)
-            if not sales:
-                sales = self._fuzzy_lookup_sales(item_name, sales_by_item, sales_name_index)
-            if not sales:
-                sales = empty_sales
-
-            total_item_units = sum(sales["units"]) if sales["units"] else 0
-            total_item_revenue = sum(sales["revenues"]) if sales["revenues"] else 0
-            total_item_cost = sum(sales["costs"]) if sales["costs"] else 0
-            total_item_gross_profit = (
-                sum(sales["gross_profits"]) if sales["gross_profits"] else 0
-            )
+            sales = sales_by_item.get(matches.get(item_name)) or empty_sales
+
+            total_item_units = sales["total_units"]
+            total_item_revenue = sales["total_revenue"]
+            total_item_cost = sales["total_cost"]
+            total_item_gross_profit = sales["total_gross_profit"]
+            data_points = len(sales["units"])
 
             # PROFESSIONAL BCG: Market share based on GROSS PROFIT contribution
             # This is the correct implementation - share of total profit, not units
@@ -265,12 +211,10 @@ class BCGClassifier:
             unit_market_share = total_item_units / total_units if total_units > 0 else 0
 
             # Growth rate (compare last period vs first period)
-            growth_rate = self._calculate_growth_rate(sales["units"], sales["dates"])
+            growth_rate = self._calculate_growth_rate(sales["units"])
 
             # Also calculate profit growth rate
-            profit_growth_rate = self._calculate_growth_rate(
-                sales["gross_profits"], sales["dates"]
-            )
+            profit_growth_rate = self._calculate_growth_rate(sales["gross_profits"])
 
             # Price and cost from menu item or inferred from sales
             price = item.get("price", 0)
@@ -291,9 +235,6 @@ class BCGClassifier:
             margin = gross_profit_per_unit / price if price > 0 else 0
 
             # Popularity score (normalized units)
-            max_units = max(
-                (sum(s["units"]) for s in sales_by_item.values()), default=1
-            )
             popularity = total_item_units / max_units if max_units > 0 else 0
 
             # Profitability index: combines margin with volume
@@ -318,11 +259,11 @@ class BCGClassifier:
                     "margin": margin,
                     "profitability_index": profitability_index,
                     "popularity_score": popularity,
-                    "data_points": len(sales["units"]),
+                    "data_points": data_points,
                     "data_quality": (
                         "high"
-                        if len(sales["units"]) >= 30
-                        else "medium" if len(sales["units"]) >= 7 else "low"
+                        if data_points >= 30
+                        else "medium" if data_points >= 7 else "low"
                     ),
                 }
             )
@@ -330,85 +271,78 @@ class BCGClassifier:
         return metrics
 
     @staticmethod
-    def _normalize_name(name: str) -> str:
-        """Normalize a product name for fuzzy matching."""
-        import re
-        import unicodedata
-        name = name.strip().lower()
-        # Remove accents
-        name = unicodedata.normalize("NFD", name)
-        name = "".join(c for c in name if unicodedata.category(c) != "Mn")
-        # Remove parenthetical suffixes like (Botella), (Trago), (Media)
-        name = re.sub(r"\s*\(.*?\)\s*", "", name).strip()
-        # Remove special punctuation (backticks, apostrophes, quotes)
-        name = re.sub(r"[`'\"']", "", name)
-        # Normalize whitespace
-        name = re.sub(r"\s+", " ", name)
-        return name
-
-    def _build_name_index(self, sales_by_item: Dict[str, Any]) -> Dict[str, str]:
-        """Build a normalized name → original name index for fuzzy lookups."""
-        index = {}
-        for original_name in sales_by_item:
-            norm = self._normalize_name(original_name)
-            index[norm] = original_name
-        return index
-
-    def _fuzzy_lookup_sales(
-        self,
-        menu_item_name: str,
-        sales_by_item: Dict[str, Any],
-        name_index: Dict[str, str],
-    ) -> Optional[Dict[str, Any]]:
-        """Try to find sales data for a menu item using normalized name matching."""
-        if not menu_item_name:
-            return None
-        norm = self._normalize_name(menu_item_name)
-        # 1. Exact normalized match
-        if norm in name_index:
-            return sales_by_item.get(name_index[norm])
-        # 2. Substring match
-        for sales_norm, sales_original in name_index.items():
-            if norm in sales_norm or sales_norm in norm:
-                return sales_by_item.get(sales_original)
-        # 3. Token overlap match (handles spelling variations)
-        norm_tokens = set(norm.split())
-        if len(norm_tokens) >= 1:
-            best_match = None
-            best_overlap = 0
-            for sales_norm, sales_original in name_index.items():
-                sales_tokens = set(sales_norm.split())
-                overlap = len(norm_tokens & sales_tokens)
-                # Require majority token overlap
-                min_len = min(len(norm_tokens), len(sales_tokens))
-                if min_len > 0 and overlap / min_len >= 0.6 and overlap > best_overlap:
-                    best_overlap = overlap
-                    best_match = sales_original
-            if best_match:
-                return sales_by_item.get(best_match)
-        return None
-
-    def _calculate_growth_rate(self, units: List[int], dates: List[Any]) -> float:
-        """Calculate growth rate from sales data."""
-
-        if len(units) < 2:
-            return 0.0
+    def _aggregate_sales(sales: SalesFrame) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-item unit and gross profit series (in date order) plus totals.
 
-        # Sort by date if dates available
-        if dates and all(dates):
-            try:
-                sorted_data = sorted(zip(dates, units), key=lambda x: x[0])
-                units = [u for _, u in sorted_data]
-            except (TypeError, ValueError):
-                pass
+        Revenue falls back to price x units, and gross profit to 65% of
+        revenue (35% food cost) when a record has no cost.
+        """
+        if not sales or not sales.has("item_name"):
+            return {}
+
+        units = sales.numeric("units_sold")
+        unit_price = sales.numeric("price")
+        revenue = sales.numeric("revenue")
+        revenue = np.where(
+            (revenue == 0) & (unit_price != 0) & (units != 0), unit_price * units, revenue
+        )
+        unit_cost = sales.numeric("cost")
+        costs = np.where(unit_cost != 0, unit_cost * units, 0)
+        gross_profits = np.where(
+            (unit_cost != 0) & (units != 0),
+            revenue - unit_cost * units,
+            np.where(revenue != 0, revenue * 0.65, 0),
+        )
 
-        # Split into first and second half
-        mid = len(units) // 2
-        if mid == 0:
+        df = pd.DataFrame(
+            {
+                "item": sales.text("item_name").to_numpy(),
+                "date": sales.dates.to_numpy(),
+                "units": units,
+                "revenue": revenue,
+                "cost": costs,
+                "gross_profit": gross_profits,
+            }
+        )
+        df = df[df["item"] != ""]
+
+        # Order each item's records by date; items with undated records keep
+        # their upload order
+        fully_dated = df["date"].notna().groupby(df["item"]).transform("all")
+        sort_key = df["date"].where(fully_dated, pd.Timestamp(0))
+        df = df.iloc[np.argsort(sort_key.to_numpy(), kind="stable")]
+
+        grouped = df.groupby("item", sort=False)
+        totals = {
+            column: grouped[column].sum().to_dict()
+            for column in ("units", "revenue", "cost", "gross_profit")
+        }
+        unit_values = df["units"].to_numpy()
+        profit_values = df["gross_profit"].to_numpy()
+
+        sales_by_item = {}
+        for name, positions in grouped.indices.items():
+            sales_by_item[name] = {
+                "units": unit_values[positions],
+                "gross_profits": profit_values[positions],
+                "total_units": totals["units"][name],
+                "total_revenue": totals["revenue"][name],
+                "total_cost": totals["cost"][name],
+                "total_gross_profit": totals["gross_profit"][name],
+            }
+        return sales_by_item
+
+    def _calculate_growth_rate(self, values: np.ndarray) -> float:
+        """Calculate growth rate from a date-ordered series."""
+
+        if len(values) < 2:
             return 0.0
 
-        first_half_avg = sum(units[:mid]) / mid
-        second_half_avg = sum(units[mid:]) / (len(units) - mid)
+        # Split into first and second half
+        mid = len(values) // 2
+        first_half_avg = float(values[:mid].mean())
+        second_half_avg = float(values[mid:].mean())
 
         if first_half_avg == 0:
             return 1.0 if second_half_avg > 0 else 0.0
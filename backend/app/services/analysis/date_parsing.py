@@ -0,0 +1,122 @@
+"""
+Shared date parsing for sales data.
+
+POS exports use one date format per file, so instead of trying every
+format on every row (``apply`` over a Python parser), the dominant format
+is inferred from a sample of distinct values and parsed in a single
+vectorized ``pd.to_datetime`` call. Only values that format cannot parse
+fall back to the row-wise parser.
+"""
+
+import warnings
+from datetime import datetime
+from typing import Optional, Sequence
+
+import pandas as pd
+
+# Day-first formats win over US ones for ambiguous values
+DATE_FORMATS: Sequence[str] = (
+    "%Y-%m-%d",  # YYYY-MM-DD (ISO) - most common after conversion
+    "%d-%m-%y",  # DD-MM-YY (sample data format)
+    "%d-%m-%Y",  # DD-MM-YYYY
+    "%d/%m/%y",  # DD/MM/YY
+    "%d/%m/%Y",  # DD/MM/YYYY
+    "%m/%d/%Y",  # MM/DD/YYYY (US)
+    "%Y/%m/%d",  # YYYY/MM/DD
+)
+
+FORMAT_SAMPLE_SIZE = 500
+
+
+def parse_date(value) -> Optional[datetime]:
+    """Parse a single date value in any supported format (naive datetime)."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None) if value.tzinfo else value
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass
+
+    date_str = str(value).strip()
+    if not date_str:
+        return None
+
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except (ValueError, TypeError):
+            continue
+
+    # ISO timestamps, optionally with timezone
+    try:
+        parsed = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
+        return parsed.replace(tzinfo=None) if parsed.tzinfo else parsed
+    except (ValueError, TypeError):
+        pass
+
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)  # "could not infer format"
+            parsed = pd.to_datetime(date_str, dayfirst=True)
+    except (ValueError, TypeError, OverflowError):
+        return None
+    if pd.isna(parsed):
+        return None
+    return parsed.tz_localize(None).to_pydatetime() if parsed.tzinfo else parsed.to_pydatetime()
+
+
+def infer_date_format(
+    values: pd.Series, sample_size: int = FORMAT_SAMPLE_SIZE
+) -> Optional[str]:
+    """Format in ``DATE_FORMATS`` that parses most of a sample of distinct values."""
+    sample = pd.Series(values.dropna().astype(str).str.strip().unique()[:sample_size])
+    sample = sample[sample != ""]
+    if sample.empty:
+        return None
+
+    best_format, best_hits = None, 0
+    for fmt in DATE_FORMATS:
+        hits = int(pd.to_datetime(sample, format=fmt, errors="coerce").notna().sum())
+        if hits > best_hits:
+            best_format, best_hits = fmt, hits
+            if hits == len(sample):
+                break
+    return best_format
+
+
+def parse_dates(column: pd.Series, date_format: Optional[str] = None) -> pd.Series:
+    """
+    Parse a column to naive datetime64 (NaT where missing or unparseable).
+
+    Sales exports repeat a few hundred distinct dates across millions of
+    rows, so each distinct value is parsed once and mapped back.
+    ``date_format`` skips inference, e.g. when parsing later chunks of a
+    file whose format is already known.
+    """
+    if pd.api.types.is_datetime64_any_dtype(column):
+        if getattr(column.dt, "tz", None) is not None:
+            column = column.dt.tz_localize(None)
+        return column.astype("datetime64[ns]")
+
+    codes, uniques = pd.factorize(column)
+    text = pd.Series(uniques, dtype=object).astype(str).str.strip()
+
+    date_format = date_format or infer_date_format(text)
+    if date_format:
+        parsed = pd.to_datetime(text, format=date_format, errors="coerce")
+    else:
+        parsed = pd.Series(pd.NaT, index=text.index)
+    parsed = parsed.astype("datetime64[ns]")
+
+    residual = parsed.isna() & (text != "")
+    if residual.any():
+        parsed[residual] = pd.DatetimeIndex(
+            [parse_date(value) for value in text[residual]], dtype="datetime64[ns]"
+        ).to_numpy()
+
+    # factorize marks missing values with -1, which picks the trailing NaT
+    lookup = pd.DatetimeIndex(parsed).append(pd.DatetimeIndex([pd.NaT], dtype="datetime64[ns]"))
+    return pd.Series(lookup[codes].to_numpy(), index=column.index)
@@ -2,17 +2,16 @@
 Menu Extraction Service - OCR and multimodal menu parsing.
 """
 
+import asyncio
 import re
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 import fitz  # PyMuPDF
-import pytesseract
 from app.core.config import get_settings
+from app.core.pdf_pages import PageImage, get_page_pool, ocr_image_file
 from app.services.gemini.base_agent import GeminiAgent
 from loguru import logger
-from pdf2image import convert_from_path
-from PIL import Image
 
 
 class MenuExtractor:
@@ -22,6 +21,9 @@ class MenuExtractor:
     Uses a hybrid approach:
     1. Local OCR (Tesseract) for initial text extraction
     2. Gemini multimodal for structure understanding and verification
+
+    PDF pages are rendered and OCR'd in the shared page process pool
+    (``app.core.pdf_pages``) and their vision calls run concurrently.
     """
 
     def __init__(self, agent: GeminiAgent):
@@ -60,7 +62,7 @@ class MenuExtractor:
         # Step 1: Local OCR preprocessing (optional)
         ocr_text = None
         if use_ocr:
-            ocr_text = self._run_local_ocr(image_path)
+            ocr_text = await self._run_local_ocr(image_path)
             logger.debug(f"OCR extracted {len(ocr_text) if ocr_text else 0} characters")
 
         # Step 2: Gemini multimodal extraction
@@ -89,84 +91,6 @@ class MenuExtractor:
             "warnings": self._generate_warnings(processed_items, ocr_text),
         }
 
-    async def _convert_pdf_to_image(self, pdf_path: str) -> str:
-        """
-        Convert PDF to images for processing.
-
-        Handles multi-page PDFs by converting all pages and extracting
-        text layers if available (for hybrid PDFs with selectable text).
-
-        Returns path to the converted image (first page).
-        """
-        try:
-            # Try PyMuPDF first (faster and better quality)
-            doc = fitz.open(pdf_path)
-            total_pages = len(doc)
-            logger.info(f"PDF has {total_pages} pages, converting all...")
-
-            output_paths = []
-            extracted_text = []
-
-            for page_num in range(total_pages):
-                page = doc[page_num]
-
-                # Extract text layer if available (for selectable text PDFs)
-                page_text = page.get_text("text")
-                if page_text and len(page_text.strip()) > 100:
-                    logger.info(
-                        f"Page {page_num + 1} has selectable text ({len(page_text)} chars)"
-                    )
-                    extracted_text.append(page_text)
-
-                # Higher resolution for better OCR and image recognition
-                pix = page.get_pixmap(
-                    matrix=fitz.Matrix(3.0, 3.0)
-                )  # Increased from 2.5 to 3.0
-
-                # Save each page as PNG
-                output_path = pdf_path.replace(".pdf", f"_page{page_num + 1}.png")
-                pix.save(output_path)
-                output_paths.append(output_path)
-                logger.info(
-                    f"Converted page {page_num + 1}/{total_pages}: {output_path}"
-                )
-
-            doc.close()
-
-            # Store all page paths and extracted text for later processing
-            self._pdf_pages = output_paths
-            self._pdf_text_layers = extracted_text
-
-            logger.info(
-                f"PDF converted successfully: {total_pages} pages, {len(extracted_text)} pages with text layer"
-            )
-            return output_paths[0]  # Return first page for immediate processing
-
-        except Exception as e:
-            logger.warning(f"PyMuPDF conversion failed: {e}, trying pdf2image...")
-
-            # Fallback to pdf2image (poppler-based)
-            try:
-                images = convert_from_path(pdf_path, dpi=200)
-                output_paths = []
-
-                for idx, image in enumerate(images):
-                    output_path = pdf_path.replace(".pdf", f"_page{idx + 1}.png")
-                    image.save(output_path, "PNG")
-                    output_paths.append(output_path)
-                    logger.info(
-                        f"Converted page {idx + 1}/{len(images)} with pdf2image"
-                    )
-
-                self._pdf_pages = output_paths
-
-                if output_paths:
-                    return output_paths[0]
-
-            except Exception as e2:
-                logger.error(f"PDF conversion failed: {e2}")
-                raise ValueError(f"Could not convert PDF to image: {e2}")
-
     def _truncate_pdf(self, pdf_path: str, max_pages: int) -> str:
         """Truncate a PDF to max_pages and return the path to the truncated file."""
         try:
@@ -210,70 +134,44 @@ class MenuExtractor:
 
         settings = get_settings()
         max_pages = settings.max_pdf_pages
-        working_pdf = self._truncate_pdf(pdf_path, max_pages)
+        working_pdf = await asyncio.to_thread(self._truncate_pdf, pdf_path, max_pages)
 
         logger.info(f"🔬 Dual-Analysis Pipeline starting for: {working_pdf}")
 
-        # ── Pass 1: Document Intelligence (PDF text + Gemini native) ──
-        pass1_items = []
-        pdf_text_content = ""
-        try:
-            # 1a. Extract text layers from PDF with PyMuPDF
-            doc = fitz.open(working_pdf)
-            for i in range(len(doc)):
-                page_text = doc[i].get_text("text")
-                if page_text and len(page_text.strip()) > 20:
-                    pdf_text_content += f"\n--- Page {i+1} ---\n{page_text}"
-            doc.close()
+        # ── Pass 1b: Gemini native PDF analysis, overlapped with everything below ──
+        document_task = asyncio.create_task(
+            self._extract_document(working_pdf, business_context)
+        )
 
-            if pdf_text_content:
-                logger.info(f"  Pass 1a: Extracted {len(pdf_text_content)} chars of text from PDF layers")
+        # Render every page (image, text layer, OCR) in the page pool
+        pages = await self._convert_pdf_to_images(working_pdf, use_ocr=use_ocr)
+        logger.info(f"  Converted {len(pages)} pages to images for Vision Analysis")
 
-            # 1b. Gemini native PDF analysis (Document Intelligence)
-            gemini_pdf_result = await self.agent.extract_menu_from_pdf(
-                working_pdf, additional_context=business_context
+        # ── Pass 1a: Document Intelligence - text layers from PDF ──
+        page_texts = {
+            page.index: page.text
+            for page in pages
+            if page.text and len(page.text.strip()) > 20
+        }
+        pdf_text_content = "".join(
+            f"\n--- Page {i+1} ---\n{text}" for i, text in page_texts.items()
+        )
+        if pdf_text_content:
+            logger.info(f"  Pass 1a: Extracted {len(pdf_text_content)} chars of text from PDF layers")
+
+        # ── Pass 2: Vision Analysis, all pages concurrently ──
+        page_results = await asyncio.gather(
+            *(
+                self._extract_page(page, page_texts.get(page.index), business_context)
+                for page in pages
             )
-            pass1_items = gemini_pdf_result.get("items", [])
-            logger.info(f"  Pass 1b: Gemini Document Intelligence found {len(pass1_items)} items")
-
-        except Exception as e:
-            logger.warning(f"  Pass 1 partial failure: {e}")
+        )
+        pass1_items = await document_task
 
-        # ── Pass 2: Vision Analysis (images + Gemini multimodal) ──
+        # Reassemble vision items in page order
         pass2_items = []
-        try:
-            page_images = self._convert_pdf_to_images(working_pdf)
-            logger.info(f"  Pass 2: Converted {len(page_images)} pages to images for Vision Analysis")
-
-            for idx, img_path in enumerate(page_images):
-                try:
-                    page_context = business_context or ""
-                    # Enrich with text layer if available
-                    if pdf_text_content:
-                        lines = pdf_text_content.split(f"--- Page {idx+1} ---")
-                        if len(lines) > 1:
-                            next_marker = lines[1].find("--- Page ")
-                            page_text_slice = lines[1][:next_marker] if next_marker > 0 else lines[1]
-                            page_context += f"\nText from this page:\n{page_text_slice[:1500]}"
-
-                    # OCR preprocessing
-                    ocr_text = None
-                    if use_ocr:
-                        ocr_text = self._run_local_ocr(img_path)
-                    if ocr_text:
-                        page_context += f"\nOCR extraction:\n{ocr_text[:1500]}"
-
-                    vision_result = await self.agent.extract_menu_from_image(
-                        img_path, additional_context=page_context if page_context else None
-                    )
-                    page_items = vision_result.get("items", [])
-                    pass2_items.extend(page_items)
-                    logger.info(f"    Page {idx+1}: Vision found {len(page_items)} items")
-                except Exception as page_err:
-                    logger.warning(f"    Page {idx+1} vision failed: {page_err}")
-
-        except Exception as e:
-            logger.warning(f"  Pass 2 failed: {e}")
+        for page_items in page_results:
+            pass2_items.extend(page_items)
 
         # ── Pass 3: Intelligent Fusion (Gemini reasoning) ──
         logger.info(f"  Pass 3: Fusing {len(pass1_items)} doc items + {len(pass2_items)} vision items")
@@ -313,21 +211,57 @@ class MenuExtractor:
             "warnings": self._generate_warnings(final_items, pdf_text_content[:500] if pdf_text_content else None),
         }
 
-    def _convert_pdf_to_images(self, pdf_path: str) -> List[str]:
-        """Convert PDF pages to JPEG images for Vision Analysis."""
-        output_paths = []
+    async def _extract_document(
+        self, pdf_path: str, business_context: Optional[str]
+    ) -> List[Dict]:
+        """Pass 1b: Gemini native PDF analysis (Document Intelligence)."""
         try:
-            doc = fitz.open(pdf_path)
-            for i in range(len(doc)):
-                page = doc[i]
-                pix = page.get_pixmap(matrix=fitz.Matrix(2.0, 2.0))
-                out_path = pdf_path.replace(".pdf", f"_vis_page{i+1}.jpg")
-                pix.pil_save(out_path, format="JPEG", quality=85, optimize=True)
-                output_paths.append(out_path)
-            doc.close()
+            gemini_pdf_result = await self.agent.extract_menu_from_pdf(
+                pdf_path, additional_context=business_context
+            )
+            items = gemini_pdf_result.get("items", [])
+            logger.info(f"  Pass 1b: Gemini Document Intelligence found {len(items)} items")
+            return items
+        except Exception as e:
+            logger.warning(f"  Pass 1 partial failure: {e}")
+            return []
+
+    async def _extract_page(
+        self,
+        page: PageImage,
+        page_text: Optional[str],
+        business_context: Optional[str],
+    ) -> List[Dict]:
+        """Pass 2: Gemini vision extraction of one rendered page."""
+        try:
+            page_context = business_context or ""
+            # Enrich with text layer if available
+            if page_text:
+                page_context += f"\nText from this page:\n{page_text[:1500]}"
+            if page.ocr_text:
+                page_context += f"\nOCR extraction:\n{page.ocr_text[:1500]}"
+
+            vision_result = await self.agent.extract_menu_from_image(
+                page.image,
+                additional_context=page_context if page_context else None,
+                mime_type=page.mime_type,
+            )
+            page_items = vision_result.get("items", [])
+            logger.info(f"    Page {page.index+1}: Vision found {len(page_items)} items")
+            return page_items
+        except Exception as page_err:
+            logger.warning(f"    Page {page.index+1} vision failed: {page_err}")
+            return []
+
+    async def _convert_pdf_to_images(
+        self, pdf_path: str, use_ocr: bool = False, zoom: float = 2.0
+    ) -> List[PageImage]:
+        """Render PDF pages to in-memory JPEGs (with text layer and OCR)."""
+        try:
+            return await get_page_pool().render(pdf_path, zoom=zoom, ocr=use_ocr)
         except Exception as e:
             logger.error(f"PDF to image conversion failed: {e}")
-        return output_paths
+            return []
 
     async def _fuse_extractions(
         self,
@@ -519,40 +453,48 @@ Respond in JSON:
             f"Fallback: Extracting menu from all pages of PDF as images: {pdf_path}"
         )
 
-        # Convert PDF to images
-        first_page = await self._convert_pdf_to_image(pdf_path)
+        # Convert PDF to images (higher resolution for dense pages)
+        pages_to_process = await self._convert_pdf_to_images(
+            pdf_path, use_ocr=use_ocr, zoom=3.0
+        )
+        if not pages_to_process:
+            raise ValueError(f"Could not convert PDF to image: {pdf_path}")
 
         all_items = []
         all_categories = {}
         total_confidence = 0
         warnings = []
 
-        # Process each page with enriched context
-        pages_to_process = getattr(self, "_pdf_pages", [first_page])
-        text_layers = getattr(self, "_pdf_text_layers", [])
+        def page_context(page: PageImage) -> Optional[str]:
+            # Enrich context with text layer if available
+            context = business_context or ""
+            if page.text and len(page.text.strip()) > 100:
+                context += f"\n\nExtracted text from PDF (selectable text layer):\n{page.text[:3000]}"
+            if page.ocr_text:
+                context += f"\n\nOCR Pre-extraction (may contain errors):\n{page.ocr_text[:2000]}"
+            return context or None
+
+        # Extract all pages concurrently, then merge in page order
+        page_results = await asyncio.gather(
+            *(
+                self.agent.extract_menu_from_image(
+                    page.image,
+                    additional_context=page_context(page),
+                    mime_type=page.mime_type,
+                )
+                for page in pages_to_process
+            ),
+            return_exceptions=True,
+        )
 
-        for idx, page_path in enumerate(pages_to_process):
+        for page, gemini_result in zip(pages_to_process, page_results):
+            idx = page.index
+            ocr_text = page.ocr_text or None
             logger.info(f"Processing page {idx + 1}/{len(pages_to_process)}")
 
             try:
-                # Enrich context with text layer if available
-                page_context = business_context or ""
-                if idx < len(text_layers) and text_layers[idx]:
-                    page_context += f"\n\nExtracted text from PDF (selectable text layer):\n{text_layers[idx][:3000]}"
-                    # ... (rest of the logic remains similar but compacted)
-
-                # Extract from this page
-                ocr_text = None
-                if use_ocr:
-                    ocr_text = self._run_local_ocr(page_path)
-
-                context = page_context
-                if ocr_text:
-                    context += f"\n\nOCR Pre-extraction (may contain errors):\n{ocr_text[:2000]}"
-
-                gemini_result = await self.agent.extract_menu_from_image(
-                    page_path, additional_context=context if context else None
-                )
+                if isinstance(gemini_result, Exception):
+                    raise gemini_result
 
                 processed_items = self._post_process_items(
                     gemini_result.get("items", [])
@@ -604,24 +546,9 @@ Respond in JSON:
             "warnings": warnings,
         }
 
-    def _run_local_ocr(self, image_path: str) -> str:
-        """Run Tesseract OCR on the image."""
-        try:
-            image = Image.open(image_path)
-
-            # Preprocess for better OCR
-            if image.mode != "RGB":
-                image = image.convert("RGB")
-
-            # Run OCR with Spanish and English support
-            text = pytesseract.image_to_string(
-                image, lang="spa+eng", config="--psm 6"  # Assume uniform block of text
-            )
-
-            return text
-        except Exception as e:
-            logger.debug(f"OCR skipped (tesseract not available): {e}")
-            return ""
+    async def _run_local_ocr(self, image_path: str) -> str:
+        """Run Tesseract OCR on the image (in the page pool, off the event loop)."""
+        return await get_page_pool().run(ocr_image_file, image_path)
 
     def _post_process_items(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Clean and validate extracted items."""
@@ -799,7 +726,10 @@ class DishImageAnalyzer:
         self.agent = agent
 
     async def analyze_images(
-        self, image_paths: List[str], menu_items: Optional[List[str]] = None
+        self,
+        image_paths: List[str],
+        menu_items: Optional[List[str]] = None,
+        on_result: Optional[Callable[..., Awaitable[None]]] = None,
     ) -> Dict[str, Any]:
         """
         Analyze multiple images (dishes, decor, social).
@@ -807,13 +737,14 @@ class DishImageAnalyzer:
         Args:
             image_paths: List of paths to images
             menu_items: Optional list of item names to match with images
+            on_result: Optional hook called as each image finishes
 
         Returns:
             Analysis results for each image
         """
 
-        # Use the new generic multimodal analyzer
-        results = await self.agent.analyze_visual_context(image_paths)
+        # Photos are analyzed concurrently, results come back in order
+        results = await self.agent.analyze_dish_images(image_paths, on_result=on_result)
 
         # Try to match with menu items if provided (only if content type is food)
         if menu_items:
@@ -30,11 +30,16 @@ Key Formulas (Kasavana & Smith, 1982):
 Reference: Kasavana, M. L., & Smith, D. I. (1982). Menu Engineering.
 """
 
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+import numpy as np
+import pandas as pd
 from app.core.config import get_settings
+from app.services.analysis.name_matching import match_menu_to_sales, sales_item_names
+from app.services.analysis.sales_frame import SalesData, SalesFrame
 from loguru import logger
 
 
@@ -69,92 +74,175 @@ def get_period_days(period: AnalysisPeriod) -> Optional[int]:
     return mapping.get(period)
 
 
-def parse_date_flexible(date_val) -> Optional[datetime]:
-    """Parse date from various formats including DD-MM-YY."""
-    if date_val is None:
-        return None
-    if isinstance(date_val, datetime):
-        return date_val
-    if not isinstance(date_val, str):
-        date_val = str(date_val)
-
-    date_str = date_val.strip()
-
-    # Try multiple date formats
-    formats = [
-        "%Y-%m-%d",  # YYYY-MM-DD (ISO) - most common after conversion
-        "%d-%m-%y",  # DD-MM-YY (sample data format)
-        "%d-%m-%Y",  # DD-MM-YYYY
-        "%d/%m/%y",  # DD/MM/YY
-        "%d/%m/%Y",  # DD/MM/YYYY
-        "%m/%d/%Y",  # MM/DD/YYYY (US)
-        "%Y/%m/%d",  # YYYY/MM/DD
-    ]
+def _period_mask(
+    sales: SalesFrame, period: AnalysisPeriod
+) -> Tuple[Optional[np.ndarray], Optional[datetime], Optional[datetime]]:
+    """
+    Boolean mask of the records inside ``period`` (None keeps every record)
+    and the date range the selection covers.
+    """
+    dates = sales.dates
+    if not dates.notna().any():
+        return None, None, None
 
-    for fmt in formats:
-        try:
-            return datetime.strptime(date_str, fmt)
-        except (ValueError, TypeError):
-            continue
+    max_date = dates.max()
+    days = get_period_days(period)
+    if days is None:
+        return None, dates.min().to_pydatetime(), max_date.to_pydatetime()
 
-    # Try ISO format with timezone
-    try:
-        return datetime.fromisoformat(date_str.replace("Z", "+00:00"))
-    except (ValueError, TypeError):
-        pass
+    cutoff_date = max_date - pd.Timedelta(days=days)
+    mask = (dates >= cutoff_date).to_numpy()
+    if not mask.any():
+        return mask, cutoff_date.to_pydatetime(), max_date.to_pydatetime()
 
-    return None
+    window = dates[mask]
+    return mask, window.min().to_pydatetime(), window.max().to_pydatetime()
 
 
 def filter_sales_by_period(
-    sales_data: List[Dict[str, Any]], period: AnalysisPeriod
-) -> Tuple[List[Dict[str, Any]], Optional[datetime], Optional[datetime]]:
+    sales_data: SalesData, period: AnalysisPeriod
+) -> Tuple[SalesFrame, Optional[datetime], Optional[datetime]]:
     """
     Filter sales data to only include records within the specified period.
 
     Returns:
         Tuple of (filtered_sales, start_date, end_date)
     """
-    if not sales_data:
-        return [], None, None
+    sales = SalesFrame.of(sales_data)
+    mask, start_date, end_date = _period_mask(sales, period)
+    if mask is None:
+        return sales, start_date, end_date
+    return sales.select(mask), start_date, end_date
+
+
+def _numeric(df: pd.DataFrame, *columns: str) -> np.ndarray:
+    """
+    Float column where a zero or missing value falls back to the next
+    column, like ``record.get(a) or record.get(b) or 0``.
+    """
+    values = np.zeros(len(df))
+    for name in reversed(columns):
+        if name in df.columns:
+            column = pd.to_numeric(df[name], errors="coerce").to_numpy(
+                dtype=np.float64, na_value=np.nan
+            )
+            column = np.nan_to_num(column, nan=0.0)
+            values = np.where(column != 0, column, values)
+    return values
 
-    dated_sales = []
-    for sale in sales_data:
-        sale_date = sale.get("sale_date") or sale.get("date")
-        if not sale_date:
-            continue
 
-        parsed_date = parse_date_flexible(sale_date)
-        if parsed_date is None:
-            continue
+def _ordered_sum(values: np.ndarray) -> float:
+    """Left-to-right float sum (``np.sum`` is pairwise and can differ in the last bit)."""
+    return float(np.cumsum(values)[-1]) if len(values) else 0.0
 
-        dated_sales.append({**sale, "_parsed_date": parsed_date})
 
-    if not dated_sales:
-        return sales_data, None, None
+def _count_distinct(codes: np.ndarray) -> int:
+    """Number of distinct non-negative codes."""
+    return int(np.count_nonzero(np.bincount(codes[codes >= 0])))
 
-    max_date = max(s["_parsed_date"] for s in dated_sales)
-    min_date = min(s["_parsed_date"] for s in dated_sales)
 
-    days = get_period_days(period)
-    if days is None:
-        return sales_data, min_date, max_date
+def _records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Row dicts with native Python values (cheaper than ``to_dict`` for small frames)."""
+    columns = list(df.columns)
+    return [dict(zip(columns, row)) for row in zip(*(df[c].tolist() for c in columns))]
 
-    cutoff_date = max_date - timedelta(days=days)
 
-    filtered = [
-        {k: v for k, v in s.items() if k != "_parsed_date"}
-        for s in dated_sales
-        if s["_parsed_date"] >= cutoff_date
-    ]
+def _rounded(values: np.ndarray, digits: int) -> List[float]:
+    # Python's round(), not np.round, so values match the record-based output
+    return [round(value, digits) for value in values.tolist()]
 
-    if filtered:
-        filtered_dates = [
-            s["_parsed_date"] for s in dated_sales if s["_parsed_date"] >= cutoff_date
-        ]
-        return filtered, min(filtered_dates), max(filtered_dates)
 
-    return [], cutoff_date, max_date
+@dataclass
+class _SalesRows:
+    """
+    Per-record columns the classifier aggregates, resolved once per sales
+    table so every period is just a mask over them.
+
+    ``code`` indexes ``keys`` (normalized item names); -1 marks records
+    without an item name. ``item_name_code`` and ``transaction_code`` number
+    the raw ``item_name`` and transaction id values for the data quality
+    counts.
+    """
+
+    keys: np.ndarray
+    code: np.ndarray
+    item_name_code: np.ndarray
+    transaction_code: np.ndarray
+    quantity: np.ndarray
+    price: np.ndarray
+    cost: np.ndarray
+    revenue: np.ndarray
+    categoria: Optional[np.ndarray]
+
+    @classmethod
+    def of(cls, sales: SalesFrame) -> "_SalesRows":
+        df = sales.df
+
+        names = df["item_name"] if "item_name" in df.columns else None
+        if "product_name" in df.columns:
+            if names is None:
+                names = df["product_name"]
+            else:
+                names = names.where(names.notna() & (names != ""), df["product_name"])
+        if names is None:
+            names = pd.Series(pd.NA, index=df.index, dtype=object)
+
+        # Normalize each distinct name once, then merge names that only
+        # differ in case or surrounding whitespace
+        raw_codes, raw_names = pd.factorize(names)
+        normalized = pd.Series(raw_names, dtype=object).astype(str).str.strip().str.lower()
+        key_codes, keys = pd.factorize(normalized.where(normalized != "", None))
+        # Missing names have raw code -1, which picks the trailing -1
+        code = np.append(key_codes, -1)[raw_codes]
+
+        quantity = _numeric(df, "quantity", "units_sold")
+        quantity = np.trunc(np.where(quantity != 0, quantity, 1)).astype(np.int64)
+        price = _numeric(df, "price")
+        revenue = _numeric(df, "revenue", "total")
+        revenue = np.where((revenue == 0) & (price > 0), price * quantity, revenue)
+
+        if "item_name" in df.columns:
+            name_codes, distinct_names = pd.factorize(df["item_name"])
+            empty = np.flatnonzero(np.asarray(distinct_names, dtype=object) == "")
+            item_name_code = np.where(np.isin(name_codes, empty), -1, name_codes)
+        else:
+            item_name_code = np.full(len(df), -1, dtype=np.intp)
+
+        transaction_col = next(
+            (c for c in ("id_transaccion", "transaction_id") if c in df.columns), None
+        )
+        if transaction_col:
+            transaction_code = pd.factorize(df[transaction_col], use_na_sentinel=False)[0]
+        else:
+            transaction_code = np.zeros(len(df), dtype=np.intp)
+
+        return cls(
+            keys=np.asarray(keys, dtype=object),
+            code=code,
+            item_name_code=item_name_code,
+            transaction_code=transaction_code,
+            quantity=quantity,
+            price=price,
+            cost=_numeric(df, "cost", "food_cost"),
+            revenue=revenue,
+            categoria=df["categoria"].to_numpy(dtype=object) if "categoria" in df.columns else None,
+        )
+
+    def __len__(self) -> int:
+        return len(self.code)
+
+    def select(self, mask: np.ndarray) -> "_SalesRows":
+        return _SalesRows(
+            keys=self.keys,
+            code=self.code[mask],
+            item_name_code=self.item_name_code[mask],
+            transaction_code=self.transaction_code[mask],
+            quantity=self.quantity[mask],
+            price=self.price[mask],
+            cost=self.cost[mask],
+            revenue=self.revenue[mask],
+            categoria=self.categoria[mask] if self.categoria is not None else None,
+        )
 
 
 class MenuEngineeringClassifier:
@@ -204,40 +292,97 @@ class MenuEngineeringClassifier:
     async def analyze(
         self,
         menu_items: List[Dict[str, Any]],
-        sales_data: List[Dict[str, Any]],
+        sales_data: SalesData,
         period: AnalysisPeriod = AnalysisPeriod.LAST_30_DAYS,
+        name_matches: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
         Perform Menu Engineering analysis on the given data.
 
         Args:
             menu_items: List of menu items with name, price, cost
-            sales_data: List of sales records with item_name, quantity, sale_date
+            sales_data: Sales records (SalesFrame, DataFrame or list of dicts)
+                with item_name, quantity, sale_date
             period: Analysis period filter
+            name_matches: Optional session table of menu -> sales name
+                matches (see ``match_menu_to_sales``)
 
         Returns:
             Complete analysis results with classifications and metrics
         """
+        sales = SalesFrame.of(sales_data)
+        matches = self._match_menu(menu_items, sales, name_matches)
+        return self._analyze_period(
+            menu_items, sales, _SalesRows.of(sales), period, matches
+        )
+
+    async def analyze_all_periods(
+        self,
+        menu_items: List[Dict[str, Any]],
+        sales_data: SalesData,
+        periods: Optional[Iterable[AnalysisPeriod]] = None,
+        name_matches: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Run the analysis for several periods (all of them by default).
+
+        Dates, per-record columns and name matches are resolved once; each
+        period only masks them, so this costs little more than a single
+        ``analyze``.
+
+        Returns:
+            Analysis results keyed by period value
+        """
+        sales = SalesFrame.of(sales_data)
+        rows = _SalesRows.of(sales)
+        matches = self._match_menu(menu_items, sales, name_matches)
+        return {
+            period.value: self._analyze_period(menu_items, sales, rows, period, matches)
+            for period in (periods or AnalysisPeriod)
+        }
+
+    @staticmethod
+    def _match_menu(
+        menu_items: List[Dict[str, Any]],
+        sales: SalesFrame,
+        name_matches: Optional[Dict[str, Any]],
+    ) -> Dict[str, Optional[str]]:
+        if not menu_items or not sales:
+            return {}
+        return match_menu_to_sales(
+            [item.get("name") for item in menu_items],
+            sales_item_names(sales),
+            name_matches,
+        )
+
+    def _analyze_period(
+        self,
+        menu_items: List[Dict[str, Any]],
+        sales: SalesFrame,
+        rows: _SalesRows,
+        period: AnalysisPeriod,
+        matches: Dict[str, Optional[str]],
+    ) -> Dict[str, Any]:
         logger.info(f"Starting Menu Engineering analysis for period: {period.value}")
 
         # Filter data by period
-        filtered_sales, start_date, end_date = filter_sales_by_period(
-            sales_data, period
-        )
+        mask, start_date, end_date = _period_mask(sales, period)
+        if mask is not None:
+            rows = rows.select(mask)
 
-        if not filtered_sales:
+        if not len(rows):
             logger.warning("No sales data found for the specified period")
             return self._empty_result(period, start_date, end_date)
 
-        logger.info(f"Analyzing {len(filtered_sales)} sales records")
+        logger.info(f"Analyzing {len(rows)} sales records")
 
         # Assess data quality (professional requirement)
-        data_quality = self._assess_data_quality(filtered_sales, start_date, end_date)
+        data_quality = self._assess_data_quality(rows, start_date, end_date)
 
         # Calculate item metrics
-        item_metrics = self._calculate_item_metrics(menu_items, filtered_sales)
+        item_metrics = self._calculate_item_metrics(menu_items, rows, matches)
 
-        if not item_metrics:
+        if item_metrics.empty:
             return self._empty_result(period, start_date, end_date)
 
         # Calculate thresholds
@@ -258,11 +403,11 @@ class MenuEngineeringClassifier:
                 "start": start_date.isoformat() if start_date else None,
                 "end": end_date.isoformat() if end_date else None,
             },
-            "total_records": len(filtered_sales),
+            "total_records": len(rows),
             "items_analyzed": len(classified_items),
             "data_quality": data_quality,
             "thresholds": thresholds,
-            "items": classified_items,
+            "items": _records(classified_items),
             "summary": summary,
             "category_analysis": category_analysis,
             "methodology": "Kasavana & Smith Menu Engineering",
@@ -270,7 +415,7 @@ class MenuEngineeringClassifier:
 
     def _assess_data_quality(
         self,
-        sales_data: List[Dict[str, Any]],
+        rows: _SalesRows,
         start_date: Optional[datetime],
         end_date: Optional[datetime],
     ) -> Dict[str, Any]:
@@ -321,17 +466,11 @@ class MenuEngineeringClassifier:
                 )
 
         # Calculate unique items and transactions
-        unique_items = len(
-            set(s.get("item_name", "") for s in sales_data if s.get("item_name"))
-        )
-        unique_transactions = len(
-            set(
-                s.get("id_transaccion", s.get("transaction_id", "")) for s in sales_data
-            )
-        )
+        unique_items = _count_distinct(rows.item_name_code)
+        unique_transactions = _count_distinct(rows.transaction_code)
 
         # Volume assessment
-        avg_sales_per_item = len(sales_data) / unique_items if unique_items > 0 else 0
+        avg_sales_per_item = len(rows) / unique_items if unique_items > 0 else 0
         if avg_sales_per_item < self.MIN_SALES_FOR_CONFIDENCE:
             warnings.append(
                 f"📉 Average of {avg_sales_per_item:.1f} records per item. "
@@ -357,7 +496,7 @@ class MenuEngineeringClassifier:
             "quality_score": max(0, quality_score),
             "quality_level": quality_level,
             "days_span": days_span,
-            "total_records": len(sales_data),
+            "total_records": len(rows),
             "unique_items": unique_items,
             "unique_transactions": unique_transactions,
             "avg_sales_per_item": round(avg_sales_per_item, 1),
@@ -367,15 +506,22 @@ class MenuEngineeringClassifier:
             "recommendations": recommendations,
         }
 
+
     def _calculate_item_metrics(
         self,
         menu_items: List[Dict[str, Any]],
-        sales_data: List[Dict[str, Any]],
-    ) -> List[Dict[str, Any]]:
-        """Calculate key metrics for each menu item."""
+        rows: _SalesRows,
+        matches: Optional[Dict[str, Optional[str]]] = None,
+    ) -> pd.DataFrame:
+        """
+        Calculate key metrics for each menu item.
+
+        Returns one row per item sold, in order of first sale.
+        """
 
         # Build price and cost lookup from menu_items
         item_info = {}
+        matched_info = {}
         for item in menu_items:
             name = item.get("name", "").strip().lower()
             if name:
@@ -385,84 +531,78 @@ class MenuEngineeringClassifier:
                     "category": item.get("category", ""),
                     "original_name": item.get("name", ""),
                 }
+                sales_name = (matches or {}).get(item.get("name"))
+                if sales_name:
+                    matched_info.setdefault(sales_name.strip().lower(), item_info[name])
+        # Fuzzy matches only fill in sales names no menu item spells exactly
+        for key, info in matched_info.items():
+            item_info.setdefault(key, info)
+
+        # Aggregate sales by item; bincount adds in record order, like a loop
+        named = rows.code >= 0
+        item_codes, item_ids = pd.factorize(rows.code[named])
+        n_items = len(item_ids)
+        if n_items == 0:
+            return pd.DataFrame()
 
-        # Aggregate sales by item
-        sales_by_item: Dict[str, Dict[str, Any]] = {}
-
-        for sale in sales_data:
-            item_name = (
-                (sale.get("item_name") or sale.get("product_name") or "")
-                .strip()
-                .lower()
-            )
-            # Support both 'quantity' and 'units_sold' column names
-            quantity = int(sale.get("quantity") or sale.get("units_sold") or 1)
-
-            # Get price and cost from sales record (per-line item data)
-            sale_price = float(sale.get("price") or 0)
-            sale_cost = float(sale.get("cost") or sale.get("food_cost") or 0)
-
-            # Calculate revenue: if not provided, compute from price * quantity
-            revenue = float(sale.get("revenue") or sale.get("total") or 0)
-            if revenue == 0 and sale_price > 0:
-                revenue = sale_price * quantity
-
-            if not item_name:
-                continue
-
-            if item_name not in sales_by_item:
-                info = item_info.get(item_name, {})
-                # Prefer price/cost from menu_items, but use sale data as fallback
-                sales_by_item[item_name] = {
-                    "name": info.get("original_name", item_name),
-                    "units_sold": 0,
-                    "total_revenue": 0,
-                    "price": info.get("price", 0) or sale_price,
-                    "cost": info.get("cost", 0) or sale_cost,
-                    "category": info.get("category") or sale.get("categoria", ""),
-                    "_price_samples": [],
-                    "_cost_samples": [],
-                }
-
-            # Accumulate price/cost samples for averaging
-            if sale_price > 0:
-                sales_by_item[item_name]["_price_samples"].append(sale_price)
-            if sale_cost > 0:
-                sales_by_item[item_name]["_cost_samples"].append(sale_cost)
-
-            sales_by_item[item_name]["units_sold"] += quantity
-            sales_by_item[item_name]["total_revenue"] += revenue
-
-        # Calculate total units for popularity %
-        total_units = sum(item["units_sold"] for item in sales_by_item.values())
+        def per_item(values: np.ndarray, where: Optional[np.ndarray] = None) -> np.ndarray:
+            values = values[named]
+            if where is None:
+                return np.bincount(item_codes, weights=values, minlength=n_items)
+            return np.bincount(item_codes[where], weights=values[where], minlength=n_items)
 
+        units = per_item(rows.quantity).astype(np.int64)
+        total_units = int(units.sum())
         if total_units == 0:
-            return []
-
-        # Calculate metrics for each item
-        item_metrics = []
-
-        for item_key, data in sales_by_item.items():
-            units = data["units_sold"]
-
-            # Calculate average price from samples, or use stored price, or infer from revenue
-            price_samples = data.get("_price_samples", [])
-            cost_samples = data.get("_cost_samples", [])
+            return pd.DataFrame()
+
+        total_revenue = per_item(rows.revenue)
+        has_price = rows.price[named] > 0
+        has_cost = rows.cost[named] > 0
+        price_sum = per_item(rows.price, has_price)
+        price_count = np.bincount(item_codes[has_price], minlength=n_items)
+        cost_sum = per_item(rows.cost, has_cost)
+        cost_count = np.bincount(item_codes[has_cost], minlength=n_items)
+
+        # Price, cost and category of each item's first sale are fallbacks
+        # for what the menu does not provide
+        # (codes are numbered in order of first sale, so a new code is one
+        # above the running maximum)
+        seen = np.maximum.accumulate(item_codes)
+        first_sale = np.flatnonzero(np.diff(seen, prepend=-1) > 0)
+        first = np.flatnonzero(named)[first_sale]
+        first_categoria = (
+            [None if pd.isna(c) else c for c in rows.categoria[first]]
+            if rows.categoria is not None
+            else [""] * n_items
+        )
+        keys = rows.keys[item_ids]
+        infos = [item_info.get(key, {}) for key in keys]
+        stored_price = np.array(
+            [info.get("price", 0) or p for info, p in zip(infos, rows.price[first].tolist())],
+            dtype=np.float64,
+        )
+        stored_cost = np.array(
+            [info.get("cost", 0) or c for info, c in zip(infos, rows.cost[first].tolist())],
+            dtype=np.float64,
+        )
 
-            if price_samples:
-                price = sum(price_samples) / len(price_samples)
-            elif data["price"] > 0:
-                price = data["price"]
-            elif units > 0 and data["total_revenue"] > 0:
-                price = data["total_revenue"] / units
-            else:
-                price = 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Average price from samples, or stored price, or inferred from revenue
+            price = np.where(
+                price_count > 0,
+                price_sum / price_count,
+                np.where(
+                    stored_price > 0,
+                    stored_price,
+                    np.where(
+                        (units > 0) & (total_revenue > 0), total_revenue / units, 0.0
+                    ),
+                ),
+            )
 
-            # Calculate average cost from samples, or use stored cost
-            if cost_samples:
-                cost = sum(cost_samples) / len(cost_samples)
-            else:
-                cost = data["cost"]
+            # Average cost from samples, or stored cost
+            cost = np.where(cost_count > 0, cost_sum / cost_count, stored_cost)
 
             # Contribution Margin (CM) = Price - Cost
             cm_unitario = price - cost
@@ -474,59 +614,62 @@ class MenuEngineeringClassifier:
             total_contribution = cm_unitario * units
 
             # Margin percentage (professional metric)
-            margin_pct = (cm_unitario / price * 100) if price > 0 else 0
+            margin_pct = np.where(price > 0, cm_unitario / price * 100, 0.0)
 
             # Food Cost % (industry benchmark: 28-35%)
-            food_cost_pct = (cost / price * 100) if price > 0 else 0
-
-            # Food cost rating based on industry benchmarks
-            if food_cost_pct <= self.FOOD_COST_TARGET_LOW * 100:
-                food_cost_rating = "excellent"
-            elif food_cost_pct <= self.FOOD_COST_TARGET_MID * 100:
-                food_cost_rating = "good"
-            elif food_cost_pct <= self.FOOD_COST_TARGET_HIGH * 100:
-                food_cost_rating = "acceptable"
-            elif food_cost_pct <= self.FOOD_COST_CRITICAL * 100:
-                food_cost_rating = "high"
-            else:
-                food_cost_rating = "critical"
-
-            # Confidence score based on sample size
-            if units >= self.MIN_SALES_FOR_HIGH_CONFIDENCE:
-                confidence = "high"
-                confidence_score = 1.0
-            elif units >= self.MIN_SALES_FOR_CONFIDENCE:
-                confidence = "medium"
-                confidence_score = 0.7
-            else:
-                confidence = "low"
-                confidence_score = 0.4
+            food_cost_pct = np.where(price > 0, cost / price * 100, 0.0)
+
+        # Food cost rating based on industry benchmarks
+        food_cost_rating = np.select(
+            [
+                food_cost_pct <= self.FOOD_COST_TARGET_LOW * 100,
+                food_cost_pct <= self.FOOD_COST_TARGET_MID * 100,
+                food_cost_pct <= self.FOOD_COST_TARGET_HIGH * 100,
+                food_cost_pct <= self.FOOD_COST_CRITICAL * 100,
+            ],
+            ["excellent", "good", "acceptable", "high"],
+            "critical",
+        )
 
-            item_metrics.append(
-                {
-                    "name": data["name"],
-                    "category": data["category"],
-                    "units_sold": units,
-                    "price": round(price, 2),
-                    "cost": round(cost, 2),
-                    "cm_unitario": round(cm_unitario, 2),
-                    "popularity_pct": round(popularity_pct, 2),
-                    "total_contribution": round(total_contribution, 2),
-                    "margin_pct": round(margin_pct, 1),
-                    "total_revenue": round(data["total_revenue"], 2),
-                    # Professional metrics
-                    "food_cost_pct": round(food_cost_pct, 1),
-                    "food_cost_rating": food_cost_rating,
-                    "confidence": confidence,
-                    "confidence_score": confidence_score,
-                }
-            )
+        # Confidence score based on sample size
+        high_confidence = units >= self.MIN_SALES_FOR_HIGH_CONFIDENCE
+        medium_confidence = units >= self.MIN_SALES_FOR_CONFIDENCE
+        confidence = np.select(
+            [high_confidence, medium_confidence], ["high", "medium"], "low"
+        )
+        confidence_score = np.select(
+            [high_confidence, medium_confidence], [1.0, 0.7], 0.4
+        )
 
-        return item_metrics
+        return pd.DataFrame(
+            {
+                "name": [
+                    info.get("original_name", key) for info, key in zip(infos, keys)
+                ],
+                "category": pd.Series(
+                    [
+                        info.get("category") or categoria
+                        for info, categoria in zip(infos, first_categoria)
+                    ],
+                    dtype=object,
+                ),
+                "units_sold": units,
+                "price": _rounded(price, 2),
+                "cost": _rounded(cost, 2),
+                "cm_unitario": _rounded(cm_unitario, 2),
+                "popularity_pct": _rounded(popularity_pct, 2),
+                "total_contribution": _rounded(total_contribution, 2),
+                "margin_pct": _rounded(margin_pct, 1),
+                "total_revenue": _rounded(total_revenue, 2),
+                # Professional metrics
+                "food_cost_pct": _rounded(food_cost_pct, 1),
+                "food_cost_rating": food_cost_rating,
+                "confidence": confidence,
+                "confidence_score": confidence_score,
+            }
+        )
 
-    def _calculate_thresholds(
-        self, item_metrics: List[Dict[str, Any]]
-    ) -> Dict[str, Any]:
+    def _calculate_thresholds(self, item_metrics: pd.DataFrame) -> Dict[str, Any]:
         """Calculate classification thresholds."""
 
         n_items = len(item_metrics)
@@ -540,17 +683,14 @@ class MenuEngineeringClassifier:
         popularity_threshold = expected_popularity * self.POPULARITY_FACTOR
 
         # CM threshold = Average CM of all items (weighted by units)
-        total_units = sum(item["units_sold"] for item in item_metrics)
+        cm = item_metrics["cm_unitario"].to_numpy(dtype=np.float64)
+        units = item_metrics["units_sold"].to_numpy()
+        total_units = int(units.sum())
+        simple_avg_cm = _ordered_sum(cm) / n_items
         if total_units > 0:
-            weighted_cm = (
-                sum(item["cm_unitario"] * item["units_sold"] for item in item_metrics)
-                / total_units
-            )
+            weighted_cm = _ordered_sum(cm * units) / total_units
         else:
-            weighted_cm = sum(item["cm_unitario"] for item in item_metrics) / n_items
-
-        # Also calculate simple average CM for reference
-        simple_avg_cm = sum(item["cm_unitario"] for item in item_metrics) / n_items
+            weighted_cm = simple_avg_cm
 
         return {
             "popularity_threshold": round(popularity_threshold, 2),
@@ -563,55 +703,50 @@ class MenuEngineeringClassifier:
 
     def _classify_items(
         self,
-        item_metrics: List[Dict[str, Any]],
+        item_metrics: pd.DataFrame,
         thresholds: Dict[str, Any],
-    ) -> List[Dict[str, Any]]:
+    ) -> pd.DataFrame:
         """Classify each item into Menu Engineering quadrants."""
 
         pop_threshold = thresholds["popularity_threshold"]
         cm_threshold = thresholds["cm_threshold"]
 
-        classified = []
-
-        for item in item_metrics:
-            pop = item["popularity_pct"]
-            cm = item["cm_unitario"]
-
-            # Classification logic
-            high_popularity = pop >= pop_threshold
-            high_cm = cm >= cm_threshold
-
-            if high_popularity and high_cm:
-                category = MenuCategory.STAR
-                strategy = self._get_star_strategy(item)
-            elif high_popularity and not high_cm:
-                category = MenuCategory.PLOWHORSE
-                strategy = self._get_plowhorse_strategy(item, cm_threshold)
-            elif not high_popularity and high_cm:
-                category = MenuCategory.PUZZLE
-                strategy = self._get_puzzle_strategy(item)
-            else:
-                category = MenuCategory.DOG
-                strategy = self._get_dog_strategy(item)
+        # Classification logic
+        high_popularity = item_metrics["popularity_pct"].to_numpy() >= pop_threshold
+        high_cm = item_metrics["cm_unitario"].to_numpy() >= cm_threshold
+        categories = np.select(
+            [high_popularity & high_cm, high_popularity, high_cm],
+            [MenuCategory.STAR.value, MenuCategory.PLOWHORSE.value, MenuCategory.PUZZLE.value],
+            MenuCategory.DOG.value,
+        )
 
-            classified.append(
-                {
-                    **item,
-                    "product_category": item.get(
-                        "category", ""
-                    ),  # Preserve original (Vino, Cerveza, etc.)
-                    "category": category.value,  # BCG category (star, dog, etc.)
-                    "category_label": self._get_category_label(category),
-                    "high_popularity": high_popularity,
-                    "high_cm": high_cm,
-                    "strategy": strategy,
-                }
-            )
+        strategies = []
+        for item, category in zip(_records(item_metrics), categories):
+            if category == MenuCategory.STAR:
+                strategies.append(self._get_star_strategy(item))
+            elif category == MenuCategory.PLOWHORSE:
+                strategies.append(self._get_plowhorse_strategy(item, cm_threshold))
+            elif category == MenuCategory.PUZZLE:
+                strategies.append(self._get_puzzle_strategy(item))
+            else:
+                strategies.append(self._get_dog_strategy(item))
+
+        classified = item_metrics.copy()
+        # Preserve original (Vino, Cerveza, etc.)
+        classified["product_category"] = classified["category"]
+        classified["category"] = categories  # BCG category (star, dog, etc.)
+        classified["category_label"] = [
+            self._get_category_label(MenuCategory(c)) for c in categories
+        ]
+        classified["high_popularity"] = high_popularity
+        classified["high_cm"] = high_cm
+        classified["strategy"] = strategies
 
         # Sort by total contribution (most valuable first)
-        classified.sort(key=lambda x: x["total_contribution"], reverse=True)
-
-        return classified
+        order = np.argsort(
+            -classified["total_contribution"].to_numpy(), kind="stable"
+        )
+        return classified.iloc[order].reset_index(drop=True)
 
     def _get_category_label(self, category: MenuCategory) -> str:
         """Get display label for category."""
@@ -742,7 +877,7 @@ class MenuEngineeringClassifier:
 
     def _generate_summary(
         self,
-        classified_items: List[Dict[str, Any]],
+        classified_items: pd.DataFrame,
         thresholds: Dict[str, Any],
     ) -> Dict[str, Any]:
         """
@@ -755,37 +890,40 @@ class MenuEngineeringClassifier:
         - Top performers
         - Items needing attention
         """
+        categories = list(MenuCategory)
+        total_items = len(classified_items)
+
+        revenue = classified_items["total_revenue"].to_numpy(dtype=np.float64)
+        contribution = classified_items["total_contribution"].to_numpy(dtype=np.float64)
+        units = classified_items["units_sold"].to_numpy()
+        cost = classified_items["cost"].to_numpy(dtype=np.float64)
+        cat_codes = pd.Index([c.value for c in categories]).get_indexer(
+            classified_items["category"]
+        )
 
-        # Count by category
-        category_counts = {cat.value: 0 for cat in MenuCategory}
-        category_revenue = {cat.value: 0.0 for cat in MenuCategory}
-        category_contribution = {cat.value: 0.0 for cat in MenuCategory}
-        category_units = {cat.value: 0 for cat in MenuCategory}
-
-        total_revenue = 0.0
-        total_contribution = 0.0
-        total_units = 0
-        total_cost = 0.0
-
-        for item in classified_items:
-            cat = item["category"]
-            category_counts[cat] += 1
-            category_revenue[cat] += item["total_revenue"]
-            category_contribution[cat] += item["total_contribution"]
-            category_units[cat] += item["units_sold"]
-
-            total_revenue += item["total_revenue"]
-            total_contribution += item["total_contribution"]
-            total_units += item["units_sold"]
-            total_cost += item["cost"] * item["units_sold"]
+        # Totals by category
+        n_cats = len(categories)
+        category_counts = np.bincount(cat_codes, minlength=n_cats)
+        category_revenue = np.bincount(cat_codes, weights=revenue, minlength=n_cats)
+        category_contribution = np.bincount(
+            cat_codes, weights=contribution, minlength=n_cats
+        )
+        category_units = np.bincount(cat_codes, weights=units, minlength=n_cats).astype(
+            np.int64
+        )
+
+        total_revenue = _ordered_sum(revenue)
+        total_contribution = _ordered_sum(contribution)
+        total_units = int(units.sum())
+        total_cost = _ordered_sum(cost * units)
 
         # Calculate percentages
         categories_summary = []
-        for cat in MenuCategory:
-            count = category_counts[cat.value]
-            revenue = category_revenue[cat.value]
-            contribution = category_contribution[cat.value]
-            units = category_units[cat.value]
+        for i, cat in enumerate(categories):
+            count = int(category_counts[i])
+            cat_revenue = float(category_revenue[i])
+            cat_contribution = float(category_contribution[i])
+            cat_units = int(category_units[i])
 
             categories_summary.append(
                 {
@@ -793,54 +931,51 @@ class MenuEngineeringClassifier:
                     "label": self._get_category_label(cat),
                     "count": count,
                     "pct_items": (
-                        round(count / len(classified_items) * 100, 1)
-                        if classified_items
-                        else 0
+                        round(count / total_items * 100, 1) if total_items else 0
                     ),
-                    "total_revenue": round(revenue, 2),
+                    "total_revenue": round(cat_revenue, 2),
                     "pct_revenue": (
-                        round(revenue / total_revenue * 100, 1)
+                        round(cat_revenue / total_revenue * 100, 1)
                         if total_revenue > 0
                         else 0
                     ),
-                    "total_contribution": round(contribution, 2),
+                    "total_contribution": round(cat_contribution, 2),
                     "pct_contribution": (
-                        round(contribution / total_contribution * 100, 1)
+                        round(cat_contribution / total_contribution * 100, 1)
                         if total_contribution > 0
                         else 0
                     ),
-                    "units_sold": units,
+                    "units_sold": cat_units,
                     "pct_units": (
-                        round(units / total_units * 100, 1) if total_units > 0 else 0
+                        round(cat_units / total_units * 100, 1)
+                        if total_units > 0
+                        else 0
                     ),
                 }
             )
 
         # Top performers
-        top_by_contribution = sorted(
-            classified_items, key=lambda x: x["total_contribution"], reverse=True
-        )[:5]
-
-        top_by_popularity = sorted(
-            classified_items, key=lambda x: x["popularity_pct"], reverse=True
-        )[:5]
+        names = classified_items["name"].to_numpy(dtype=object)
+        popularity = classified_items["popularity_pct"].to_numpy(dtype=np.float64)
+        top_by_contribution = np.argsort(-contribution, kind="stable")[:5]
+        top_by_popularity = np.argsort(-popularity, kind="stable")[:5]
 
         # Items needing attention (Dogs)
-        dogs = [
-            item
-            for item in classified_items
-            if item["category"] == MenuCategory.DOG.value
-        ]
+        dogs = names[classified_items["category"].to_numpy() == MenuCategory.DOG.value]
 
         # Calculate portfolio health score (0-1 scale)
         # Based on BCG distribution: Stars and Plowhorses are good, Dogs are bad
         # Puzzles are neutral (potential)
-        star_count = category_counts[MenuCategory.STAR.value]
-        plowhorse_count = category_counts[MenuCategory.PLOWHORSE.value]
-        puzzle_count = category_counts[MenuCategory.PUZZLE.value]
-        dog_count = category_counts[MenuCategory.DOG.value]
+        star_count, plowhorse_count, puzzle_count, dog_count = (
+            int(category_counts[categories.index(cat)])
+            for cat in (
+                MenuCategory.STAR,
+                MenuCategory.PLOWHORSE,
+                MenuCategory.PUZZLE,
+                MenuCategory.DOG,
+            )
+        )
 
-        total_items = len(classified_items)
         if total_items > 0:
             # Weighted score: Stars (1.0), Plowhorses (0.8), Puzzles (0.5), Dogs (0.0)
             portfolio_health_score = (
@@ -860,7 +995,7 @@ class MenuEngineeringClassifier:
         food_cost_pct = (total_cost / total_revenue * 100) if total_revenue > 0 else 0
 
         return {
-            "total_items": len(classified_items),
+            "total_items": total_items,
             "total_revenue": round(total_revenue, 2),
             "total_contribution": round(total_contribution, 2),
             "total_cost": round(total_cost, 2),
@@ -882,15 +1017,15 @@ class MenuEngineeringClassifier:
             },
             "categories": categories_summary,
             "top_by_contribution": [
-                {"name": item["name"], "contribution": item["total_contribution"]}
-                for item in top_by_contribution
+                {"name": names[i], "contribution": float(contribution[i])}
+                for i in top_by_contribution
             ],
             "top_by_popularity": [
-                {"name": item["name"], "popularity_pct": item["popularity_pct"]}
-                for item in top_by_popularity
+                {"name": names[i], "popularity_pct": float(popularity[i])}
+                for i in top_by_popularity
             ],
             "attention_needed": len(dogs),
-            "dogs_list": [item["name"] for item in dogs],
+            "dogs_list": dogs.tolist(),
         }
 
     def _empty_result(
@@ -920,7 +1055,7 @@ class MenuEngineeringClassifier:
         }
 
     def _analyze_by_product_category(
-        self, classified_items: List[Dict[str, Any]]
+        self, classified_items: pd.DataFrame
     ) -> Dict[str, Any]:
         """
         Analyze items grouped by product category (Drinks, Food, etc.).
@@ -929,49 +1064,60 @@ class MenuEngineeringClassifier:
         more refined decisions since different categories have different
         cost structures and margin expectations.
         """
-        if not classified_items:
+        if classified_items.empty:
             return {"categories": [], "insights": []}
 
         # Group by product category (Wine, Beer, Cocktails, etc.)
-        by_product_cat: Dict[str, List[Dict[str, Any]]] = {}
-        for item in classified_items:
-            prod_cat = item.get("product_category", "Uncategorized") or "Uncategorized"
-            if prod_cat not in by_product_cat:
-                by_product_cat[prod_cat] = []
-            by_product_cat[prod_cat].append(item)
-
-        # Analyze each product category
+        product_categories = [
+            c or "Uncategorized" for c in classified_items["product_category"].tolist()
+        ]
+        group_codes, group_names = pd.factorize(pd.Series(product_categories, dtype=object))
+        n_groups = len(group_names)
+
+        def per_group(column: str) -> np.ndarray:
+            values = classified_items[column].to_numpy(dtype=np.float64)
+            return np.bincount(group_codes, weights=values, minlength=n_groups)
+
+        item_counts = np.bincount(group_codes, minlength=n_groups)
+        revenue = per_group("total_revenue")
+        contribution = per_group("total_contribution")
+        units = per_group("units_sold").astype(np.int64)
+        price = per_group("price")
+        cost = per_group("cost")
+        margin = per_group("margin_pct")
+        food_cost = per_group("food_cost_pct")
+
+        # BCG distribution within each category
+        bcg_labels = [c.value for c in MenuCategory]
+        bcg_codes = pd.Index(bcg_labels).get_indexer(classified_items["category"])
+        bcg_counts = np.zeros((n_groups, len(bcg_labels)), dtype=np.int64)
+        np.add.at(bcg_counts, (group_codes, bcg_codes), 1)
+
+        # Items are sorted by contribution, so each group's first item is its top item
+        names = classified_items["name"].to_numpy(dtype=object)
+        top_items = names[np.unique(group_codes, return_index=True)[1]]
+
+        # Analyze each product category, largest first
         category_analysis = []
         insights = []
 
-        for cat_name, items in sorted(by_product_cat.items(), key=lambda x: -len(x[1])):
-            total_revenue = sum(i["total_revenue"] for i in items)
-            total_contribution = sum(i["total_contribution"] for i in items)
-            total_units = sum(i["units_sold"] for i in items)
+        for g in np.argsort(-item_counts, kind="stable"):
+            cat_name = group_names[g]
+            n_items = int(item_counts[g])
 
             # Average metrics
-            avg_price = sum(i["price"] for i in items) / len(items) if items else 0
-            avg_cost = sum(i["cost"] for i in items) / len(items) if items else 0
-            avg_margin = (
-                sum(i["margin_pct"] for i in items) / len(items) if items else 0
-            )
-            avg_food_cost = (
-                sum(i.get("food_cost_pct", 0) for i in items) / len(items)
-                if items
-                else 0
-            )
+            avg_price = price[g] / n_items
+            avg_cost = cost[g] / n_items
+            avg_margin = margin[g] / n_items
+            avg_food_cost = food_cost[g] / n_items
 
-            # BCG distribution within category
             bcg_dist = {
-                "star": len([i for i in items if i["category"] == "star"]),
-                "plowhorse": len([i for i in items if i["category"] == "plowhorse"]),
-                "puzzle": len([i for i in items if i["category"] == "puzzle"]),
-                "dog": len([i for i in items if i["category"] == "dog"]),
+                label: int(count) for label, count in zip(bcg_labels, bcg_counts[g])
             }
 
             # Determine category health
-            star_pct = bcg_dist["star"] / len(items) * 100 if items else 0
-            dog_pct = bcg_dist["dog"] / len(items) * 100 if items else 0
+            star_pct = bcg_dist["star"] / n_items * 100
+            dog_pct = bcg_dist["dog"] / n_items * 100
 
             if star_pct >= 20 and dog_pct <= 30:
                 health = "healthy"
@@ -986,22 +1132,18 @@ class MenuEngineeringClassifier:
             category_analysis.append(
                 {
                     "category_name": cat_name,
-                    "item_count": len(items),
-                    "total_revenue": round(total_revenue, 2),
-                    "total_contribution": round(total_contribution, 2),
-                    "total_units": total_units,
-                    "avg_price": round(avg_price, 2),
-                    "avg_cost": round(avg_cost, 2),
-                    "avg_margin_pct": round(avg_margin, 1),
-                    "avg_food_cost_pct": round(avg_food_cost, 1),
+                    "item_count": n_items,
+                    "total_revenue": round(float(revenue[g]), 2),
+                    "total_contribution": round(float(contribution[g]), 2),
+                    "total_units": int(units[g]),
+                    "avg_price": round(float(avg_price), 2),
+                    "avg_cost": round(float(avg_cost), 2),
+                    "avg_margin_pct": round(float(avg_margin), 1),
+                    "avg_food_cost_pct": round(float(avg_food_cost), 1),
                     "bcg_distribution": bcg_dist,
                     "health": health,
                     "health_emoji": health_emoji,
-                    "top_item": (
-                        max(items, key=lambda x: x["total_contribution"])["name"]
-                        if items
-                        else None
-                    ),
+                    "top_item": top_items[g],
                 }
             )
 
@@ -0,0 +1,356 @@
+"""
+Local menu extraction from competitor web pages.
+
+Sending raw HTML to Gemini wastes most of the prompt on scripts, styles and
+navigation, and long pages get cut off before the menu. Pages are parsed
+locally first:
+- schema.org ``Menu`` / ``MenuSection`` / ``MenuItem`` data, from JSON-LD
+  blocks and microdata attributes
+- Readable text with boilerplate (scripts, styles, navigation, footers)
+  stripped
+- Lines carrying prices, with the lines around them, as the residual
+  menu-bearing text
+
+When the structured data already lists the menu, no LLM call is needed;
+otherwise only the residual text is sent.
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional
+
+# Structured items needed to skip the LLM
+MIN_STRUCTURED_ITEMS = 3
+
+# Upper bound on the text sent to the LLM
+MAX_LLM_TEXT_CHARS = 15000
+
+# Lines kept before and after each price line
+_CONTEXT_BEFORE = 2
+_CONTEXT_AFTER = 1
+
+_SKIP_TAGS = {
+    "script", "style", "noscript", "template", "svg", "head",
+    "nav", "header", "footer", "form", "iframe", "button", "select",
+}
+_BLOCK_TAGS = {
+    "p", "div", "li", "tr", "td", "th", "br", "section", "article", "ul",
+    "ol", "table", "dd", "dt", "h1", "h2", "h3", "h4", "h5", "h6", "span",
+}
+_VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "source", "track", "wbr",
+}
+_RESTAURANT_TYPES = {
+    "Restaurant", "FoodEstablishment", "CafeOrCoffeeShop", "BarOrPub",
+    "FastFoodRestaurant", "Bakery", "IceCreamShop", "Winery", "Brewery",
+}
+_CURRENCY_SYMBOLS = {"$": "MXN", "€": "EUR", "£": "GBP"}
+
+PRICE_PATTERN = re.compile(
+    r"[$€£]\s?\d{1,6}(?:[.,]\d{3})*(?:[.,]\d{1,2})?"
+    r"|\b\d{1,6}(?:[.,]\d{1,2})?\s?(?:MXN|USD|EUR|pesos)\b"
+    r"|\.{3,}\s*\d{1,6}(?:[.,]\d{1,2})?\s*$"
+    r"|\b\d{1,5}[.,]\d{2}\s*$",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class PageMenu:
+    """What could be read from a page without the LLM."""
+
+    restaurant_name: Optional[str] = None
+    items: List[Dict[str, Any]] = field(default_factory=list)
+    currency: Optional[str] = None
+    text: str = ""  # Readable page text
+    menu_text: str = ""  # Price lines with their neighbours
+
+    @property
+    def has_structured_menu(self) -> bool:
+        return len(self.items) >= MIN_STRUCTURED_ITEMS
+
+    @property
+    def categories(self) -> List[str]:
+        return list(dict.fromkeys(i["category"] for i in self.items if i.get("category")))
+
+    def llm_text(self) -> str:
+        """Text to send to the LLM: the menu-bearing lines, or the page text."""
+        return (self.menu_text or self.text)[:MAX_LLM_TEXT_CHARS]
+
+
+class _PageParser(HTMLParser):
+    """Collects JSON-LD blocks, microdata scopes and readable text."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.json_ld: List[str] = []
+        self.scopes: List[Dict[str, Any]] = []  # Top-level microdata items
+        self.title = ""
+        self._lines: List[str] = []
+        self._line: List[str] = []
+        self._stack: List[Dict[str, Any]] = []
+        self._skip = 0
+        self._json_ld_buffer: Optional[List[str]] = None
+        self._in_title = False
+
+    # Readable text
+
+    def text(self) -> str:
+        self._break()
+        return "\n".join(self._lines)
+
+    def _break(self):
+        line = " ".join("".join(self._line).split())
+        if line:
+            self._lines.append(line)
+        self._line = []
+
+    # Parser callbacks
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "script" and (attrs.get("type") or "").lower() == "application/ld+json":
+            self._json_ld_buffer = []
+        if tag == "title":
+            self._in_title = True
+        if tag in _BLOCK_TAGS:
+            self._break()
+
+        itemprop = attrs.get("itemprop")
+        scope = None
+        if "itemscope" in attrs:
+            itemtype = (attrs.get("itemtype") or "").rstrip("/")
+            scope = {"@type": itemtype.rsplit("/", 1)[-1]} if itemtype else {}
+            if not itemprop and not self._current_scope():
+                self.scopes.append(scope)
+        elif itemprop:
+            value = attrs.get("content") or attrs.get("href") or attrs.get("src")
+            if value is not None or tag in _VOID_TAGS:
+                self._assign(itemprop, value or "")
+                itemprop = None
+
+        if tag in _VOID_TAGS:
+            return
+        self._stack.append(
+            {
+                "tag": tag,
+                "itemprop": itemprop,
+                "scope": scope,
+                "text": [] if itemprop and scope is None else None,
+                "skip": tag in _SKIP_TAGS,
+            }
+        )
+        if tag in _SKIP_TAGS:
+            self._skip += 1
+
+    def handle_endtag(self, tag):
+        if tag == "script" and self._json_ld_buffer is not None:
+            self.json_ld.append("".join(self._json_ld_buffer))
+            self._json_ld_buffer = None
+        if tag == "title":
+            self._in_title = False
+        if tag in _BLOCK_TAGS:
+            self._break()
+        if not any(entry["tag"] == tag for entry in self._stack):
+            return
+        while self._stack:
+            entry = self._stack.pop()
+            if entry["skip"]:
+                self._skip -= 1
+            if entry["itemprop"]:
+                if entry["scope"] is not None:
+                    self._assign(entry["itemprop"], entry["scope"])
+                else:
+                    self._assign(entry["itemprop"], " ".join("".join(entry["text"]).split()))
+            if entry["tag"] == tag:
+                break
+
+    def handle_data(self, data):
+        if self._json_ld_buffer is not None:
+            self._json_ld_buffer.append(data)
+            return
+        if self._in_title:
+            self.title += data
+        for entry in self._stack:
+            if entry["text"] is not None:
+                entry["text"].append(data)
+        if not self._skip:
+            self._line.append(data)
+
+    # Microdata
+
+    def _current_scope(self) -> Optional[Dict[str, Any]]:
+        for entry in reversed(self._stack):
+            if entry["scope"] is not None:
+                return entry["scope"]
+        return None
+
+    def _assign(self, prop: str, value: Any):
+        scope = self._current_scope()
+        if scope is None:
+            return
+        for name in prop.split():
+            if name in scope:
+                existing = scope[name]
+                scope[name] = existing + [value] if isinstance(existing, list) else [existing, value]
+            else:
+                scope[name] = value
+
+
+def parse_price(value: Any) -> Optional[float]:
+    """Price as a float from a number or a string like "$1,250.00" or "85,50"."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    number = re.sub(r"[^\d.,]", "", value)
+    if not re.search(r"\d", number):
+        return None
+    if "," in number and "." in number:
+        # The separator that comes last is the decimal one
+        thousands = "," if number.rfind(",") < number.rfind(".") else "."
+        number = number.replace(thousands, "")
+    if "," in number:
+        head, _, tail = number.rpartition(",")
+        number = f"{head.replace(',', '')}.{tail}" if len(tail) <= 2 else number.replace(",", "")
+    if number.count(".") > 1:
+        head, _, tail = number.rpartition(".")
+        number = head.replace(".", "") + ("." + tail if len(tail) <= 2 else tail)
+    try:
+        return float(number)
+    except ValueError:
+        return None
+
+
+def _types(node: Dict[str, Any]) -> List[str]:
+    types = node.get("@type") or []
+    if isinstance(types, str):
+        types = [types]
+    return [str(t).rsplit("/", 1)[-1] for t in types]
+
+
+def _first(value: Any) -> Any:
+    return value[0] if isinstance(value, list) and value else value
+
+
+def _text(value: Any) -> str:
+    value = _first(value)
+    if isinstance(value, dict):
+        value = value.get("name") or value.get("@value") or ""
+    return " ".join(str(value or "").split())
+
+
+def _offer(node: Dict[str, Any]) -> Dict[str, Any]:
+    offers = node.get("offers")
+    for offer in offers if isinstance(offers, list) else [offers]:
+        if isinstance(offer, dict):
+            price = offer.get("price", offer.get("lowPrice"))
+            if price is not None:
+                return {"price": price, "currency": offer.get("priceCurrency")}
+    return {"price": node.get("price"), "currency": node.get("priceCurrency")}
+
+
+class _Collector:
+    """Walks schema.org nodes collecting menu items and the restaurant."""
+
+    def __init__(self):
+        self.items: List[Dict[str, Any]] = []
+        self.restaurant_name: Optional[str] = None
+        self.currencies: List[str] = []
+        self._seen = set()
+
+    def walk(self, node: Any, category: Optional[str] = None, depth: int = 0):
+        if depth > 12:
+            return
+        if isinstance(node, list):
+            for child in node:
+                self.walk(child, category, depth + 1)
+            return
+        if not isinstance(node, dict):
+            return
+
+        types = set(_types(node))
+        if types & _RESTAURANT_TYPES and not self.restaurant_name:
+            self.restaurant_name = _text(node.get("name")) or None
+
+        if "MenuItem" in types:
+            self._add_item(node, category)
+            return
+        if "MenuSection" in types:
+            category = _text(node.get("name")) or category
+
+        for key, value in node.items():
+            if isinstance(value, (dict, list)) and key not in ("offers", "@context"):
+                self.walk(value, category, depth + 1)
+
+    def _add_item(self, node: Dict[str, Any], category: Optional[str]):
+        name = _text(node.get("name"))
+        if not name:
+            return
+        offer = _offer(node)
+        price = parse_price(_first(offer["price"]))
+        if offer["currency"]:
+            self.currencies.append(_text(offer["currency"]).upper())
+        key = (name.lower(), price)
+        if key in self._seen:
+            return
+        self._seen.add(key)
+        self.items.append(
+            {
+                "name": name,
+                "price": price,
+                "category": category or "",
+                "description": _text(node.get("description")),
+            }
+        )
+
+
+def _menu_text(lines: List[str]) -> str:
+    """Price lines together with the lines just before and after them."""
+    keep = set()
+    for i, line in enumerate(lines):
+        if PRICE_PATTERN.search(line):
+            keep.update(range(max(0, i - _CONTEXT_BEFORE), min(len(lines), i + _CONTEXT_AFTER + 1)))
+    return "\n".join(lines[i] for i in sorted(keep))
+
+
+def _detect_currency(text: str) -> Optional[str]:
+    match = re.search(r"\b(MXN|USD|EUR|GBP)\b", text)
+    if match:
+        return match.group(1).upper()
+    for symbol, currency in _CURRENCY_SYMBOLS.items():
+        if symbol in text:
+            return currency
+    return None
+
+
+def extract_page_menu(html: str) -> PageMenu:
+    """Read menu data and menu-bearing text out of a page's HTML."""
+    parser = _PageParser()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:
+        # Malformed markup: keep whatever was read before the error
+        pass
+
+    collector = _Collector()
+    for block in parser.json_ld:
+        try:
+            collector.walk(json.loads(block.strip()))
+        except ValueError:
+            continue
+    collector.walk(parser.scopes)
+
+    text = parser.text()
+    menu_text = _menu_text(text.splitlines())
+    return PageMenu(
+        restaurant_name=collector.restaurant_name or (" ".join(parser.title.split()) or None),
+        items=collector.items,
+        currency=collector.currencies[0] if collector.currencies else _detect_currency(menu_text),
+        text=text,
+        menu_text=menu_text,
+    )
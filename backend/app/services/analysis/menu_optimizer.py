@@ -9,12 +9,24 @@ from datetime import datetime, timezone
 from enum import Enum
 from typing import Any, Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 from app.core.config import get_settings
+from app.services.analysis.name_matching import match_menu_to_sales
 
 logger = logging.getLogger(__name__)
 
 
+def _rounded(values: pd.Series, digits: int) -> List[float]:
+    # Python's round(), not np.round, so values match per-item rounding
+    return [round(value, digits) for value in values.tolist()]
+
+
+def _has_suggestion(plan: pd.DataFrame) -> pd.Series:
+    # Truthiness of each suggested price: None and 0 are no suggestion
+    return plan["suggested_price"].map(bool)
+
+
 class OptimizationAction(str, Enum):
     """Recommended actions for menu items."""
 
@@ -112,6 +124,7 @@ class MenuOptimizer:
         session_id: str,
         column_mapping: Optional[Dict] = None,
         bcg_results: Optional[Dict] = None,
+        name_matches: Optional[Dict] = None,
     ) -> MenuOptimizationReport:
         """
         Analyze menu for optimization opportunities.
@@ -122,6 +135,8 @@ class MenuOptimizer:
             session_id: Current session ID
             column_mapping: Mapping of column names
             bcg_results: Optional BCG classification results
+            name_matches: Optional session table of menu -> sales name
+                matches (see ``match_menu_to_sales``)
         """
         logger.info(f"Starting menu optimization for session {session_id}")
 
@@ -141,14 +156,17 @@ class MenuOptimizer:
         item_metrics = self._calculate_item_metrics(sales_df, column_mapping)
 
         # Merge with menu items for additional info
-        item_metrics = self._merge_with_menu(item_metrics, menu_items)
+        item_metrics = self._merge_with_menu(item_metrics, menu_items, name_matches)
 
         # Add BCG categories if available
         if bcg_results:
             item_metrics = self._add_bcg_categories(item_metrics, bcg_results)
 
-        # Generate item optimizations
-        item_optimizations = self._generate_item_optimizations(item_metrics)
+        # Generate item optimizations (one row per item, in report order)
+        plan = self._plan_item_optimizations(item_metrics)
+        item_optimizations = [
+            ItemOptimization(**record) for record in plan.to_dict("records")
+        ]
 
         # Generate category summaries
         category_summaries = self._generate_category_summaries(
@@ -156,56 +174,50 @@ class MenuOptimizer:
         )
 
         # Identify quick wins
-        quick_wins = self._identify_quick_wins(item_optimizations)
+        quick_wins = self._identify_quick_wins(plan)
 
         # Calculate opportunity metrics
-        revenue_opp = self._calculate_revenue_opportunity(item_optimizations)
-        margin_opp = self._calculate_margin_opportunity(item_optimizations)
+        revenue_opp = self._calculate_revenue_opportunity(plan)
+        margin_opp = self._calculate_margin_opportunity(plan)
 
         # Generate AI insights
-        insights = await self._generate_ai_insights(
-            item_optimizations, category_summaries
-        )
+        insights = await self._generate_ai_insights(plan, category_summaries)
 
         # Categorize items by action
-        items_to_promote = [
-            o.item_name
-            for o in item_optimizations
-            if o.action == OptimizationAction.PROMOTE
-        ]
-        items_to_review = [
-            o.item_name
-            for o in item_optimizations
-            if o.action in [OptimizationAction.REPOSITION, OptimizationAction.BUNDLE]
-        ]
-        items_to_remove = [
-            o.item_name
-            for o in item_optimizations
-            if o.action == OptimizationAction.REMOVE
-        ]
+        items_to_promote = plan.loc[
+            plan["action"] == OptimizationAction.PROMOTE, "item_name"
+        ].tolist()
+        items_to_review = plan.loc[
+            plan["action"].isin(
+                [OptimizationAction.REPOSITION, OptimizationAction.BUNDLE]
+            ),
+            "item_name",
+        ].tolist()
+        items_to_remove = plan.loc[
+            plan["action"] == OptimizationAction.REMOVE, "item_name"
+        ].tolist()
 
         # Get price adjustments
+        adjusted = plan[
+            _has_suggestion(plan)
+            & (plan["suggested_price"] != plan["current_price"])
+        ]
         price_adjustments = [
             {
-                "item": o.item_name,
-                "current": o.current_price,
-                "suggested": o.suggested_price,
-                "change_pct": (
-                    round(
-                        (o.suggested_price - o.current_price) / o.current_price * 100, 1
-                    )
-                    if o.suggested_price
-                    else 0
-                ),
+                "item": item,
+                "current": current,
+                "suggested": suggested,
+                "change_pct": round((suggested - current) / current * 100, 1),
             }
-            for o in item_optimizations
-            if o.suggested_price and o.suggested_price != o.current_price
+            for item, current, suggested in zip(
+                adjusted["item_name"].tolist(),
+                adjusted["current_price"].tolist(),
+                adjusted["suggested_price"].tolist(),
+            )
         ]
 
         # Generate thought process
-        thought_process = self._generate_thought_process(
-            item_metrics, item_optimizations
-        )
+        thought_process = self._generate_thought_process(item_metrics, plan)
 
         return MenuOptimizationReport(
             session_id=session_id,
@@ -230,12 +242,17 @@ class MenuOptimizer:
         rev_col = col_map.get("revenue", "revenue")
         cost_col = col_map.get("cost")
 
-        # Group by item
-        metrics = (
-            df.groupby(item_col).agg({qty_col: "sum", rev_col: "sum"}).reset_index()
-        )
+        has_cost = bool(cost_col) and cost_col in df.columns
 
-        metrics.columns = ["item_name", "total_quantity", "total_revenue"]
+        # Group by item (quantity, revenue and cost in one pass)
+        sums = {qty_col: "sum", rev_col: "sum"}
+        if has_cost:
+            sums[cost_col] = "sum"
+        metrics = df.groupby(item_col).agg(sums).reset_index()
+
+        metrics.columns = ["item_name", "total_quantity", "total_revenue"] + (
+            ["total_cost"] if has_cost else []
+        )
 
         # Calculate average price
         metrics["avg_price"] = metrics["total_revenue"] / metrics["total_quantity"]
@@ -248,10 +265,7 @@ class MenuOptimizer:
         metrics["revenue_contribution"] = metrics["total_revenue"] / total_rev
 
         # Calculate margin if cost data available
-        if cost_col and cost_col in df.columns:
-            cost_agg = df.groupby(item_col)[cost_col].sum().reset_index()
-            cost_agg.columns = ["item_name", "total_cost"]
-            metrics = metrics.merge(cost_agg, on="item_name", how="left")
+        if has_cost:
             metrics["margin"] = (
                 metrics["total_revenue"] - metrics["total_cost"]
             ) / metrics["total_revenue"]
@@ -271,9 +285,12 @@ class MenuOptimizer:
         return metrics
 
     def _merge_with_menu(
-        self, metrics: pd.DataFrame, menu_items: List[Dict]
+        self,
+        metrics: pd.DataFrame,
+        menu_items: List[Dict],
+        name_matches: Optional[Dict] = None,
     ) -> pd.DataFrame:
-        """Merge metrics with menu item information."""
+        """Merge metrics with menu item information, joined on matched names."""
         if not menu_items:
             return metrics
 
@@ -294,6 +311,15 @@ class MenuOptimizer:
                 keep_cols.append("description")
 
             menu_df = menu_df[keep_cols]
+            sales_names = [
+                str(name) for name in metrics["item_name"].dropna().unique() if name
+            ]
+            matches = match_menu_to_sales(
+                menu_df["item_name"].dropna().astype(str), sales_names, name_matches
+            )
+            menu_df = menu_df.assign(
+                item_name=[matches.get(name) or name for name in menu_df["item_name"]]
+            ).drop_duplicates("item_name")
             metrics = metrics.merge(menu_df, on="item_name", how="left")
 
         return metrics
@@ -313,136 +339,171 @@ class MenuOptimizer:
 
         return metrics
 
-    def _generate_item_optimizations(
-        self, metrics: pd.DataFrame
-    ) -> List[ItemOptimization]:
-        """Generate optimization recommendations for each item."""
-        optimizations = []
-
+    def _plan_item_optimizations(self, metrics: pd.DataFrame) -> pd.DataFrame:
+        """
+        Optimization recommendations for all items as a frame with the
+        ItemOptimization fields, sorted by priority and combined score.
+        """
         # Calculate thresholds
         rotation_high = metrics["rotation_score"].quantile(0.75)
         rotation_low = metrics["rotation_score"].quantile(0.25)
 
-        for _, row in metrics.iterrows():
-            action, priority, reasoning, expected_impact, suggested_price = (
-                self._determine_action(row, rotation_high, rotation_low)
-            )
+        actions = self._determine_actions(metrics, rotation_high, rotation_low)
+        current_price = (
+            metrics["price"] if "price" in metrics.columns else metrics["avg_price"]
+        )
+        bcg_category = (
+            metrics["bcg_category"].tolist()
+            if "bcg_category" in metrics.columns
+            else None
+        )
 
-            opt = ItemOptimization(
-                item_name=row["item_name"],
-                current_price=round(row.get("price", row["avg_price"]), 2),
-                suggested_price=suggested_price,
-                current_margin=(
-                    round(row.get("margin", 0.6), 2) if "margin" in row else None
+        plan = pd.DataFrame(
+            {
+                "item_name": metrics["item_name"].tolist(),
+                "current_price": _rounded(current_price, 2),
+                "suggested_price": pd.Series(
+                    actions["suggested_price"], index=metrics.index, dtype=object
                 ),
-                suggested_margin=None,
-                action=action,
-                priority=priority,
-                reasoning=reasoning,
-                expected_impact=expected_impact,
-                rotation_score=round(row["rotation_score"], 2),
-                margin_score=round(row.get("margin_score", 0.5), 2),
-                combined_score=round(row["combined_score"], 2),
-                bcg_category=row.get("bcg_category"),
-            )
-            optimizations.append(opt)
+                "current_margin": _rounded(metrics["margin"], 2),
+                "suggested_margin": None,
+                # Object columns keep the enum members (not plain strings)
+                "action": pd.Series(actions["action"], index=metrics.index, dtype=object),
+                "priority": pd.Series(
+                    actions["priority"], index=metrics.index, dtype=object
+                ),
+                "reasoning": actions["reasoning"],
+                "expected_impact": actions["expected_impact"],
+                "rotation_score": _rounded(metrics["rotation_score"], 2),
+                "margin_score": _rounded(metrics["margin_score"], 2),
+                "combined_score": _rounded(metrics["combined_score"], 2),
+                "bcg_category": bcg_category,
+            },
+            index=metrics.index,
+        )
 
-        # Sort by priority and combined score
+        # Sort by priority and combined score (stable, like list.sort)
         priority_order = {
             PriorityLevel.CRITICAL: 0,
             PriorityLevel.HIGH: 1,
             PriorityLevel.MEDIUM: 2,
             PriorityLevel.LOW: 3,
         }
-        optimizations.sort(
-            key=lambda x: (priority_order[x.priority], -x.combined_score)
+        order = np.lexsort(
+            (
+                -plan["combined_score"].to_numpy(dtype=float),
+                plan["priority"].map(priority_order).to_numpy(),
+            )
         )
+        return plan.iloc[order].reset_index(drop=True)
 
-        return optimizations
+    def _determine_actions(
+        self, metrics: pd.DataFrame, rotation_high: float, rotation_low: float
+    ) -> Dict[str, list]:
+        """
+        Determine the optimization action of every item.
 
-    def _determine_action(
-        self, row: pd.Series, rotation_high: float, rotation_low: float
-    ) -> tuple:
-        """Determine optimization action based on metrics."""
-        rotation = row["rotation_score"]
-        margin = row.get("margin", 0.6)
-        margin_score = row.get("margin_score", 0.5)
-        current_price = row.get("price", row["avg_price"])
+        Rules are masks over the metrics, checked in order; the first rule
+        an item matches decides its action.
+        """
+        rotation = metrics["rotation_score"]
+        margin = metrics["margin"]
+        margin_score = metrics["margin_score"]
+        current_price = (
+            metrics["price"] if "price" in metrics.columns else metrics["avg_price"]
+        )
         # bcg_category available but not used in this method
 
-        suggested_price = None
+        high_margin = margin > self.HIGH_MARGIN_THRESHOLD
+        low_margin = margin < self.LOW_MARGIN_THRESHOLD
+        high_rotation = rotation > rotation_high
+        low_rotation = rotation < rotation_low
 
-        # High margin, high rotation = STAR - maintain or slight price increase
-        if margin > self.HIGH_MARGIN_THRESHOLD and rotation > rotation_high:
-            suggested_price = round(current_price * 1.05, 2)  # 5% increase
-            return (
+        # (mask, action, priority, reasoning, expected impact, price factor)
+        rules = [
+            # High margin, high rotation = STAR - maintain or slight price increase
+            (
+                high_margin & high_rotation,
                 OptimizationAction.INCREASE_PRICE,
                 PriorityLevel.MEDIUM,
-                f"Star performer with {margin:.0%} margin and high rotation. Price increase potential.",
+                "Star performer with {margin:.0%} margin and high rotation. Price increase potential.",
                 "Expected 3-5% revenue increase with minimal volume impact",
-                suggested_price,
-            )
-
-        # High margin, low rotation = premium item underperforming
-        if margin > self.HIGH_MARGIN_THRESHOLD and rotation < rotation_low:
-            return (
+                1.05,  # 5% increase
+            ),
+            # High margin, low rotation = premium item underperforming
+            (
+                high_margin & low_rotation,
                 OptimizationAction.PROMOTE,
                 PriorityLevel.HIGH,
-                f"High margin item ({margin:.0%}) with low visibility. Marketing opportunity.",
+                "High margin item ({margin:.0%}) with low visibility. Marketing opportunity.",
                 "Promotion could increase volume 20-30% without margin sacrifice",
                 None,
-            )
-
-        # Low margin, high rotation = volume driver, potential price increase
-        if margin < self.LOW_MARGIN_THRESHOLD and rotation > rotation_high:
-            suggested_price = round(current_price * 1.10, 2)  # 10% increase
-            return (
+            ),
+            # Low margin, high rotation = volume driver, potential price increase
+            (
+                low_margin & high_rotation,
                 OptimizationAction.INCREASE_PRICE,
                 PriorityLevel.CRITICAL,
-                f"High-volume item with thin margin ({margin:.0%}). Critical for profitability.",
+                "High-volume item with thin margin ({margin:.0%}). Critical for profitability.",
                 "10% price increase could significantly improve overall margins",
-                suggested_price,
-            )
-
-        # Low margin, low rotation = candidate for removal
-        if margin < self.LOW_MARGIN_THRESHOLD and rotation < rotation_low:
-            return (
+                1.10,  # 10% increase
+            ),
+            # Low margin, low rotation = candidate for removal
+            (
+                low_margin & low_rotation,
                 OptimizationAction.REMOVE,
                 PriorityLevel.HIGH,
-                f"Low margin ({margin:.0%}) and low sales. Consider removing from menu.",
+                "Low margin ({margin:.0%}) and low sales. Consider removing from menu.",
                 "Removal frees kitchen capacity and simplifies operations",
                 None,
-            )
-
-        # Medium performers - various strategies
-        if rotation < rotation_low:
+            ),
             # Low rotation, medium margin - try bundling
-            return (
+            (
+                low_rotation,
                 OptimizationAction.BUNDLE,
                 PriorityLevel.MEDIUM,
                 "Moderate margin but low sales. Bundle with popular items.",
                 "Bundling could increase sales 15-25%",
                 None,
-            )
-
-        if margin_score < 0.4:
+            ),
             # Low margin score - reposition or recipe change
-            return (
+            (
+                margin_score < 0.4,
                 OptimizationAction.REPOSITION,
                 PriorityLevel.MEDIUM,
                 "Margin below average. Consider portion adjustment or supplier negotiation.",
                 "Cost optimization could improve margin 5-10 points",
                 None,
-            )
-
+            ),
+        ]
         # Default: maintain
-        return (
+        default = (
             OptimizationAction.MAINTAIN,
             PriorityLevel.LOW,
             "Item performing within acceptable parameters.",
             "Monitor for changes in customer preference",
             None,
         )
+        outcomes = [rule[1:] for rule in rules] + [default]
+
+        chosen = np.select(
+            [rule[0].to_numpy() for rule in rules], range(len(rules)), len(rules)
+        ).tolist()
+
+        suggested_price = [
+            round(price * outcomes[i][4], 2) if outcomes[i][4] else None
+            for i, price in zip(chosen, current_price.tolist())
+        ]
+        return {
+            "action": [outcomes[i][0] for i in chosen],
+            "priority": [outcomes[i][1] for i in chosen],
+            "reasoning": [
+                outcomes[i][2].format(margin=value)
+                for i, value in zip(chosen, margin.tolist())
+            ],
+            "expected_impact": [outcomes[i][3] for i in chosen],
+            "suggested_price": suggested_price,
+        }
 
     def _generate_category_summaries(
         self, metrics: pd.DataFrame, col_map: Dict
@@ -453,13 +514,26 @@ class MenuOptimizer:
         if "category" not in metrics.columns:
             return summaries
 
-        for category in metrics["category"].dropna().unique():
-            cat_data = metrics[metrics["category"] == category]
-
-            avg_margin = cat_data["margin"].mean() if "margin" in cat_data else 0.6
-            avg_rotation = cat_data["rotation_score"].mean()
-            total_rev = cat_data["total_revenue"].sum()
+        # Categories in order of first appearance
+        grouped = metrics.groupby("category", sort=False)
+        rollup = pd.DataFrame(
+            {
+                "avg_margin": (
+                    grouped["margin"].mean() if "margin" in metrics.columns else 0.6
+                ),
+                "avg_rotation": grouped["rotation_score"].mean(),
+                "total_revenue": grouped["total_revenue"].sum(),
+                "item_count": grouped.size(),
+            }
+        )
 
+        for category, avg_margin, avg_rotation, total_rev, item_count in zip(
+            rollup.index.tolist(),
+            rollup["avg_margin"].tolist(),
+            rollup["avg_rotation"].tolist(),
+            rollup["total_revenue"].tolist(),
+            rollup["item_count"].tolist(),
+        ):
             # Generate recommendations
             recs = []
             if avg_margin < 0.5:
@@ -470,13 +544,13 @@ class MenuOptimizer:
                 recs.append(
                     "Low category rotation. Consider menu placement or promotion."
                 )
-            if len(cat_data) > 10:
+            if item_count > 10:
                 recs.append("Large category. Consider consolidating similar items.")
 
             summaries.append(
                 CategoryOptimization(
                     category=category,
-                    item_count=len(cat_data),
+                    item_count=item_count,
                     avg_margin=round(avg_margin, 2),
                     avg_rotation=round(avg_rotation, 2),
                     total_revenue=round(total_rev, 2),
@@ -486,37 +560,39 @@ class MenuOptimizer:
 
         return summaries
 
-    def _identify_quick_wins(
-        self, optimizations: List[ItemOptimization]
-    ) -> List[Dict[str, Any]]:
+    def _identify_quick_wins(self, plan: pd.DataFrame) -> List[Dict[str, Any]]:
         """Identify quick wins - high impact, easy implementation."""
         quick_wins = []
+        action = plan["action"]
 
         # Price increases on high-volume items
-        for opt in optimizations:
-            if opt.action == OptimizationAction.INCREASE_PRICE and opt.priority in [
-                PriorityLevel.CRITICAL,
-                PriorityLevel.HIGH,
-            ]:
-                quick_wins.append(
-                    {
-                        "type": "price_increase",
-                        "item": opt.item_name,
-                        "action": f"Increase price from ${opt.current_price:.2f} to ${opt.suggested_price:.2f}",
-                        "impact": opt.expected_impact,
-                        "difficulty": "Easy",
-                    }
-                )
+        increases = plan[
+            (action == OptimizationAction.INCREASE_PRICE)
+            & plan["priority"].isin([PriorityLevel.CRITICAL, PriorityLevel.HIGH])
+        ].head(5)
+        for item, current, suggested, impact in zip(
+            increases["item_name"].tolist(),
+            increases["current_price"].tolist(),
+            increases["suggested_price"].tolist(),
+            increases["expected_impact"].tolist(),
+        ):
+            quick_wins.append(
+                {
+                    "type": "price_increase",
+                    "item": item,
+                    "action": f"Increase price from ${current:.2f} to ${suggested:.2f}",
+                    "impact": impact,
+                    "difficulty": "Easy",
+                }
+            )
 
         # Items to remove
-        removal_candidates = [
-            opt for opt in optimizations if opt.action == OptimizationAction.REMOVE
-        ]
-        if removal_candidates:
+        removal_candidates = plan.loc[action == OptimizationAction.REMOVE, "item_name"]
+        if len(removal_candidates):
             quick_wins.append(
                 {
                     "type": "menu_simplification",
-                    "items": [opt.item_name for opt in removal_candidates[:3]],
+                    "items": removal_candidates.head(3).tolist(),
                     "action": "Remove underperforming items",
                     "impact": "Reduced complexity, improved kitchen efficiency",
                     "difficulty": "Easy",
@@ -525,48 +601,39 @@ class MenuOptimizer:
 
         return quick_wins[:5]  # Top 5 quick wins
 
-    def _calculate_revenue_opportunity(
-        self, optimizations: List[ItemOptimization]
-    ) -> float:
+    def _calculate_revenue_opportunity(self, plan: pd.DataFrame) -> float:
         """Calculate potential revenue opportunity from price changes."""
-        opportunity = 0
-        for opt in optimizations:
-            if opt.suggested_price and opt.suggested_price > opt.current_price:
-                # Assume 5% of current revenue as opportunity
-                opportunity += opt.current_price * 0.05 * opt.rotation_score * 1000
-        return round(opportunity, 2)
-
-    def _calculate_margin_opportunity(
-        self, optimizations: List[ItemOptimization]
-    ) -> float:
+        raised = plan[plan["suggested_price"].astype(float) > plan["current_price"]]
+        # Assume 5% of current revenue as opportunity
+        opportunity = raised["current_price"] * 0.05 * raised["rotation_score"] * 1000
+        return round(sum(opportunity.tolist()), 2)
+
+    def _calculate_margin_opportunity(self, plan: pd.DataFrame) -> float:
         """Calculate potential margin improvement."""
-        low_margin_items = [
-            o for o in optimizations if o.current_margin and o.current_margin < 0.5
-        ]
+        margin = plan["current_margin"]
+        low_margin_items = int(((margin != 0) & (margin < 0.5)).sum())
         if not low_margin_items:
             return 0
 
         # Assume 5% margin improvement on average
         avg_improvement = 0.05
-        return round(len(low_margin_items) * avg_improvement * 100, 1)
+        return round(low_margin_items * avg_improvement * 100, 1)
 
     async def _generate_ai_insights(
         self,
-        optimizations: List[ItemOptimization],
+        plan: pd.DataFrame,
         categories: List[CategoryOptimization],
     ) -> List[str]:
         """Generate AI-powered insights using Gemini."""
         insights = []
 
         # Analyze patterns
-        high_priority = [
-            o
-            for o in optimizations
-            if o.priority in [PriorityLevel.CRITICAL, PriorityLevel.HIGH]
-        ]
+        high_priority = int(
+            plan["priority"].isin([PriorityLevel.CRITICAL, PriorityLevel.HIGH]).sum()
+        )
         if high_priority:
             insights.append(
-                f"🎯 {len(high_priority)} items require immediate attention for pricing optimization"
+                f"🎯 {high_priority} items require immediate attention for pricing optimization"
             )
 
         # Category insights
@@ -576,32 +643,26 @@ class MenuOptimizer:
             insights.append(f"📊 Categories with margin opportunities: {cat_names}")
 
         # BCG alignment
-        stars = [o for o in optimizations if o.bcg_category == "STAR"]
+        stars = int((plan["bcg_category"] == "STAR").sum())
         if stars:
             insights.append(
-                f"⭐ {len(stars)} Star items identified - protect these with strategic pricing"
+                f"⭐ {stars} Star items identified - protect these with strategic pricing"
             )
 
-        dogs = [o for o in optimizations if o.bcg_category == "DOG"]
+        dogs = int((plan["bcg_category"] == "DOG").sum())
         if dogs:
             insights.append(
-                f"🐕 {len(dogs)} Dog items may be candidates for menu removal"
+                f"🐕 {dogs} Dog items may be candidates for menu removal"
             )
 
         # Price increase opportunities
-        increase_items = [
-            o for o in optimizations if o.action == OptimizationAction.INCREASE_PRICE
-        ]
-        if increase_items:
-            avg_increase = (
-                sum(
-                    (o.suggested_price - o.current_price) / o.current_price
-                    for o in increase_items
-                    if o.suggested_price
-                )
-                / len(increase_items)
-                * 100
-            )
+        increase_items = plan[plan["action"] == OptimizationAction.INCREASE_PRICE]
+        if len(increase_items):
+            priced = increase_items[_has_suggestion(increase_items)]
+            changes = (
+                priced["suggested_price"].astype(float) - priced["current_price"]
+            ) / priced["current_price"]
+            avg_increase = sum(changes.tolist()) / len(increase_items) * 100
             insights.append(
                 f"💰 Average recommended price increase: {avg_increase:.1f}%"
             )
@@ -609,9 +670,13 @@ class MenuOptimizer:
         return insights
 
     def _generate_thought_process(
-        self, metrics: pd.DataFrame, optimizations: List[ItemOptimization]
+        self, metrics: pd.DataFrame, plan: pd.DataFrame
     ) -> str:
         """Generate transparent thought process."""
+        action_counts = plan["action"].value_counts()
+        high_priority = int(
+            plan["priority"].isin([PriorityLevel.CRITICAL, PriorityLevel.HIGH]).sum()
+        )
         return f"""
 ## Menu Optimization Analysis
 
@@ -627,10 +692,10 @@ class MenuOptimizer:
 4. Applied optimization matrix based on margin x rotation quadrants
 
 ### Key Findings
-- High-priority items: {len([o for o in optimizations if o.priority in [PriorityLevel.CRITICAL, PriorityLevel.HIGH]])}
-- Price increase candidates: {len([o for o in optimizations if o.action == OptimizationAction.INCREASE_PRICE])}
-- Removal candidates: {len([o for o in optimizations if o.action == OptimizationAction.REMOVE])}
-- Promotion opportunities: {len([o for o in optimizations if o.action == OptimizationAction.PROMOTE])}
+- High-priority items: {high_priority}
+- Price increase candidates: {action_counts.get(OptimizationAction.INCREASE_PRICE, 0)}
+- Removal candidates: {action_counts.get(OptimizationAction.REMOVE, 0)}
+- Promotion opportunities: {action_counts.get(OptimizationAction.PROMOTE, 0)}
 
 ### Confidence
 Analysis based on available sales data. Recommendations should be validated with:
@@ -0,0 +1,289 @@
+"""
+Model Registry - process-wide warm cache for trained predictors.
+
+Predictors deserialize their models from ``data/models`` on construction,
+which dominates latency when every request builds a fresh instance. The
+registry loads each model once, on first use, and keeps it warm:
+- Models are versioned per scope (a session / restaurant, or "global")
+- ``train()`` fits a fresh instance and swaps it in atomically, so
+  in-flight predictions keep using the previous version until they finish
+- Idle models are unloaded and their scope's files deleted; the least
+  recently used ones are evicted (but kept on disk) when the in-memory
+  footprint exceeds the configured budget
+"""
+
+import asyncio
+import re
+import shutil
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+from app.core.config import get_settings
+
+GLOBAL_SCOPE = "global"
+
+ModelKey = Tuple[str, str]
+
+
+def _load_sales_predictor(model_dir: Optional[Path]) -> Any:
+    from app.services.analysis.sales_predictor import SalesPredictor
+
+    if model_dir is None:
+        return SalesPredictor()
+    return SalesPredictor(model_path=str(model_dir / "sales_predictor.joblib"))
+
+
+def _load_neural_predictor(model_dir: Optional[Path]) -> Any:
+    from app.services.analysis.neural_predictor import NeuralPredictor
+
+    return NeuralPredictor(model_dir=model_dir)
+
+
+@dataclass
+class ModelEntry:
+    """A warm predictor and its bookkeeping."""
+
+    kind: str
+    scope: str
+    predictor: Any
+    version: int
+    size_bytes: int
+    loaded_at: float
+    last_used: float
+
+
+class ModelRegistry:
+    """Lazily loads, caches and hot-swaps predictor instances."""
+
+    def __init__(
+        self,
+        max_bytes: int = 512 * 1024 * 1024,
+        idle_ttl_seconds: float = 3600,
+        base_dir: str = "data/models",
+        loaders: Optional[Dict[str, Callable[[Optional[Path]], Any]]] = None,
+    ):
+        self.max_bytes = max_bytes
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.base_dir = Path(base_dir)
+        self.loaders = loaders or {
+            "sales": _load_sales_predictor,
+            "neural": _load_neural_predictor,
+        }
+        self._entries: "OrderedDict[ModelKey, ModelEntry]" = OrderedDict()
+        self._versions: Dict[ModelKey, int] = {}
+        self._locks: Dict[ModelKey, asyncio.Lock] = {}
+        self.hits = 0
+        self.loads = 0
+        self.swaps = 0
+        self.evictions = 0
+
+    async def get(self, kind: str, scope: Optional[str] = None) -> Any:
+        """
+        Return the warm predictor for ``kind`` and ``scope``, loading it if needed.
+
+        Args:
+            kind: Predictor type ("sales" or "neural")
+            scope: Session / restaurant id; None shares the global model
+
+        Returns:
+            Predictor instance (untrained if nothing is on disk yet)
+        """
+        key = self._key(kind, scope)
+        self.evict_idle(keep=key)
+        entry = self._touch(key)
+        if entry is not None:
+            self.hits += 1
+            return entry.predictor
+
+        async with self._lock(key):
+            entry = self._touch(key)
+            if entry is not None:
+                self.hits += 1
+                return entry.predictor
+
+            predictor = await asyncio.to_thread(self._loader(kind), self._model_dir(key))
+            self.loads += 1
+            self._install(key, predictor, self._versions.get(key, 1))
+            logger.info(f"Model registry loaded {kind} model for scope '{key[1]}'")
+            return predictor
+
+    async def train(
+        self, kind: str, scope: Optional[str], *args: Any, **kwargs: Any
+    ) -> Any:
+        """
+        Train a fresh predictor and swap it in once it is ready.
+
+        Extra arguments are passed to the predictor's ``train()``. Training
+        for the same model is serialized; readers are never blocked.
+
+        Returns:
+            The predictor now serving ``kind`` / ``scope``
+        """
+        key = self._key(kind, scope)
+        async with self._lock(key):
+            predictor = await asyncio.to_thread(self._loader(kind), self._model_dir(key))
+            await predictor.train(*args, **kwargs)
+
+            if not predictor.is_trained:
+                logger.warning(f"Training {kind} model for scope '{key[1]}' produced no model")
+                current = self._touch(key)
+                if current is not None:
+                    return current.predictor
+                self._install(key, predictor, self._versions.get(key, 1))
+                return predictor
+
+            version = self._versions.get(key, 0) + 1
+            self._install(key, predictor, version)
+            self.swaps += 1
+            logger.info(f"Model registry swapped in {kind} v{version} for scope '{key[1]}'")
+            return predictor
+
+    def evict(self, kind: str, scope: Optional[str] = None) -> bool:
+        """Unload a model; it is reloaded from disk on next use."""
+        return self._drop(self._key(kind, scope))
+
+    def evict_idle(self, keep: Optional[ModelKey] = None) -> int:
+        """
+        Unload every model unused for longer than the idle TTL.
+
+        Scopes left without a loaded model have their ``scopes/<scope>``
+        directory deleted, since nothing will load it again.
+        """
+        cutoff = time.monotonic() - self.idle_ttl_seconds
+        idle = [
+            key
+            for key, entry in self._entries.items()
+            if entry.last_used < cutoff and key != keep
+        ]
+        for key in idle:
+            self._drop(key)
+        for scope in {key[1] for key in idle}:
+            self._purge_scope(scope)
+        return len(idle)
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "entries": len(self._entries),
+            "bytes": self._total_bytes(),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "loads": self.loads,
+            "swaps": self.swaps,
+            "evictions": self.evictions,
+            "models": [
+                {
+                    "kind": entry.kind,
+                    "scope": entry.scope,
+                    "version": entry.version,
+                    "size_bytes": entry.size_bytes,
+                    "idle_seconds": round(now - entry.last_used, 1),
+                }
+                for entry in self._entries.values()
+            ],
+        }
+
+    def _install(self, key: ModelKey, predictor: Any, version: int):
+        now = time.monotonic()
+        self._entries[key] = ModelEntry(
+            kind=key[0],
+            scope=key[1],
+            predictor=predictor,
+            version=version,
+            size_bytes=self._footprint(predictor),
+            loaded_at=now,
+            last_used=now,
+        )
+        self._entries.move_to_end(key)
+        self._versions[key] = version
+        self._enforce_budget(keep=key)
+
+    def _touch(self, key: ModelKey) -> Optional[ModelEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.last_used = time.monotonic()
+            self._entries.move_to_end(key)
+        return entry
+
+    def _enforce_budget(self, keep: ModelKey):
+        self.evict_idle(keep=keep)
+        for key in list(self._entries):
+            if self._total_bytes() <= self.max_bytes:
+                break
+            if key != keep:
+                self._drop(key)
+
+    def _drop(self, key: ModelKey) -> bool:
+        if self._entries.pop(key, None) is None:
+            return False
+        self.evictions += 1
+        logger.debug(f"Model registry unloaded {key[0]} model for scope '{key[1]}'")
+        return True
+
+    def _purge_scope(self, scope: str):
+        """Delete a scope's model files unless it is loaded or being trained."""
+        if scope == GLOBAL_SCOPE or any(key[1] == scope for key in self._entries):
+            return
+        keys = [key for key in self._locks if key[1] == scope]
+        if any(self._locks[key].locked() for key in keys):
+            return
+        for key in keys:
+            del self._locks[key]
+            self._versions.pop(key, None)
+        model_dir = self.base_dir / "scopes" / scope
+        if model_dir.exists():
+            shutil.rmtree(model_dir, ignore_errors=True)
+            logger.debug(f"Model registry deleted idle scope '{scope}'")
+
+    def _total_bytes(self) -> int:
+        return sum(entry.size_bytes for entry in self._entries.values())
+
+    def _lock(self, key: ModelKey) -> asyncio.Lock:
+        if key not in self._locks:
+            self._locks[key] = asyncio.Lock()
+        return self._locks[key]
+
+    def _loader(self, kind: str) -> Callable[[Optional[Path]], Any]:
+        if kind not in self.loaders:
+            raise ValueError(f"Unknown model kind: {kind}")
+        return self.loaders[kind]
+
+    def _model_dir(self, key: ModelKey) -> Optional[Path]:
+        """Scoped models live under ``scopes/<scope>``; the global one keeps the legacy path."""
+        if key[1] == GLOBAL_SCOPE:
+            return None
+        return self.base_dir / "scopes" / key[1]
+
+    @staticmethod
+    def _key(kind: str, scope: Optional[str]) -> ModelKey:
+        if not scope:
+            return (kind, GLOBAL_SCOPE)
+        return (kind, re.sub(r"[^A-Za-z0-9_-]", "_", scope))
+
+    @staticmethod
+    def _footprint(predictor: Any) -> int:
+        try:
+            return int(predictor.footprint_bytes())
+        except Exception:
+            return 0
+
+
+# Global instance shared by the orchestrator and API routes
+_model_registry: Optional[ModelRegistry] = None
+
+
+def get_model_registry() -> ModelRegistry:
+    """Get or create the global model registry."""
+    global _model_registry
+    if _model_registry is None:
+        settings = get_settings()
+        _model_registry = ModelRegistry(
+            max_bytes=int(settings.model_registry_max_size_mb) * 1024 * 1024,
+            idle_ttl_seconds=float(settings.model_registry_idle_ttl_seconds),
+        )
+    return _model_registry
@@ -0,0 +1,344 @@
+"""
+Menu item to sales item name matching.
+
+Extracted menus and POS exports rarely spell a dish the same way
+("Taco al Pastor" vs "TACOS AL PASTOR (Orden)"). Instead of every analysis
+module rescanning all sales names per menu item, ``NameMatcher`` indexes
+the sales names once:
+- Normalized names for exact lookups
+- An inverted token index for token-overlap matches
+- A character trigram index for substring matches and typos
+
+Fuzzy matches never bridge names that differ by a number or size ("Combo
+1" vs "Combo 3", "Café Chico" vs "Café Grande"), and a sales name matched
+exactly by one menu item is not also handed to another item's fuzzy match.
+
+Matchers are shared process-wide per set of sales names and memoize their
+results. ``match_menu_to_sales`` can also keep the menu -> sales mapping in
+a table stored with the session or pipeline state, so later stages (and
+other workers) reuse it instead of rematching from scratch.
+"""
+
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from app.services.analysis.sales_frame import SalesData, SalesFrame
+
+# Minimum share of the shorter name's tokens two names must have in common
+MIN_TOKEN_OVERLAP = 0.6
+
+# Minimum trigram Dice similarity for typo matches
+MIN_NGRAM_SIMILARITY = 0.7
+
+# Matchers kept for reuse across modules and requests
+MATCHER_CACHE_SIZE = 32
+
+# Sets of sales names a session mapping table keeps matches for
+TABLE_SALES_SETS = 4
+
+# Size words that, like numbers, tell variants of one product apart
+SIZE_WORDS = frozenset(
+    "chico chica pequeno pequena mediano mediana grande familiar personal "
+    "jumbo mini small medium large xl".split()
+)
+
+_PARENTHETICAL = re.compile(r"\s*\(.*?\)\s*")
+_QUOTES = re.compile(r"[`'\"']")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=8192)
+def normalize_name(name: str) -> str:
+    """
+    Normalize a product name for matching: lowercase, no accents, no
+    parenthetical suffixes like (Botella) or (Trago), no quotes.
+    """
+    name = name.strip().lower()
+    # Remove accents
+    name = unicodedata.normalize("NFD", name)
+    name = "".join(c for c in name if unicodedata.category(c) != "Mn")
+    name = _PARENTHETICAL.sub("", name).strip()
+    name = _QUOTES.sub("", name)
+    return _WHITESPACE.sub(" ", name)
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _is_variant_token(token: str) -> bool:
+    return token in SIZE_WORDS or any(c.isdigit() for c in token)
+
+
+def _variants_differ(tokens: FrozenSet[str], other: FrozenSet[str]) -> bool:
+    """Whether two names differ in a number or size token."""
+    return any(_is_variant_token(token) for token in tokens ^ other)
+
+
+class NameMatcher:
+    """
+    Matches names (menu items) against a fixed set of candidate names
+    (sales items).
+
+    Lookup order, first hit wins:
+    1. Exact name
+    2. Exact normalized name
+    3. One normalized name contained in the other
+    4. Token overlap of at least ``MIN_TOKEN_OVERLAP`` (most shared tokens)
+    5. Trigram similarity of at least ``MIN_NGRAM_SIMILARITY`` (typos)
+
+    Stages 3-5 skip candidates whose name differs from the looked-up one
+    in a number or size token. Ties go to the candidate that sorts first,
+    so the result does not depend on the order the sales names were seen in.
+    """
+
+    def __init__(self, candidates: Iterable[str]):
+        self.candidates: List[str] = sorted({c for c in candidates if c})
+        self.fingerprint = candidates_fingerprint(self.candidates)
+
+        self._exact = set(self.candidates)
+        self._normalized: List[str] = []
+        self._tokens: List[FrozenSet[str]] = []
+        self._by_normalized: Dict[str, int] = {}
+        token_index: Dict[str, List[int]] = {}
+        ngram_index: Dict[str, List[int]] = {}
+        token_counts: List[int] = []
+        ngram_counts: List[int] = []
+
+        for i, candidate in enumerate(self.candidates):
+            norm = normalize_name(candidate)
+            self._normalized.append(norm)
+            if norm:
+                self._by_normalized.setdefault(norm, i)
+
+            tokens = frozenset(norm.split())
+            self._tokens.append(tokens)
+            token_counts.append(len(tokens))
+            for token in tokens:
+                token_index.setdefault(token, []).append(i)
+
+            ngrams = _trigrams(norm)
+            ngram_counts.append(len(ngrams))
+            for ngram in ngrams:
+                ngram_index.setdefault(ngram, []).append(i)
+
+        # Postings as arrays so per-name hit counts are one bincount
+        self._token_index = {
+            token: np.array(ids, dtype=np.intp) for token, ids in token_index.items()
+        }
+        self._ngram_index = {
+            ngram: np.array(ids, dtype=np.intp) for ngram, ids in ngram_index.items()
+        }
+        self._token_counts = np.array(token_counts, dtype=np.intp)
+        self._ngram_counts = np.array(ngram_counts, dtype=np.intp)
+        # Non-empty names too short to have trigrams
+        self._short = np.flatnonzero(
+            (self._ngram_counts == 0) & (self._token_counts > 0)
+        )
+
+        self._matches: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    def match(self, name: Optional[str]) -> Optional[str]:
+        """Best candidate for ``name``, or None."""
+        if not name:
+            return None
+        with self._lock:
+            if name in self._matches:
+                return self._matches[name]
+        found = self._find(name)
+        with self._lock:
+            self._matches[name] = found
+        return found
+
+    def match_all(self, names: Iterable[str]) -> Dict[str, Optional[str]]:
+        return {name: self.match(name) for name in names if name}
+
+    def remember(self, matches: Dict[str, Optional[str]]):
+        """Seed the memo with previously computed matches."""
+        with self._lock:
+            for name, candidate in matches.items():
+                if candidate is None or candidate in self._exact:
+                    self._matches.setdefault(name, candidate)
+
+    def _find(self, name: str) -> Optional[str]:
+        if name in self._exact:
+            return name
+        if not self.candidates:
+            return None
+
+        norm = normalize_name(name)
+        if not norm:
+            return None
+        if norm in self._by_normalized:
+            return self.candidates[self._by_normalized[norm]]
+
+        tokens = frozenset(norm.split())
+        ngrams = _trigrams(norm)
+        ngram_hits = self._hits(self._ngram_index, ngrams)
+
+        found = self._find_substring(norm, tokens, len(ngrams), ngram_hits)
+        if found is None:
+            found = self._find_token_overlap(tokens)
+        if found is None:
+            found = self._find_similar(tokens, len(ngrams), ngram_hits)
+        return self.candidates[found] if found is not None else None
+
+    def _hits(self, index: Dict[str, np.ndarray], keys: Set[str]) -> np.ndarray:
+        """Number of ``keys`` each candidate has."""
+        postings = [index[key] for key in keys if key in index]
+        if not postings:
+            return np.zeros(len(self.candidates), dtype=np.intp)
+        return np.bincount(np.concatenate(postings), minlength=len(self.candidates))
+
+    def _find_substring(
+        self, norm: str, tokens: FrozenSet[str], n_ngrams: int, ngram_hits: np.ndarray
+    ) -> Optional[int]:
+        # A candidate containing the name has all of the name's trigrams; a
+        # candidate contained in the name has all of its own trigrams in it
+        if n_ngrams:
+            possible = (ngram_hits == n_ngrams) | (
+                (ngram_hits == self._ngram_counts) & (self._ngram_counts > 0)
+            )
+            possible = np.union1d(np.flatnonzero(possible), self._short)
+        else:
+            possible = np.flatnonzero(self._token_counts > 0)
+
+        for i in possible.tolist():
+            candidate = self._normalized[i]
+            if (norm in candidate or candidate in norm) and not _variants_differ(
+                tokens, self._tokens[i]
+            ):
+                return i
+        return None
+
+    def _find_token_overlap(self, tokens: FrozenSet[str]) -> Optional[int]:
+        overlap = self._hits(self._token_index, tokens)
+        min_len = np.maximum(np.minimum(len(tokens), self._token_counts), 1)
+        eligible = (overlap > 0) & (overlap / min_len >= MIN_TOKEN_OVERLAP)
+        for i in np.flatnonzero(eligible).tolist():
+            if _variants_differ(tokens, self._tokens[i]):
+                eligible[i] = False
+        if not eligible.any():
+            return None
+        # argmax picks the first candidate with the most shared tokens
+        return int(np.argmax(np.where(eligible, overlap, 0)))
+
+    def _find_similar(
+        self, tokens: FrozenSet[str], n_ngrams: int, ngram_hits: np.ndarray
+    ) -> Optional[int]:
+        if not n_ngrams:
+            return None
+        score = 2 * ngram_hits / (n_ngrams + self._ngram_counts)
+        similar = np.flatnonzero(score >= MIN_NGRAM_SIMILARITY)
+        # Best score first; the stable sort keeps ties in candidate order
+        for i in similar[np.argsort(-score[similar], kind="stable")].tolist():
+            if not _variants_differ(tokens, self._tokens[i]):
+                return i
+        return None
+
+
+def candidates_fingerprint(candidates: Iterable[str]) -> str:
+    """Stable id of a set of candidate names."""
+    digest = hashlib.sha1("\n".join(sorted(set(candidates))).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+_matchers: "OrderedDict[str, NameMatcher]" = OrderedDict()
+_matchers_lock = threading.Lock()
+
+
+def get_name_matcher(candidates: Iterable[str]) -> NameMatcher:
+    """Shared matcher for a set of candidate names (built once per set)."""
+    candidates = [c for c in candidates if c]
+    key = candidates_fingerprint(candidates)
+    with _matchers_lock:
+        matcher = _matchers.get(key)
+        if matcher is not None:
+            _matchers.move_to_end(key)
+            return matcher
+
+    matcher = NameMatcher(candidates)
+    with _matchers_lock:
+        matcher = _matchers.setdefault(key, matcher)
+        _matchers.move_to_end(key)
+        while len(_matchers) > MATCHER_CACHE_SIZE:
+            _matchers.popitem(last=False)
+    return matcher
+
+
+def sales_item_names(sales_data: SalesData) -> List[str]:
+    """Distinct non-empty item names of a sales table, in first-seen order."""
+    sales = SalesFrame.of(sales_data)
+    if not sales.has("item_name"):
+        return []
+    return [name for name in pd.unique(sales.text("item_name").to_numpy()) if name]
+
+
+def match_menu_to_sales(
+    menu_names: Iterable[str],
+    sales_names: Iterable[str],
+    table: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Optional[str]]:
+    """
+    Map menu item names to sales item names (None where nothing matches).
+
+    ``table`` is a mapping table kept with the session or pipeline state,
+    holding the matches for the last few sets of sales names (a new upload,
+    or a period window with fewer items). Known names are served from it
+    and new ones are matched and added.
+    """
+    matcher = get_name_matcher(sales_names)
+    names = [name for name in menu_names if name]
+
+    if table is None:
+        return _drop_claimed_fuzzy(matcher.match_all(names))
+
+    known = table.pop(matcher.fingerprint, {})
+    table[matcher.fingerprint] = known  # Most recently used last
+    while len(table) > TABLE_SALES_SETS:
+        del table[next(iter(table))]
+    matcher.remember(known)
+
+    matches = matcher.match_all(names)
+    known.update(matches)
+    return _drop_claimed_fuzzy(matches)
+
+
+def _drop_claimed_fuzzy(matches: Dict[str, Optional[str]]) -> Dict[str, Optional[str]]:
+    """Unmatch fuzzy matches to a sales name another menu item matches exactly."""
+    exact = {
+        sales_name
+        for name, sales_name in matches.items()
+        if sales_name and normalize_name(name) == normalize_name(sales_name)
+    }
+    return {
+        name: None
+        if sales_name in exact and normalize_name(name) != normalize_name(sales_name)
+        else sales_name
+        for name, sales_name in matches.items()
+    }
+
+
+def rekey_to_sales_names(
+    values: Dict[str, Any], matches: Dict[str, Optional[str]]
+) -> Dict[str, Any]:
+    """
+    Copy of a menu-name keyed mapping that also answers for the matched
+    sales names. Keys that already are sales names keep their own value.
+    """
+    rekeyed: Dict[str, Any] = {}
+    for name, value in values.items():
+        sales_name = matches.get(name)
+        if sales_name and sales_name not in values:
+            rekeyed.setdefault(sales_name, value)
+    rekeyed.update(values)
+    return rekeyed
@@ -7,12 +7,14 @@ pattern recognition and ensemble predictions.
 
 from __future__ import annotations
 
+import os
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
+from app.services.analysis.sales_frame import SalesData, SalesFrame
 from loguru import logger
 
 try:
@@ -123,8 +125,10 @@ class NeuralPredictor:
 
     MODEL_DIR = Path("data/models")
     SEQUENCE_LENGTH = 14
+    MC_BATCH_ROWS = 4096  # Max rows (series x MC samples) per forward pass
 
-    def __init__(self):
+    def __init__(self, model_dir: Optional[Path] = None):
+        self.model_dir = Path(model_dir) if model_dir else self.MODEL_DIR
         self.device = (
             torch.device("cuda" if torch.cuda.is_available() else "cpu")
             if TORCH_AVAILABLE
@@ -142,13 +146,14 @@ class NeuralPredictor:
 
     def _load_models(self):
         """Load pre-trained models if they exist."""
-        lstm_path = self.MODEL_DIR / "lstm_predictor.pt"
-        transformer_path = self.MODEL_DIR / "transformer_predictor.pt"
+        lstm_path = self.model_dir / "lstm_predictor.pt"
+        transformer_path = self.model_dir / "transformer_predictor.pt"
 
         if lstm_path.exists():
             try:
                 checkpoint = torch.load(lstm_path, map_location=self.device)
-                self.lstm_model = SalesLSTM()
+                state = checkpoint["model_state"]
+                self.lstm_model = SalesLSTM(input_size=state["lstm.weight_ih_l0"].shape[1])
                 self.lstm_model.load_state_dict(checkpoint["model_state"])
                 self.lstm_model.to(self.device)
                 self.feature_scaler = checkpoint.get("feature_scaler")
@@ -161,7 +166,10 @@ class NeuralPredictor:
         if transformer_path.exists():
             try:
                 checkpoint = torch.load(transformer_path, map_location=self.device)
-                self.transformer_model = SalesTransformer()
+                state = checkpoint["model_state"]
+                self.transformer_model = SalesTransformer(
+                    input_size=state["input_projection.weight"].shape[1]
+                )
                 self.transformer_model.load_state_dict(checkpoint["model_state"])
                 self.transformer_model.to(self.device)
                 logger.info("Loaded Transformer model")
@@ -169,30 +177,44 @@ class NeuralPredictor:
                 logger.warning(f"Could not load Transformer model: {e}")
 
     def _save_models(self):
-        """Save trained models."""
-        self.MODEL_DIR.mkdir(parents=True, exist_ok=True)
+        """Save trained models, replacing previous files atomically."""
+        self.model_dir.mkdir(parents=True, exist_ok=True)
 
         if self.lstm_model:
-            torch.save(
+            self._atomic_save(
                 {
                     "model_state": self.lstm_model.state_dict(),
                     "feature_scaler": self.feature_scaler,
                     "target_scaler": self.target_scaler,
                 },
-                self.MODEL_DIR / "lstm_predictor.pt",
+                self.model_dir / "lstm_predictor.pt",
             )
 
         if self.transformer_model:
-            torch.save(
+            self._atomic_save(
                 {
                     "model_state": self.transformer_model.state_dict(),
                 },
-                self.MODEL_DIR / "transformer_predictor.pt",
+                self.model_dir / "transformer_predictor.pt",
             )
 
+    @staticmethod
+    def _atomic_save(checkpoint: Dict[str, Any], path: Path):
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        torch.save(checkpoint, tmp_path)
+        os.replace(tmp_path, path)
+
+    def footprint_bytes(self) -> int:
+        """Approximate in-memory size of the loaded networks."""
+        total = 0
+        for model in (self.lstm_model, self.transformer_model):
+            if model is not None:
+                total += sum(p.numel() * p.element_size() for p in model.parameters())
+        return total
+
     async def train(
         self,
-        sales_data: List[Dict[str, Any]],
+        sales_data: SalesData,
         menu_items: List[Dict[str, Any]],
         epochs: int = 50,
         batch_size: int = 32,
@@ -362,46 +384,82 @@ class NeuralPredictor:
         Returns:
             Predictions with confidence intervals
         """
+        batch = await self.predict_batch(
+            [{"name": item_name, **base_features}],
+            horizon_days,
+            scenarios,
+            use_ensemble=use_ensemble,
+            uncertainty_samples=uncertainty_samples,
+        )
+        if "error" in batch:
+            return batch
+        return batch["predictions"][item_name]
+
+    async def predict_batch(
+        self,
+        items: List[Dict[str, Any]],
+        horizon_days: int,
+        scenarios: Optional[List[Dict[str, Any]]] = None,
+        use_ensemble: bool = True,
+        uncertainty_samples: int = 10,
+    ) -> Dict[str, Any]:
+        """
+        Predict every item under every scenario in batched forward passes.
+
+        Args:
+            items: Items with ``name`` and base features (price, avg_daily_units)
+            horizon_days: Number of days to predict
+            scenarios: Different scenarios to evaluate
+            use_ensemble: Whether to use ensemble of both models
+            uncertainty_samples: Number of MC dropout samples for uncertainty
+
+        Returns:
+            Per-item predictions keyed by item name
+        """
         if not TORCH_AVAILABLE or not self.is_trained:
             return {"error": "Neural models not available", "predictions": {}}
 
         scenarios = scenarios or [{"name": "baseline"}]
-        results = {}
-
-        for scenario in scenarios:
-            scenario_name = scenario.get("name", "baseline")
-
-            X_sequence = self._build_prediction_sequence(
-                base_features, scenario, horizon_days
-            )
-            X_scaled = self._scale_features(X_sequence)
-            X_tensor = torch.FloatTensor(X_scaled).unsqueeze(0).to(self.device)
+        windows = np.stack(
+            [
+                self._build_prediction_sequence(item, scenario, horizon_days)
+                for item in items
+                for scenario in scenarios
+            ]
+        )
+        X = torch.as_tensor(windows, dtype=torch.float32, device=self.device)
 
-            predictions, uncertainties = self._predict_with_uncertainty(
-                X_tensor, horizon_days, uncertainty_samples, use_ensemble
-            )
+        means, stds = self._predict_with_uncertainty(
+            X, horizon_days, max(1, uncertainty_samples), use_ensemble
+        )
+        means = means.reshape(len(items), len(scenarios), horizon_days)
+        stds = stds.reshape(len(items), len(scenarios), horizon_days)
+
+        predictions = {}
+        for i, item in enumerate(items):
+            results = {}
+            for s, scenario in enumerate(scenarios):
+                daily, spread = means[i, s].tolist(), stds[i, s].tolist()
+                results[scenario.get("name", "baseline")] = {
+                    "daily_predictions": [round(p, 1) for p in daily],
+                    "uncertainty": [round(u, 2) for u in spread],
+                    "confidence_interval_95": [
+                        [round(p - 1.96 * u, 1), round(p + 1.96 * u, 1)]
+                        for p, u in zip(daily, spread)
+                    ],
+                    "total_units": round(sum(daily)),
+                    "avg_daily": round(sum(daily) / horizon_days, 1),
+                }
 
-            predictions = self._inverse_scale_predictions(predictions)
-            uncertainties = self._inverse_scale_predictions(uncertainties)
-
-            results[scenario_name] = {
-                "daily_predictions": [round(p, 1) for p in predictions],
-                "uncertainty": [round(u, 2) for u in uncertainties],
-                "confidence_interval_95": [
-                    [round(p - 1.96 * u, 1), round(p + 1.96 * u, 1)]
-                    for p, u in zip(predictions, uncertainties)
-                ],
-                "total_units": round(sum(predictions)),
-                "avg_daily": round(sum(predictions) / horizon_days, 1),
+            predictions[item["name"]] = {
+                "item_name": item["name"],
+                "horizon_days": horizon_days,
+                "predictions": results,
+                "model_type": "neural_ensemble" if use_ensemble else "neural_single",
+                "uncertainty_quantified": True,
             }
 
-        return {
-            "item_name": item_name,
-            "horizon_days": horizon_days,
-            "predictions": results,
-            "model_type": "neural_ensemble" if use_ensemble else "neural_single",
-            "uncertainty_quantified": True,
-        }
+        return {"predictions": predictions}
 
     def _predict_with_uncertainty(
         self,
@@ -409,93 +467,139 @@ class NeuralPredictor:
         horizon: int,
         n_samples: int,
         use_ensemble: bool,
-    ) -> Tuple[List[float], List[float]]:
-        """Predict with Monte Carlo Dropout for uncertainty estimation."""
-        all_predictions = []
-
-        for _ in range(n_samples):
-            preds = []
-
-            if self.lstm_model and (use_ensemble or not self.transformer_model):
-                self.lstm_model.train()
-                with torch.no_grad():
-                    lstm_pred = self.lstm_model(X).item()
-                    preds.append(lstm_pred)
-
-            if self.transformer_model and (use_ensemble or not self.lstm_model):
-                self.transformer_model.train()
-                with torch.no_grad():
-                    trans_pred = self.transformer_model(X).item()
-                    preds.append(trans_pred)
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Roll a multi-step forecast under Monte Carlo Dropout.
 
-            all_predictions.append(np.mean(preds) if preds else 0)
+        Each input window is repeated ``n_samples`` times along the batch
+        dimension with dropout active, so every sample follows its own
+        autoregressive trajectory: each day's prediction is fed back as the
+        next day's ``units`` feature. One forward pass per model per day.
 
-        mean_pred = np.mean(all_predictions)
-        std_pred = np.std(all_predictions)
+        Args:
+            X: Raw (unscaled) windows, shape (series, SEQUENCE_LENGTH, features)
+            horizon: Days to forecast
+            n_samples: MC dropout samples per series
+            use_ensemble: Average LSTM and Transformer instead of using one
 
-        predictions = [mean_pred * (1 + 0.05 * np.sin(i * 0.5)) for i in range(horizon)]
-        uncertainties = [std_pred * (1 + 0.1 * i / horizon) for i in range(horizon)]
+        Returns:
+            Mean and standard deviation in units, each (series, horizon)
+        """
+        models = [
+            model
+            for model, wanted in (
+                (self.lstm_model, use_ensemble or not self.transformer_model),
+                (self.transformer_model, use_ensemble or not self.lstm_model),
+            )
+            if model is not None and wanted
+        ]
+        n_series = X.shape[0]
+        if not models:
+            zeros = np.zeros((n_series, horizon))
+            return zeros, zeros
+
+        feature_min, feature_range = self._feature_scale_tensors(X.shape[2])
+        y_min, y_max = (float(v) for v in self.target_scaler or (0.0, 1.0))
+
+        # Bound the batch so large menus do not spike memory
+        chunk = max(1, self.MC_BATCH_ROWS // n_samples)
+        means, stds = [], []
+
+        for model in models:
+            model.train()  # Keep dropout active for MC sampling
+        try:
+            with torch.no_grad():
+                for start in range(0, n_series, chunk):
+                    window = X[start : start + chunk].repeat_interleave(n_samples, dim=0)
+                    paths = torch.empty(window.shape[0], horizon, device=self.device)
+
+                    for day in range(horizon):
+                        scaled = (window - feature_min) / feature_range
+                        step = torch.stack(
+                            [model(scaled).squeeze(-1) for model in models]
+                        ).mean(dim=0)
+                        units = (step * (y_max - y_min) + y_min).clamp_(min=0)
+                        paths[:, day] = units
+
+                        dow = (self.SEQUENCE_LENGTH + day) % 7
+                        next_row = window[:, -1, :].clone()
+                        next_row[:, 0] = units
+                        next_row[:, 1] = dow
+                        next_row[:, 2] = 1.0 if dow >= 5 else 0.0
+                        window = torch.cat([window[:, 1:, :], next_row.unsqueeze(1)], dim=1)
+
+                    paths = paths.view(-1, n_samples, horizon)
+                    means.append(paths.mean(dim=1))
+                    stds.append(paths.std(dim=1, unbiased=False))
+        finally:
+            for model in models:
+                model.eval()
+
+        return (
+            torch.cat(means).cpu().numpy(),
+            torch.cat(stds).cpu().numpy(),
+        )
 
-        return predictions, uncertainties
+    def _feature_scale_tensors(self, n_features: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Per-feature offset and range matching the training normalization."""
+        offset = torch.zeros(n_features, device=self.device)
+        scale = torch.ones(n_features, device=self.device)
+        for i, (min_val, max_val) in (self.feature_scaler or {}).items():
+            if i < n_features and max_val > min_val:
+                offset[i] = float(min_val)
+                scale[i] = float(max_val - min_val)
+        return offset, scale
 
     def _prepare_sequences(
         self,
-        sales_data: List[Dict],
+        sales_data: SalesData,
         menu_items: List[Dict],
     ) -> Tuple[np.ndarray, np.ndarray]:
         """Prepare sequence data for training."""
         price_lookup = {item["name"]: item.get("price", 15) for item in menu_items}
 
-        records = []
-        for sale in sales_data:
-            item_name = sale.get("item_name")
-            sale_date = sale.get("sale_date")
-            if not item_name or not sale_date:
-                continue
-
-            if isinstance(sale_date, str):
-                try:
-                    sale_date = datetime.fromisoformat(sale_date).date()
-                except ValueError:
-                    continue
-
-            records.append(
-                {
-                    "item_name": item_name,
-                    "date": sale_date,
-                    "units_sold": sale.get("units_sold", 0),
-                    "day_of_week": sale_date.weekday(),
-                    "is_weekend": 1 if sale_date.weekday() >= 5 else 0,
-                    "price": price_lookup.get(item_name, 15),
-                    "promo": 1 if sale.get("had_promotion") else 0,
-                }
-            )
-
-        if not records:
+        sales = SalesFrame.of(sales_data)
+        item_names = sales.text("item_name")
+        dates = sales.dates
+        keep = ((item_names != "") & dates.notna()).to_numpy()
+        if not keep.any():
             return np.array([]), np.array([])
 
-        df = pd.DataFrame(records).sort_values(["item_name", "date"])
+        item_names = item_names[keep]
+        day_of_week = dates[keep].dt.dayofweek.to_numpy()
+        df = pd.DataFrame(
+            {
+                "item_name": item_names.to_numpy(),
+                "date": dates[keep].dt.normalize().to_numpy(),
+                "units_sold": sales.numeric("units_sold")[keep],
+                "day_of_week": day_of_week,
+                "is_weekend": (day_of_week >= 5).astype(np.int64),
+                "price": pd.to_numeric(item_names.map(price_lookup), errors="coerce")
+                .fillna(15)
+                .to_numpy(),
+                "promo": sales.flag("had_promotion")[keep].astype(np.int64),
+            }
+        ).sort_values(["item_name", "date"])
 
+        feature_columns = ["units_sold", "day_of_week", "is_weekend", "price", "promo"]
         X_sequences = []
         y_targets = []
 
-        for item_name in df["item_name"].unique():
-            item_df = df[df["item_name"] == item_name].reset_index(drop=True)
-
+        for _, item_df in df.groupby("item_name"):
             if len(item_df) < self.SEQUENCE_LENGTH + 1:
                 continue
 
-            for i in range(len(item_df) - self.SEQUENCE_LENGTH):
-                seq = item_df.iloc[i : i + self.SEQUENCE_LENGTH]
-                target = item_df.iloc[i + self.SEQUENCE_LENGTH]["units_sold"]
-
-                features = seq[
-                    ["units_sold", "day_of_week", "is_weekend", "price", "promo"]
-                ].values
-                X_sequences.append(features)
-                y_targets.append(target)
+            values = item_df[feature_columns].to_numpy(dtype=np.float64)
+            # (windows, features, SEQUENCE_LENGTH) -> (windows, SEQUENCE_LENGTH, features)
+            windows = np.lib.stride_tricks.sliding_window_view(
+                values, self.SEQUENCE_LENGTH, axis=0
+            )[:-1]
+            X_sequences.append(windows.transpose(0, 2, 1))
+            y_targets.append(values[self.SEQUENCE_LENGTH :, 0])
 
-        return np.array(X_sequences), np.array(y_targets)
+        if not X_sequences:
+            return np.array([]), np.array([])
+        return np.concatenate(X_sequences), np.concatenate(y_targets)
 
     def _generate_synthetic_sequences(
         self,
@@ -562,25 +666,6 @@ class NeuralPredictor:
 
         return X_normalized, y_normalized, feature_scaler, target_scaler
 
-    def _scale_features(self, X: np.ndarray) -> np.ndarray:
-        """Scale features using stored scaler."""
-        if not self.feature_scaler:
-            return X
-
-        X_scaled = X.copy()
-        for i, (min_val, max_val) in self.feature_scaler.items():
-            if i < X.shape[1] and max_val > min_val:
-                X_scaled[:, i] = (X[:, i] - min_val) / (max_val - min_val)
-        return X_scaled
-
-    def _inverse_scale_predictions(self, predictions: List[float]) -> List[float]:
-        """Inverse scale predictions to original units."""
-        if not self.target_scaler:
-            return predictions
-
-        y_min, y_max = self.target_scaler
-        return [p * (y_max - y_min) + y_min for p in predictions]
-
     def _build_prediction_sequence(
         self,
         base_features: Dict[str, Any],
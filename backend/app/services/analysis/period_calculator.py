@@ -2,10 +2,10 @@
 Period Calculator - Calculate available analysis periods based on data.
 """
 
-from datetime import timedelta
-from typing import Any, Dict, List
+from typing import Any, Dict
 
-from app.services.analysis.menu_engineering import parse_date_flexible
+import pandas as pd
+from app.services.analysis.sales_frame import SalesData, SalesFrame
 from loguru import logger
 
 
@@ -13,7 +13,7 @@ class PeriodCalculator:
     """Calculate which analysis periods are available based on sales data."""
 
     @staticmethod
-    def calculate_available_periods(sales_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def calculate_available_periods(sales_data: SalesData) -> Dict[str, Any]:
         """
         Analyze sales data and determine which periods have sufficient data.
 
@@ -30,7 +30,8 @@ class PeriodCalculator:
                 }
             }
         """
-        if not sales_data:
+        sales = SalesFrame.of(sales_data)
+        if not sales:
             return {
                 "available_periods": [],
                 "data_span_days": 0,
@@ -40,31 +41,19 @@ class PeriodCalculator:
                 "period_info": {},
             }
 
-        # Parse all dates
-        dated_sales = []
-        for sale in sales_data:
-            sale_date = sale.get("sale_date") or sale.get("date")
-            if not sale_date:
-                continue
-
-            parsed_date = parse_date_flexible(sale_date)
-            if parsed_date is None:
-                continue
-
-            dated_sales.append(parsed_date)
-
-        if not dated_sales:
+        dated_sales = sales.dates.dropna().to_numpy()
+        if not len(dated_sales):
             return {
                 "available_periods": [],
                 "data_span_days": 0,
                 "earliest_date": None,
                 "latest_date": None,
-                "total_records": len(sales_data),
+                "total_records": len(sales),
                 "period_info": {},
             }
 
-        earliest = min(dated_sales)
-        latest = max(dated_sales)
+        earliest = pd.Timestamp(dated_sales.min()).to_pydatetime()
+        latest = pd.Timestamp(dated_sales.max()).to_pydatetime()
         data_span_days = (latest - earliest).days + 1
 
         logger.info(f"Data span: {data_span_days} days ({earliest} to {latest})")
@@ -113,13 +102,9 @@ class PeriodCalculator:
             if data_span_days >= min_required:
                 # Calculate how many records fall within this period
                 if period["days"]:
-                    cutoff_date = latest - timedelta(days=period["days"])
-                    records_in_period = sum(1 for d in dated_sales if d >= cutoff_date)
-                    coverage_pct = (
-                        (records_in_period / len(dated_sales)) * 100
-                        if dated_sales
-                        else 0
-                    )
+                    cutoff_date = pd.Timestamp(latest) - pd.Timedelta(days=period["days"])
+                    records_in_period = int((dated_sales >= cutoff_date.to_datetime64()).sum())
+                    coverage_pct = (records_in_period / len(dated_sales)) * 100
                 else:
                     # "all" period
                     records_in_period = len(dated_sales)
@@ -148,7 +133,7 @@ class PeriodCalculator:
             "data_span_days": data_span_days,
             "earliest_date": earliest.isoformat(),
             "latest_date": latest.isoformat(),
-            "total_records": len(sales_data),
+            "total_records": len(sales),
             "period_info": period_info,
         }
 
@@ -8,6 +8,8 @@ Provides comprehensive competitive analysis capabilities:
 - Strategic competitive insights
 """
 
+import asyncio
+import hashlib
 import json
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
@@ -17,6 +19,10 @@ from uuid import uuid4
 import httpx
 from loguru import logger
 
+from app.core.cache import get_cache_manager
+from app.core.config import get_settings
+from app.core.http_clients import get_http_client
+from app.services.analysis.menu_html import PageMenu, extract_page_menu
 from app.services.gemini.base_agent import ThinkingLevel
 from app.services.gemini.multimodal import MultimodalAgent
 from app.services.gemini.reasoning_agent import ReasoningAgent
@@ -196,7 +202,15 @@ class CompetitorIntelligenceService:
         self.multimodal = multimodal_agent or MultimodalAgent()
         self.reasoning = reasoning_agent or ReasoningAgent()
         self.social_scraper = SocialScraper()
-        self.http_client = httpx.AsyncClient(
+        self._http_client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Shared pooled client for competitor pages, unless one was injected."""
+        if self._http_client is not None:
+            return self._http_client
+        return get_http_client(
+            "competitor_pages",
             timeout=30.0,
             follow_redirects=True,
             headers={
@@ -204,6 +218,10 @@ class CompetitorIntelligenceService:
             },
         )
 
+    @http_client.setter
+    def http_client(self, client: httpx.AsyncClient):
+        self._http_client = client
+
     async def analyze_competitors(
         self,
         our_menu: Dict[str, Any],
@@ -339,23 +357,96 @@ class CompetitorIntelligenceService:
         self,
         source: CompetitorSource,
     ) -> Optional[CompetitorMenu]:
-        """Extract menu from competitor website URL."""
+        """
+        Extract menu from competitor website URL.
+
+        The page is parsed locally first (schema.org menu data, price lines);
+        Gemini only sees the menu-bearing text, and only when the page has no
+        usable structured menu. Results are cached per URL and revalidated
+        with ETag / Last-Modified.
+        """
+
+        url = source.value
+        cache_key = f"competitor_url:{hashlib.sha256(url.encode('utf-8')).hexdigest()[:32]}"
 
         try:
-            # Fetch webpage content
-            response = await self.http_client.get(source.value)
+            cached = await self._get_cached_url_menu(cache_key)
+            if cached and not (cached.get("data") or {}).get("items"):
+                cached = None
+
+            # Fetch webpage content, conditionally when we have validators
+            headers = {}
+            if cached and cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached and cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+            response = await self.http_client.get(url, headers=headers)
+
+            if response.status_code == 304 and cached:
+                logger.info(f"Competitor page not modified, reusing menu for {url}")
+                return self._menu_from_url_data(cached["data"], source, cached["method"], cached=True)
             response.raise_for_status()
 
             html_content = response.text
+            content_hash = hashlib.sha256(html_content.encode("utf-8")).hexdigest()
+            record = {
+                "etag": response.headers.get("etag"),
+                "last_modified": response.headers.get("last-modified"),
+                "content_hash": content_hash,
+            }
+
+            if cached and cached.get("content_hash") == content_hash:
+                record.update(data=cached["data"], method=cached["method"])
+                await self._set_cached_url_menu(cache_key, record)
+                return self._menu_from_url_data(record["data"], source, record["method"], cached=True)
+
+            page = await asyncio.to_thread(extract_page_menu, html_content)
+
+            if page.has_structured_menu:
+                data = {
+                    "competitor_name": source.name or page.restaurant_name or "Unknown",
+                    "items": page.items,
+                    "categories": page.categories,
+                    "currency": page.currency or "MXN",
+                    "confidence": 0.95,
+                }
+                method = "structured_data"
+            else:
+                data = await self._extract_from_page_text(source, page)
+                method = "page_text"
 
-            # Use Gemini to extract menu from HTML
-            prompt = f"""Extract menu items from this restaurant webpage HTML.
+            # An empty answer is likely a transient LLM failure: retry next time
+            if data.get("items"):
+                record.update(data=data, method=method)
+                await self._set_cached_url_menu(cache_key, record)
+            return self._menu_from_url_data(data, source, method)
 
-URL: {source.value}
-Restaurant Name: {source.name or "Unknown"}
+        except Exception as e:
+            logger.error(f"URL extraction failed for {url}: {e}")
+            return None
+
+    async def _extract_from_page_text(
+        self,
+        source: CompetitorSource,
+        page: PageMenu,
+    ) -> Dict[str, Any]:
+        """Use Gemini on the menu-bearing text of a page."""
+
+        hints = ""
+        if page.items:
+            hints = (
+                "\nItems already found in the page's structured data:\n"
+                + json.dumps(page.items, ensure_ascii=False)
+                + "\n"
+            )
+
+        prompt = f"""Extract menu items from this restaurant webpage text.
 
-HTML Content (truncated):
-{html_content[:15000]}
+URL: {source.value}
+Restaurant Name: {source.name or page.restaurant_name or "Unknown"}
+{hints}
+Menu text (page lines with prices and their neighbours):
+{page.llm_text()}
 
 Extract all menu items with prices. Return JSON:
 {{
@@ -364,41 +455,60 @@ Extract all menu items with prices. Return JSON:
         {{"name": "Item", "price": 85.00, "category": "Category", "description": ""}}
     ],
     "categories": ["Category1", "Category2"],
-    "currency": "MXN",
+    "currency": "{page.currency or "MXN"}",
     "confidence": 0.8
 }}"""
 
-            result = await self.multimodal._generate_content(
-                prompt=prompt,
-                temperature=0.3,
-                max_output_tokens=8192,
-                feature="competitor_url_extraction",
-            )
+        result = await self.multimodal._generate_content(
+            prompt=prompt,
+            temperature=0.3,
+            max_output_tokens=8192,
+            feature="competitor_url_extraction",
+        )
 
-            data = self.multimodal._parse_json_response(result)
+        return self.multimodal._parse_json_response(result)
 
-            items = data.get("items", [])
-            prices = [item.get("price", 0) for item in items if item.get("price")]
+    def _menu_from_url_data(
+        self,
+        data: Dict[str, Any],
+        source: CompetitorSource,
+        method: str,
+        cached: bool = False,
+    ) -> CompetitorMenu:
+        items = data.get("items", [])
+        prices = [item.get("price", 0) for item in items if item.get("price")]
 
-            return CompetitorMenu(
-                competitor_name=data.get("competitor_name", source.name or "Unknown"),
-                items=items,
-                categories=data.get("categories", []),
-                price_range={
-                    "min": min(prices) if prices else 0,
-                    "max": max(prices) if prices else 0,
-                },
-                average_price=sum(prices) / len(prices) if prices else 0,
-                currency=data.get("currency", "MXN"),
-                source_type="url",
-                extraction_confidence=data.get("confidence", 0.6),
-                metadata={"url": source.value},
-            )
+        return CompetitorMenu(
+            competitor_name=data.get("competitor_name", source.name or "Unknown"),
+            items=items,
+            categories=data.get("categories", []),
+            price_range={
+                "min": min(prices) if prices else 0,
+                "max": max(prices) if prices else 0,
+            },
+            average_price=sum(prices) / len(prices) if prices else 0,
+            currency=data.get("currency", "MXN"),
+            source_type="url",
+            extraction_confidence=data.get("confidence", 0.6),
+            metadata={"url": source.value, "extraction_method": method, "cached": cached},
+        )
 
+    async def _get_cached_url_menu(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            cache = await get_cache_manager()
+            return await cache.get(key)
         except Exception as e:
-            logger.error(f"URL extraction failed for {source.value}: {e}")
+            logger.warning(f"Competitor URL cache read failed: {e}")
             return None
 
+    async def _set_cached_url_menu(self, key: str, record: Dict[str, Any]):
+        try:
+            cache = await get_cache_manager()
+            ttl = int(get_settings().competitor_url_cache_ttl_seconds)
+            await cache.set(key, record, l2_ttl=ttl, tags=["competitor_url"])
+        except Exception as e:
+            logger.warning(f"Competitor URL cache write failed: {e}")
+
     async def _extract_from_instagram(
         self,
         source: CompetitorSource,
@@ -831,5 +941,6 @@ Return JSON:
         return price_gaps
 
     async def close(self):
-        """Close HTTP client."""
-        await self.http_client.aclose()
+        """Close an injected HTTP client; the shared one closes on app shutdown."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
@@ -0,0 +1,308 @@
+"""
+Columnar sales storage and typed accessor.
+
+Sales uploads used to be stored as ``df.to_dict("records")`` inside the
+session JSON and ``AnalysisState.sales_data``, so every analysis re-parsed
+the whole list and looped over it in Python. Instead:
+- Each session's sales table is written once as a Parquet file (pickled
+  DataFrame when pyarrow is not installed) and sessions only keep a small
+  ``sales_ref`` document pointing at it
+- Reads are memory-mapped and cached per file modification time
+- ``SalesFrame`` wraps the table and resolves the column aliases the
+  analysis modules accept (``date``/``sale_date``, ``quantity``/``units_sold``
+  ...) into typed pandas/NumPy columns without copying the table
+
+Legacy list-of-dicts data (older sessions, inline test data) goes through
+the same accessor via ``SalesFrame.of``.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from app.core.config import get_settings
+from app.services.analysis.date_parsing import parse_dates
+
+try:
+    import pyarrow.parquet as pq
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+# Canonical field -> accepted column names, in lookup order
+COLUMN_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "item_name": ("item_name", "product_name"),
+    "sale_date": ("sale_date", "date", "fecha"),
+    "units_sold": ("units_sold", "quantity"),
+    "price": ("price",),
+    "cost": ("cost", "unit_cost"),
+    "revenue": ("revenue",),
+    "category": ("category",),
+}
+
+
+class SalesFrame:
+    """Read-only typed view over a sales table."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._dates: Optional[pd.Series] = None
+
+    @classmethod
+    def of(cls, data: Union["SalesFrame", pd.DataFrame, List[Dict[str, Any]], None]) -> "SalesFrame":
+        """Wrap sales data given as a SalesFrame, DataFrame or list of records."""
+        if isinstance(data, SalesFrame):
+            return data
+        if isinstance(data, pd.DataFrame):
+            return cls(data)
+        return cls(pd.DataFrame.from_records(list(data or [])))
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def __bool__(self) -> bool:
+        return len(self.df) > 0
+
+    def resolve(self, field: str) -> Optional[str]:
+        """Name of the first column present for a canonical field."""
+        for name in COLUMN_ALIASES.get(field, (field,)):
+            if name in self.df.columns:
+                return name
+        return None
+
+    def has(self, field: str) -> bool:
+        return self.resolve(field) is not None
+
+    def text(self, field: str) -> pd.Series:
+        """String column with missing values as empty strings."""
+        name = self.resolve(field)
+        if name is None:
+            return pd.Series("", index=self.df.index, dtype=object)
+        column = self.df[name]
+        return column.where(column.notna(), "").astype(str)
+
+    def numeric(self, field: str) -> np.ndarray:
+        """
+        Numeric column with missing values as 0.
+
+        Like ``record.get(a) or record.get(b)``, a zero or missing value
+        falls back to the next alias. Integer-valued columns come back as
+        int64 so totals keep the type the record dicts had.
+        """
+        values: Optional[np.ndarray] = None
+        for name in COLUMN_ALIASES.get(field, (field,)):
+            if name not in self.df.columns:
+                continue
+            column = pd.to_numeric(self.df[name], errors="coerce").to_numpy(
+                dtype=np.float64, na_value=np.nan
+            )
+            column = np.nan_to_num(column, nan=0.0)
+            values = column if values is None else np.where(values != 0, values, column)
+        if values is None:
+            return np.zeros(len(self.df), dtype=np.int64)
+        if np.all(np.mod(values, 1) == 0):
+            return values.astype(np.int64)
+        return values
+
+    @property
+    def dates(self) -> pd.Series:
+        """Sale dates as datetime64 (NaT where missing or unparseable), parsed once."""
+        if self._dates is None:
+            name = self.resolve("sale_date")
+            if name is None:
+                self._dates = pd.Series(pd.NaT, index=self.df.index, dtype="datetime64[ns]")
+            else:
+                self._dates = parse_dates(self.df[name])
+        return self._dates
+
+    def flag(self, field: str) -> np.ndarray:
+        """Boolean column; strings like "true"/"1"/"yes" count as set."""
+        if field not in self.df.columns:
+            return np.zeros(len(self.df), dtype=bool)
+        column = self.df[field]
+        if pd.api.types.is_bool_dtype(column) or pd.api.types.is_numeric_dtype(column):
+            return column.fillna(0).astype(bool).to_numpy()
+        text = column.astype(str).str.strip().str.lower()
+        return text.isin(("true", "1", "1.0", "yes", "si", "sí")).to_numpy()
+
+    def last_days(self, days: Optional[int]) -> "SalesFrame":
+        """
+        Records within ``days`` of the latest sale date (all records when
+        ``days`` is None or nothing is dated).
+        """
+        dates = self.dates
+        if days is None or not dates.notna().any():
+            return self
+        return self.select((dates >= dates.max() - pd.Timedelta(days=days)).to_numpy())
+
+    def select(self, mask: np.ndarray) -> "SalesFrame":
+        """Rows where ``mask`` is set, keeping the already parsed dates."""
+        window = SalesFrame(self.df[mask])
+        if self._dates is not None:
+            window._dates = self._dates[mask]
+        return window
+
+    def to_records(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Record dicts in the shape the legacy list-of-dicts consumers expect."""
+        df = self.df if limit is None else self.df.head(limit)
+        out = df.copy()
+        for name in out.columns:
+            if pd.api.types.is_datetime64_any_dtype(out[name]):
+                out[name] = out[name].dt.strftime("%Y-%m-%d")
+        out = out.astype(object).where(out.notna(), None)
+        return out.to_dict("records")
+
+
+# Anything the analysis modules accept as sales input
+SalesData = Union[SalesFrame, pd.DataFrame, List[Dict[str, Any]]]
+
+
+class SalesFrameStore:
+    """Writes one columnar sales file per session and serves cached reads."""
+
+    def __init__(self, directory: Path, cache_size: int = 8):
+        self.directory = Path(directory)
+        self.cache_size = max(1, cache_size)
+        self._cache: "OrderedDict[str, Tuple[int, SalesFrame]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def write(
+        self,
+        key: str,
+        data: Union[SalesFrame, pd.DataFrame, List[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        """
+        Persist a sales table and return the reference document to keep in
+        the session.
+        """
+        frame = SalesFrame.of(data)
+        df = frame.df.copy()
+        date_col = frame.resolve("sale_date")
+        if date_col is not None:
+            df[date_col] = frame.dates.to_numpy()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path, fmt = self._write_file(key, df)
+
+        stored = SalesFrame(df)
+        with self._lock:
+            self._remember(str(path), path.stat().st_mtime_ns, stored)
+
+        dates = stored.dates
+        return {
+            "path": str(path),
+            "format": fmt,
+            "rows": len(df),
+            "columns": [str(c) for c in df.columns],
+            "start_date": dates.min().date().isoformat() if dates.notna().any() else None,
+            "end_date": dates.max().date().isoformat() if dates.notna().any() else None,
+        }
+
+    def read(self, ref: Dict[str, Any], columns: Optional[Sequence[str]] = None) -> SalesFrame:
+        """Load the sales table a reference points to."""
+        path = Path(ref["path"])
+        mtime = path.stat().st_mtime_ns
+        with self._lock:
+            cached = self._cache.get(str(path))
+            if cached and cached[0] == mtime:
+                self._cache.move_to_end(str(path))
+                self.hits += 1
+                frame = cached[1]
+                return SalesFrame(frame.df[list(columns)]) if columns else frame
+            self.misses += 1
+
+        if ref.get("format") == "parquet":
+            table = pq.read_table(path, memory_map=True)
+            df = table.to_pandas(split_blocks=True)
+        else:
+            df = pd.read_pickle(path)
+
+        frame = SalesFrame(df)
+        with self._lock:
+            self._remember(str(path), mtime, frame)
+        return SalesFrame(df[list(columns)]) if columns else frame
+
+    def delete(self, key: str):
+        for suffix in (".parquet", ".pkl"):
+            path = self._path(key, suffix)
+            with self._lock:
+                self._cache.pop(str(path), None)
+            path.unlink(missing_ok=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "cached_frames": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "parquet": PYARROW_AVAILABLE,
+        }
+
+    def _write_file(self, key: str, df: pd.DataFrame) -> Tuple[Path, str]:
+        if PYARROW_AVAILABLE:
+            path = self._path(key, ".parquet")
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                df.to_parquet(tmp_path, engine="pyarrow", index=False)
+                os.replace(tmp_path, path)
+                self._path(key, ".pkl").unlink(missing_ok=True)
+                return path, "parquet"
+            except Exception as e:
+                # Mixed-type object columns cannot be written as Arrow
+                tmp_path.unlink(missing_ok=True)
+                logger.warning(f"Parquet write failed for {key}, storing pickle: {e}")
+
+        path = self._path(key, ".pkl")
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+        self._path(key, ".parquet").unlink(missing_ok=True)
+        return path, "pickle"
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self.directory / (re.sub(r"[^A-Za-z0-9_-]", "_", key) + suffix)
+
+    def _remember(self, path: str, mtime: int, frame: SalesFrame):
+        self._cache[path] = (mtime, frame)
+        self._cache.move_to_end(path)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+
+# Global instance
+_sales_store: Optional[SalesFrameStore] = None
+
+
+def get_sales_store() -> SalesFrameStore:
+    """Get or create the sales frame store."""
+    global _sales_store
+    if _sales_store is None:
+        settings = get_settings()
+        _sales_store = SalesFrameStore(
+            Path(settings.sales_data_dir),
+            cache_size=int(settings.sales_frame_cache_size),
+        )
+    return _sales_store
+
+
+def load_sales(
+    sales_data: Optional[List[Dict[str, Any]]] = None,
+    sales_ref: Optional[Dict[str, Any]] = None,
+) -> SalesFrame:
+    """Sales for a session or state: the columnar file if referenced, else inline records."""
+    if sales_ref:
+        try:
+            return get_sales_store().read(sales_ref)
+        except FileNotFoundError:
+            logger.warning(f"Sales file {sales_ref.get('path')} is missing")
+    return SalesFrame.of(sales_data)
@@ -0,0 +1,136 @@
+"""
+Chunked reader for uploaded sales files (CSV/XLSX).
+
+Large POS exports are read in fixed-size chunks instead of one
+``read_csv``/``read_excel`` call. Column names are normalized once, the
+date format is inferred from the first chunk and reused for the rest, and
+each chunk's dates are parsed vectorized before the chunks are combined.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import pandas as pd
+from loguru import logger
+
+from app.services.analysis.date_parsing import infer_date_format, parse_dates
+
+try:
+    import openpyxl
+
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+
+REQUIRED_COLUMNS = ["date", "item_name", "units_sold"]
+
+COLUMN_ALTERNATIVES = {
+    "date": ["sale_date", "fecha"],
+    "item_name": ["item", "producto", "plato"],
+    "units_sold": ["units", "cantidad", "vendidos"],
+}
+
+
+class SalesFileError(ValueError):
+    """The uploaded file cannot be used as sales data."""
+
+
+@dataclass
+class SalesIngestResult:
+    df: pd.DataFrame
+    invalid_dates: int
+    date_format: Optional[str]
+    chunks: int
+
+
+def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Lower-case/underscore column names and map known alternatives."""
+    df.columns = df.columns.astype(str).str.lower().str.strip().str.replace(" ", "_")
+    renames = {}
+    for column in REQUIRED_COLUMNS:
+        if column in df.columns:
+            continue
+        for alt in COLUMN_ALTERNATIVES.get(column, []):
+            if alt in df.columns:
+                renames[alt] = column
+                break
+    return df.rename(columns=renames) if renames else df
+
+
+def iter_sales_chunks(path: Path, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Yield the file as DataFrames of at most ``chunk_rows`` rows."""
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+    elif OPENPYXL_AVAILABLE:
+        yield from _iter_xlsx_chunks(path, chunk_rows)
+    else:
+        yield pd.read_excel(path)
+
+
+def _iter_xlsx_chunks(path: Path, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    # Read-only mode streams rows instead of loading the whole workbook
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [
+            str(name) if name is not None else f"unnamed:_{i}"
+            for i, name in enumerate(header)
+        ]
+
+        batch: List[tuple] = []
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            batch.append(row[: len(columns)])
+            if len(batch) >= chunk_rows:
+                yield pd.DataFrame.from_records(batch, columns=columns)
+                batch = []
+        if batch:
+            yield pd.DataFrame.from_records(batch, columns=columns)
+    finally:
+        workbook.close()
+
+
+def read_sales_file(path: Path, chunk_rows: int = 100_000) -> SalesIngestResult:
+    """
+    Read a sales upload into one DataFrame with a datetime ``date`` column.
+
+    Rows whose date cannot be parsed are dropped and counted.
+
+    Raises:
+        SalesFileError: If required columns are missing
+    """
+    frames = []
+    invalid_dates = 0
+    date_format = None
+
+    for i, chunk in enumerate(iter_sales_chunks(path, chunk_rows)):
+        chunk = normalize_columns(chunk)
+        if i == 0:
+            missing = [c for c in REQUIRED_COLUMNS if c not in chunk.columns]
+            if missing:
+                raise SalesFileError(f"Missing required columns: {missing}")
+            date_format = infer_date_format(chunk["date"])
+
+        dates = parse_dates(chunk["date"], date_format)
+        valid = dates.notna()
+        invalid_dates += int((~valid).sum())
+        frames.append(chunk.assign(date=dates)[valid])
+
+    if not frames:
+        raise SalesFileError(f"Missing required columns: {REQUIRED_COLUMNS}")
+
+    df = pd.concat(frames, ignore_index=True)
+    logger.info(
+        f"Read {len(df)} sales rows from {Path(path).name} in {len(frames)} chunks "
+        f"(date format {date_format or 'mixed'}, {invalid_dates} invalid dates)"
+    )
+    return SalesIngestResult(
+        df=df, invalid_dates=invalid_dates, date_format=date_format, chunks=len(frames)
+    )
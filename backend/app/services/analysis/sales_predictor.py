@@ -3,7 +3,7 @@ Sales Prediction Service - ML-based forecasting for menu items.
 Uses XGBoost for time-series forecasting.
 """
 
-import asyncio
+import os
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional
@@ -13,6 +13,12 @@ import numpy as np
 import pandas as pd
 import xgboost as xgb
 from app.core.config import get_settings
+from app.services.analysis.name_matching import (
+    match_menu_to_sales,
+    rekey_to_sales_names,
+    sales_item_names,
+)
+from app.services.analysis.sales_frame import SalesData, SalesFrame
 from loguru import logger
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 from sklearn.model_selection import train_test_split
@@ -23,8 +29,9 @@ class SalesPredictor:
 
     MODEL_PATH = "data/models/sales_predictor.joblib"
 
-    def __init__(self):
+    def __init__(self, model_path: Optional[str] = None):
         self.settings = get_settings()
+        self.model_path = model_path or self.MODEL_PATH
         self.model: Optional[xgb.XGBRegressor] = None
         self.feature_columns = [
             "day_of_week",
@@ -41,11 +48,21 @@ class SalesPredictor:
         self.model_metrics: Dict[str, float] = {}
         self._load_model()
 
+    @property
+    def is_trained(self) -> bool:
+        return self.model is not None
+
+    def footprint_bytes(self) -> int:
+        """Approximate in-memory size of the fitted model."""
+        if self.model is None:
+            return 0
+        return len(self.model.get_booster().save_raw(raw_format="ubj"))
+
     def _load_model(self):
         """Load pre-trained model if exists."""
-        if Path(self.MODEL_PATH).exists():
+        if Path(self.model_path).exists():
             try:
-                data = joblib.load(self.MODEL_PATH)
+                data = joblib.load(self.model_path)
                 self.model = data["model"]
                 self.model_metrics = data.get("metrics", {})
                 logger.info("Loaded existing sales prediction model")
@@ -53,37 +70,55 @@ class SalesPredictor:
                 logger.warning(f"Could not load model: {e}")
 
     def _save_model(self):
-        """Save trained model."""
-        Path(self.MODEL_PATH).parent.mkdir(parents=True, exist_ok=True)
+        """Save trained model, replacing the previous file atomically."""
+        path = Path(self.model_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
         joblib.dump(
             {
                 "model": self.model,
                 "features": self.feature_columns,
                 "metrics": self.model_metrics,
             },
-            self.MODEL_PATH,
+            tmp_path,
         )
+        os.replace(tmp_path, path)
 
     async def train(
         self,
-        sales_data: List[Dict[str, Any]],
+        sales_data: SalesData,
         menu_items: List[Dict[str, Any]],
         image_scores: Optional[Dict[str, float]] = None,
+        name_matches: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
-        """Train the prediction model on provided data."""
+        """
+        Train the prediction model on provided data.
 
-        logger.info(f"Training predictor with {len(sales_data)} records")
+        Menu prices and image scores are looked up for sales records through
+        the menu -> sales name matches (``name_matches`` is the optional
+        session table, see ``match_menu_to_sales``).
+        """
+
+        sales = SalesFrame.of(sales_data)
+        logger.info(f"Training predictor with {len(sales)} records")
         start_time = datetime.now()
 
         # OPTIMIZATION: Limit training data to most recent 5000 records to prevent timeouts
-        if len(sales_data) > 5000:
+        if len(sales) > 5000:
             logger.info("Sampling most recent 5000 records for training")
             # Assuming sales_data might not be sorted, but usually comes from DB
             # We'll just take the last 5000 if we assume append order, or random sample
-            sales_data = sales_data[-5000:]
+            sales = SalesFrame(sales.df.iloc[-5000:])
 
-        price_lookup = {item["name"]: item.get("price", 0) for item in menu_items}
-        df = self._prepare_training_data(sales_data, price_lookup, image_scores)
+        matches = match_menu_to_sales(
+            [item["name"] for item in menu_items], sales_item_names(sales), name_matches
+        )
+        price_lookup = rekey_to_sales_names(
+            {item["name"]: item.get("price", 0) for item in menu_items}, matches
+        )
+        df = self._prepare_training_data(
+            sales, price_lookup, rekey_to_sales_names(image_scores or {}, matches)
+        )
 
         if len(df) < 10:
             logger.warning("Insufficient data, generating synthetic data")
@@ -145,26 +180,12 @@ class SalesPredictor:
             return {"error": "Model not trained", "predictions": []}
 
         scenarios = scenarios or [{"name": "baseline"}]
-        results = {}
-        start_date = datetime.now(timezone.utc).date()
-
-        for scenario in scenarios:
-            scenario_name = scenario.get("name", "baseline")
-            predictions = []
-
-            for day_offset in range(horizon_days):
-                pred_date = start_date + timedelta(days=day_offset)
-                features = self._build_features(
-                    pred_date, base_features, scenario, predictions
-                )
-                X = pd.DataFrame([features])[self.feature_columns].fillna(0)
-
-                # Run prediction directly
-                pred_array = self.model.predict(X)
-                pred = float(max(0, pred_array[0]))
-                predictions.append(round(pred, 1))
+        forecast = self._forecast([base_features], scenarios, horizon_days)[0]
 
-            results[scenario_name] = {
+        results = {}
+        for j, scenario in enumerate(scenarios):
+            predictions = forecast[j].tolist()
+            results[scenario.get("name", "baseline")] = {
                 "daily_predictions": predictions,
                 "total_units": float(round(sum(predictions))),
                 "avg_daily": float(round(sum(predictions) / horizon_days, 1)),
@@ -177,81 +198,49 @@ class SalesPredictor:
             "model_accuracy_mae": self.model_metrics.get("mae", 0),
         }
 
-    def _parse_date_flexible(self, date_val):
-        """Parse date from various formats including DD-MM-YY."""
-        if date_val is None:
-            return None
-        if hasattr(date_val, "date"):
-            return date_val.date()
-        if not isinstance(date_val, str):
-            date_val = str(date_val)
-
-        date_str = date_val.strip()
-
-        # Try multiple date formats
-        formats = [
-            "%Y-%m-%d",  # YYYY-MM-DD (ISO) - most common after conversion
-            "%d-%m-%y",  # DD-MM-YY (sample data format)
-            "%d-%m-%Y",  # DD-MM-YYYY
-            "%d/%m/%y",  # DD/MM/YY
-            "%d/%m/%Y",  # DD/MM/YYYY
-            "%m/%d/%Y",  # MM/DD/YYYY (US)
-            "%Y/%m/%d",  # YYYY/MM/DD
-        ]
-
-        for fmt in formats:
-            try:
-                return datetime.strptime(date_str, fmt).date()
-            except (ValueError, TypeError):
-                continue
-
-        # Try ISO format with timezone
-        try:
-            return datetime.fromisoformat(date_str.replace("Z", "+00:00")).date()
-        except (ValueError, TypeError):
-            pass
-
-        return None
-
-    def _prepare_training_data(self, sales_data, price_lookup, image_scores):
-        """Prepare training DataFrame from sales records."""
-        records = []
-        for sale in sales_data:
-            item_name = sale.get("item_name") or sale.get("product_name")
-            # Support multiple date column names
-            sale_date = sale.get("sale_date") or sale.get("date") or sale.get("fecha")
-            if not item_name or not sale_date:
-                continue
-
-            sale_date = self._parse_date_flexible(sale_date)
-            if sale_date is None:
-                continue
-
-            # Get units sold - support both column names
-            units = int(sale.get("units_sold") or sale.get("quantity") or 1)
-
-            # Get price from sale record or lookup
-            price = float(sale.get("price") or price_lookup.get(item_name, 0) or 0)
-
-            records.append(
-                {
-                    "item_name": item_name,
-                    "date": sale_date,
-                    "units_sold": units,
-                    "day_of_week": sale_date.weekday(),
-                    "is_weekend": 1 if sale_date.weekday() >= 5 else 0,
-                    "price": price,
-                    "promo_flag": (
-                        1 if sale.get("had_promotion") or sale.get("es_festivo") else 0
-                    ),
-                    "promo_discount": float(sale.get("promotion_discount", 0) or 0),
-                    "image_score": (image_scores or {}).get(item_name, 0.5),
-                }
-            )
-
-        df = pd.DataFrame(records)
-        if len(df) == 0:
-            return df
+    def _prepare_training_data(
+        self,
+        sales: SalesFrame,
+        price_lookup: Dict[str, float],
+        image_scores: Optional[Dict[str, float]],
+    ) -> pd.DataFrame:
+        """Prepare training DataFrame from a sales table."""
+        item_names = sales.text("item_name")
+        dates = sales.dates
+        keep = ((item_names != "") & dates.notna()).to_numpy()
+        if not keep.any():
+            return pd.DataFrame()
+
+        item_names = item_names[keep]
+        dates = dates[keep].dt.normalize()
+        day_of_week = dates.dt.dayofweek.to_numpy()
+
+        # Missing units count as one sale; missing prices come from the menu
+        units = sales.numeric("units_sold")[keep]
+        units = np.where(units == 0, 1, units).astype(np.int64)
+        price = sales.numeric("price")[keep].astype(np.float64)
+        menu_price = pd.to_numeric(
+            item_names.map(price_lookup), errors="coerce"
+        ).fillna(0).to_numpy(dtype=np.float64)
+        price = np.where(price == 0, menu_price, price)
+
+        df = pd.DataFrame(
+            {
+                "item_name": item_names.to_numpy(),
+                "date": dates.to_numpy(),
+                "units_sold": units,
+                "day_of_week": day_of_week,
+                "is_weekend": (day_of_week >= 5).astype(np.int64),
+                "price": price,
+                "promo_flag": (
+                    sales.flag("had_promotion")[keep] | sales.flag("es_festivo")[keep]
+                ).astype(np.int64),
+                "promo_discount": sales.numeric("promotion_discount")[keep].astype(np.float64),
+                "image_score": item_names.map(image_scores or {})
+                .fillna(0.5)
+                .to_numpy(dtype=np.float64),
+            }
+        )
 
         df = df.sort_values(["item_name", "date"])
         df["rolling_avg_7d"] = df.groupby("item_name")["units_sold"].transform(
@@ -317,6 +306,86 @@ class SalesPredictor:
         df["lag_7d"] = df.groupby("item_name")["units_sold"].shift(7).fillna(0)
         return df
 
+    def _forecast(
+        self,
+        base_features: List[Dict[str, Any]],
+        scenarios: List[Dict[str, Any]],
+        horizon_days: int,
+    ) -> np.ndarray:
+        """
+        Forecast every (item, scenario) pair over the horizon at once.
+
+        Static features for all (item, scenario, day) triples are laid out in
+        one matrix up front. The autoregressive features (rolling average and
+        lags over earlier predictions) are then filled in column-wise for all
+        rows per day, so the booster runs once per day instead of once per
+        item, scenario and day. Values match ``_build_features`` step by step.
+
+        Returns:
+            Array of shape (items, scenarios, horizon_days), rounded to 0.1
+        """
+        n_items, n_scenarios = len(base_features), len(scenarios)
+        n_rows = n_items * n_scenarios
+        col = {name: i for i, name in enumerate(self.feature_columns)}
+        start_date = datetime.now(timezone.utc).date()
+
+        # Per-item and per-scenario inputs, broadcast to (items, scenarios)
+        base_price = np.array([f.get("price", 15) for f in base_features], dtype=float)
+        base_image = np.array([f.get("image_score", 0.5) for f in base_features], dtype=float)
+        price_change = np.array(
+            [s.get("price_change_percent", 0) / 100 for s in scenarios], dtype=float
+        )
+        promo = np.array([bool(s.get("promotion_active", False)) for s in scenarios])
+        discount = np.array(
+            [s.get("promotion_discount", 0) if p else 0 for s, p in zip(scenarios, promo)],
+            dtype=float,
+        )
+        boost = np.array([s.get("marketing_boost", 1.0) for s in scenarios], dtype=float)
+
+        # Seed values used until a full week of predictions exists
+        rolling_7d_base = np.repeat(
+            np.array([f.get("rolling_avg_7d", 10) for f in base_features], dtype=float),
+            n_scenarios,
+        )
+        has_30d = np.repeat(
+            np.array(["rolling_avg_30d" in f for f in base_features]), n_scenarios
+        )
+        rolling_30d_base = np.repeat(
+            np.array([f.get("rolling_avg_30d", 0) for f in base_features], dtype=float),
+            n_scenarios,
+        )
+
+        static = np.zeros((n_rows, len(self.feature_columns)))
+        static[:, col["price"]] = (base_price[:, None] * (1 + price_change)[None, :]).ravel()
+        static[:, col["promo_flag"]] = np.tile(promo.astype(float), n_items)
+        static[:, col["promo_discount"]] = np.tile(discount, n_items)
+        static[:, col["image_score"]] = np.minimum(
+            1.0, base_image[:, None] * boost[None, :]
+        ).ravel()
+
+        predictions = np.zeros((n_rows, horizon_days))
+        X = static.copy()
+        for day in range(horizon_days):
+            weekday = (start_date + timedelta(days=day)).weekday()
+            X[:, col["day_of_week"]] = weekday
+            X[:, col["is_weekend"]] = 1 if weekday >= 5 else 0
+
+            if day >= 7:
+                rolling_7d = predictions[:, day - 7:day].sum(axis=1) / 7
+                lag_7d = predictions[:, day - 7]
+            else:
+                rolling_7d = rolling_7d_base
+                lag_7d = rolling_7d
+            X[:, col["rolling_avg_7d"]] = rolling_7d
+            X[:, col["rolling_avg_30d"]] = np.where(has_30d, rolling_30d_base, rolling_7d)
+            X[:, col["lag_1d"]] = predictions[:, day - 1] if day >= 1 else rolling_7d
+            X[:, col["lag_7d"]] = lag_7d
+
+            day_pred = self.model.predict(np.nan_to_num(X).astype(np.float32))
+            predictions[:, day] = np.round(np.maximum(0, day_pred.astype(float)), 1)
+
+        return predictions.reshape(n_items, n_scenarios, horizon_days)
+
     def _build_features(self, date, base_features, scenario, previous_predictions):
         """Build feature dict for a single prediction."""
         price_change = scenario.get("price_change_percent", 0) / 100
@@ -372,22 +441,19 @@ class SalesPredictor:
             s.get("name", f"scenario_{i}"): 0 for i, s in enumerate(scenarios)
         }
 
-        for i, item in enumerate(items):
-            # Yield to event loop every 5 items to keep server responsive
-            if i > 0 and i % 5 == 0:
-                await asyncio.sleep(0)
-
-            base_features = {
+        base_features = [
+            {
                 "price": item.get("price", 15),
                 "image_score": item.get("image_score", 0.5),
                 "rolling_avg_7d": item.get("avg_daily_units", 10),
                 "rolling_avg_30d": item.get("avg_daily_units", 10),
             }
+            for item in items
+        ]
+        scenario_names = [s.get("name", "baseline") for s in scenarios]
+        forecast = self._forecast(base_features, scenarios, horizon_days) if items else None
 
-            prediction = await self.predict(
-                item["name"], horizon_days, base_features, scenarios
-            )
-
+        for i, item in enumerate(items):
             # Build item prediction with all scenario totals for easier frontend use
             item_pred = {
                 "name": item["name"],
@@ -396,13 +462,12 @@ class SalesPredictor:
             }
 
             # Add each scenario's total to the item prediction
-            for scenario_name, data in prediction.get("predictions", {}).items():
-                item_pred[scenario_name] = {
-                    "total": data.get("total_units", 0),
-                    "daily": data.get("daily_predictions", []),
-                }
+            for j, scenario_name in enumerate(scenario_names):
+                daily = forecast[i, j].tolist()
+                total = float(round(sum(daily)))
+                item_pred[scenario_name] = {"total": total, "daily": daily}
                 if scenario_name in scenario_totals:
-                    scenario_totals[scenario_name] += data.get("total_units", 0)
+                    scenario_totals[scenario_name] += total
 
             item_predictions.append(item_pred)
 
@@ -0,0 +1,379 @@
+"""
+Delta checkpoint storage for orchestrator state.
+
+Every checkpoint used to serialize the whole AnalysisState (sales records,
+menu items, traces, campaigns) twice: to ``data/orchestrator_states`` and
+into ``MarathonCheckpoint.state_data``. Here each large top-level field is
+stored as a content-addressed blob, and a checkpoint is a small manifest
+document holding the small fields inline plus ``_refs: {field: digest}``.
+Writing a checkpoint only persists the blobs whose content changed;
+restoring one resolves its references.
+
+Layout:
+- Disk: ``<storage_dir>/<session_id>.json`` holds the manifest, blobs live
+  in ``<storage_dir>/blobs/<digest[:2]>/<digest>.json``
+- Database: manifests in ``MarathonCheckpoint.state_data``, blobs in
+  ``CheckpointBlob``
+
+Compaction keeps restorable manifests only on the latest checkpoints of a
+session and garbage-collects blobs only the dropped manifests referenced.
+"""
+
+import asyncio
+import dataclasses
+import hashlib
+import json
+import os
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+from sqlalchemy import String, cast, delete, or_, select, update
+
+from app.models.analysis import CheckpointBlob, MarathonCheckpoint
+
+STATE_FORMAT = "delta-v1"
+
+# Fields serializing to at most this many bytes stay inline in the manifest
+INLINE_MAX_BYTES = 512
+
+# field -> (digest, JSON payload)
+EncodedState = Dict[str, Tuple[str, str]]
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    # numpy scalars, Decimals, ... (the DB snapshot always used default=str)
+    return str(obj)
+
+
+def encode_state(state: Any) -> EncodedState:
+    """Serialize each field of a state dataclass and hash it."""
+    encoded = {}
+    for f in dataclasses.fields(state):
+        payload = json.dumps(
+            getattr(state, f.name), default=_json_default, separators=(",", ":")
+        )
+        encoded[f.name] = (hashlib.sha256(payload.encode()).hexdigest(), payload)
+    return encoded
+
+
+def build_manifest(encoded: EncodedState) -> Dict[str, Any]:
+    """Manifest document: small fields inline, large ones as ``_refs`` digests."""
+    manifest: Dict[str, Any] = {"_format": STATE_FORMAT, "_refs": {}}
+    for name, (digest, payload) in encoded.items():
+        if len(payload) <= INLINE_MAX_BYTES:
+            manifest[name] = json.loads(payload)
+        else:
+            manifest["_refs"][name] = digest
+    return manifest
+
+
+def is_manifest(data: Any) -> bool:
+    return isinstance(data, dict) and data.get("_format") == STATE_FORMAT
+
+
+def _inline_fields(manifest: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in manifest.items() if not k.startswith("_")}
+
+
+class CheckpointStore:
+    """Writes and restores delta checkpoints on disk and in the database."""
+
+    def __init__(
+        self,
+        storage_dir: Path,
+        retained_states: int = 3,
+        compact_every: int = 50,
+    ):
+        self.storage_dir = Path(storage_dir)
+        self.retained_states = max(1, retained_states)
+        self.compact_every = max(1, compact_every)
+
+        # Blob refs last written per session, so unchanged fields are skipped
+        self._disk_refs: Dict[str, Dict[str, str]] = {}
+        self._db_refs: Dict[str, Dict[str, str]] = {}
+        self._disk_writes = 0
+        self._db_writes = 0
+        self._db_lock: Optional[asyncio.Lock] = None
+
+        self.bytes_written = 0
+        self.bytes_skipped = 0
+
+    # ==================== Disk ====================
+
+    @property
+    def blob_dir(self) -> Path:
+        return self.storage_dir / "blobs"
+
+    def save_to_disk(self, session_id: str, encoded: EncodedState) -> List[str]:
+        """
+        Persist a state to disk, writing only blobs that are new.
+
+        Returns:
+            Names of the blob fields whose content changed
+        """
+        manifest = build_manifest(encoded)
+        changed = self._changed_refs(self._disk_refs.get(session_id, {}), encoded, manifest)
+        for name in changed:
+            digest, payload = encoded[name]
+            path = self._blob_path(digest)
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                self._atomic_write(path, payload)
+                self.bytes_written += len(payload)
+
+        manifest["_saved_at"] = datetime.utcnow().isoformat()
+        self._atomic_write(
+            self._manifest_path(session_id),
+            json.dumps(manifest, separators=(",", ":")),
+        )
+        self._disk_refs[session_id] = manifest["_refs"]
+
+        self._disk_writes += 1
+        if self._disk_writes % self.compact_every == 0:
+            self.compact_disk()
+        return changed
+
+    def load_from_disk(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Rebuild the state dict for a session, or None if not stored."""
+        path = self._manifest_path(session_id)
+        if not path.exists():
+            return None
+
+        with open(path, "r") as f:
+            data = json.load(f)
+        if not is_manifest(data):
+            return data  # Legacy full snapshot
+
+        state = _inline_fields(data)
+        for name, digest in data["_refs"].items():
+            with open(self._blob_path(digest), "r") as f:
+                state[name] = json.load(f)
+        self._disk_refs[session_id] = data["_refs"]
+        return state
+
+    def compact_disk(self) -> int:
+        """Delete blobs that no session manifest references."""
+        referenced: Set[str] = set()
+        for path in self.storage_dir.glob("*.json"):
+            try:
+                with open(path, "r") as f:
+                    data = json.load(f)
+            except Exception:
+                continue
+            if is_manifest(data):
+                referenced.update(data["_refs"].values())
+        for refs in self._disk_refs.values():
+            referenced.update(refs.values())
+
+        removed = 0
+        for path in self.blob_dir.glob("*/*.json"):
+            if path.stem not in referenced:
+                path.unlink(missing_ok=True)
+                removed += 1
+        if removed:
+            logger.debug(f"Checkpoint store removed {removed} unreferenced disk blobs")
+        return removed
+
+    # ==================== Database ====================
+
+    async def save_to_db(
+        self,
+        db: Any,
+        session_id: str,
+        encoded: EncodedState,
+        compact: bool = False,
+        **checkpoint_fields: Any,
+    ) -> MarathonCheckpoint:
+        """
+        Insert a checkpoint row referencing per-field blobs.
+
+        Only blobs missing from the table are inserted. ``checkpoint_fields``
+        are passed to ``MarathonCheckpoint`` (stage, status, error, ...).
+        """
+        async with self._lock():
+            manifest = build_manifest(encoded)
+            changed = self._changed_refs(self._db_refs.get(session_id, {}), encoded, manifest)
+            if changed:
+                candidates = {encoded[name][0]: encoded[name][1] for name in changed}
+                existing = set(
+                    (
+                        await db.execute(
+                            select(CheckpointBlob.digest).where(
+                                CheckpointBlob.digest.in_(list(candidates))
+                            )
+                        )
+                    ).scalars()
+                )
+                for digest, payload in candidates.items():
+                    if digest not in existing:
+                        db.add(CheckpointBlob(digest=digest, data=payload, size=len(payload)))
+                        self.bytes_written += len(payload)
+
+            manifest["_changed"] = changed
+            checkpoint = MarathonCheckpoint(
+                session_id=session_id,
+                state_data=manifest,
+                **checkpoint_fields,
+            )
+            db.add(checkpoint)
+            await db.commit()
+            self._db_refs[session_id] = manifest["_refs"]
+
+            self._db_writes += 1
+            if compact or self._db_writes % self.compact_every == 0:
+                await self._compact_db(db, session_id)
+            return checkpoint
+
+    async def load_latest_from_db(self, db: Any, session_id: str) -> Optional[Dict[str, Any]]:
+        """Rebuild the state dict from a session's most recent checkpoint."""
+        result = await db.execute(
+            select(MarathonCheckpoint)
+            .where(MarathonCheckpoint.session_id == session_id)
+            .order_by(MarathonCheckpoint.timestamp.desc(), MarathonCheckpoint.id.desc())
+            .limit(1)
+        )
+        last_cp = result.scalar_one_or_none()
+        if not last_cp:
+            return None
+
+        data = last_cp.state_data
+        if not is_manifest(data):
+            return data  # Legacy full snapshot
+
+        refs = data["_refs"]
+        rows = await db.execute(
+            select(CheckpointBlob.digest, CheckpointBlob.data).where(
+                CheckpointBlob.digest.in_(set(refs.values()))
+            )
+        )
+        blobs = dict(rows.all())
+        missing = set(refs.values()) - blobs.keys()
+        if missing:
+            raise LookupError(f"Checkpoint for {session_id} references {len(missing)} missing blobs")
+
+        state = _inline_fields(data)
+        state.update({name: json.loads(blobs[digest]) for name, digest in refs.items()})
+        self._db_refs[session_id] = refs
+        return state
+
+    async def _compact_db(self, db: Any, session_id: str) -> int:
+        """
+        Drop manifests from all but the latest checkpoints of ``session_id``
+        (their stage/status history is kept), then delete the blobs those
+        manifests referenced that no remaining manifest still uses.
+        Caller holds the lock.
+        """
+        rows = (
+            await db.execute(
+                select(MarathonCheckpoint.id, MarathonCheckpoint.state_data)
+                .where(MarathonCheckpoint.session_id == session_id)
+                .order_by(MarathonCheckpoint.timestamp.desc(), MarathonCheckpoint.id.desc())
+            )
+        ).all()
+        retained, stale = rows[: self.retained_states], rows[self.retained_states :]
+
+        candidates: Set[str] = set()
+        for _, state_data in stale:
+            if is_manifest(state_data):
+                candidates.update(state_data.get("_refs", {}).values())
+        for _, state_data in retained:
+            if is_manifest(state_data):
+                candidates.difference_update(state_data.get("_refs", {}).values())
+
+        stale_ids = [row_id for row_id, _ in stale]
+        if stale_ids:
+            await db.execute(
+                update(MarathonCheckpoint)
+                .where(MarathonCheckpoint.id.in_(stale_ids))
+                .values(state_data={"_format": STATE_FORMAT, "_compacted": True})
+            )
+
+        # Blobs are shared by digest, so only fetch other sessions' manifests
+        # that mention one of this session's candidates
+        if candidates:
+            shared = await db.execute(
+                select(MarathonCheckpoint.state_data).where(
+                    MarathonCheckpoint.session_id != session_id,
+                    or_(
+                        *(
+                            cast(MarathonCheckpoint.state_data, String).contains(digest)
+                            for digest in candidates
+                        )
+                    ),
+                )
+            )
+            for (state_data,) in shared:
+                if is_manifest(state_data):
+                    candidates.difference_update(state_data.get("_refs", {}).values())
+
+        orphans = list(candidates)
+        for start in range(0, len(orphans), 500):
+            await db.execute(
+                delete(CheckpointBlob).where(
+                    CheckpointBlob.digest.in_(orphans[start:start + 500])
+                )
+            )
+        await db.commit()
+
+        if orphans or stale_ids:
+            logger.debug(
+                f"Checkpoint store compacted {len(stale_ids)} checkpoints and "
+                f"{len(orphans)} blobs for session {session_id}"
+            )
+        return len(orphans)
+
+    # ==================== Helpers ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "disk_writes": self._disk_writes,
+            "db_writes": self._db_writes,
+            "bytes_written": self.bytes_written,
+            "bytes_skipped": self.bytes_skipped,
+        }
+
+    def forget(self, session_id: str):
+        """Drop cached refs so the next save re-checks every blob."""
+        self._disk_refs.pop(session_id, None)
+        self._db_refs.pop(session_id, None)
+
+    def _changed_refs(
+        self,
+        previous: Dict[str, str],
+        encoded: EncodedState,
+        manifest: Dict[str, Any],
+    ) -> List[str]:
+        changed = []
+        for name, digest in manifest["_refs"].items():
+            if previous.get(name) == digest:
+                self.bytes_skipped += len(encoded[name][1])
+            else:
+                changed.append(name)
+        return changed
+
+    def _lock(self) -> asyncio.Lock:
+        if self._db_lock is None:
+            self._db_lock = asyncio.Lock()
+        return self._db_lock
+
+    def _manifest_path(self, session_id: str) -> Path:
+        return self.storage_dir / f"{session_id}.json"
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.blob_dir / digest[:2] / f"{digest}.json"
+
+    @staticmethod
+    def _atomic_write(path: Path, payload: str):
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "w") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
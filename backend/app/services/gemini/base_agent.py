@@ -8,12 +8,14 @@ function calling capabilities for multi-step reasoning and verification.
 import asyncio
 import base64
 import functools
+import hashlib
 import json
 import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, TypeVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar, Union
 from datetime import datetime
 
 from google import genai
@@ -22,7 +24,14 @@ from loguru import logger
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from app.core.config import get_settings
+from app.core.gemini_executor import (
+    GeminiRequestExecutor,
+    RequestPriority,
+    get_gemini_executor,
+)
+from app.core.image_batch import analyze_image_batch
 from app.core.rate_limiter import get_rate_limiter
+from app.core.single_flight import get_single_flight
 from app.core.model_fallback import get_fallback_handler
 
 
@@ -80,16 +89,150 @@ class RateLimiter:
 
 
 class GeminiCache:
-    """Simple in-memory cache for Gemini responses."""
+    """
+    Bounded in-memory cache for Gemini responses.
+
+    Entries are keyed by a content hash of everything that affects the
+    output (see ``make_key``), evicted least-recently-used once the byte
+    budget is exceeded, and dropped after ``ttl_seconds``.
+    """
 
-    def __init__(self):
-        self._cache: Dict[str, Any] = {}
+    ENTRY_OVERHEAD_BYTES = 256
+
+    def __init__(self, max_bytes: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        settings = get_settings()
+        if max_bytes is None:
+            max_bytes = int(settings.gemini_cache_max_size_mb) * 1024 * 1024
+        if ttl_seconds is None:
+            ttl_seconds = float(settings.gemini_cache_ttl_seconds)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        # key -> (value, size_bytes, tokens, expires_at), oldest first
+        self._cache: "OrderedDict[str, Tuple[Any, int, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.bytes_saved = 0
+        self.tokens_saved = 0
+
+    @staticmethod
+    def make_key(
+        prompt: str,
+        model: str,
+        thinking_level: Optional[str] = None,
+        config: Optional[Dict[str, Any]] = None,
+        images: Optional[List[bytes]] = None,
+        namespace: str = "generate",
+    ) -> str:
+        """Content-addressed key over every input that shapes the response."""
+        digest = hashlib.sha256()
+        for part in (namespace, model, thinking_level or "", prompt):
+            digest.update(str(part).encode("utf-8"))
+            digest.update(b"\x00")
+        digest.update(
+            json.dumps(config or {}, sort_keys=True, default=_stable_repr).encode("utf-8")
+        )
+        for image in images or []:
+            digest.update(hashlib.sha256(image).digest())
+        return digest.hexdigest()
 
     def get(self, key: str) -> Optional[Any]:
-        return self._cache.get(key)
+        entry = self._cache.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, size, tokens, expires_at = entry
+        if time.monotonic() >= expires_at:
+            self._drop(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._cache.move_to_end(key)
+        self.hits += 1
+        self.bytes_saved += size
+        self.tokens_saved += tokens
+        return value
+
+    def set(self, key: str, value: Any, size_bytes: Optional[int] = None, tokens: int = 0):
+        if size_bytes is None:
+            size_bytes = len(json.dumps(value, default=str).encode("utf-8"))
+        size_bytes += self.ENTRY_OVERHEAD_BYTES
+        if size_bytes > self.max_bytes:
+            return
+
+        if key in self._cache:
+            self._drop(key)
+        self._cache[key] = (value, size_bytes, tokens, time.monotonic() + self.ttl_seconds)
+        self._bytes += size_bytes
+
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._cache))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def clear(self):
+        self._cache.clear()
+        self._bytes = 0
+
+    def _drop(self, key: str):
+        _, size, _, _ = self._cache.pop(key)
+        self._bytes -= size
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._cache),
+            "bytes_used": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "bytes_saved": self.bytes_saved,
+            "tokens_saved": self.tokens_saved,
+        }
+
+
+def _stable_repr(value: Any) -> Any:
+    """JSON fallback that keeps cache keys stable across processes."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    if isinstance(value, type):
+        return f"{value.__module__}.{value.__qualname__}"
+    if isinstance(value, Enum):
+        return value.value
+    return repr(value)
+
+
+def _response_size(response: Any) -> int:
+    """Approximate bytes held by a cached response (its text)."""
+    text = getattr(response, "text", None)
+    return len(text.encode("utf-8")) if isinstance(text, str) else 0
+
+
+def _response_tokens(response: Any) -> int:
+    usage = getattr(response, "usage_metadata", None)
+    tokens = getattr(usage, "total_token_count", 0) if usage else 0
+    return tokens if isinstance(tokens, int) else 0
 
-    def set(self, key: str, value: Any):
-        self._cache[key] = value
+
+# Global response cache shared by all agents
+_response_cache: Optional[GeminiCache] = None
+
+
+def get_response_cache() -> GeminiCache:
+    """Get or create the global Gemini response cache."""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = GeminiCache()
+    return _response_cache
 
 
 T = TypeVar("T")
@@ -139,10 +282,16 @@ class GeminiBaseAgent:
         self.call_count = 0
         self.total_tokens = 0
         
-        # Rate limiter and fallback handler
+        # Rate limiter and fallback handler (the request executor is looked
+        # up per call, see ``executor``)
         self.rate_limiter = get_rate_limiter()
         self.fallback_handler = get_fallback_handler()
         
+        # Shared response cache (content-addressed, LRU + TTL)
+        self.response_cache = get_response_cache()
+        self.enable_cache = bool(settings.gemini_enable_cache)
+        self.single_flight = get_single_flight()
+        
         # Enhanced usage stats
         self.usage_stats = {
             "total_tokens": 0,
@@ -154,6 +303,11 @@ class GeminiBaseAgent:
         # Define available tools for function calling
         self.tools = self._define_tools()
     
+    @property
+    def executor(self) -> GeminiRequestExecutor:
+        """Shared request executor, looked up per call so a restarted one is used."""
+        return get_gemini_executor()
+    
     def get_model_for_task(self, task_type: str = "general") -> str:
         """
         Get appropriate Gemini 3 model based on task type.
@@ -264,6 +418,7 @@ This thought trace will be visible for transparency."""
             thinking_level: Depth of reasoning (default QUICK for chat)
         """
         config_kwargs = kwargs.copy()
+        config_kwargs.setdefault("priority", RequestPriority.INTERACTIVE)
         if system_instruction:
             config_kwargs["system_instruction"] = system_instruction
 
@@ -284,6 +439,7 @@ This thought trace will be visible for transparency."""
         images: Optional[List[bytes]] = None,
         thinking_level: str = "STANDARD",
         return_full_response: bool = False,
+        priority: Optional[RequestPriority] = None,
         **kwargs
     ) -> Any:
         """
@@ -294,6 +450,8 @@ This thought trace will be visible for transparency."""
             images: Optional list of image bytes
             thinking_level: Analysis depth
             return_full_response: If True, returns full response object instead of text
+            priority: Executor scheduling class; pass BACKGROUND for pipeline
+                and enrichment work so interactive requests are served first
             **kwargs: Additional generation config
         """
         start_time = datetime.now()
@@ -348,8 +506,21 @@ This thought trace will be visible for transparency."""
             # Extract internal parameters that shouldn't go to API config
             feature = kwargs.pop("feature", None)
             
+            bypass_cache = kwargs.pop("bypass_cache", False)
+            
             config_kwargs.update(kwargs)
 
+            use_cache = self.enable_cache and not bypass_cache
+            if not bypass_cache:
+                cache_key = GeminiCache.make_key(
+                    prompt, self.model_name, thinking_level, config_kwargs, images
+                )
+            if use_cache:
+                cached = self.response_cache.get(cache_key)
+                if cached is not None:
+                    logger.debug(f"Gemini cache hit for {self.model_name} ({thinking_level})")
+                    return cached if return_full_response else cached.text
+
             # Get timeout based on task type (settings already loaded above)
             # Use marathon timeout for EXHAUSTIVE thinking or if explicitly requested
             is_long_task = thinking_level in ["EXHAUSTIVE", "DEEP"] or feature == "marathon"
@@ -363,34 +534,52 @@ This thought trace will be visible for transparency."""
                     config=types.GenerateContentConfig(**config_kwargs)
                 )
 
-            # Use settings timeout
-            if timeout and timeout > 0:
-                response = await asyncio.wait_for(asyncio.to_thread(_sync_generate), timeout=timeout)
-            else:
-                response = await asyncio.to_thread(_sync_generate)
-            
-            # Track usage
-            if hasattr(response, 'usage_metadata') and response.usage_metadata:
-                tokens = response.usage_metadata.total_token_count
-                self.usage_stats["total_tokens"] += tokens
-                self.usage_stats["total_requests"] += 1
-                self.usage_stats["total_cost_usd"] += tokens * 0.00001  # Approximate
-                self.total_tokens += tokens 
+            async def _call():
+                # Use settings timeout
+                response = await self.executor.run(
+                    _sync_generate,
+                    model=self.model_name,
+                    priority=priority,
+                    timeout=timeout if timeout and timeout > 0 else None,
+                )
+                
+                # Track usage
+                if hasattr(response, 'usage_metadata') and response.usage_metadata:
+                    tokens = response.usage_metadata.total_token_count
+                    self.usage_stats["total_tokens"] += tokens
+                    self.usage_stats["total_requests"] += 1
+                    self.usage_stats["total_cost_usd"] += tokens * 0.00001  # Approximate
+                    self.total_tokens += tokens 
+                else:
+                    tokens = 0
+                
+                self.call_count += 1
+                
+                # Log
+                latency = (datetime.now() - start_time).total_seconds() * 1000
+                logger.info(
+                    "gemini_request",
+                    model=self.model_name,
+                    thinking_level=thinking_level,
+                    tokens=tokens,
+                    latency_ms=latency,
+                    has_images=bool(images)
+                )
+                
+                if use_cache and _response_size(response):
+                    self.response_cache.set(
+                        cache_key,
+                        response,
+                        size_bytes=_response_size(response),
+                        tokens=_response_tokens(response),
+                    )
+                return response
+
+            if bypass_cache:
+                response = await _call()
             else:
-                tokens = 0
-            
-            self.call_count += 1
-            
-            # Log
-            latency = (datetime.now() - start_time).total_seconds() * 1000
-            logger.info(
-                "gemini_request",
-                model=self.model_name,
-                thinking_level=thinking_level,
-                tokens=tokens,
-                latency_ms=latency,
-                has_images=bool(images)
-            )
+                # Identical concurrent requests share a single API call
+                response = await self.single_flight.do(cache_key, _call)
             
             if return_full_response:
                 return response
@@ -468,6 +657,7 @@ This thought trace will be visible for transparency."""
         prompt: str,
         enable_grounding: bool = True,
         thinking_level: str = "STANDARD",
+        priority: Optional[RequestPriority] = None,
         **kwargs
     ) -> Dict[str, Any]:
         """
@@ -479,6 +669,7 @@ This thought trace will be visible for transparency."""
             prompt: Text prompt
             enable_grounding: Whether to enable Google Search grounding
             thinking_level: Depth of reasoning
+            priority: Executor scheduling class (see ``generate``)
             **kwargs: Additional generation config
             
         Returns:
@@ -511,6 +702,7 @@ This thought trace will be visible for transparency."""
                 "max_output_tokens": settings.thinking_level_standard_tokens
             }
         
+        bypass_cache = kwargs.pop("bypass_cache", False)
         config_kwargs.update(kwargs)
         
         # Add grounding tools if enabled
@@ -518,6 +710,19 @@ This thought trace will be visible for transparency."""
         if enable_grounding and settings.enable_grounding:
             tools.append(types.Tool(google_search=types.GoogleSearch()))
         
+        use_cache = self.enable_cache and not bypass_cache
+        cache_key = GeminiCache.make_key(
+            prompt,
+            self.model_name,
+            thinking_level,
+            {**config_kwargs, "grounding": bool(tools)},
+            namespace="grounding",
+        )
+        if use_cache:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return dict(cached)
+        
         # Generate with grounding
         def _sync_generate():
             config = types.GenerateContentConfig(**config_kwargs)
@@ -530,7 +735,16 @@ This thought trace will be visible for transparency."""
                 config=config
             )
         
-        response = await asyncio.to_thread(_sync_generate)
+        async def _call():
+            return await self.executor.run(
+                _sync_generate, model=self.model_name, priority=priority
+            )
+        
+        if bypass_cache:
+            response = await _call()
+        else:
+            # Identical concurrent requests share a single API call
+            response = await self.single_flight.do(cache_key, _call)
         
         # Extract grounding metadata
         grounding_metadata = None
@@ -554,12 +768,19 @@ This thought trace will be visible for transparency."""
                         candidate.grounding_metadata.search_entry_point.rendered_content
                     ]
         
-        return {
+        result = {
             "answer": response.text,
             "grounding_metadata": grounding_metadata,
             "grounded": bool(grounding_metadata),
             "model_used": self.model_name
         }
+        
+        if use_cache and _response_size(response):
+            self.response_cache.set(
+                cache_key, result, tokens=_response_tokens(response)
+            )
+        
+        return result
     
     # === IMPROVED RETRY LOGIC FOR MARATHON AGENT ===
     
@@ -668,16 +889,14 @@ This thought trace will be visible for transparency."""
         config_kwargs.update(kwargs)
         
         # Stream generation
-        def _sync_stream():
-            return self.client.models.generate_content_stream(
-                model=self.model_name,
-                contents=prompt,
-                config=types.GenerateContentConfig(**config_kwargs)
-            )
-        
-        stream = await asyncio.to_thread(_sync_stream)
+        stream = self.executor.stream(
+            self.client.models.generate_content_stream,
+            model=self.model_name,
+            contents=prompt,
+            config=types.GenerateContentConfig(**config_kwargs),
+        )
         
-        for chunk in stream:
+        async for chunk in stream:
             if hasattr(chunk, 'text') and chunk.text:
                 yield chunk.text
 
@@ -943,72 +1162,109 @@ Respond ONLY with valid JSON.
 
     async def _call_gemini_with_pdf(self, prompt: str, pdf_path: str) -> Any:
         """Upload PDF to Gemini File API and generate content."""
-        logger.info(f"Uploading PDF {pdf_path} to Gemini...")
+        pdf_bytes = await asyncio.to_thread(Path(pdf_path).read_bytes)
+        cache_key = GeminiCache.make_key(
+            prompt,
+            self.model_name,
+            config={"mime_type": "application/pdf", "temperature": 0.2, "max_output_tokens": 8192},
+            images=[pdf_bytes],
+            namespace="pdf",
+        )
+        if self.enable_cache:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
 
-        def _sync_upload():
-            try:
-                return self.client.files.upload(file=pdf_path)
-            except TypeError:
-                return self.client.files.upload(path=pdf_path)
-
-        file_ref = await asyncio.to_thread(_sync_upload)
-
-        # Wait for processing with timeout
-        max_wait = 120
-        waited = 0
-        while file_ref.state.name == "PROCESSING" and waited < max_wait:
-            await asyncio.sleep(2)
-            waited += 2
-            file_ref = await asyncio.to_thread(
-                self.client.files.get, name=file_ref.name
-            )
+        async def _call():
+            logger.info(f"Uploading PDF {pdf_path} to Gemini...")
 
-        if file_ref.state.name == "FAILED":
-            raise ValueError(f"PDF processing failed: {file_ref.state.name}")
-        if file_ref.state.name == "PROCESSING":
-            raise ValueError(f"PDF processing timed out after {max_wait}s")
+            def _sync_upload():
+                try:
+                    return self.client.files.upload(file=pdf_path)
+                except TypeError:
+                    return self.client.files.upload(path=pdf_path)
+
+            file_ref = await self.executor.run(_sync_upload, model=self.model_name)
+
+            # Wait for processing with timeout
+            max_wait = 120
+            waited = 0
+            while file_ref.state.name == "PROCESSING" and waited < max_wait:
+                await asyncio.sleep(2)
+                waited += 2
+                file_ref = await self.executor.run(
+                    self.client.files.get, name=file_ref.name, model=self.model_name
+                )
 
-        logger.info(f"PDF processed. Generating analysis for {pdf_path}...")
+            if file_ref.state.name == "FAILED":
+                raise ValueError(f"PDF processing failed: {file_ref.state.name}")
+            if file_ref.state.name == "PROCESSING":
+                raise ValueError(f"PDF processing timed out after {max_wait}s")
 
-        def _sync_generate():
-            return self.client.models.generate_content(
-                model=self.model_name,
-                contents=[
-                    types.Content(
-                        parts=[
-                            types.Part(text=prompt),
-                            types.Part(
-                                file_data=types.FileData(
-                                    file_uri=file_ref.uri, mime_type="application/pdf"
-                                )
-                            ),
-                        ]
-                    )
-                ],
-                config=types.GenerateContentConfig(
-                    temperature=0.2,
-                    max_output_tokens=8192,
-                ),
+            logger.info(f"PDF processed. Generating analysis for {pdf_path}...")
+
+            def _sync_generate():
+                return self.client.models.generate_content(
+                    model=self.model_name,
+                    contents=[
+                        types.Content(
+                            parts=[
+                                types.Part(text=prompt),
+                                types.Part(
+                                    file_data=types.FileData(
+                                        file_uri=file_ref.uri, mime_type="application/pdf"
+                                    )
+                                ),
+                            ]
+                        )
+                    ],
+                    config=types.GenerateContentConfig(
+                        temperature=0.2,
+                        max_output_tokens=8192,
+                    ),
+                )
+
+            return await self.executor.run(
+                _sync_generate, model=self.model_name, timeout=120.0
             )
 
-        response = await asyncio.wait_for(
-            asyncio.to_thread(_sync_generate), timeout=120.0
-        )
+        # Identical concurrent requests share a single upload and API call
+        response = await self.single_flight.do(cache_key, _call)
+        
+        if self.enable_cache and _response_size(response):
+            self.response_cache.set(
+                cache_key,
+                response,
+                size_bytes=_response_size(response),
+                tokens=_response_tokens(response),
+            )
         return response
 
     async def extract_menu_from_image(
-        self, image_path: str, additional_context: Optional[str] = None
+        self,
+        image_source: Union[str, bytes],
+        additional_context: Optional[str] = None,
+        mime_type: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         Extract menu items from a menu image using multimodal analysis.
+
+        Args:
+            image_source: Image path, or the image bytes (e.g. a rendered PDF page)
+            additional_context: Extra text (OCR, PDF text layer, business context)
+            mime_type: Image type; derived from the file extension for paths
         """
 
         # Read and encode image with correct mime type
-        image_data = Path(image_path).read_bytes()
+        if isinstance(image_source, bytes):
+            image_data = image_source
+        else:
+            image_data = Path(image_source).read_bytes()
+            ext = Path(image_source).suffix.lower()
+            mime_map = {".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".png": "image/png", ".webp": "image/webp"}
+            mime_type = mime_type or mime_map.get(ext)
         image_base64 = base64.b64encode(image_data).decode()
-        ext = Path(image_path).suffix.lower()
-        mime_map = {".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".png": "image/png", ".webp": "image/webp"}
-        mime_type = mime_map.get(ext, "image/jpeg")
+        mime_type = mime_type or "image/jpeg"
 
         prompt = """You are an ADVANCED artificial intelligence system specialized in digitizing complex restaurant menus.
 Your mission is to perform a TOTAL AND DEEP extraction of every sellable item visible in this menu image.
@@ -1069,15 +1325,21 @@ Respond ONLY with valid JSON.
 
         return self._parse_extraction_response(response)
 
-    async def analyze_dish_images(self, image_paths: List[str]) -> List[Dict[str, Any]]:
+    async def analyze_dish_images(
+        self,
+        image_paths: List[str],
+        on_result: Optional[Callable[..., Awaitable[None]]] = None,
+    ) -> List[Dict[str, Any]]:
         """
         Analyze dish photographs for visual appeal and marketability.
+
+        ``on_result`` is called as each photo finishes (see
+        ``analyze_image_batch``); results are returned in input order.
         """
 
-        results = []
 
-        for path in image_paths:
-            image_data = Path(path).read_bytes()
+        async def _analyze(path: str) -> Dict[str, Any]:
+            image_data = await asyncio.to_thread(Path(path).read_bytes)
             image_base64 = base64.b64encode(image_data).decode()
 
             prompt = """ACT AS A WORLD-CLASS FOOD CRITIC AND FOOD STYLING EXPERT.
@@ -1144,9 +1406,14 @@ JSON RESPONSE:
             response = await self._call_gemini_with_image(prompt, image_base64)
             self.call_count += 1
 
-            results.append(self._parse_image_analysis(response, path))
+            return self._parse_image_analysis(response, path)
 
-        return results
+        # Photos are analyzed concurrently and deduplicated by content
+        images = await analyze_image_batch(image_paths, _analyze, on_result=on_result)
+        return [
+            image.result if image.ok else {"image_path": path, "error": str(image.error)}
+            for path, image in zip(image_paths, images)
+        ]
 
     async def generate_bcg_insights(
         self, product_data: List[Dict[str, Any]], sales_summary: Dict[str, Any]
@@ -1213,8 +1480,10 @@ Respond in JSON format:
 
         try:
             # Add timeout to prevent hanging
-            response = await asyncio.wait_for(
-                asyncio.to_thread(self._call_gemini_sync, prompt),
+            response = await self.executor.run(
+                self._call_gemini_sync,
+                prompt,
+                model=self.MODEL_NAME,
                 timeout=60.0,  # 60 second timeout for insights
             )
             self.call_count += 1
@@ -1227,7 +1496,7 @@ Respond in JSON format:
             return self._get_default_bcg_insights(simple_summary)
 
     def _call_gemini_sync(self, prompt: str) -> Any:
-        """Synchronous Gemini call for use with asyncio.to_thread."""
+        """Synchronous Gemini call for use with the shared request executor."""
         return self.client.models.generate_content(
             model=self.MODEL_NAME,
             contents=prompt,
@@ -1372,13 +1641,17 @@ Be critical and thorough."""
     async def _call_gemini(self, prompt: str) -> Any:
         """Make a text-only call to Gemini."""
 
-        response = self.client.models.generate_content(
-            model=self.MODEL_NAME,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                temperature=0.7,
-                max_output_tokens=8192,
+        response = await self.executor.run(
+            functools.partial(
+                self.client.models.generate_content,
+                model=self.MODEL_NAME,
+                contents=prompt,
+                config=types.GenerateContentConfig(
+                    temperature=0.7,
+                    max_output_tokens=8192,
+                ),
             ),
+            model=self.MODEL_NAME,
         )
         return response
 
@@ -1386,6 +1659,19 @@ Be critical and thorough."""
         self, prompt: str, image_base64: str, mime_type: str = "image/jpeg"
     ) -> Any:
         """Call Gemini with image/video content."""
+        image_bytes = base64.b64decode(image_base64)
+        cache_key = GeminiCache.make_key(
+            prompt,
+            self.model_name,
+            config={"mime_type": mime_type, "temperature": 0.4, "max_output_tokens": 8192},
+            images=[image_bytes],
+            namespace="image",
+        )
+        if self.enable_cache:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         def _sync_generate():
             return self.client.models.generate_content(
                 model=self.model_name,
@@ -1395,7 +1681,7 @@ Be critical and thorough."""
                             types.Part(text=prompt),
                             types.Part(
                                 inline_data=types.Blob(
-                                    mime_type=mime_type, data=base64.b64decode(image_base64)
+                                    mime_type=mime_type, data=image_bytes
                                 )
                             ),
                         ]
@@ -1407,9 +1693,21 @@ Be critical and thorough."""
                 ),
             )
 
-        response = await asyncio.wait_for(
-            asyncio.to_thread(_sync_generate), timeout=120.0
-        )
+        async def _call():
+            return await self.executor.run(
+                _sync_generate, model=self.model_name, timeout=120.0
+            )
+
+        # Identical concurrent requests share a single API call
+        response = await self.single_flight.do(cache_key, _call)
+
+        if self.enable_cache and _response_size(response):
+            self.response_cache.set(
+                cache_key,
+                response,
+                size_bytes=_response_size(response),
+                tokens=_response_tokens(response),
+            )
         return response
 
     async def _call_gemini_with_tools(
@@ -1420,14 +1718,18 @@ Be critical and thorough."""
         contents = context or []
         contents.append(types.Content(parts=[types.Part(text=prompt)]))
 
-        response = self.client.models.generate_content(
-            model=self.MODEL_NAME,
-            contents=contents,
-            config=types.GenerateContentConfig(
-                tools=self.tools,
-                temperature=0.7,
-                max_output_tokens=8192,
+        response = await self.executor.run(
+            functools.partial(
+                self.client.models.generate_content,
+                model=self.MODEL_NAME,
+                contents=contents,
+                config=types.GenerateContentConfig(
+                    tools=self.tools,
+                    temperature=0.7,
+                    max_output_tokens=8192,
+                ),
             ),
+            model=self.MODEL_NAME,
         )
         return response
 
@@ -1467,14 +1769,18 @@ Be critical and thorough."""
         tool_config = types.Tool(google_search=types.GoogleSearch())
 
         try:
-            response = self.client.models.generate_content(
-                model=self.MODEL_NAME,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    tools=[tool_config],
-                    response_mime_type="application/json",
-                    temperature=0.3,
+            response = await self.executor.run(
+                functools.partial(
+                    self.client.models.generate_content,
+                    model=self.MODEL_NAME,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(
+                        tools=[tool_config],
+                        response_mime_type="application/json",
+                        temperature=0.3,
+                    ),
                 ),
+                model=self.MODEL_NAME,
             )
 
             return json.loads(response.text)
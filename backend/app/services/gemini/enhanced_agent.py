@@ -10,10 +10,22 @@ This module extends the base agent with advanced features:
 """
 
 import asyncio
-import hashlib
+import functools
 import json
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, AsyncIterator, Dict, List, Optional, Union
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    TypeVar,
+    Union,
+)
 from enum import Enum
 
 from google import genai
@@ -22,8 +34,17 @@ from loguru import logger
 from pydantic import BaseModel, ValidationError
 
 from app.core.config import get_settings, GeminiModel
-from app.core.rate_limiter import get_rate_limiter
+from app.core.gemini_cache import build_cache_key
+from app.core.gemini_executor import (
+    GeminiRequestExecutor,
+    RequestPriority,
+    get_gemini_executor,
+)
+from app.core.rate_limiter import TokenReservation, get_rate_limiter
 from app.core.model_fallback import get_fallback_handler
+from app.core.single_flight import get_single_flight
+
+T = TypeVar("T")
 
 
 class ThinkingLevel(str, Enum):
@@ -57,6 +78,19 @@ class UsageStats(BaseModel):
     cached: bool
 
 
+@dataclass
+class BatchItemResult:
+    """Outcome of one item of ``EnhancedGeminiAgent.run_batch``."""
+    index: int
+    result: Any = None
+    error: Optional[BaseException] = None
+    timed_out: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
 class EnhancedGeminiAgent:
     """
     Enhanced Gemini 3 agent with streaming, grounding, caching, and validation.
@@ -87,9 +121,11 @@ class EnhancedGeminiAgent:
         # Initialize Gemini client
         self.client = genai.Client(api_key=self.settings.gemini_api_key)
         
-        # Get rate limiter and fallback handler
+        # Get rate limiter and fallback handler (the request executor is
+        # looked up per call, see ``executor``)
         self.rate_limiter = get_rate_limiter()
         self.fallback_handler = get_fallback_handler()
+        self.single_flight = get_single_flight()
         
         # Stats tracking
         self.total_tokens_used = 0
@@ -107,6 +143,11 @@ class EnhancedGeminiAgent:
             caching=self.enable_cache
         )
     
+    @property
+    def executor(self) -> GeminiRequestExecutor:
+        """Shared request executor, looked up per call so a restarted one is used."""
+        return get_gemini_executor()
+    
     def _get_generation_config(
         self,
         thinking_level: ThinkingLevel,
@@ -181,22 +222,19 @@ class EnhancedGeminiAgent:
         self,
         prompt: str,
         images: Optional[List[bytes]] = None,
-        thinking_level: ThinkingLevel = ThinkingLevel.STANDARD
+        thinking_level: ThinkingLevel = ThinkingLevel.STANDARD,
+        response_schema: Optional[type[BaseModel]] = None,
+        enable_grounding: bool = False
     ) -> str:
-        """Generate cache key from inputs."""
-        key_components = [
+        """Generate cache key from inputs (same hash as the shared Gemini cache)."""
+        return build_cache_key(
             prompt,
             self.model_name.value,
-            thinking_level.value
-        ]
-        
-        if images:
-            for img in images:
-                if isinstance(img, bytes):
-                    key_components.append(hashlib.md5(img).hexdigest())
-        
-        combined = "|".join(str(c) for c in key_components)
-        return hashlib.sha256(combined.encode()).hexdigest()
+            thinking_level.value,
+            images,
+            response_schema=response_schema,
+            enable_grounding=enable_grounding
+        )
     
     async def generate(
         self,
@@ -206,7 +244,8 @@ class EnhancedGeminiAgent:
         response_schema: Optional[type[BaseModel]] = None,
         enable_thought_trace: bool = True,
         bypass_cache: bool = False,
-        enable_grounding: Optional[bool] = None
+        enable_grounding: Optional[bool] = None,
+        priority: Optional[RequestPriority] = None
     ) -> Dict[str, Any]:
         """
         Enhanced generation with all advanced features.
@@ -227,6 +266,8 @@ class EnhancedGeminiAgent:
             enable_thought_trace: Include reasoning trace
             bypass_cache: Skip cache lookup
             enable_grounding: Override grounding setting
+            priority: Scheduling class on the shared Gemini executor
+                (defaults to the caller's ``request_priority()``)
             
         Returns:
             Dict with data, usage, thought_trace, and metadata
@@ -236,18 +277,59 @@ class EnhancedGeminiAgent:
         # Use instance setting if not overridden
         use_grounding = enable_grounding if enable_grounding is not None else self.enable_grounding
         
+        cache_key = self._compute_cache_key(
+            prompt, images, thinking_level, response_schema, use_grounding
+        )
+        
         # Check cache
         if self.enable_cache and not bypass_cache:
-            cache_key = self._compute_cache_key(prompt, images, thinking_level)
             if cache_key in self._cache:
                 logger.info("cache_hit", key=cache_key[:16])
                 cached_result = self._cache[cache_key]
                 cached_result["cached"] = True
                 return cached_result
         
+        async def _generate():
+            return await self._generate_uncached(
+                prompt,
+                images,
+                thinking_level,
+                response_schema,
+                enable_thought_trace,
+                use_grounding,
+                priority,
+                start_time
+            )
+        
+        if bypass_cache:
+            result = await _generate()
+        else:
+            # Identical concurrent requests share a single API call
+            result = await self.single_flight.do(
+                f"{cache_key}:trace={enable_thought_trace}", _generate
+            )
+        
+        # Cache result
+        if self.enable_cache and not bypass_cache:
+            self._cache[cache_key] = result
+        
+        return result
+    
+    async def _generate_uncached(
+        self,
+        prompt: str,
+        images: Optional[List[Union[bytes, str]]],
+        thinking_level: ThinkingLevel,
+        response_schema: Optional[type[BaseModel]],
+        enable_thought_trace: bool,
+        use_grounding: bool,
+        priority: Optional[RequestPriority],
+        start_time: datetime
+    ) -> Dict[str, Any]:
+        """Make the API call behind ``generate`` and build its result dict."""
         # Check rate limit
         estimated_tokens = len(prompt.split()) * 2  # Rough estimate
-        await self.rate_limiter.acquire(estimated_tokens)
+        reservation = await self.rate_limiter.acquire(estimated_tokens)
         
         try:
             # Prepare content parts
@@ -293,11 +375,15 @@ class EnhancedGeminiAgent:
                 if tools:
                     config.tools = tools
                 
-                return await asyncio.to_thread(
-                    self.client.models.generate_content,
+                return await self.executor.run(
+                    functools.partial(
+                        self.client.models.generate_content,
+                        model=model,
+                        contents=[types.Content(parts=parts)],
+                        config=config
+                    ),
                     model=model,
-                    contents=[types.Content(parts=parts)],
-                    config=config
+                    priority=priority
                 )
             
             response = await self.fallback_handler.execute_with_fallback(
@@ -339,7 +425,7 @@ class EnhancedGeminiAgent:
                     result_data = {"text": result_text}
             
             # Track usage
-            usage = self._track_usage(response, start_time)
+            usage = self._track_usage(response, start_time, reservation)
             
             # Build thought trace
             thought_trace = None
@@ -361,10 +447,6 @@ class EnhancedGeminiAgent:
                 "grounding_used": use_grounding
             }
             
-            # Cache result
-            if self.enable_cache and not bypass_cache:
-                self._cache[cache_key] = result
-            
             return result
             
         except Exception as e:
@@ -423,21 +505,24 @@ class EnhancedGeminiAgent:
         if tools:
             config.tools = tools
         
-        def _sync_stream():
-            return self.client.models.generate_content_stream(
-                model=self.model_name.value,
-                contents=[types.Content(parts=parts)],
-                config=config
-            )
-        
-        response_stream = await asyncio.to_thread(_sync_stream)
+        response_stream = self.executor.stream(
+            self.client.models.generate_content_stream,
+            model=self.model_name.value,
+            contents=[types.Content(parts=parts)],
+            config=config
+        )
         
-        for chunk in response_stream:
+        async for chunk in response_stream:
             if chunk.text:
                 yield chunk.text
     
-    def _track_usage(self, response, start_time: datetime) -> UsageStats:
-        """Track token usage and costs."""
+    def _track_usage(
+        self,
+        response,
+        start_time: datetime,
+        reservation: Optional[TokenReservation] = None
+    ) -> UsageStats:
+        """Track token usage and costs, reconciling the rate-limit reservation."""
         
         if hasattr(response, 'usage_metadata') and response.usage_metadata:
             prompt_tokens = getattr(response.usage_metadata, 'prompt_token_count', 0)
@@ -452,7 +537,8 @@ class EnhancedGeminiAgent:
         cost = self.rate_limiter.record_call(
             input_tokens=prompt_tokens,
             output_tokens=completion_tokens,
-            model=self.model_name.value
+            model=self.model_name.value,
+            reservation=reservation
         )
         
         # Update totals
@@ -548,6 +634,52 @@ class EnhancedGeminiAgent:
         
         return confidence
     
+    async def run_batch(
+        self,
+        items: Sequence[T],
+        worker: Callable[[T], Awaitable[Any]],
+        max_concurrency: Optional[int] = None,
+        item_timeout: Optional[float] = None,
+    ) -> List[BatchItemResult]:
+        """
+        Run ``worker`` over ``items`` concurrently.
+
+        Requests still go through the shared Gemini executor, so the
+        per-model concurrency budget applies on top of ``max_concurrency``.
+
+        Args:
+            items: Inputs, one worker call each
+            worker: Coroutine function applied to each item
+            max_concurrency: Items in flight (defaults to ``gemini_batch_max_concurrency``)
+            item_timeout: Deadline per item in seconds
+                (defaults to ``gemini_batch_item_timeout_seconds``; 0 disables it)
+
+        Returns:
+            One BatchItemResult per item, in input order; a failed or timed
+            out item carries its error instead of a result
+        """
+        if max_concurrency is None:
+            max_concurrency = int(self.settings.gemini_batch_max_concurrency)
+        if item_timeout is None:
+            item_timeout = float(self.settings.gemini_batch_item_timeout_seconds)
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def _run(index: int, item: T) -> BatchItemResult:
+            async with semaphore:
+                try:
+                    result = await asyncio.wait_for(
+                        worker(item), timeout=item_timeout if item_timeout > 0 else None
+                    )
+                    return BatchItemResult(index=index, result=result)
+                except asyncio.TimeoutError as e:
+                    logger.warning("batch_item_timeout", index=index, timeout=item_timeout)
+                    return BatchItemResult(index=index, error=e, timed_out=True)
+                except Exception as e:
+                    logger.error("batch_item_failed", index=index, error=str(e))
+                    return BatchItemResult(index=index, error=e)
+
+        return list(await asyncio.gather(*(_run(i, item) for i, item in enumerate(items))))
+
     def get_session_stats(self) -> Dict[str, Any]:
         """Get usage statistics for transparency."""
         return {
@@ -521,28 +521,32 @@ RETURN AS JSON:
         location: str
     ) -> List[CompetitorIntelligence]:
         """
-        Analyze multiple competitors efficiently.
+        Analyze multiple competitors concurrently.
         
         Args:
             competitors: List of dicts with 'name' and optional 'cuisine_type'
             location: Location for all competitors
+
+        Returns:
+            Intelligence for the competitors that could be analyzed, in input order
         """
         
-        results = []
+        async def _analyze(competitor: Dict[str, str]) -> CompetitorIntelligence:
+            return await self.analyze_competitor_with_grounding(
+                competitor_name=competitor["name"],
+                location=location,
+                cuisine_type=competitor.get("cuisine_type")
+            )
         
-        for competitor in competitors:
-            try:
-                intel = await self.analyze_competitor_with_grounding(
-                    competitor_name=competitor["name"],
-                    location=location,
-                    cuisine_type=competitor.get("cuisine_type")
-                )
-                results.append(intel)
-            except Exception as e:
+        results = []
+        for competitor, item in zip(competitors, await self.run_batch(competitors, _analyze)):
+            if item.ok:
+                results.append(item.result)
+            else:
                 logger.error(
                     "competitor_analysis_failed",
                     competitor=competitor["name"],
-                    error=str(e)
+                    error=str(item.error) or type(item.error).__name__
                 )
         
         return results
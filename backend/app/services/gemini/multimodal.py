@@ -14,6 +14,7 @@ from typing import Any, Dict, List, Optional, Union
 
 from loguru import logger
 
+from app.core.image_batch import analyze_image_batch
 from app.services.gemini.base_agent import GeminiBaseAgent, GeminiModel
 
 
@@ -501,16 +502,22 @@ Be specific, professional, and constructive. This analysis will be used to impro
         Returns:
             List of analysis results
         """
-        results = []
 
-        for i, image in enumerate(images):
-            logger.info(f"Analyzing dish image {i + 1}/{len(images)}")
-            result = await self.analyze_dish_image(
+        async def _analyze(image: Union[str, bytes]) -> Dict[str, Any]:
+            return await self.analyze_dish_image(
                 image_source=image,
                 menu_context=menu_context,
                 **kwargs,
             )
-            result["image_index"] = i
+
+        # Concurrent, deduplicated by content; results stay in upload order
+        results = []
+        for image in await analyze_image_batch(images, _analyze):
+            if image.ok:
+                result = image.result
+            else:
+                result = {"error": str(image.error), "overall_score": 0, "scores": {}}
+            result["image_index"] = image.index
             results.append(result)
 
         # Generate summary
@@ -8,6 +8,7 @@ Handles:
 - Multi-perspective reasoning with thought traces
 """
 
+import asyncio
 import json
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
@@ -95,6 +96,46 @@ class ReasoningAgent(GeminiBaseAgent):
         },
     }
 
+    # Debate personas
+    DEBATE_AGENTS = [
+        {
+            "id": "cfo",
+            "name": "CFO Conservador",
+            "role": "Chief Financial Officer",
+            "emoji": "👔",
+            "persona": """You are a conservative CFO focused on:
+            - Protecting margins and profitability
+            - Minimizing financial risk
+            - Optimizing cost structure
+            - ROI-driven decisions
+            Your priority is financial health over growth."""
+        },
+        {
+            "id": "strategist", 
+            "name": "Growth Strategist",
+            "role": "Strategic Growth Director",
+            "emoji": "📈",
+            "persona": """You are an ambitious Growth Strategist focused on:
+            - Market share expansion
+            - Revenue growth opportunities
+            - Competitive positioning
+            - Long-term strategic advantage
+            Your priority is sustainable growth."""
+        },
+        {
+            "id": "customer_centric",
+            "name": "Customer Experience Lead",
+            "role": "Customer-Centric Marketing Director", 
+            "emoji": "❤️",
+            "persona": """You are a customer-focused marketer focused on:
+            - Customer satisfaction and loyalty
+            - Brand perception and reputation
+            - Customer lifetime value
+            - Experience optimization
+            Your priority is customer delight."""
+        }
+    ]
+
     def __init__(
         self,
         model: GeminiModel = GeminiModel.FLASH,
@@ -1055,6 +1096,7 @@ Write the executive summary now:"""
         item_data: Dict[str, Any],
         context: Dict[str, Any],
         thinking_level: ThinkingLevel = ThinkingLevel.DEEP,
+        max_rounds: Optional[int] = None,
     ) -> Dict[str, Any]:
         """
         Run a multi-agent debate on a strategic decision.
@@ -1063,120 +1105,43 @@ Write the executive summary now:"""
         - CFO: Financial/cost perspective
         - Growth Strategist: Growth/expansion perspective  
         - Customer-Centric Marketer: Customer experience perspective
+
+        The personas answer concurrently within a round. Later rounds show
+        each persona the others' positions so it can hold or revise its own;
+        the debate stops as soon as they agree.
         
         Args:
             topic: The decision topic to debate
             item_data: Data about the item being discussed
             context: Additional context (BCG data, sentiment, etc.)
             thinking_level: Depth of reasoning
+            max_rounds: Upper bound on rounds (defaults to ``debate_max_rounds``)
             
         Returns:
             Debate result with all perspectives and consensus
         """
         config = self.THINKING_CONFIGS[thinking_level]
-        
-        # Agent definitions
-        agents = [
-            {
-                "id": "cfo",
-                "name": "CFO Conservador",
-                "role": "Chief Financial Officer",
-                "emoji": "👔",
-                "persona": """You are a conservative CFO focused on:
-                - Protecting margins and profitability
-                - Minimizing financial risk
-                - Optimizing cost structure
-                - ROI-driven decisions
-                Your priority is financial health over growth."""
-            },
-            {
-                "id": "strategist", 
-                "name": "Growth Strategist",
-                "role": "Strategic Growth Director",
-                "emoji": "📈",
-                "persona": """You are an ambitious Growth Strategist focused on:
-                - Market share expansion
-                - Revenue growth opportunities
-                - Competitive positioning
-                - Long-term strategic advantage
-                Your priority is sustainable growth."""
-            },
-            {
-                "id": "customer_centric",
-                "name": "Customer Experience Lead",
-                "role": "Customer-Centric Marketing Director", 
-                "emoji": "❤️",
-                "persona": """You are a customer-focused marketer focused on:
-                - Customer satisfaction and loyalty
-                - Brand perception and reputation
-                - Customer lifetime value
-                - Experience optimization
-                Your priority is customer delight."""
-            }
-        ]
-        
-        perspectives = []
-        
-        # Get each agent's perspective
-        for agent in agents:
-            agent_prompt = f"""{agent['persona']}
-
-DEBATE TOPIC: {topic}
-
-ITEM DATA:
-{json.dumps(item_data, indent=2, default=str)}
-
-CONTEXT:
-{json.dumps(context, indent=2, default=str)[:3000]}
-
-From your perspective as {agent['role']}, analyze this situation and provide your recommendation.
+        max_rounds = max(1, int(max_rounds or self.settings.debate_max_rounds))
+
+        perspectives: List[Dict[str, Any]] = []
+        rounds = 0
+        agreed = False
+        while rounds < max_rounds and not agreed:
+            previous = perspectives
+            perspectives = await asyncio.gather(
+                *(
+                    self._debate_perspective(
+                        agent, topic, item_data, context, config, previous, i
+                    )
+                    for i, agent in enumerate(self.DEBATE_AGENTS)
+                )
+            )
+            rounds += 1
+            agreed = self._debate_agreed(perspectives)
 
-RESPOND WITH VALID JSON:
-{{
-    "position": "agree|disagree|partial",
-    "reasoning": "Your main argument in 2-3 sentences",
-    "key_points": ["Point 1", "Point 2", "Point 3"],
-    "confidence": 0.85,
-    "suggested_action": "Your recommended action",
-    "risks_identified": ["Risk from your perspective"],
-    "benefits_identified": ["Benefit from your perspective"]
-}}"""
+        if agreed and rounds < max_rounds:
+            logger.info(f"Debate on '{topic}' reached consensus after {rounds} round(s)")
 
-            try:
-                response = await self.generate(
-                    prompt=agent_prompt,
-                    temperature=config["temperature"],
-                    max_output_tokens=4096,
-                    feature="multi_agent_debate",
-                )
-                
-                agent_response = self._parse_json_response(response) if response else {}
-                
-                perspectives.append({
-                    "agentId": agent["id"],
-                    "agentName": agent["name"],
-                    "agentRole": agent["role"],
-                    "position": agent_response.get("position", "neutral"),
-                    "reasoning": agent_response.get("reasoning", ""),
-                    "keyPoints": agent_response.get("key_points", []),
-                    "confidence": agent_response.get("confidence", 0.7),
-                    "suggestedAction": agent_response.get("suggested_action", ""),
-                    "risks": agent_response.get("risks_identified", []),
-                    "benefits": agent_response.get("benefits_identified", []),
-                })
-                
-            except Exception as e:
-                logger.error(f"Agent {agent['id']} debate failed: {e}")
-                perspectives.append({
-                    "agentId": agent["id"],
-                    "agentName": agent["name"],
-                    "agentRole": agent["role"],
-                    "position": "neutral",
-                    "reasoning": f"Unable to generate perspective: {str(e)}",
-                    "keyPoints": [],
-                    "confidence": 0.5,
-                })
-        
         # Generate consensus
         consensus_prompt = f"""You are a neutral moderator synthesizing multiple expert perspectives.
 
@@ -1228,6 +1193,8 @@ RESPOND WITH VALID JSON:
             "primaryRecommendation": consensus_data.get("primary_recommendation", ""),
             "dissent": consensus_data.get("dissent_note"),
             "keyTradeoffs": consensus_data.get("key_tradeoffs", []),
+            "rounds": rounds,
+            "agentsAgreed": agreed,
             "timestamp": datetime.now(timezone.utc).isoformat(),
         }
         
@@ -1243,6 +1210,111 @@ RESPOND WITH VALID JSON:
         
         return debate_result
 
+
+    async def _debate_perspective(
+        self,
+        agent: Dict[str, Any],
+        topic: str,
+        item_data: Dict[str, Any],
+        context: Dict[str, Any],
+        config: Dict[str, Any],
+        previous: List[Dict[str, Any]],
+        index: int,
+    ) -> Dict[str, Any]:
+        """One persona's position for a debate round."""
+        agent_prompt = f"""{agent['persona']}
+
+DEBATE TOPIC: {topic}
+
+ITEM DATA:
+{json.dumps(item_data, indent=2, default=str)}
+
+CONTEXT:
+{json.dumps(context, indent=2, default=str)[:3000]}
+
+From your perspective as {agent['role']}, analyze this situation and provide your recommendation.
+"""
+        if previous:
+            others = [
+                {
+                    "agent": p["agentRole"],
+                    "position": p.get("position"),
+                    "reasoning": p.get("reasoning"),
+                    "suggested_action": p.get("suggestedAction"),
+                }
+                for i, p in enumerate(previous)
+                if i != index
+            ]
+            agent_prompt += f"""
+YOUR PREVIOUS POSITION:
+{json.dumps(previous[index], indent=2, default=str)}
+
+OTHER EXPERTS' POSITIONS:
+{json.dumps(others, indent=2, default=str)}
+
+Consider their arguments. Hold your position or revise it if they convinced you.
+"""
+        agent_prompt += """
+RESPOND WITH VALID JSON:
+{
+    "position": "agree|disagree|partial",
+    "reasoning": "Your main argument in 2-3 sentences",
+    "key_points": ["Point 1", "Point 2", "Point 3"],
+    "confidence": 0.85,
+    "suggested_action": "Your recommended action",
+    "risks_identified": ["Risk from your perspective"],
+    "benefits_identified": ["Benefit from your perspective"]
+}"""
+
+        try:
+            response = await self.generate(
+                prompt=agent_prompt,
+                temperature=config["temperature"],
+                max_output_tokens=4096,
+                feature="multi_agent_debate",
+            )
+            
+            agent_response = self._parse_json_response(response) if response else {}
+            
+            return {
+                "agentId": agent["id"],
+                "agentName": agent["name"],
+                "agentRole": agent["role"],
+                "position": agent_response.get("position", "neutral"),
+                "reasoning": agent_response.get("reasoning", ""),
+                "keyPoints": agent_response.get("key_points", []),
+                "confidence": agent_response.get("confidence", 0.7),
+                "suggestedAction": agent_response.get("suggested_action", ""),
+                "risks": agent_response.get("risks_identified", []),
+                "benefits": agent_response.get("benefits_identified", []),
+            }
+            
+        except Exception as e:
+            logger.error(f"Agent {agent['id']} debate failed: {e}")
+            if previous:
+                # Keep the position from the previous round
+                return previous[index]
+            return {
+                "agentId": agent["id"],
+                "agentName": agent["name"],
+                "agentRole": agent["role"],
+                "position": "neutral",
+                "reasoning": f"Unable to generate perspective: {str(e)}",
+                "keyPoints": [],
+                "confidence": 0.5,
+            }
+
+    def _debate_agreed(self, perspectives: List[Dict[str, Any]]) -> bool:
+        """Whether every persona takes the same, confident position."""
+        positions = {str(p.get("position", "neutral")).lower() for p in perspectives}
+        if len(positions) != 1 or positions == {"neutral"}:
+            return False
+        threshold = float(self.settings.debate_consensus_confidence)
+        try:
+            return all(float(p.get("confidence", 0)) >= threshold for p in perspectives)
+        except (TypeError, ValueError):
+            return False
+
     async def run_bcg_debates(
         self,
         bcg_items: List[Dict[str, Any]],
@@ -1283,9 +1355,11 @@ RESPOND WITH VALID JSON:
         priority_items.sort(key=lambda x: 0 if x[1] == "high" else 1)
         priority_items = priority_items[:max_debates]
         
-        for item, priority, topic in priority_items:
-            try:
-                debate = await self.multi_agent_debate(
+        # Debates run in parallel; the shared Gemini executor bounds how
+        # many of their calls are in flight per model
+        results = await asyncio.gather(
+            *(
+                self.multi_agent_debate(
                     topic=topic,
                     item_data=item,
                     context={
@@ -1296,9 +1370,15 @@ RESPOND WITH VALID JSON:
                         **context
                     },
                 )
+                for item, priority, topic in priority_items
+            ),
+            return_exceptions=True,
+        )
+        for (item, priority, topic), debate in zip(priority_items, results):
+            if isinstance(debate, Exception):
+                logger.error(f"Debate for {item.get('name')} failed: {debate}")
+            else:
                 debates.append(debate)
-            except Exception as e:
-                logger.error(f"Debate for {item.get('name')} failed: {e}")
         
         return debates
 
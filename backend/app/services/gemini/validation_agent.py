@@ -8,8 +8,9 @@ Validates AI outputs against input data to detect:
 - Data misinterpretations
 """
 
+import asyncio
 import json
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 
 from loguru import logger
@@ -35,6 +36,11 @@ class ValidationResult(BaseModel):
     validation_timestamp: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
 
 
+class PackedValidationResults(BaseModel):
+    """Results for several targets validated in one request."""
+    results: List[ValidationResult]
+
+
 class SafetyCheck(BaseModel):
     """Safety check result."""
     safe: bool
@@ -43,6 +49,63 @@ class SafetyCheck(BaseModel):
     recommended_action: str
 
 
+# ==================== Prompts ====================
+
+VALIDATION_TASKS = """VERIFICATION TASKS:
+
+1. **Numerical Accuracy**:
+   - Are all numbers in output present in input data?
+   - Are calculations correct?
+   - Are percentages/ratios accurate?
+   - Flag any numbers that can't be traced to input
+
+2. **Factual Claims**:
+   - Are all statements supported by input data?
+   - Any claims that go beyond what data shows?
+   - Any assumptions presented as facts?
+
+3. **Logical Consistency**:
+   - Do recommendations follow from the data?
+   - Any contradictions in the output?
+   - Are conclusions justified?
+
+4. **Data Mismatches**:
+   - Compare specific values between input and output
+   - Identify any discrepancies
+   - Note any transformations that seem incorrect
+
+5. **Hallucination Detection**:
+   - Any invented data points?
+   - Any claims about things not in input?
+   - Any extrapolations presented as facts?"""
+
+VALIDATION_RESULT_SHAPE = """{
+    "verified": bool,  // true if ALL claims are supported
+    "confidence": float,  // 0.0-1.0 confidence in validation
+    "unsupported_claims": [
+        "claim text that can't be verified from input"
+    ],
+    "data_mismatches": [
+        {
+            "field": "field name",
+            "input_value": "value from input",
+            "output_value": "value in output",
+            "issue": "description of mismatch"
+        }
+    ],
+    "logical_issues": [
+        "description of logical inconsistency"
+    ],
+    "recommendations": [
+        "how to fix or improve the output"
+    ]
+}"""
+
+VALIDATION_STRICTNESS = (
+    "BE STRICT: If you can't trace a claim directly to the input data, flag it as unsupported."
+)
+
+
 # ==================== Validation Agent ====================
 
 class ValidationAgent(EnhancedGeminiAgent):
@@ -105,58 +168,12 @@ INPUT DATA (GROUND TRUTH):
 OUTPUT TO VALIDATE (AI CLAIMS):
 {json.dumps(output, indent=2)}{context_str}
 
-VERIFICATION TASKS:
-
-1. **Numerical Accuracy**:
-   - Are all numbers in output present in input data?
-   - Are calculations correct?
-   - Are percentages/ratios accurate?
-   - Flag any numbers that can't be traced to input
-
-2. **Factual Claims**:
-   - Are all statements supported by input data?
-   - Any claims that go beyond what data shows?
-   - Any assumptions presented as facts?
-
-3. **Logical Consistency**:
-   - Do recommendations follow from the data?
-   - Any contradictions in the output?
-   - Are conclusions justified?
-
-4. **Data Mismatches**:
-   - Compare specific values between input and output
-   - Identify any discrepancies
-   - Note any transformations that seem incorrect
-
-5. **Hallucination Detection**:
-   - Any invented data points?
-   - Any claims about things not in input?
-   - Any extrapolations presented as facts?
+{VALIDATION_TASKS}
 
 RETURN AS JSON:
-{{
-    "verified": bool,  // true if ALL claims are supported
-    "confidence": float,  // 0.0-1.0 confidence in validation
-    "unsupported_claims": [
-        "claim text that can't be verified from input"
-    ],
-    "data_mismatches": [
-        {{
-            "field": "field name",
-            "input_value": "value from input",
-            "output_value": "value in output",
-            "issue": "description of mismatch"
-        }}
-    ],
-    "logical_issues": [
-        "description of logical inconsistency"
-    ],
-    "recommendations": [
-        "how to fix or improve the output"
-    ]
-}}
+{VALIDATION_RESULT_SHAPE}
 
-BE STRICT: If you can't trace a claim directly to the input data, flag it as unsupported.
+{VALIDATION_STRICTNESS}
 """
         
         result = await self.generate(
@@ -312,29 +329,129 @@ RETURN AS JSON:
     async def batch_validate(
         self,
         outputs: List[Dict[str, Any]],
-        inputs: List[Dict[str, Any]]
+        inputs: List[Dict[str, Any]],
+        pack_size: Optional[int] = None
     ) -> List[ValidationResult]:
         """
         Validate multiple outputs in batch.
         
+        Targets are validated concurrently. Small targets (up to
+        ``gemini_validation_pack_max_chars``) can also be packed
+        ``pack_size`` at a time into a single request.
+        
         Args:
             outputs: List of outputs to validate
             inputs: Corresponding input data
+            pack_size: Small targets per request (defaults to
+                ``gemini_validation_pack_size``; 1 disables packing)
             
         Returns:
-            List of validation results
+            List of validation results, in input order
         """
         
         if len(outputs) != len(inputs):
             raise ValueError("Outputs and inputs must have same length")
         
-        results = []
-        for output, input_data in zip(outputs, inputs):
-            result = await self.validate_output(output, input_data)
-            results.append(result)
+        if pack_size is None:
+            pack_size = int(self.settings.gemini_validation_pack_size)
+        max_chars = int(self.settings.gemini_validation_pack_max_chars)
+        targets = list(zip(outputs, inputs))
+        
+        # Large targets get a request each; small ones share one
+        groups: List[List[int]] = []
+        small: List[int] = []
+        for i, (output, input_data) in enumerate(targets):
+            size = len(json.dumps(output, default=str)) + len(json.dumps(input_data, default=str))
+            if pack_size > 1 and size <= max_chars:
+                small.append(i)
+            else:
+                groups.append([i])
+        groups.extend(small[i:i + pack_size] for i in range(0, len(small), pack_size))
+        
+        async def _validate(group: List[int]) -> List[ValidationResult]:
+            if len(group) == 1:
+                return [await self.validate_output(*targets[group[0]])]
+            return await self._validate_packed([targets[i] for i in group])
+        
+        results: List[Optional[ValidationResult]] = [None] * len(targets)
+        for group, item in zip(groups, await self.run_batch(groups, _validate)):
+            for position, i in enumerate(group):
+                if item.ok:
+                    results[i] = item.result[position]
+                else:
+                    # Same conservative result as an unparseable validation
+                    results[i] = ValidationResult(
+                        verified=False,
+                        confidence=0.0,
+                        unsupported_claims=[
+                            f"Validation failed: {str(item.error) or type(item.error).__name__}"
+                        ],
+                        recommendations=["Manual review required"]
+                    )
         
         return results
     
+    async def _validate_packed(
+        self,
+        targets: List[Tuple[Dict[str, Any], Dict[str, Any]]]
+    ) -> List[ValidationResult]:
+        """Validate several small targets with a single request."""
+        
+        sections = "\n".join(
+            f"""TARGET {n}
+INPUT DATA (GROUND TRUTH):
+{json.dumps(input_data, indent=2)}
+
+OUTPUT TO VALIDATE (AI CLAIMS):
+{json.dumps(output, indent=2)}
+"""
+            for n, (output, input_data) in enumerate(targets, start=1)
+        )
+        
+        prompt = f"""You are a rigorous fact-checker and data validator.
+
+Your job is to verify that AI-generated outputs are FULLY SUPPORTED by the input data.
+There are {len(targets)} independent targets. Validate each one ONLY against its own input data.
+
+{sections}
+{VALIDATION_TASKS}
+
+RETURN AS JSON, with one result per target in target order:
+{{
+    "results": [RESULT_FOR_TARGET_1, RESULT_FOR_TARGET_2, ...]
+}}
+
+Each result has this shape:
+{VALIDATION_RESULT_SHAPE}
+
+{VALIDATION_STRICTNESS}
+"""
+        
+        result = await self.generate(
+            prompt=prompt,
+            thinking_level=ThinkingLevel.DEEP,
+            enable_thought_trace=True
+        )
+        
+        try:
+            packed = PackedValidationResults(**result["data"]).results
+            if len(packed) == len(targets):
+                return packed
+            logger.warning(
+                "packed_validation_count_mismatch",
+                expected=len(targets),
+                received=len(packed)
+            )
+        except Exception as e:
+            logger.warning("packed_validation_parse_error", error=str(e))
+        
+        # Fall back to one request per target
+        return list(
+            await asyncio.gather(
+                *(self.validate_output(output, input_data) for output, input_data in targets)
+            )
+        )
+    
     # ==================== Utility Methods ====================
     
     def get_validation_summary(
@@ -9,6 +9,7 @@ from typing import Any, Dict, List, Optional
 from loguru import logger
 
 from app.services.gemini.base_agent import GeminiBaseAgent, GeminiModel, ThinkingLevel
+from app.services.intelligence.enrichment_engine import fan_out
 from app.services.intelligence.geocoding import GeocodingService
 from app.services.intelligence.location import PlacesService
 
@@ -359,10 +360,9 @@ class ScoutAgent(GeminiBaseAgent):
                 confidence=0.85,
             )
 
-            for i, profile in enumerate(self.discovered_competitors):
-                if i < 3:
-                    await self._analyze_competitor_photos(profile)
-                    await self._analyze_competitor_positioning(profile, our_menu)
+            await self._deep_analyze_competitors(
+                self.discovered_competitors[:3], our_menu
+            )
 
         # 5. Comparative Analysis & Report
         if websocket_callback:
@@ -401,6 +401,38 @@ class ScoutAgent(GeminiBaseAgent):
             "processing_time_ms": processing_time,
         }
 
+    async def _deep_analyze_competitors(
+        self,
+        profiles: List[CompetitorProfile],
+        our_menu: Optional[Dict[str, Any]],
+    ) -> None:
+        """Run photo and positioning analysis concurrently, recording failures."""
+
+        async def _deep_analyze(profile: CompetitorProfile):
+            # Positioning uses the photo scores, so these stay sequential per competitor
+            await self._analyze_competitor_photos(profile)
+            await self._analyze_competitor_positioning(profile, our_menu)
+
+        results = await fan_out(
+            profiles,
+            _deep_analyze,
+            max_concurrency=int(self.settings.enrichment_max_concurrent_competitors),
+        )
+
+        failures = []
+        for profile, result in zip(profiles, results):
+            if isinstance(result, Exception):
+                logger.error(f"Deep analysis failed for {profile.name}: {result}")
+                failures.append(f"{profile.name}: {result}")
+
+        if failures:
+            self._add_thought(
+                action=ScoutAction.ANALYZE_PHOTOS,
+                reasoning=f"Deep analysis failed for {len(failures)} of {len(profiles)} competitors.",
+                observations=failures,
+                confidence=0.0,
+            )
+
     def _calculate_distance(
         self, loc1: Dict[str, float], loc2: Dict[str, float]
     ) -> float:
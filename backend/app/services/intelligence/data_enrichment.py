@@ -9,18 +9,23 @@ Capabilities:
 - Multimedia content analysis (photos, videos, menus)
 """
 
+import asyncio
 import json
 import re
 import urllib.parse
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 from uuid import uuid4
 
 import httpx
 from loguru import logger
 
+from app.core.config import get_settings
+from app.core.gemini_executor import RequestPriority
+from app.core.http_clients import get_http_client
 from app.services.gemini.base_agent import GeminiAgent
+from app.services.intelligence.enrichment_engine import EnrichmentRun, HostLimiter, fan_out
 
 
 @dataclass
@@ -190,11 +195,28 @@ class CompetitorEnrichmentService:
     ):
         self.google_api_key = google_maps_api_key
         self.gemini = gemini_agent or GeminiAgent()
+
+        settings = get_settings()
+        self.step_timeout = settings.enrichment_step_timeout_seconds
+        self.max_concurrent_competitors = settings.enrichment_max_concurrent_competitors
+        # Gemini calls are already bounded by the shared executor; HTTP is bounded here
+        self.limiter = HostLimiter(
+            default_limit=settings.enrichment_per_host_limit,
+            limits={"places.googleapis.com": settings.enrichment_places_concurrency},
+        )
         
         if not self.google_api_key:
             logger.info("CompetitorEnrichmentService initialized without Google Maps API key. Place Details extraction will be disabled.")
 
-        self.http_client = httpx.AsyncClient(
+        self._http_client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Shared pooled client for enrichment sources, unless one was injected."""
+        if self._http_client is not None:
+            return self._http_client
+        return get_http_client(
+            "competitor_enrichment",
             timeout=30.0,
             follow_redirects=True,
             headers={
@@ -202,6 +224,45 @@ class CompetitorEnrichmentService:
             },
         )
 
+    @http_client.setter
+    def http_client(self, client: httpx.AsyncClient):
+        self._http_client = client
+
+    async def _http_get(self, url: str, **kwargs) -> httpx.Response:
+        """GET through the shared client, within the target host's concurrency limit."""
+        async with self.limiter.slot(HostLimiter.host_of(url)):
+            return await self.http_client.get(url, **kwargs)
+
+    async def enrich_competitors(
+        self,
+        competitors: List[Dict[str, Any]],
+        on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None,
+    ) -> List[Any]:
+        """
+        Enrich several competitors concurrently.
+
+        Args:
+            competitors: Basic competitor dicts (with ``place_id`` or ``placeId``)
+            on_progress: Optional ``await on_progress(completed, total)`` hook
+
+        Returns:
+            One entry per competitor, in order: a CompetitorProfile, or the
+            exception that enrichment raised for it
+        """
+
+        async def _enrich(comp: Dict[str, Any]) -> CompetitorProfile:
+            return await self.enrich_competitor_profile(
+                place_id=comp.get("place_id") or comp.get("placeId"),
+                basic_info=comp,
+            )
+
+        return await fan_out(
+            competitors,
+            _enrich,
+            max_concurrency=self.max_concurrent_competitors,
+            on_done=on_progress,
+        )
+
     async def enrich_competitor_profile(
         self,
         place_id: str,
@@ -225,8 +286,12 @@ class CompetitorEnrichmentService:
             competitor_id=competitor_id,
         )
 
+        run = EnrichmentRun(self.step_timeout)
+
         # Step 1: Google Maps Place Details
-        maps_data = await self._get_place_details(place_id)
+        maps_data = await run.step(
+            "place_details", self._get_place_details(place_id), default=None
+        )
 
         if not maps_data:
             if basic_info:
@@ -256,89 +321,100 @@ class CompetitorEnrichmentService:
                 logger.warning(f"Could not get place details for {place_id}")
                 return self._create_minimal_profile(competitor_id, basic_info or {})
 
-        # Step 2: Cross-reference with web search
-        try:
-            web_data = await self._cross_reference_web_search(
-                name=maps_data.get("name"),
-                phone=maps_data.get("formatted_phone_number"),
-                address=maps_data.get("formatted_address"),
-                google_maps_url=maps_data.get("url"),
-            )
-        except Exception as e:
-            logger.error(f"Step 2 (web search) failed: {e}")
-            web_data = {}
+        # Steps 2, 5 and 7 only need the Maps data, so they run together
+        web_data, photo_analysis, reviews_summary = await asyncio.gather(
+            # Step 2: Cross-reference with web search
+            run.step(
+                "web_search",
+                self._cross_reference_web_search(
+                    name=maps_data.get("name"),
+                    phone=maps_data.get("formatted_phone_number"),
+                    address=maps_data.get("formatted_address"),
+                    google_maps_url=maps_data.get("url"),
+                ),
+                default={},
+            ),
+            # Step 5: Analyze photos with Gemini Vision
+            run.step(
+                "photo_analysis",
+                self._analyze_competitor_photos(maps_data.get("photos", [])),
+                default={},
+            ),
+            # Step 7: Process reviews with Gemini
+            run.step(
+                "reviews",
+                self._analyze_reviews(maps_data.get("reviews", [])),
+                default={},
+            ),
+        )
 
-        # Step 3: Identify social media
-        try:
-            social_profiles = await self._identify_social_media(
-                name=maps_data.get("name"),
-                website=maps_data.get("website"),
-                phone=maps_data.get("formatted_phone_number"),
-                web_results=web_data,
-                address=maps_data.get("formatted_address") or maps_data.get("address"),
+        async def _social_to_consolidation():
+            # Step 3: Identify social media
+            social_profiles = await run.step(
+                "social_media",
+                self._identify_social_media(
+                    name=maps_data.get("name"),
+                    website=maps_data.get("website"),
+                    phone=maps_data.get("formatted_phone_number"),
+                    web_results=web_data,
+                    address=maps_data.get("formatted_address") or maps_data.get("address"),
+                ),
+                default=[],
             )
-        except Exception as e:
-            logger.error(f"Step 3 (social media) failed: {e}")
-            social_profiles = []
 
-        # Step 4: Extract WhatsApp Business data if available
-        try:
-            whatsapp_data = await self._extract_whatsapp_business(
-                phone=maps_data.get("formatted_phone_number"),
-                social_profiles=social_profiles,
+            # Step 4: Extract WhatsApp Business data if available
+            whatsapp_data = await run.step(
+                "whatsapp",
+                self._extract_whatsapp_business(
+                    phone=maps_data.get("formatted_phone_number"),
+                    social_profiles=social_profiles,
+                ),
+                default={},
             )
-        except Exception as e:
-            logger.error(f"Step 4 (WhatsApp) failed: {e}")
-            whatsapp_data = {}
 
-        # Step 5: Analyze photos with Gemini Vision
-        try:
-            photo_analysis = await self._analyze_competitor_photos(
-                maps_data.get("photos", [])
+            # Step 6: Extract menu from all sources
+            menu_data = await run.step(
+                "menu_extraction",
+                self._extract_menu_all_sources(
+                    maps_data=maps_data,
+                    web_data=web_data,
+                    whatsapp_data=whatsapp_data,
+                    photo_analysis=photo_analysis,
+                ),
+                default={},
             )
-        except Exception as e:
-            logger.error(f"Step 5 (photo analysis) failed: {e}")
-            photo_analysis = {}
 
-        # Step 6: Extract menu from all sources
-        try:
-            menu_data = await self._extract_menu_all_sources(
-                maps_data=maps_data,
-                web_data=web_data,
-                whatsapp_data=whatsapp_data,
-                photo_analysis=photo_analysis,
+            # Step 8: Consolidate everything with Gemini
+            intelligence = await run.step(
+                "consolidation",
+                self._consolidate_intelligence(
+                    maps_data=maps_data,
+                    web_data=web_data,
+                    social_data={"profiles": social_profiles},
+                    menu_data=menu_data,
+                    reviews_summary=reviews_summary,
+                    photo_analysis=photo_analysis,
+                ),
+                default={},
             )
-        except Exception as e:
-            logger.error(f"Step 6 (menu extraction) failed: {e}")
-            menu_data = {}
-
-        # Step 7: Process reviews with Gemini
-        try:
-            reviews_summary = await self._analyze_reviews(maps_data.get("reviews", []))
-        except Exception as e:
-            logger.error(f"Step 7 (reviews) failed: {e}")
-            reviews_summary = {}
-
-        # Step 8: Consolidate everything with Gemini
-        try:
-            intelligence = await self._consolidate_intelligence(
-                maps_data=maps_data,
-                web_data=web_data,
-                social_data={"profiles": social_profiles},
-                menu_data=menu_data,
-                reviews_summary=reviews_summary,
-                photo_analysis=photo_analysis,
+            return social_profiles, whatsapp_data, menu_data, intelligence
+
+        # Step 9 (delivery platforms, with retry for failed URLs) only needs
+        # the web search, so it runs alongside the social -> menu chain
+        (social_profiles, whatsapp_data, menu_data, intelligence), delivery_platforms = (
+            await asyncio.gather(
+                _social_to_consolidation(),
+                run.step(
+                    "delivery_platforms",
+                    self._validate_delivery_platforms(
+                        self._extract_delivery_platforms(web_data),
+                        business_name=maps_data.get("name"),
+                        business_address=maps_data.get("formatted_address"),
+                        grounding_chunk_urls=web_data.get("_grounding_chunk_urls"),
+                    ),
+                    default=[],
+                ),
             )
-        except Exception as e:
-            logger.error(f"Step 8 (consolidation) failed: {e}")
-            intelligence = {}
-
-        # Step 9: Extract and validate delivery platforms (with retry for failed URLs)
-        delivery_platforms = await self._validate_delivery_platforms(
-            self._extract_delivery_platforms(web_data),
-            business_name=maps_data.get("name"),
-            business_address=maps_data.get("formatted_address"),
-            grounding_chunk_urls=web_data.get("_grounding_chunk_urls"),
         )
 
         # Build complete profile
@@ -378,7 +454,7 @@ class CompetitorEnrichmentService:
                 maps_data, web_data, social_profiles, whatsapp_data
             ),
             confidence_score=self._calculate_confidence(maps_data, web_data, menu_data),
-            enrichment_notes=intelligence.get("notes", []),
+            enrichment_notes=intelligence.get("notes", []) + run.notes(),
         )
 
         logger.info(
@@ -402,14 +478,14 @@ class CompetitorEnrichmentService:
         valid = []
         failed_platforms = []
 
-        for p in platforms:
-            url = p.get("url")
-            if url:
-                if await self._validate_url(url):
-                    valid.append(p)
-                else:
-                    logger.warning(f"Delivery platform URL failed validation: {p['name']} -> {url}")
-                    failed_platforms.append(p["name"])
+        with_urls = [p for p in platforms if p.get("url")]
+        checks = await asyncio.gather(*(self._validate_url(p["url"]) for p in with_urls))
+        for p, ok in zip(with_urls, checks):
+            if ok:
+                valid.append(p)
+            else:
+                logger.warning(f"Delivery platform URL failed validation: {p['name']} -> {p['url']}")
+                failed_platforms.append(p["name"])
 
         # Also retry if no Rappi was found at all in the initial results
         rappi_names = [p["name"] for p in platforms if "rappi" in p.get("name", "").lower()]
@@ -506,7 +582,7 @@ class CompetitorEnrichmentService:
             try:
                 encoded_q = urllib.parse.quote_plus(query)
                 ddg_url = f"https://lite.duckduckgo.com/lite?q={encoded_q}"
-                resp = await self.http_client.get(ddg_url, headers=ddg_headers, follow_redirects=True, timeout=15.0)
+                resp = await self._http_get(ddg_url, headers=ddg_headers, follow_redirects=True, timeout=15.0)
                 logger.debug(f"Rappi DDG query={query!r} status={resp.status_code} body_len={len(resp.text)}")
                 if resp.status_code == 200:
                     matches = rappi_store_pattern.findall(resp.text)
@@ -553,6 +629,7 @@ List every rappi.com.co URL you find. Include the complete URL."""
         try:
             response = await self.gemini.generate_with_grounding(
                 prompt=prompt,
+                priority=RequestPriority.BACKGROUND,
                 enable_grounding=True,
                 thinking_level="STANDARD",
                 temperature=0.1,
@@ -653,7 +730,7 @@ List every rappi.com.co URL you find. Include the complete URL."""
                 "X-Goog-LanguageCode": "es"
             }
 
-            response = await self.http_client.get(url, headers=headers)
+            response = await self._http_get(url, headers=headers)
             
             if response.status_code == 200:
                 data = response.json()
@@ -828,6 +905,7 @@ Respond ONLY with valid JSON:
             # NOTE: Do NOT set response_mime_type — it is incompatible with Google Search grounding
             response = await self.gemini.generate_with_grounding(
                 prompt=prompt,
+                priority=RequestPriority.BACKGROUND,
                 enable_grounding=True,
                 thinking_level="STANDARD",
                 temperature=0.3,
@@ -849,6 +927,7 @@ Respond ONLY with valid JSON:
                 # Retry once with a simpler prompt
                 response = await self.gemini.generate_with_grounding(
                     prompt=prompt,
+                    priority=RequestPriority.BACKGROUND,
                     enable_grounding=True,
                     thinking_level="DEEP",
                     temperature=0.2,
@@ -896,7 +975,7 @@ Respond ONLY with valid JSON:
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
                 "Accept-Language": "es-CO,es;q=0.9,en;q=0.8",
             }
-            response = await self.http_client.get(url, headers=headers, follow_redirects=True)
+            response = await self._http_get(url, headers=headers, follow_redirects=True)
             
             if response.status_code == 404:
                 logger.warning(f"Validation failed (404) for URL: {url}")
@@ -913,7 +992,7 @@ Respond ONLY with valid JSON:
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
                 "Accept-Language": "es-CO,es;q=0.9,en;q=0.8",
             }
-            response = await self.http_client.get(url, headers=headers, follow_redirects=True)
+            response = await self._http_get(url, headers=headers, follow_redirects=True)
             
             if response.status_code == 404:
                 logger.warning(f"Facebook page not found (404): {url}")
@@ -968,7 +1047,7 @@ Respond ONLY with valid JSON:
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
                 "Accept-Language": "es-CO,es;q=0.9,en;q=0.8",
             }
-            response = await self.http_client.get(url, headers=headers, follow_redirects=True)
+            response = await self._http_get(url, headers=headers, follow_redirects=True)
             
             if response.status_code == 404:
                 logger.warning(f"Rappi store not found (404): {url}")
@@ -1156,7 +1235,7 @@ Respond ONLY with valid JSON:
                     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
                     "Accept-Language": "es-CO,es;q=0.9,en;q=0.8",
                 }
-                response = await self.http_client.get(url, headers=headers, follow_redirects=True)
+                response = await self._http_get(url, headers=headers, follow_redirects=True)
 
                 # Check for unavailable page
                 is_unavailable = False
@@ -1249,7 +1328,7 @@ Respond ONLY with valid JSON:
                     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
                     "Accept-Language": "es-CO,es;q=0.9,en;q=0.8",
                 }
-                response = await self.http_client.get(url, headers=headers, follow_redirects=True)
+                response = await self._http_get(url, headers=headers, follow_redirects=True)
 
                 if response.status_code == 200:
                     body = response.text.lower()
@@ -1362,11 +1441,12 @@ Respond in JSON:
 
             # Due to constraints, we only use the first photo
             # In production, multiple photos would be processed
-            photo_data = await self.http_client.get(photo_urls[0])
+            photo_data = await self._http_get(photo_urls[0])
             
             # Use shared Gemini agent
             response_text = await self.gemini.generate(
                 prompt=prompt,
+                priority=RequestPriority.BACKGROUND,
                 images=[photo_data.content],
                 temperature=0.4,
                 max_output_tokens=2048,
@@ -1446,7 +1526,7 @@ Respond in JSON:
         """Scrape competitor menu from their website using Gemini."""
 
         try:
-            response = await self.http_client.get(website_url, timeout=15.0)
+            response = await self._http_get(website_url, timeout=15.0)
             html_content = response.text[:20000]  # Limit size
 
             # Use Gemini to extract the menu
@@ -1465,6 +1545,7 @@ Respond in JSON:
             # Use shared Gemini agent
             response_text = await self.gemini.generate(
                 prompt=prompt,
+                priority=RequestPriority.BACKGROUND,
                 temperature=0.3,
                 max_output_tokens=4096,
             )
@@ -1509,6 +1590,7 @@ Summarize in 2-3 paragraphs."""
 
             response_text = await self.gemini.generate(
                 prompt=prompt,
+                priority=RequestPriority.BACKGROUND,
                 temperature=0.4,
                 max_output_tokens=1024,
             )
@@ -1578,6 +1660,7 @@ Respond in JSON:
             # Use shared Gemini agent
             response_text = await self.gemini.generate(
                 prompt=context,
+                priority=RequestPriority.BACKGROUND,
                 temperature=0.4,
                 max_output_tokens=2048,
             )
@@ -1748,5 +1831,6 @@ Respond in JSON:
         )
 
     async def close(self):
-        """Close the HTTP client."""
-        await self.http_client.aclose()
+        """Close an injected HTTP client; the shared one closes on app shutdown."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
@@ -0,0 +1,153 @@
+"""
+Fan-out primitives for competitor enrichment.
+
+Enrichment issues many slow, independent calls (Places details, web
+search, social probes, delivery platform checks, Gemini analysis). These
+helpers let callers run them concurrently while keeping them polite and
+bounded:
+- Per-host / per-API concurrency limits for outbound HTTP
+- Per-step deadlines that degrade to a default instead of failing
+- Bounded fan-out over many competitors with ordered, partial results
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, TypeVar
+from urllib.parse import urlparse
+
+from loguru import logger
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class HostLimiter:
+    """Caps concurrent requests per host (or named API)."""
+
+    def __init__(self, default_limit: int = 2, limits: Optional[Dict[str, int]] = None):
+        self.default_limit = max(1, default_limit)
+        self.limits = dict(limits or {})
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return (urlparse(url).hostname or "").lower()
+
+    @asynccontextmanager
+    async def slot(self, key: str):
+        """Hold one of ``key``'s concurrency slots for the duration of the block."""
+        if key not in self._semaphores:
+            self._semaphores[key] = asyncio.Semaphore(
+                max(1, self.limits.get(key, self.default_limit))
+            )
+        async with self._semaphores[key]:
+            yield
+
+
+@dataclass
+class StepOutcome:
+    """How one enrichment step finished."""
+
+    name: str
+    status: str  # ok, timeout, error
+    elapsed_ms: float
+    error: Optional[str] = None
+
+
+class EnrichmentRun:
+    """
+    Runs the steps of one enrichment under per-step deadlines.
+
+    A step that times out or raises yields its default value, so the
+    profile is still built from whatever the other steps returned.
+    """
+
+    def __init__(self, step_timeout: Optional[float] = None):
+        self.step_timeout = step_timeout
+        self.outcomes: List[StepOutcome] = []
+
+    async def step(
+        self,
+        name: str,
+        awaitable: Awaitable[T],
+        default: T,
+        timeout: Optional[float] = None,
+    ) -> T:
+        """Await ``awaitable`` within the deadline, falling back to ``default``."""
+        timeout = timeout if timeout is not None else self.step_timeout
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(awaitable, timeout=timeout)
+            self._record(name, "ok", start)
+            return result
+        except asyncio.TimeoutError:
+            logger.warning(f"Enrichment step '{name}' timed out after {timeout}s")
+            self._record(name, "timeout", start)
+        except Exception as e:
+            logger.error(f"Enrichment step '{name}' failed: {e}")
+            self._record(name, "error", start, str(e))
+        return default
+
+    @property
+    def partial(self) -> bool:
+        return any(o.status != "ok" for o in self.outcomes)
+
+    def notes(self) -> List[str]:
+        """Human-readable notes for steps that did not complete."""
+        return [
+            f"Partial data: step '{o.name}' "
+            + ("timed out" if o.status == "timeout" else f"failed ({o.error})")
+            for o in self.outcomes
+            if o.status != "ok"
+        ]
+
+    def _record(self, name: str, status: str, start: float, error: Optional[str] = None):
+        self.outcomes.append(
+            StepOutcome(
+                name=name,
+                status=status,
+                elapsed_ms=round((time.perf_counter() - start) * 1000, 1),
+                error=error,
+            )
+        )
+
+
+async def fan_out(
+    items: Sequence[T],
+    worker: Callable[[T], Awaitable[R]],
+    max_concurrency: int,
+    on_done: Optional[Callable[[int, int], Awaitable[None]]] = None,
+) -> List[Any]:
+    """
+    Run ``worker`` over ``items`` with at most ``max_concurrency`` in flight.
+
+    Args:
+        items: Inputs, one worker call each
+        worker: Coroutine function applied to each item
+        max_concurrency: Upper bound on concurrent worker calls
+        on_done: Optional ``await on_done(completed, total)`` progress hook
+
+    Returns:
+        Results in input order; a failed item yields its exception instead
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    completed = 0
+
+    async def _run(item: T) -> Any:
+        nonlocal completed
+        async with semaphore:
+            try:
+                return await worker(item)
+            except Exception as e:
+                return e
+            finally:
+                completed += 1
+                if on_done:
+                    try:
+                        await on_done(completed, len(items))
+                    except Exception as e:
+                        logger.debug(f"Fan-out progress hook failed: {e}")
+
+    return await asyncio.gather(*(_run(item) for item in items))
@@ -1,8 +1,9 @@
-import httpx
 from typing import Optional
 from pydantic import BaseModel
 from loguru import logger
 from app.core.config import get_settings
+from app.core.http_clients import GOOGLE_API_RETRY, get_http_client
+from app.services.intelligence.places_cache import PlacesCache
 
 class GeocodingResult(BaseModel):
     latitude: float
@@ -17,6 +18,7 @@ class GeocodingService:
         self.settings = get_settings()
         self.api_key = self.settings.google_maps_api_key
         self.base_url = "https://maps.googleapis.com/maps/api/geocode/json"
+        self.cache = PlacesCache()
     
     async def geocode(self, address: str) -> GeocodingResult:
         """
@@ -27,14 +29,18 @@ class GeocodingService:
             logger.warning("GOOGLE_MAPS_API_KEY not found. Using mock geocoding data.")
             return self._get_mock_geocode(address)
 
+        cached = await self.cache.get_geocode(address)
+        if cached is not None:
+            return GeocodingResult(**cached)
+
         params = {
             "address": address,
             "key": self.api_key
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(self.base_url, params=params)
-            data = response.json()
+        client = get_http_client("google_apis", retry=GOOGLE_API_RETRY)
+        response = await client.get(self.base_url, params=params)
+        data = response.json()
         
         if data["status"] != "OK":
             logger.error(f"Geocoding failed: {data['status']} - {data.get('error_message', '')}")
@@ -60,7 +66,7 @@ class GeocodingService:
             if "country" in types:
                 country = component["long_name"]
         
-        return GeocodingResult(
+        geocoded = GeocodingResult(
             latitude=location["lat"],
             longitude=location["lng"],
             formatted_address=result["formatted_address"],
@@ -68,6 +74,8 @@ class GeocodingService:
             city=city or "Unknown",
             country=country or "Unknown"
         )
+        await self.cache.set_geocode(address, geocoded.model_dump())
+        return geocoded
 
     def _get_mock_geocode(self, address: str) -> GeocodingResult:
         """Return mock data for demo/testing without API key."""
@@ -1,8 +1,14 @@
-import httpx
 from typing import List, Dict, Optional
 from pydantic import BaseModel
 from loguru import logger
 from app.core.config import get_settings
+from app.core.http_clients import GOOGLE_API_RETRY, get_http_client
+from app.services.intelligence.places_cache import (
+    NEARBY_PAGE_SIZE,
+    PlacesCache,
+    places_within,
+    tile_query,
+)
 
 class PlaceResult(BaseModel):
     place_id: str
@@ -32,6 +38,12 @@ class PlacesService:
         self.legacy_nearby_url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
         self.legacy_details_url = "https://maps.googleapis.com/maps/api/place/details/json"
         self.legacy_photo_url = "https://maps.googleapis.com/maps/api/place/photo"
+        self.cache = PlacesCache()
+
+    @staticmethod
+    def _client():
+        """Shared pooled client for Google Maps Platform APIs."""
+        return get_http_client("google_apis", retry=GOOGLE_API_RETRY)
 
     async def search_nearby_restaurants(
         self,
@@ -47,9 +59,42 @@ class PlacesService:
             logger.warning("GOOGLE_PLACES_API_KEY not found. Using mock places data.")
             return self._get_mock_places(latitude, longitude, max_results)
 
-        # Try V1 API first
+        cached = await self.cache.get_nearby(
+            latitude, longitude, radius_meters, "restaurant", max_results
+        )
+        if cached is not None:
+            logger.info(f"Nearby search served from cache ({len(cached)} places)")
+            return [PlaceResult(**place) for place in cached[:max_results]]
+
+        # Try V1 API first, searching the whole tile so nearby queries can reuse it
         try:
-            return await self._search_nearby_v1(latitude, longitude, radius_meters, max_results)
+            tile = tile_query(latitude, longitude, radius_meters, "restaurant")
+            if tile is not None and not await self.cache.is_dense(tile):
+                places = await self._search_nearby_v1(
+                    tile.latitude, tile.longitude, tile.radius, NEARBY_PAGE_SIZE
+                )
+                found = [place.model_dump() for place in places]
+                await self.cache.set_nearby(tile, found)
+                if len(found) < NEARBY_PAGE_SIZE:
+                    return [
+                        PlaceResult(**place)
+                        for place in places_within(found, latitude, longitude, radius_meters)[
+                            :max_results
+                        ]
+                    ]
+
+            # Dense area (the capped tile search would miss places within the
+            # radius) or a radius too large to tile
+            places = await self._search_nearby_v1(latitude, longitude, radius_meters, max_results)
+            await self.cache.set_nearby_point(
+                latitude,
+                longitude,
+                radius_meters,
+                max_results,
+                "restaurant",
+                [place.model_dump() for place in places],
+            )
+            return places
         except Exception as e:
             logger.warning(f"V1 Places Search failed: {e}. Falling back to Legacy.")
             # Fallback logic could go here, but since we know Legacy is blocked, we raise or return empty
@@ -83,9 +128,7 @@ class PlacesService:
             }
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(self.search_url, headers=headers, json=body)
-            
+        response = await self._client().post(self.search_url, headers=headers, json=body)
         if response.status_code != 200:
             raise ValueError(f"Places V1 Search error: {response.status_code} - {response.text}")
             
@@ -135,9 +178,8 @@ class PlacesService:
             "key": self.api_key
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(self.legacy_nearby_url, params=params)
-            data = response.json()
+        response = await self._client().get(self.legacy_nearby_url, params=params)
+        data = response.json()
         
         if data["status"] not in ["OK", "ZERO_RESULTS"]:
             logger.error(f"Legacy search failed: {data['status']}")
@@ -154,6 +196,10 @@ class PlacesService:
         if not self.api_key:
             return self._get_mock_place_details(place_id)
 
+        cached = await self.cache.get_place_details(place_id)
+        if cached is not None:
+            return PlaceResult(**cached)
+
         # Try V1
         try:
             url = f"{self.details_base_url}/{place_id}"
@@ -163,9 +209,7 @@ class PlacesService:
                 "X-Goog-FieldMask": "id,displayName,formattedAddress,location,rating,userRatingCount,priceLevel,types,nationalPhoneNumber,websiteUri,regularOpeningHours,photos"
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, headers=headers)
-                
+            response = await self._client().get(url, headers=headers)
             if response.status_code != 200:
                 raise ValueError(f"Details V1 error: {response.status_code}")
                 
@@ -175,7 +219,7 @@ class PlacesService:
             if "photos" in place:
                 photos = [p["name"] for p in place["photos"][:5]]
 
-            return PlaceResult(
+            details = PlaceResult(
                 place_id=place.get("id"),
                 name=place.get("displayName", {}).get("text", "Unknown"),
                 address=place.get("formattedAddress", ""),
@@ -190,6 +234,8 @@ class PlacesService:
                 opening_hours=place.get("regularOpeningHours"),
                 photos=photos
             )
+            await self.cache.set_place_details(place_id, details.model_dump())
+            return details
 
         except Exception as e:
             logger.error(f"V1 details failed: {e}")
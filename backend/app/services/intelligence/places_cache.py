@@ -0,0 +1,368 @@
+"""
+Persistent cache for geocoding and Google Places results.
+
+Scouting missions for nearby addresses (or several branches of one chain)
+keep geocoding the same addresses and searching the same city blocks.
+Results are kept in the shared CacheManager, whose L2 tier survives
+restarts:
+- Geocoding, keyed by normalized address
+- Place details, keyed by place_id
+- Nearby searches, keyed by geohash tile + radius + place type
+
+Nearby searches are issued per tile rather than per exact point: the
+search is centered on the geohash cell the point falls in, with the radius
+grown by the cell's half-diagonal, so every point of that cell reuses it.
+A later query is also answered from any stored, untruncated tile search
+whose circle fully contains the query circle, filtered down to the query
+radius.
+
+A tile search that hits the API's result cap would drop places inside the
+query radius once filtered, so it is never served. The tile is marked as
+dense instead, and queries centered in it use (and cache) the exact
+point/radius search. Capped searches are also indexed by area, so a cold
+query next to a known dense tile skips the tile search and goes straight
+to the exact one. Tiling is skipped as well when the grown radius would
+exceed the API's maximum.
+"""
+
+import math
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from app.core.cache import get_cache_manager
+from app.core.config import get_settings
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Cell size of nearby-search tiles (~153m x 153m at precision 7)
+TILE_PRECISION = 7
+
+# Cell size of the tile index used to find covering searches (~4.9km)
+INDEX_PRECISION = 5
+
+# Tile search radii are rounded up to this step (meters)
+RADIUS_STEP = 50
+
+# Results per Places nearby search (API maximum); fewer means the search was complete
+NEARBY_PAGE_SIZE = 20
+
+# Largest radius a Places nearby search accepts (meters)
+MAX_NEARBY_RADIUS = 50000
+
+# Tile searches remembered per index cell and place type
+MAX_INDEX_ENTRIES = 200
+
+# Exact searches in dense tiles are keyed by this cell size (~5m at precision 9)
+POINT_PRECISION = 9
+
+_EARTH_RADIUS_M = 6371008.8
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int) -> str:
+    """Geohash of a point."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    cell = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(cell) < precision:
+        rng, value = (lng_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            cell.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(cell)
+
+
+def geohash_bounds(cell: str) -> Tuple[float, float, float, float]:
+    """(lat_min, lat_max, lng_min, lng_max) of a geohash cell."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+    for char in cell:
+        bits = _BASE32.index(char)
+        for shift in range(4, -1, -1):
+            rng = lng_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if bits >> shift & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_range[0], lat_range[1], lng_range[0], lng_range[1]
+
+
+def geohash_neighbours(cell: str) -> List[str]:
+    """The (up to) 8 cells surrounding ``cell``."""
+    lat_min, lat_max, lng_min, lng_max = geohash_bounds(cell)
+    lat_center, lng_center = (lat_min + lat_max) / 2, (lng_min + lng_max) / 2
+    height, width = lat_max - lat_min, lng_max - lng_min
+    neighbours = []
+    for d_lat in (-1, 0, 1):
+        for d_lng in (-1, 0, 1):
+            if not d_lat and not d_lng:
+                continue
+            lat = lat_center + d_lat * height
+            if not -90 <= lat <= 90:
+                continue
+            lng = (lng_center + d_lng * width + 180) % 360 - 180
+            neighbour = geohash_encode(lat, lng, len(cell))
+            if neighbour not in neighbours:
+                neighbours.append(neighbour)
+    return neighbours
+
+
+def distance_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance in meters."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * _EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def normalize_address(address: str) -> str:
+    """Address reduced to lowercase ASCII words, for cache keys."""
+    text = unicodedata.normalize("NFKD", address or "")
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return " ".join(re.sub(r"[^\w#]+", " ", text).split())
+
+
+@dataclass
+class TileQuery:
+    """The nearby search that stands in for every query centered in one tile."""
+
+    cell: str
+    latitude: float
+    longitude: float
+    radius: int
+    place_type: str
+
+    @property
+    def key(self) -> str:
+        return f"places_nearby:{self.place_type}:{self.cell}:{self.radius}"
+
+
+def tile_query(
+    latitude: float, longitude: float, radius: int, place_type: str
+) -> Optional[TileQuery]:
+    """
+    Tile search covering a ``radius`` circle around any point of the point's cell.
+
+    Returns None when the grown radius exceeds the API maximum; such queries
+    use the exact search.
+    """
+    cell = geohash_encode(latitude, longitude, TILE_PRECISION)
+    lat_min, lat_max, lng_min, lng_max = geohash_bounds(cell)
+    lat_center, lng_center = (lat_min + lat_max) / 2, (lng_min + lng_max) / 2
+    # The cell corner nearest the equator is the farthest from the center
+    corner_lat = lat_min if abs(lat_min) < abs(lat_max) else lat_max
+    half_diagonal = distance_m(lat_center, lng_center, corner_lat, lng_max)
+    tile_radius = int(math.ceil((radius + half_diagonal) / RADIUS_STEP) * RADIUS_STEP)
+    if tile_radius > MAX_NEARBY_RADIUS:
+        return None
+    return TileQuery(cell, lat_center, lng_center, tile_radius, place_type)
+
+
+def places_within(
+    places: List[Dict[str, Any]], latitude: float, longitude: float, radius: float
+) -> List[Dict[str, Any]]:
+    """Places of a tile search that fall inside the query circle, in search order."""
+    return [
+        place
+        for place in places
+        if distance_m(latitude, longitude, place.get("latitude", 0.0), place.get("longitude", 0.0))
+        <= radius
+    ]
+
+
+class PlacesCache:
+    """Geocoding, place details and nearby-search results in the shared cache."""
+
+    TAG = "places"
+
+    def __init__(self):
+        settings = get_settings()
+        self.geocode_ttl = int(settings.geocode_cache_ttl_seconds)
+        self.nearby_ttl = int(settings.places_nearby_cache_ttl_seconds)
+        self.details_ttl = int(settings.place_details_cache_ttl_seconds)
+
+    async def _get(self, key: str) -> Optional[Any]:
+        try:
+            cache = await get_cache_manager()
+            return await cache.get(key)
+        except Exception as e:
+            logger.warning(f"Places cache read failed: {e}")
+            return None
+
+    async def _set(self, key: str, value: Any, ttl: int):
+        try:
+            cache = await get_cache_manager()
+            await cache.set(key, value, l2_ttl=ttl, tags=[self.TAG])
+        except Exception as e:
+            logger.warning(f"Places cache write failed: {e}")
+
+    # Geocoding
+
+    @staticmethod
+    def geocode_key(address: str) -> str:
+        return f"geocode:{normalize_address(address)}"
+
+    async def get_geocode(self, address: str) -> Optional[Dict[str, Any]]:
+        return await self._get(self.geocode_key(address))
+
+    async def set_geocode(self, address: str, result: Dict[str, Any]):
+        await self._set(self.geocode_key(address), result, self.geocode_ttl)
+
+    # Place details
+
+    async def get_place_details(self, place_id: str) -> Optional[Dict[str, Any]]:
+        return await self._get(f"place_details:{place_id}")
+
+    async def set_place_details(self, place_id: str, details: Dict[str, Any]):
+        await self._set(f"place_details:{place_id}", details, self.details_ttl)
+
+    # Nearby search
+
+    @staticmethod
+    def _index_key(place_type: str, cell: str) -> str:
+        return f"places_tiles:{place_type}:{cell}"
+
+    @staticmethod
+    def _dense_key(place_type: str, cell: str) -> str:
+        return f"places_dense:{place_type}:{cell}"
+
+    @staticmethod
+    def _point_key(
+        latitude: float, longitude: float, radius: int, max_results: int, place_type: str
+    ) -> str:
+        cell = geohash_encode(latitude, longitude, POINT_PRECISION)
+        return f"places_nearby_point:{place_type}:{cell}:{radius}:{max_results}"
+
+    async def get_nearby(
+        self,
+        latitude: float,
+        longitude: float,
+        radius: int,
+        place_type: str,
+        max_results: int = NEARBY_PAGE_SIZE,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Cached places within ``radius`` of the point, or None on a miss.
+
+        Hits come from the point's own complete tile search, from any
+        complete tile search nearby whose circle contains the query circle,
+        or from an earlier exact search at the same point.
+        """
+        tile = tile_query(latitude, longitude, radius, place_type)
+        if tile is not None:
+            record = await self._get(tile.key)
+            if record is not None and record["complete"]:
+                return places_within(record["places"], latitude, longitude, radius)
+
+        point = await self._get(self._point_key(latitude, longitude, radius, max_results, place_type))
+        if point is not None:
+            return point
+
+        index_cell = geohash_encode(latitude, longitude, INDEX_PRECISION)
+        for cell in [index_cell] + geohash_neighbours(index_cell):
+            for entry in await self._get(self._index_key(place_type, cell)) or []:
+                if not entry["complete"]:
+                    continue
+                offset = distance_m(entry["lat"], entry["lng"], latitude, longitude)
+                if offset + radius > entry["radius"]:
+                    continue
+                record = await self._get(entry["key"])
+                if record is not None:
+                    logger.debug(f"Nearby search answered from covering tile {entry['key']}")
+                    return places_within(record["places"], latitude, longitude, radius)
+        return None
+
+    async def is_dense(self, tile: TileQuery) -> bool:
+        """
+        Whether a search of this tile is expected to hit the result cap.
+
+        True if an earlier search of the tile did, or if a capped search no
+        wider than this one was centered inside the tile's circle.
+        """
+        record = await self._get(tile.key)
+        if record is not None:
+            return not record["complete"]
+
+        index_cell = geohash_encode(tile.latitude, tile.longitude, INDEX_PRECISION)
+        for cell in [index_cell] + geohash_neighbours(index_cell):
+            for entry in await self._get(self._dense_key(tile.place_type, cell)) or []:
+                if entry["radius"] <= tile.radius and (
+                    distance_m(entry["lat"], entry["lng"], tile.latitude, tile.longitude)
+                    <= tile.radius
+                ):
+                    return True
+        return False
+
+    async def set_nearby(self, tile: TileQuery, places: List[Dict[str, Any]]):
+        """Store a complete tile search and register it in its index cell.
+
+        A truncated search only marks the tile (and its area) as dense.
+        """
+        index_cell = geohash_encode(tile.latitude, tile.longitude, INDEX_PRECISION)
+        if len(places) >= NEARBY_PAGE_SIZE:
+            await self._set(tile.key, {"complete": False}, self.nearby_ttl)
+            dense_key = self._dense_key(tile.place_type, index_cell)
+            dense = [e for e in await self._get(dense_key) or [] if e["key"] != tile.key]
+            dense.append(
+                {"key": tile.key, "lat": tile.latitude, "lng": tile.longitude, "radius": tile.radius}
+            )
+            await self._set(dense_key, dense[-MAX_INDEX_ENTRIES:], self.nearby_ttl)
+            return
+
+        await self._set(
+            tile.key,
+            {
+                "lat": tile.latitude,
+                "lng": tile.longitude,
+                "radius": tile.radius,
+                "complete": True,
+                "places": places,
+            },
+            self.nearby_ttl,
+        )
+
+        index_key = self._index_key(tile.place_type, index_cell)
+        index = [e for e in await self._get(index_key) or [] if e["key"] != tile.key]
+        index.append(
+            {
+                "key": tile.key,
+                "lat": tile.latitude,
+                "lng": tile.longitude,
+                "radius": tile.radius,
+                "complete": True,
+            }
+        )
+        await self._set(index_key, index[-MAX_INDEX_ENTRIES:], self.nearby_ttl)
+
+    async def set_nearby_point(
+        self,
+        latitude: float,
+        longitude: float,
+        radius: int,
+        max_results: int,
+        place_type: str,
+        places: List[Dict[str, Any]],
+    ):
+        """Store an exact point/radius search (dense or untiled query)."""
+        key = self._point_key(latitude, longitude, radius, max_results, place_type)
+        await self._set(key, places, self.nearby_ttl)
@@ -8,16 +8,20 @@ and autonomous execution with transparent reasoning.
 import asyncio
 import json
 import httpx  # Added for image downloading
-from dataclasses import asdict, dataclass, field
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional
 from uuid import uuid4
 
+import numpy as np
+import pandas as pd
 from loguru import logger
 
 from app.core.config import get_settings
+from app.core.gemini_executor import RequestPriority, request_priority
+from app.core.image_batch import ImageResult, analyze_image_batch
 from app.core.websocket_manager import (
     ThoughtType,
     send_error,
@@ -31,7 +35,13 @@ from app.services.analysis.pricing import (
     CompetitorIntelligenceService,
     CompetitorSource,
 )
-from app.services.analysis.sales_predictor import SalesPredictor
+from app.services.analysis.model_registry import get_model_registry
+from app.services.analysis.name_matching import (
+    match_menu_to_sales,
+    normalize_name,
+    sales_item_names,
+)
+from app.services.analysis.sales_frame import SalesFrame, get_sales_store, load_sales
 from app.services.analysis.sentiment import ReviewData, SentimentAnalyzer, SentimentSource
 from app.services.campaigns.generator import CampaignGenerator
 from app.services.gemini.base_agent import GeminiAgent, ThinkingLevel
@@ -43,9 +53,13 @@ from app.services.intelligence.social_aesthetics import SocialAestheticsAnalyzer
 from app.services.intelligence.neighborhood import NeighborhoodAnalyzer
 from app.services.analysis.context_processor import ContextProcessor
 from app.services.intelligence.competitor_parser import CompetitorParser
-from app.models.analysis import MarathonCheckpoint
+from app.services.checkpoint_store import CheckpointStore, EncodedState, encode_state
+from app.services.pipeline_scheduler import StageScheduler, StageSpec
 from app.models.database import AsyncSessionLocal
 
+# Separate directory for orchestrator state to avoid conflicts with business session files
+ORCHESTRATOR_STATES_DIR = Path("data/orchestrator_states")
+
 
 class PipelineStage(str, Enum):
     """Stages of the analysis pipeline."""
@@ -110,7 +124,9 @@ class AnalysisState:
     restaurant_name: str = "Our Restaurant"
     location: Optional[Dict[str, float]] = None
     menu_items: List[Dict[str, Any]] = field(default_factory=list)
-    sales_data: List[Dict[str, Any]] = field(default_factory=list)
+    sales_data: List[Dict[str, Any]] = field(default_factory=list)  # Inline/legacy records
+    sales_ref: Optional[Dict[str, Any]] = None  # Columnar sales file (see sales_frame)
+    name_matches: Dict[str, Any] = field(default_factory=dict)  # Menu -> sales names (see name_matching)
     
     # Context Data
     business_context: Dict[str, Any] = field(default_factory=dict) # History, values, goals, etc.
@@ -143,6 +159,23 @@ class AnalysisState:
     completed_at: Optional[datetime] = None
     total_thinking_time_ms: int = 0
 
+    def sales(self) -> SalesFrame:
+        """Typed sales table: the columnar file if stored, else the inline records."""
+        return load_sales(self.sales_data, self.sales_ref)
+
+    def name_matches_copy(self) -> Dict[str, Any]:
+        """
+        Private copy of the name table for stages that only read it.
+
+        ``match_menu_to_sales`` reorders and extends the table it is given,
+        and only the sales-processing stage may write the shared one.
+        """
+        return {key: dict(known) for key, known in self.name_matches.items()}
+
+    @property
+    def sales_count(self) -> int:
+        return self.sales_ref["rows"] if self.sales_ref else len(self.sales_data)
+
 
 class AnalysisOrchestrator:
     """
@@ -159,7 +192,7 @@ class AnalysisOrchestrator:
         self.gemini = GeminiAgent()
         self.menu_extractor = MenuExtractor(self.gemini)
         self.bcg_classifier = BCGClassifier(self.gemini)
-        self.sales_predictor = SalesPredictor()
+        self.models = get_model_registry()
         self.campaign_generator = CampaignGenerator(self.gemini)
         self.verification_agent = VerificationAgent()
         self.vibe_agent = VibeEngineeringAgent()
@@ -183,75 +216,43 @@ class AnalysisOrchestrator:
         self.active_sessions: Dict[str, AnalysisState] = {}
         self.completed_sessions: Dict[str, AnalysisState] = {}
         self._checkpointer_tasks: Dict[str, asyncio.Task] = {} # Track periodic checkpoint tasks
+        self.max_concurrent_stages = settings.marathon_max_concurrent_stages
+
+        storage_dir = ORCHESTRATOR_STATES_DIR
+        storage_dir.mkdir(parents=True, exist_ok=True)
+        self.checkpoint_store = CheckpointStore(
+            storage_dir,
+            retained_states=int(settings.marathon_checkpoint_retained_states),
+            compact_every=int(settings.marathon_checkpoint_compact_every),
+        )
+
+    @property
+    def storage_dir(self) -> Path:
+        return self.checkpoint_store.storage_dir
 
-        # Use separate directory for orchestrator state to avoid conflicts with business session files
-        self.storage_dir = Path("data/orchestrator_states")
-        self.storage_dir.mkdir(parents=True, exist_ok=True)
+    @storage_dir.setter
+    def storage_dir(self, path: Path):
+        self.checkpoint_store.storage_dir = Path(path)
 
-    def _save_session_to_disk(self, state: AnalysisState):
-        """Save session state to disk."""
+    def _save_session_to_disk(
+        self, state: AnalysisState, encoded: Optional[EncodedState] = None
+    ):
+        """Save session state to disk, writing only the fields that changed."""
         try:
-            file_path = self.storage_dir / f"{state.session_id}.json"
-
-            # Helper to convert objects to JSON-serializable format
-            def json_default(obj):
-                if isinstance(obj, datetime):
-                    return obj.isoformat()
-                if isinstance(obj, Enum):
-                    return obj.value
-                raise TypeError(f"Type {type(obj)} not serializable")
-
-            with open(file_path, "w") as f:
-                json.dump(asdict(state), f, default=json_default, indent=2)
+            self.checkpoint_store.save_to_disk(
+                state.session_id, encoded or encode_state(state)
+            )
         except Exception as e:
             logger.error(f"Failed to save orchestrator session {state.session_id}: {e}")
 
     def _load_session_from_disk(self, session_id: str) -> Optional[AnalysisState]:
         """Load session state from disk."""
-        file_path = self.storage_dir / f"{session_id}.json"
-        if not file_path.exists():
-            return None
-
         try:
-            with open(file_path, "r") as f:
-                data = json.load(f)
-            
-            # Parse enums and datetime strings
-            if isinstance(data.get("current_stage"), str):
-                data["current_stage"] = PipelineStage(data["current_stage"])
-            
-            if isinstance(data.get("started_at"), str):
-                data["started_at"] = datetime.fromisoformat(data["started_at"])
-            
-            if isinstance(data.get("completed_at"), str):
-                data["completed_at"] = datetime.fromisoformat(data["completed_at"])
-            
-            # Parse checkpoints
-            if "checkpoints" in data:
-                parsed_checkpoints = []
-                for cp in data["checkpoints"]:
-                    if isinstance(cp.get("stage"), str):
-                        cp["stage"] = PipelineStage(cp["stage"])
-                    if isinstance(cp.get("timestamp"), str):
-                        cp["timestamp"] = datetime.fromisoformat(cp["timestamp"])
-                    parsed_checkpoints.append(PipelineCheckpoint(**cp))
-                data["checkpoints"] = parsed_checkpoints
-            
-            # Parse thought traces
-            if "thought_traces" in data:
-                parsed_traces = []
-                for trace in data["thought_traces"]:
-                    if isinstance(trace.get("timestamp"), str):
-                        trace["timestamp"] = datetime.fromisoformat(trace["timestamp"])
-                    parsed_traces.append(ThoughtTrace(**trace))
-                data["thought_traces"] = parsed_traces
-            
-            # Parse thinking_level if present
-            if "thinking_level" in data and isinstance(data["thinking_level"], str):
-                data["thinking_level"] = ThinkingLevel(data["thinking_level"])
-            
-            # Convert dict back to AnalysisState
-            state = AnalysisState(**data)
+            data = self.checkpoint_store.load_from_disk(session_id)
+            if data is None:
+                return None
+
+            state = self._state_from_dict(data)
             
             # Cache in memory depending on state
             if state.current_stage in [PipelineStage.COMPLETED, PipelineStage.FAILED]:
@@ -264,6 +265,44 @@ class AnalysisOrchestrator:
             logger.error(f"Failed to load orchestrator session {session_id}: {e}")
             return None
 
+    @staticmethod
+    def _state_from_dict(data: Dict[str, Any]) -> AnalysisState:
+        """Rebuild an AnalysisState from its JSON form (enums and datetimes as strings)."""
+        if isinstance(data.get("current_stage"), str):
+            data["current_stage"] = PipelineStage(data["current_stage"])
+        
+        if isinstance(data.get("started_at"), str):
+            data["started_at"] = datetime.fromisoformat(data["started_at"])
+        
+        if isinstance(data.get("completed_at"), str):
+            data["completed_at"] = datetime.fromisoformat(data["completed_at"])
+        
+        # Parse checkpoints
+        if "checkpoints" in data:
+            parsed_checkpoints = []
+            for cp in data["checkpoints"]:
+                if isinstance(cp.get("stage"), str):
+                    cp["stage"] = PipelineStage(cp["stage"])
+                if isinstance(cp.get("timestamp"), str):
+                    cp["timestamp"] = datetime.fromisoformat(cp["timestamp"])
+                parsed_checkpoints.append(PipelineCheckpoint(**cp))
+            data["checkpoints"] = parsed_checkpoints
+        
+        # Parse thought traces
+        if "thought_traces" in data:
+            parsed_traces = []
+            for trace in data["thought_traces"]:
+                if isinstance(trace.get("timestamp"), str):
+                    trace["timestamp"] = datetime.fromisoformat(trace["timestamp"])
+                parsed_traces.append(ThoughtTrace(**trace))
+            data["thought_traces"] = parsed_traces
+        
+        # Parse thinking_level if present
+        if "thinking_level" in data and isinstance(data["thinking_level"], str):
+            data["thinking_level"] = ThinkingLevel(data["thinking_level"])
+        
+        return AnalysisState(**data)
+
     async def create_session(self, session_id: Optional[str] = None) -> str:
         """Create a new analysis session."""
         if not session_id:
@@ -370,39 +409,8 @@ class AnalysisOrchestrator:
         self._save_session_to_disk(state)
 
         try:
-            # 1. Menu Extraction
-            if menu_images:
-                await self._run_stage(
-                    state,
-                    PipelineStage.MENU_EXTRACTION,
-                    self._extract_menus,
-                    menu_images,
-                )
-
-            # 1.5 Competitor Parsing (Manual Input)
-            # Check if we have manual competitor input (text or files)
-            competitor_input_text = state.business_context.get("competitor_input")
-            if competitor_input_text or competitor_files:
-                await self._run_stage(
-                    state,
-                    PipelineStage.COMPETITOR_PARSING,
-                    self._run_competitor_parsing,
-                    competitor_input_text,
-                    competitor_files
-                )
-
-            # 2. Competitor Discovery (Scout Agent)
-            # Only run if auto_find is true OR if we have no competitors yet and an address
-            if auto_find_competitors and address:
-                await self._run_stage(
-                    state,
-                    PipelineStage.COMPETITOR_DISCOVERY,
-                    self._run_competitor_discovery,
-                    address,
-                    cuisine_type,
-                )
-            elif not auto_find_competitors and state.competitor_urls:
-                 self._add_thought_trace(
+            if not auto_find_competitors and state.competitor_urls:
+                self._add_thought_trace(
                     state,
                     step="Competitor Discovery Skipped",
                     reasoning="User provided manual competitors and disabled auto-discovery",
@@ -411,127 +419,32 @@ class AnalysisOrchestrator:
                     confidence=1.0,
                 )
 
-            # 3. Competitor Enrichment (Deep Data)
-            if state.discovered_competitors:
-                await self._run_stage(
-                    state,
-                    PipelineStage.COMPETITOR_ENRICHMENT,
-                    self._run_competitor_enrichment,
-                )
-
-            # 4. Competitor Verification (Data Quality)
-            if state.discovered_competitors:
-                await self._run_stage(
-                    state,
-                    PipelineStage.COMPETITOR_VERIFICATION,
-                    self._run_competitor_verification,
-                )
-
-            # 5. Competitor Analysis (Intelligence Service)
-            if state.discovered_competitors and state.menu_items:
-                await self._run_stage(
-                    state,
-                    PipelineStage.COMPETITOR_ANALYSIS,
-                    self._run_competitor_analysis,
-                )
-
-            # 6. Neighborhood Analysis
-            if address and state.location:
-                await self._run_stage(
-                    state,
-                    PipelineStage.NEIGHBORHOOD_ANALYSIS,
-                    self._run_neighborhood_analysis,
-                )
-
-            # 7. Sentiment Analysis (Google Maps reviews + social media + competitor reviews)
-            has_own_reviews = bool(state.business_profile_enriched)
-            has_social_media = bool(state.social_media)
-            has_competitor_reviews = bool(state.discovered_competitors)
-            if has_own_reviews or has_social_media or has_competitor_reviews:
-                await self._run_stage(
-                    state,
-                    PipelineStage.SENTIMENT_ANALYSIS,
-                    self._run_sentiment_analysis,
-                )
-
-            # 8. Visual Analysis (Dish Photos)
-            if dish_images:
-                await self._run_stage(
-                    state,
-                    PipelineStage.IMAGE_ANALYSIS,
-                    self._analyze_dish_images,
-                    dish_images,
-                )
-
-            # 9. Visual Gap Analysis (Comparing ours vs competitors)
-            if dish_images and state.discovered_competitors:
-                await self._run_stage(
-                    state,
-                    PipelineStage.VISUAL_GAP_ANALYSIS,
-                    self._run_visual_gap_analysis,
-                    dish_images,
-                )
-
-            # 10. Context Processing (Enrichment)
-            if state.business_context:
-                await self._run_stage(
-                    state,
-                    PipelineStage.CONTEXT_PROCESSING,
-                    self._run_context_processing,
-                )
-
-            # 11. Sales Data Processing
-            if sales_csv:
-                await self._run_stage(
-                    state,
-                    PipelineStage.SALES_PROCESSING,
-                    self._process_sales_data,
-                    sales_csv,
-                )
-            elif state.sales_data:
+            if not sales_csv and state.sales_count:
                 # Sales data already loaded (e.g., from demo session)
-                logger.info(f"Sales data already present ({len(state.sales_data)} records), skipping processing stage")
+                logger.info(f"Sales data already present ({state.sales_count} records), skipping processing stage")
 
-            # 12. BCG & Prediction & Campaigns (Requires Menu & Sales)
-            if state.menu_items:
-                await self._run_stage(
+            # Independent stages run concurrently; dependent ones wait for
+            # the stages that produce the state fields they read.
+            scheduler = StageScheduler(
+                self._build_stage_graph(
                     state,
-                    PipelineStage.BCG_CLASSIFICATION,
-                    self._run_bcg_classification,
-                    state.thinking_level,
-                )
-
-                await self._run_stage(
-                    state, PipelineStage.SALES_PREDICTION, self._run_sales_prediction
-                )
-
-                await self._run_stage(
-                    state,
-                    PipelineStage.CAMPAIGN_GENERATION,
-                    self._generate_campaigns,
-                    state.thinking_level,
-                )
-
-            # 13. Strategic Verification
-            if state.campaigns:
-                await self._run_stage(
-                    state,
-                    PipelineStage.STRATEGIC_VERIFICATION,
-                    self._run_strategic_verification,
-                )
+                    menu_images=menu_images,
+                    dish_images=dish_images,
+                    competitor_files=competitor_files,
+                    sales_csv=sales_csv,
+                    address=address,
+                    cuisine_type=cuisine_type,
+                    auto_find_competitors=auto_find_competitors,
+                ),
+                runner=lambda spec: self._run_stage(
+                    state, spec.stage, spec.handler, *spec.args
+                ),
+                max_concurrency=self.max_concurrent_stages,
+            )
+            # Marathon stages yield the Gemini executor to interactive requests
+            with request_priority(RequestPriority.BACKGROUND):
+                await scheduler.run()
 
-            # 14. Final Verification (Optional extra check or merge with strategic)
-            # Keeping original verification as final "holistic" check if desired
-            if state.auto_verify and state.bcg_analysis:
-                logger.info(f"Running final verification for session {session_id}")
-                await self._run_stage(
-                    state,
-                    PipelineStage.VERIFICATION,
-                    self._verify_analysis,
-                    state.thinking_level,
-                )
-                logger.info(f"Verification completed for session {session_id}")
-            
             logger.info(f"Marking pipeline as COMPLETED for session {session_id}")
             state.current_stage = PipelineStage.COMPLETED
             state.completed_at = datetime.now(timezone.utc)
@@ -560,6 +473,173 @@ class AnalysisOrchestrator:
             self._save_session_to_disk(state)
             return {"error": str(e), "last_checkpoint": state.current_stage.value}
 
+    def _build_stage_graph(
+        self,
+        state: AnalysisState,
+        menu_images: Optional[List[str]],
+        dish_images: Optional[List[str]],
+        competitor_files: Optional[List[Dict[str, Any]]],
+        sales_csv: Optional[str],
+        address: Optional[str],
+        cuisine_type: str,
+        auto_find_competitors: bool,
+    ) -> List[StageSpec]:
+        """
+        Declare the pipeline as a stage graph.
+
+        Stages are listed in their canonical order; each one declares the
+        AnalysisState fields it reads and writes so the scheduler can derive
+        dependencies. Bookkeeping fields shared by every stage (thought_traces,
+        checkpoints, current_stage, total_thinking_time_ms, vibe_status and the
+        append-only verification_history) are intentionally left out.
+        """
+        competitor_input_text = state.business_context.get("competitor_input")
+
+        return [
+            StageSpec(
+                stage=PipelineStage.MENU_EXTRACTION,
+                handler=self._extract_menus,
+                args=(menu_images,),
+                writes=frozenset({"menu_items"}),
+                condition=lambda: bool(menu_images),
+            ),
+            StageSpec(
+                stage=PipelineStage.COMPETITOR_PARSING,
+                handler=self._run_competitor_parsing,
+                args=(competitor_input_text, competitor_files),
+                writes=frozenset({"discovered_competitors"}),
+                condition=lambda: bool(competitor_input_text or competitor_files),
+            ),
+            StageSpec(
+                stage=PipelineStage.COMPETITOR_DISCOVERY,
+                handler=self._run_competitor_discovery,
+                args=(address, cuisine_type),
+                reads=frozenset({"discovered_competitors"}),
+                writes=frozenset({"discovered_competitors", "location"}),
+                condition=lambda: bool(auto_find_competitors and address),
+            ),
+            StageSpec(
+                stage=PipelineStage.COMPETITOR_ENRICHMENT,
+                handler=self._run_competitor_enrichment,
+                reads=frozenset({"discovered_competitors"}),
+                writes=frozenset({"discovered_competitors"}),
+                condition=lambda: bool(state.discovered_competitors),
+            ),
+            StageSpec(
+                stage=PipelineStage.COMPETITOR_VERIFICATION,
+                handler=self._run_competitor_verification,
+                reads=frozenset({"discovered_competitors"}),
+                condition=lambda: bool(state.discovered_competitors),
+            ),
+            StageSpec(
+                stage=PipelineStage.COMPETITOR_ANALYSIS,
+                handler=self._run_competitor_analysis,
+                reads=frozenset({"discovered_competitors", "menu_items"}),
+                writes=frozenset({"competitor_analysis"}),
+                condition=lambda: bool(state.discovered_competitors and state.menu_items),
+            ),
+            StageSpec(
+                stage=PipelineStage.NEIGHBORHOOD_ANALYSIS,
+                handler=self._run_neighborhood_analysis,
+                reads=frozenset({"location", "discovered_competitors"}),
+                writes=frozenset({"neighborhood_analysis"}),
+                condition=lambda: bool(address and state.location),
+            ),
+            StageSpec(
+                stage=PipelineStage.SENTIMENT_ANALYSIS,
+                handler=self._run_sentiment_analysis,
+                reads=frozenset({
+                    "business_profile_enriched",
+                    "social_media",
+                    "discovered_competitors",
+                    "menu_items",
+                    "bcg_analysis",
+                }),
+                writes=frozenset({"sentiment_analysis"}),
+                condition=lambda: bool(
+                    state.business_profile_enriched
+                    or state.social_media
+                    or state.discovered_competitors
+                ),
+            ),
+            StageSpec(
+                stage=PipelineStage.IMAGE_ANALYSIS,
+                handler=self._analyze_dish_images,
+                args=(dish_images,),
+                writes=frozenset({"image_scores"}),
+                condition=lambda: bool(dish_images),
+            ),
+            StageSpec(
+                stage=PipelineStage.VISUAL_GAP_ANALYSIS,
+                handler=self._run_visual_gap_analysis,
+                args=(dish_images,),
+                reads=frozenset({"discovered_competitors", "business_context"}),
+                writes=frozenset({"visual_gap_report"}),
+                condition=lambda: bool(dish_images and state.discovered_competitors),
+            ),
+            StageSpec(
+                stage=PipelineStage.CONTEXT_PROCESSING,
+                handler=self._run_context_processing,
+                reads=frozenset({
+                    "business_context",
+                    "discovered_competitors",
+                    "neighborhood_analysis",
+                    "visual_gap_report",
+                }),
+                writes=frozenset({"business_context", "context_insights"}),
+                condition=lambda: bool(state.business_context),
+            ),
+            StageSpec(
+                stage=PipelineStage.SALES_PROCESSING,
+                handler=self._process_sales_data,
+                args=(sales_csv,),
+                reads=frozenset({"menu_items"}),
+                writes=frozenset({"sales_data", "sales_ref", "menu_items", "name_matches"}),
+                condition=lambda: bool(sales_csv),
+            ),
+            StageSpec(
+                stage=PipelineStage.BCG_CLASSIFICATION,
+                handler=self._run_bcg_classification,
+                args=(state.thinking_level,),
+                reads=frozenset({
+                    "menu_items", "sales_data", "sales_ref", "image_scores", "name_matches",
+                }),
+                writes=frozenset({"bcg_analysis"}),
+                condition=lambda: bool(state.menu_items),
+            ),
+            StageSpec(
+                stage=PipelineStage.SALES_PREDICTION,
+                handler=self._run_sales_prediction,
+                reads=frozenset({
+                    "menu_items", "sales_data", "sales_ref", "image_scores", "name_matches",
+                }),
+                writes=frozenset({"predictions"}),
+                condition=lambda: bool(state.menu_items),
+            ),
+            StageSpec(
+                stage=PipelineStage.CAMPAIGN_GENERATION,
+                handler=self._generate_campaigns,
+                args=(state.thinking_level,),
+                reads=frozenset({"menu_items", "bcg_analysis", "business_context"}),
+                writes=frozenset({"campaigns"}),
+                condition=lambda: bool(state.menu_items),
+            ),
+            StageSpec(
+                stage=PipelineStage.STRATEGIC_VERIFICATION,
+                handler=self._run_strategic_verification,
+                reads=frozenset({"bcg_analysis", "campaigns", "context_insights"}),
+                condition=lambda: bool(state.campaigns),
+            ),
+            StageSpec(
+                stage=PipelineStage.VERIFICATION,
+                handler=self._verify_analysis,
+                args=(state.thinking_level,),
+                reads=frozenset({"menu_items", "bcg_analysis", "predictions", "campaigns"}),
+                writes=frozenset({"verification_result"}),
+                condition=lambda: bool(state.auto_verify and state.bcg_analysis),
+            ),
+        ]
+
     async def _run_stage(
         self,
         state: AnalysisState,
@@ -610,7 +690,7 @@ class AnalysisOrchestrator:
             )
             state.total_thinking_time_ms += elapsed_ms
 
-            await self._save_checkpoint(state, success=True)
+            await self._save_checkpoint(state, success=True, stage=stage)
 
             # Broadcast stage completion
             await send_stage_complete(
@@ -623,7 +703,7 @@ class AnalysisOrchestrator:
             import traceback
             logger.error(f"Stage {stage.value} failed: {e}")
             logger.error(f"Traceback: {traceback.format_exc()}")
-            await self._save_checkpoint(state, success=False, error=str(e))
+            await self._save_checkpoint(state, success=False, error=str(e), stage=stage)
 
             # Broadcast error
             await send_error(
@@ -677,7 +757,7 @@ class AnalysisOrchestrator:
             # Pop it to be clean.
             self._checkpointer_tasks.pop(session_id, None)
 
-    async def _extract_menus(self, state: AnalysisState, menu_images: List[bytes]):
+    async def _extract_menus(self, state: AnalysisState, menu_images: List[str]):
         """Extract menu items from images."""
         self._add_thought_trace(
             state,
@@ -688,8 +768,41 @@ class AnalysisOrchestrator:
             confidence=0.85,
         )
 
-        for i, image_data in enumerate(menu_images):
-            result = await self.menu_extractor.extract_from_image(image_data)
+        async def _report(image: ImageResult, completed: int, total: int):
+            items = image.result.get("items", []) if image.ok else []
+            await send_progress_update(
+                session_id=state.session_id,
+                stage=PipelineStage.MENU_EXTRACTION.value,
+                progress=(completed / total) * 100,
+                message=f"Processed menu image {completed}/{total}...",
+                data={
+                    "image_index": image.index,
+                    "items_count": len(items),
+                    "error": None if image.ok else str(image.error),
+                },
+            )
+
+        # Images are extracted concurrently; items are added in upload order
+        images = await analyze_image_batch(
+            menu_images, self.menu_extractor.extract_from_image, on_result=_report
+        )
+        if not any(image.ok for image in images):
+            raise images[0].error
+
+        for image in images:
+            i = image.index
+            if not image.ok:
+                self._add_thought_trace(
+                    state,
+                    step=f"Menu Image {i+1} Processing",
+                    reasoning="Extraction failed for this image",
+                    observations=[f"Image {i+1} could not be processed: {image.error}"],
+                    decisions=["Continuing with the remaining images"],
+                    confidence=0.0,
+                )
+                continue
+
+            result = image.result
             items = result.get("items", [])
             state.menu_items.extend(items)
 
@@ -703,7 +816,7 @@ class AnalysisOrchestrator:
             )
 
     async def _analyze_dish_images(
-        self, state: AnalysisState, dish_images: List[bytes]
+        self, state: AnalysisState, dish_images: List[str]
     ):
         """Analyze dish photos for visual appeal."""
         self._add_thought_trace(
@@ -715,9 +828,26 @@ class AnalysisOrchestrator:
             confidence=0.8,
         )
 
-        for i, image_data in enumerate(dish_images):
-            result = await self.menu_extractor.analyze_dish_image(image_data)
+        async def _report(image: ImageResult, completed: int, total: int):
+            result = image.result if image.ok else {}
+            await send_progress_update(
+                session_id=state.session_id,
+                stage=PipelineStage.IMAGE_ANALYSIS.value,
+                progress=(completed / total) * 100,
+                message=f"Analyzed dish photo {completed}/{total}...",
+                data={
+                    "image_index": image.index,
+                    "item_name": result.get("item_name"),
+                    "score": result.get("score"),
+                },
+            )
+
+        images = await analyze_image_batch(
+            dish_images, self.menu_extractor.analyze_dish_image, on_result=_report
+        )
 
+        for image in images:
+            result = image.result if image.ok else {}
             if "item_name" in result and "score" in result:
                 state.image_scores[result["item_name"]] = result["score"]
 
@@ -817,30 +947,32 @@ class AnalysisOrchestrator:
             confidence=0.9,
         )
 
-        enriched_competitors = []
-        for i, comp in enumerate(state.discovered_competitors):
-            # Report progress
+        competitors = state.discovered_competitors
+        with_place_id = [comp for comp in competitors if comp.get("place_id")]
+
+        async def _report(completed: int, total: int):
             await send_progress_update(
                 session_id=state.session_id,
                 stage=PipelineStage.COMPETITOR_ENRICHMENT.value,
-                progress=(i / len(state.discovered_competitors)) * 100,
-                message=f"Enriching profile for {comp.get('name', 'Competitor')}..."
+                progress=(completed / total) * 100,
+                message=f"Enriched {completed}/{total} competitor profiles..."
             )
 
-            # Check if we have a place_id
-            place_id = comp.get("place_id")
-            if place_id:
-                try:
-                    profile = await self.enrichment_service.enrich_competitor_profile(
-                        place_id=place_id,
-                        basic_info=comp
-                    )
-                    enriched_competitors.append(profile.to_dict())
-                except Exception as e:
-                    logger.warning(f"Enrichment failed for {comp.get('name')}: {e}")
-                    enriched_competitors.append(comp)
-            else:
+        # Profiles are enriched concurrently; failures keep the basic data
+        results = iter(
+            await self.enrichment_service.enrich_competitors(with_place_id, on_progress=_report)
+        )
+        enriched_competitors = []
+        for comp in competitors:
+            if not comp.get("place_id"):
+                enriched_competitors.append(comp)
+                continue
+            result = next(results)
+            if isinstance(result, Exception):
+                logger.warning(f"Enrichment failed for {comp.get('name')}: {result}")
                 enriched_competitors.append(comp)
+            else:
+                enriched_competitors.append(result.to_dict())
         
         state.discovered_competitors = enriched_competitors
 
@@ -1369,33 +1501,36 @@ class AnalysisOrchestrator:
 
     async def _process_sales_data(self, state: AnalysisState, sales_csv: str):
         """Process sales CSV data and enrich menu with sales-only items."""
-        import csv
         from io import StringIO
 
-        reader = csv.DictReader(StringIO(sales_csv))
-        sales_records = list(reader)
-
-        for record in sales_records:
-            item_name = record.get("item_name", record.get("product", ""))
-            price_val = record.get("price", record.get("subtotal_tiket", 0))
-            cost_val = record.get("cost", record.get("unit_cost", 0))
-            state.sales_data.append(
-                {
-                    "item_name": item_name,
-                    "sale_date": record.get("date", record.get("sale_date", "")),
-                    "units_sold": int(
-                        record.get("units_sold", record.get("quantity", 0))
-                    ),
-                    "price": float(price_val) if price_val else 0,
-                    "cost": float(cost_val) if cost_val else 0,
-                    "revenue": float(record.get("revenue", record.get("total", 0))),
-                    "category": record.get("categoria", record.get("category", "")),
-                    "had_promotion": record.get("had_promotion", "").lower() == "true",
-                    "promotion_discount": float(
-                        record.get("promotion_discount", 0) or 0
-                    ),
-                }
-            )
+        raw = pd.read_csv(StringIO(sales_csv), dtype=str, keep_default_na=False)
+
+        def column(*names: str) -> pd.Series:
+            for name in names:
+                if name in raw.columns:
+                    return raw[name]
+            return pd.Series("", index=raw.index, dtype=object)
+
+        def number(*names: str) -> pd.Series:
+            return pd.to_numeric(column(*names), errors="coerce").fillna(0)
+
+        sales = pd.DataFrame(
+            {
+                "item_name": column("item_name", "product"),
+                "sale_date": column("date", "sale_date"),
+                "units_sold": number("units_sold", "quantity").astype(np.int64),
+                "price": number("price", "subtotal_tiket").astype(float),
+                "cost": number("cost", "unit_cost").astype(float),
+                "revenue": number("revenue", "total").astype(float),
+                "category": column("categoria", "category"),
+                "had_promotion": column("had_promotion").str.lower() == "true",
+                "promotion_discount": number("promotion_discount").astype(float),
+            }
+        )
+        state.sales_ref = await asyncio.to_thread(
+            get_sales_store().write, f"{state.session_id}_pipeline", sales
+        )
+        state.sales_data = []
 
         # Enrich menu: add items found in sales but not in extracted menu
         items_added = self._enrich_menu_from_sales(state)
@@ -1405,7 +1540,7 @@ class AnalysisOrchestrator:
             step="Sales Data Processing",
             reasoning="Parsing sales records and cross-referencing with menu extraction",
             observations=[
-                f"Processed {len(state.sales_data)} sales records",
+                f"Processed {state.sales_count} sales records",
                 f"Found {items_added} additional items in sales not in menu extraction",
                 f"Total menu items after enrichment: {len(state.menu_items)}",
             ],
@@ -1414,67 +1549,78 @@ class AnalysisOrchestrator:
         )
 
     def _enrich_menu_from_sales(self, state: "AnalysisState") -> int:
-        """Add items that appear in sales data but not in the extracted menu."""
-        import unicodedata
-
-        def normalize(name: str) -> str:
-            """Normalize name for comparison: lowercase, strip accents, remove parenthetical suffixes."""
-            import re
-            name = name.strip().lower()
-            # Remove accents
-            name = unicodedata.normalize("NFD", name)
-            name = "".join(c for c in name if unicodedata.category(c) != "Mn")
-            # Remove common suffixes like (Botella), (Trago), (Media)
-            name = re.sub(r"\s*\(.*?\)\s*", "", name).strip()
-            # Remove special punctuation
-            name = re.sub(r"[`'\"']", "", name)
-            name = re.sub(r"\s+", " ", name)
-            return name
-
-        # Build normalized lookup of existing menu items
-        menu_names_normalized = {}
-        for item in state.menu_items:
-            norm = normalize(item.get("name", ""))
-            menu_names_normalized[norm] = item
+        """
+        Add items that appear in sales data but not in the extracted menu.
+
+        Also fills ``state.name_matches``, the menu -> sales name table the
+        analysis stages share.
+        """
+        sales = state.sales()
+        if not sales.has("item_name"):
+            return 0
+        sales_names = sales_item_names(sales)
+
+        # Sales names a menu item already matches (exactly or fuzzily)
+        matches = match_menu_to_sales(
+            [item.get("name") for item in state.menu_items],
+            sales_names,
+            state.name_matches,
+        )
+        matched_sales_names = {name for name in matches.values() if name}
+        menu_names_normalized = {
+            normalize_name(item.get("name") or "") for item in state.menu_items
+        }
 
         # Aggregate sales by item name to get avg price, cost, category
-        sales_agg = {}
-        for record in state.sales_data:
-            item_name = record.get("item_name", "")
-            if not item_name:
-                continue
-            if item_name not in sales_agg:
-                sales_agg[item_name] = {
-                    "prices": [], "costs": [], "category": record.get("category", ""),
-                    "count": 0,
-                }
-            if record.get("price"):
-                sales_agg[item_name]["prices"].append(record["price"])
-            if record.get("cost"):
-                sales_agg[item_name]["costs"].append(record["cost"])
-            sales_agg[item_name]["count"] += 1
+        prices = sales.numeric("price").astype(float)
+        costs = sales.numeric("cost").astype(float)
+        df = pd.DataFrame(
+            {
+                "item_name": sales.text("item_name").to_numpy(),
+                # Zero/missing prices and costs are left out of the averages
+                "price": np.where(prices != 0, prices, np.nan),
+                "cost": np.where(costs != 0, costs, np.nan),
+                "category": sales.text("category").to_numpy(),
+            }
+        )
+        sales_agg = (
+            df[df["item_name"] != ""]
+            .groupby("item_name", sort=False)
+            .agg(
+                price=("price", "mean"),
+                cost=("cost", "mean"),
+                category=("category", "first"),
+            )
+            .fillna({"price": 0, "cost": 0})
+        )
 
         added = 0
-        for sales_name, agg in sales_agg.items():
-            norm = normalize(sales_name)
-            if norm not in menu_names_normalized:
+        for sales_name, avg_price, avg_cost, category in zip(
+            sales_agg.index, sales_agg["price"], sales_agg["cost"], sales_agg["category"]
+        ):
+            norm = normalize_name(sales_name)
+            if sales_name not in matched_sales_names and norm not in menu_names_normalized:
                 # This item is in sales but NOT in menu — add it
-                avg_price = sum(agg["prices"]) / len(agg["prices"]) if agg["prices"] else 0
-                avg_cost = sum(agg["costs"]) / len(agg["costs"]) if agg["costs"] else 0
                 state.menu_items.append({
                     "name": sales_name,
-                    "price": round(avg_price, 2),
-                    "cost": round(avg_cost, 2),
-                    "category": agg["category"] or "Other",
+                    "price": round(float(avg_price), 2),
+                    "cost": round(float(avg_cost), 2),
+                    "category": category or "Other",
                     "description": None,
                     "confidence": 0.7,
                     "source": "sales_enrichment",
                     "dietary_tags": [],
                 })
-                menu_names_normalized[norm] = state.menu_items[-1]
+                menu_names_normalized.add(norm)
                 added += 1
 
         if added:
+            # Items added from sales match their own sales name
+            match_menu_to_sales(
+                [item["name"] for item in state.menu_items[-added:]],
+                sales_names,
+                state.name_matches,
+            )
             logger.info(f"Menu enriched with {added} items from sales data")
         return added
 
@@ -1496,8 +1642,9 @@ class AnalysisOrchestrator:
 
         result = await self.bcg_classifier.classify(
             state.menu_items,
-            state.sales_data,
+            state.sales(),
             state.image_scores,
+            name_matches=state.name_matches_copy(),
         )
 
         # FEATURE #2: VIBE ENGINEERING - Autonomous Verification Loop
@@ -1507,7 +1654,7 @@ class AnalysisOrchestrator:
                 analysis_result=result,
                 source_data={
                     "menu_items_count": len(state.menu_items),
-                    "sales_data_count": len(state.sales_data)
+                    "sales_data_count": state.sales_count
                 },
                 auto_improve=state.auto_improve
             )
@@ -1559,19 +1706,25 @@ class AnalysisOrchestrator:
             step="Sales Prediction",
             reasoning="Training ML model and generating forecasts",
             observations=[
-                f"Using {len(state.sales_data)} historical records",
+                f"Using {state.sales_count} historical records",
                 "Preparing scenarios for comparison",
             ],
             decisions=["Running XGBoost prediction with scenario analysis"],
             confidence=0.75,
         )
 
-        if state.sales_data:
-            await self.sales_predictor.train(
-                state.sales_data,
+        sales = state.sales()
+        if sales:
+            sales_predictor = await self.models.train(
+                "sales",
+                state.session_id,
+                sales,
                 state.menu_items,
                 state.image_scores,
+                name_matches=state.name_matches_copy(),
             )
+        else:
+            sales_predictor = await self.models.get("sales", state.session_id)
 
         scenarios = [
             {"name": "baseline"},
@@ -1579,7 +1732,7 @@ class AnalysisOrchestrator:
             {"name": "premium", "price_change_percent": 10},
         ]
 
-        predictions = await self.sales_predictor.predict_batch(
+        predictions = await sales_predictor.predict_batch(
             state.menu_items,
             horizon_days=14,
             scenarios=scenarios,
@@ -1591,7 +1744,7 @@ class AnalysisOrchestrator:
                 analysis_type="sales_prediction",
                 analysis_result=predictions,
                 source_data={
-                    "sales_records": len(state.sales_data),
+                    "sales_records": state.sales_count,
                     "scenarios_count": len(scenarios)
                 },
                 auto_improve=state.auto_improve
@@ -1861,17 +2014,23 @@ class AnalysisOrchestrator:
         state: AnalysisState,
         success: bool,
         error: Optional[str] = None,
+        stage: Optional[PipelineStage] = None,
     ):
-        """Save a checkpoint for the current stage to DB and disk."""
+        """Save a checkpoint to DB and disk.
+
+        ``stage`` defaults to ``state.current_stage``; stage runners pass it
+        explicitly because concurrent stages share the same state.
+        """
+        stage = stage or state.current_stage
         checkpoint_data = {
             "menu_items_count": len(state.menu_items),
-            "sales_records_count": len(state.sales_data),
+            "sales_records_count": state.sales_count,
             "campaigns_count": len(state.campaigns),
         }
         
         # In-memory checkpoint
         checkpoint = PipelineCheckpoint(
-            stage=state.current_stage,
+            stage=stage,
             timestamp=datetime.now(timezone.utc),
             data=checkpoint_data,
             thought_trace=[t.step for t in state.thought_traces],
@@ -1879,73 +2038,38 @@ class AnalysisOrchestrator:
             error=error,
         )
         state.checkpoints.append(checkpoint)
+
+        # Each field is serialized once and shared by both stores, which
+        # only persist the fields whose content changed
+        encoded = encode_state(state)
         
         # Save to Disk (Legacy/Backup)
-        self._save_session_to_disk(state)
+        self._save_session_to_disk(state, encoded)
         
         # Save to Database (Marathon Persistence)
         try:
             async with AsyncSessionLocal() as db:
-                db_checkpoint = MarathonCheckpoint(
-                    session_id=state.session_id,
-                    stage=state.current_stage.value,
+                await self.checkpoint_store.save_to_db(
+                    db,
+                    state.session_id,
+                    encoded,
+                    compact=state.current_stage in (PipelineStage.COMPLETED, PipelineStage.FAILED),
+                    stage=stage.value,
                     status="completed" if success else "failed",
-                    state_data=json.loads(json.dumps(asdict(state), default=str)),
                     thought_trace=[t.step for t in state.thought_traces],
-                    error=error
+                    error=error,
                 )
-                db.add(db_checkpoint)
-                await db.commit()
         except Exception as e:
             logger.error(f"Failed to save marathon checkpoint to DB: {e}")
 
     async def _load_last_checkpoint_from_db(self, session_id: str) -> Optional[AnalysisState]:
         """Load the most recent checkpoint from the database."""
-        from sqlalchemy import select
-        
         try:
             async with AsyncSessionLocal() as db:
-                result = await db.execute(
-                    select(MarathonCheckpoint)
-                    .where(MarathonCheckpoint.session_id == session_id)
-                    .order_by(MarathonCheckpoint.timestamp.desc())
-                    .limit(1)
-                )
-                last_cp = result.scalar_one_or_none()
-                
-                if not last_cp:
-                    return None
-                
-                data = last_cp.state_data
-                
-                # Reconstruct datetime objects and Enums
-                if "current_stage" in data:
-                    data["current_stage"] = PipelineStage(data["current_stage"])
-                if "thinking_level" in data:
-                    data["thinking_level"] = ThinkingLevel(data["thinking_level"])
-
-                if "started_at" in data:
-                    data["started_at"] = datetime.fromisoformat(data["started_at"])
-                if data.get("completed_at"):
-                    data["completed_at"] = datetime.fromisoformat(data["completed_at"])
-
-                # Reconstruct checkpoints list
-                checkpoints = []
-                for cp_data in data.get("checkpoints", []):
-                    cp_data["stage"] = PipelineStage(cp_data["stage"])
-                    cp_data["timestamp"] = datetime.fromisoformat(cp_data["timestamp"])
-                    checkpoints.append(PipelineCheckpoint(**cp_data))
-                data["checkpoints"] = checkpoints
-
-                # Reconstruct thought traces
-                traces = []
-                for t_data in data.get("thought_traces", []):
-                    t_data["timestamp"] = datetime.fromisoformat(t_data["timestamp"])
-                    traces.append(ThoughtTrace(**t_data))
-                data["thought_traces"] = traces
-
-                state = AnalysisState(**data)
-                return state
+                data = await self.checkpoint_store.load_latest_from_db(db, session_id)
+            if data is None:
+                return None
+            return self._state_from_dict(data)
                 
         except Exception as e:
             logger.error(f"Failed to load checkpoint from DB for {session_id}: {e}")
@@ -1967,13 +2091,14 @@ class AnalysisOrchestrator:
             "completed_at": state.completed_at.isoformat() if state.completed_at else None,
             "summary": {
                 "products_analyzed": len(state.menu_items),
-                "sales_records_processed": len(state.sales_data),
+                "sales_records_processed": state.sales_count,
                 "campaigns_generated": len(state.campaigns),
                 "total_thinking_time_ms": state.total_thinking_time_ms,
             },
             # Core Data
             "menu_items": state.menu_items,
             "sales_data": state.sales_data,
+            "sales_ref": state.sales_ref,
             "business_context": state.business_context, # Full context object
             
             # Mapped Context for Frontend (Strings)
@@ -0,0 +1,129 @@
+"""DAG-based stage scheduler for the analysis pipeline.
+
+Each stage declares the ``AnalysisState`` fields it reads and writes. The
+scheduler derives a dependency graph from those declarations (read-after-write,
+write-after-write and write-after-read hazards against earlier stages) and runs
+every stage whose prerequisites are done concurrently, up to a configurable cap.
+
+Because dependencies are derived from the declared (sequential) stage order,
+the result of a run is the same as executing the stages one after another;
+only independent stages overlap.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Hashable, List, Optional, Set, Tuple
+
+from loguru import logger
+
+
+@dataclass
+class StageSpec:
+    """Declarative description of one pipeline stage."""
+
+    stage: Hashable
+    handler: Callable[..., Awaitable[Any]]
+    args: Tuple[Any, ...] = ()
+    reads: FrozenSet[str] = frozenset()
+    writes: FrozenSet[str] = frozenset()
+    # Evaluated once all prerequisites are done; a falsy result skips the stage.
+    # Any state field it inspects must be listed in ``reads``.
+    condition: Optional[Callable[[], bool]] = None
+
+
+def build_dependencies(specs: List[StageSpec]) -> Dict[Hashable, Set[Hashable]]:
+    """
+    Derive prerequisites for each stage from its read/write sets.
+
+    A stage depends on an earlier stage when it reads a field the earlier stage
+    writes, writes a field the earlier stage writes, or writes a field the
+    earlier stage reads.
+    """
+    deps: Dict[Hashable, Set[Hashable]] = {}
+    for i, spec in enumerate(specs):
+        prereqs: Set[Hashable] = set()
+        for earlier in specs[:i]:
+            if (
+                spec.reads & earlier.writes
+                or spec.writes & earlier.writes
+                or spec.writes & earlier.reads
+            ):
+                prereqs.add(earlier.stage)
+        deps[spec.stage] = prereqs
+    return deps
+
+
+class StageScheduler:
+    """Runs a list of stages as a DAG under a concurrency cap."""
+
+    def __init__(
+        self,
+        specs: List[StageSpec],
+        runner: Callable[[StageSpec], Awaitable[Any]],
+        max_concurrency: int = 4,
+    ):
+        """
+        Args:
+            specs: Stages in their canonical (sequential) order
+            runner: Coroutine function that executes a single stage
+            max_concurrency: Maximum number of stages running at once
+        """
+        self.specs = specs
+        self.runner = runner
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.dependencies = build_dependencies(specs)
+        self.completed: List[Hashable] = []
+        self.skipped: List[Hashable] = []
+
+    async def run(self):
+        """
+        Execute all stages, respecting dependencies.
+
+        The first stage failure cancels the stages still in flight and is
+        re-raised to the caller.
+        """
+        pending = list(self.specs)
+        done: Set[Hashable] = set()
+        running: Dict[asyncio.Task, StageSpec] = {}
+
+        try:
+            while pending or running:
+                for spec in list(pending):
+                    if len(running) >= self.max_concurrency:
+                        break
+                    if not self.dependencies[spec.stage] <= done:
+                        continue
+                    pending.remove(spec)
+                    if spec.condition is not None and not spec.condition():
+                        # Skipped stages satisfy their dependents immediately
+                        done.add(spec.stage)
+                        self.skipped.append(spec.stage)
+                        continue
+                    running[asyncio.create_task(self.runner(spec))] = spec
+
+                if not running:
+                    continue
+
+                finished, _ = await asyncio.wait(
+                    running.keys(), return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in finished:
+                    spec = running.pop(task)
+                    error = task.exception()
+                    if error is not None:
+                        await self._cancel(running)
+                        raise error
+                    done.add(spec.stage)
+                    self.completed.append(spec.stage)
+        except asyncio.CancelledError:
+            await self._cancel(running)
+            raise
+
+    @staticmethod
+    async def _cancel(running: Dict[asyncio.Task, StageSpec]):
+        """Cancel stages still in flight."""
+        for task, spec in running.items():
+            logger.info(f"Cancelling in-flight stage: {spec.stage}")
+            task.cancel()
+        await asyncio.gather(*running.keys(), return_exceptions=True)
+        running.clear()
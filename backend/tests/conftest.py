@@ -2,9 +2,20 @@
 Pytest configuration and fixtures for RestoPilotAI tests.
 """
 
+import os
+import tempfile
+from pathlib import Path
+
 import pytest
-from httpx import AsyncClient, ASGITransport
-from app.main import app
+
+# Keep databases and caches written during tests out of backend/data
+_TEST_DATA_DIR = Path(tempfile.mkdtemp(prefix="restopilot-tests-"))
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_TEST_DATA_DIR / 'test.db'}"
+os.environ["CACHE_DIR"] = str(_TEST_DATA_DIR / "cache")
+os.environ["SALES_DATA_DIR"] = str(_TEST_DATA_DIR / "sales")
+
+from httpx import AsyncClient, ASGITransport  # noqa: E402
+from app.main import app  # noqa: E402
 
 
 @pytest.fixture
@@ -18,3 +29,30 @@ async def client():
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
+
+
+@pytest.fixture(autouse=True)
+def _tmp_data_dirs(tmp_path_factory, monkeypatch):
+    """Write sessions and orchestrator checkpoints under a per-test tmp dir."""
+    from app.api import deps
+    from app.services import orchestrator as orchestrator_module
+
+    data_dir = tmp_path_factory.mktemp("data")
+    states_dir = data_dir / "orchestrator_states"
+    sessions_dir = data_dir / "sessions"
+    states_dir.mkdir()
+    sessions_dir.mkdir()
+
+    monkeypatch.setattr(orchestrator_module, "ORCHESTRATOR_STATES_DIR", states_dir)
+    monkeypatch.setattr(orchestrator_module.orchestrator, "storage_dir", states_dir)
+    monkeypatch.setattr(deps.session_store, "directory", sessions_dir)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_response_cache():
+    """Keep cached Gemini responses from leaking between tests."""
+    import app.services.gemini.base_agent as base_agent
+
+    base_agent._response_cache = None
+    yield
+    base_agent._response_cache = None
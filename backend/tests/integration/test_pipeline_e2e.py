@@ -139,9 +139,9 @@ def mock_agents():
     
     # Enrichment Service
     mocks['enrichment_service'] = MagicMock()
-    mocks['enrichment_service'].enrich_competitor_profile = AsyncMock(return_value=MagicMock(to_dict=lambda: {
-        "name": "Comp1", "enriched": True
-    }))
+    enriched_profile = MagicMock(to_dict=lambda: {"name": "Comp1", "enriched": True})
+    mocks['enrichment_service'].enrich_competitor_profile = AsyncMock(return_value=enriched_profile)
+    mocks['enrichment_service'].enrich_competitors = AsyncMock(return_value=[enriched_profile])
 
     # Sales Predictor
     mocks['sales_predictor'] = MagicMock()
@@ -149,6 +149,9 @@ def mock_agents():
     mocks['sales_predictor'].predict_batch = AsyncMock(return_value={
         "predictions": [{"item": "Tacos", "predicted_sales": 110}]
     })
+    mocks['model_registry'] = MagicMock()
+    mocks['model_registry'].train = AsyncMock(return_value=mocks['sales_predictor'])
+    mocks['model_registry'].get = AsyncMock(return_value=mocks['sales_predictor'])
     
     return mocks
 
@@ -159,7 +162,7 @@ def orchestrator(mock_agents, tmp_path):
     with patch('app.services.orchestrator.GeminiAgent', return_value=mock_agents['gemini']), \
          patch('app.services.orchestrator.MenuExtractor', return_value=mock_agents['menu_extractor']), \
          patch('app.services.orchestrator.BCGClassifier', return_value=mock_agents['bcg_classifier']), \
-         patch('app.services.orchestrator.SalesPredictor', return_value=mock_agents['sales_predictor']), \
+         patch('app.services.orchestrator.get_model_registry', return_value=mock_agents['model_registry']), \
          patch('app.services.orchestrator.CampaignGenerator', return_value=mock_agents['campaign_generator']), \
          patch('app.services.orchestrator.VerificationAgent', return_value=mock_agents['verification_agent']), \
          patch('app.services.orchestrator.VibeEngineeringAgent', return_value=mock_agents['vibe_agent']), \
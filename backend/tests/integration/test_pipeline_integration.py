@@ -14,7 +14,7 @@ class TestPipelineIntegration:
             GeminiAgent=MagicMock(),
             MenuExtractor=MagicMock(),
             BCGClassifier=MagicMock(),
-            SalesPredictor=MagicMock(),
+            get_model_registry=MagicMock(),
             CampaignGenerator=MagicMock(),
             VerificationAgent=MagicMock(),
             VibeEngineeringAgent=MagicMock(),
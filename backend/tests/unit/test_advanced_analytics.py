@@ -0,0 +1,95 @@
+import asyncio
+
+import pandas as pd
+
+from app.services.analysis.advanced_analytics import AdvancedAnalyticsService
+
+MAPPING = {
+    "datetime_col": "timestamp",
+    "item_name_col": "item",
+    "category_col": "category",
+    "quantity_col": "quantity",
+    "revenue_col": "revenue",
+    "ticket_id_col": "ticket",
+}
+CAPABILITIES = ["hourly_demand", "daily_patterns", "category_analysis"]
+
+
+def _sales():
+    return pd.DataFrame(
+        {
+            # Monday 2024-01-01 and Saturday 2024-01-06
+            "timestamp": [
+                "2024-01-01 12:10:00",
+                "2024-01-01 12:40:00",
+                "2024-01-01 20:00:00",
+                "2024-01-06 20:30:00",
+                "2024-01-06 20:45:00",
+            ],
+            "item": ["Tacos", "Agua", "Tacos", "Burrito", None],
+            "category": ["Food", "Drinks", "Food", "Food", "Food"],
+            "quantity": [2, 1, 4, 3, 1],
+            "revenue": [20.0, 2.0, 40.0, 45.0, 5.0],
+            "ticket": [1, 1, 2, 3, 3],
+        }
+    )
+
+
+def test_patterns_come_from_one_pass_over_the_sales():
+    df = _sales()
+    columns = list(df.columns)
+
+    report = asyncio.run(
+        AdvancedAnalyticsService().analyze(df, "s1", MAPPING, CAPABILITIES)
+    )
+
+    # The caller's frame is left as is
+    assert list(df.columns) == columns
+
+    hourly = {p.hour: p for p in report.hourly_patterns}
+    assert list(hourly) == [12, 20]
+    assert hourly[12].avg_quantity == 1.5
+    assert hourly[20].avg_revenue == round(90 / 3, 2)
+
+    daily = {p.day_name: p for p in report.daily_patterns}
+    assert daily["Monday"].avg_tickets == 2
+    assert isinstance(daily["Monday"].avg_tickets, float)
+    assert daily["Saturday"].avg_quantity == 2.0
+
+    products = {p.item_name: p for p in report.product_analytics}
+    assert [p.item_name for p in report.product_analytics] == ["Tacos", "Burrito", "Agua"]
+    assert products["Tacos"].total_quantity == 6
+    assert products["Tacos"].avg_daily_sales == round(6 / 6, 1)
+    assert products["Burrito"].category == "Food"
+
+    food, drinks = report.category_analytics
+    # Rows without an item still count towards the category revenue
+    assert (food.category, food.total_revenue, food.item_count) == ("Food", 110.0, 2)
+    assert (food.top_performer, food.worst_performer) == ("Tacos", "Burrito")
+    assert drinks.revenue_share == round(2 / 112 * 100, 1)
+
+
+def test_unparseable_dates_skip_time_patterns():
+    df = _sales().assign(timestamp="not a date")
+
+    report = asyncio.run(
+        AdvancedAnalyticsService().analyze(df, "s1", MAPPING, CAPABILITIES)
+    )
+
+    assert report.hourly_patterns == []
+    assert report.daily_patterns == []
+    assert len(report.product_analytics) == 3
+
+
+def test_revenue_share_is_of_all_sales_including_uncategorized_rows():
+    df = _sales().assign(category=["Food", "Drinks", None, "Food", None])
+
+    report = asyncio.run(
+        AdvancedAnalyticsService().analyze(df, "s1", MAPPING, CAPABILITIES)
+    )
+
+    shares = {c.category: c.revenue_share for c in report.category_analytics}
+    assert shares == {
+        "Food": round(65 / 112 * 100, 1),
+        "Drinks": round(2 / 112 * 100, 1),
+    }
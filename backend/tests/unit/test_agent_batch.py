@@ -0,0 +1,104 @@
+import asyncio
+import json
+
+from app.services.gemini.grounded_intelligence import (
+    CompetitorIntelligence,
+    GroundedIntelligenceService,
+)
+from app.services.gemini.validation_agent import ValidationAgent
+
+
+def test_run_batch_is_bounded_ordered_and_captures_errors():
+    agent = ValidationAgent()
+    in_flight = 0
+    max_in_flight = 0
+
+    async def worker(n):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        try:
+            await asyncio.sleep(1 if n == 3 else 0.01 * (5 - n))
+            if n == 2:
+                raise ValueError("bad item")
+            return n * 10
+        finally:
+            in_flight -= 1
+
+    results = asyncio.run(
+        agent.run_batch(range(5), worker, max_concurrency=3, item_timeout=0.2)
+    )
+
+    assert max_in_flight == 3
+    assert [r.result for r in results] == [0, 10, None, None, 40]
+    assert "bad item" in str(results[2].error)
+    assert results[3].timed_out and not results[3].ok
+
+
+def test_competitors_are_analyzed_concurrently(monkeypatch):
+    service = GroundedIntelligenceService()
+    in_flight = 0
+    max_in_flight = 0
+
+    async def analyze(competitor_name, location, cuisine_type=None):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if competitor_name == "Closed":
+            raise RuntimeError("no results")
+        return CompetitorIntelligence(competitor_name=competitor_name, location=location)
+
+    monkeypatch.setattr(service, "analyze_competitor_with_grounding", analyze)
+    names = ["Taqueria", "Closed", "Cantina", "Fonda"]
+
+    results = asyncio.run(
+        service.analyze_multiple_competitors([{"name": n} for n in names], "CDMX")
+    )
+
+    assert max_in_flight == 4
+    assert [r.competitor_name for r in results] == ["Taqueria", "Cantina", "Fonda"]
+
+
+def test_small_validation_targets_share_a_request():
+    agent = ValidationAgent()
+    prompts = []
+
+    async def generate(prompt, **kwargs):
+        prompts.append(prompt)
+        if "independent targets" in prompt:
+            count = prompt.count("TARGET ")
+            verdicts = [{"verified": n % 2 == 0, "confidence": 0.9} for n in range(count)]
+            return {"data": {"results": verdicts}}
+        return {"data": {"verified": True, "confidence": 0.5}}
+
+    agent.generate = generate
+    outputs = [{"claim": i} for i in range(4)] + [{"claim": "x" * 5000}]
+    inputs = [{"value": i} for i in range(5)]
+
+    results = asyncio.run(agent.batch_validate(outputs, inputs, pack_size=3))
+
+    # Three small targets share a request; the leftover small target and
+    # the large one are validated on their own
+    assert len(prompts) == 3
+    assert [r.verified for r in results] == [True, False, True, True, True]
+    assert [r.confidence for r in results] == [0.9, 0.9, 0.9, 0.5, 0.5]
+
+
+def test_packed_validation_falls_back_on_a_short_answer():
+    agent = ValidationAgent()
+
+    async def generate(prompt, **kwargs):
+        if "independent targets" in prompt:
+            return {"data": {"results": [{"verified": True, "confidence": 0.9}]}}
+        claim = json.loads(prompt.split("OUTPUT TO VALIDATE (AI CLAIMS):\n")[1].split("\n\n")[0])
+        return {"data": {"verified": claim["claim"] == 1, "confidence": 0.6}}
+
+    agent.generate = generate
+
+    results = asyncio.run(
+        agent.batch_validate([{"claim": 0}, {"claim": 1}], [{}, {}], pack_size=2)
+    )
+
+    assert [r.verified for r in results] == [False, True]
@@ -0,0 +1,141 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.analysis import CheckpointBlob, MarathonCheckpoint
+from app.services.checkpoint_store import CheckpointStore, encode_state
+
+
+@dataclass
+class FakeState:
+    session_id: str
+    current_stage: str = "initialized"
+    sales_data: List[Dict[str, Any]] = field(default_factory=list)
+    campaigns: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def _state(**kwargs):
+    sales = [{"item_name": f"Item {i}", "units_sold": i} for i in range(200)]
+    return FakeState(session_id="s1", sales_data=sales, **kwargs)
+
+
+def test_disk_writes_only_changed_blobs(tmp_path):
+    store = CheckpointStore(tmp_path)
+    state = _state()
+
+    assert store.save_to_disk("s1", encode_state(state)) == ["sales_data"]
+    written = store.bytes_written
+
+    state.current_stage = "bcg_classification"
+    state.campaigns = [{"title": "Taco Tuesday", "body": "x" * 600}]
+    assert store.save_to_disk("s1", encode_state(state)) == ["campaigns"]
+    assert store.bytes_skipped > written * 0.9
+
+    # A fresh store (e.g. after restart) rebuilds the same state
+    loaded = CheckpointStore(tmp_path).load_from_disk("s1")
+    assert loaded == {
+        "session_id": "s1",
+        "current_stage": "bcg_classification",
+        "sales_data": state.sales_data,
+        "campaigns": state.campaigns,
+    }
+
+
+def test_disk_compaction_drops_unreferenced_blobs(tmp_path):
+    store = CheckpointStore(tmp_path)
+    state = _state()
+    store.save_to_disk("s1", encode_state(state))
+    state.sales_data = state.sales_data[:100]
+    store.save_to_disk("s1", encode_state(state))
+
+    assert len(list(store.blob_dir.glob("*/*.json"))) == 2
+    assert store.compact_disk() == 1
+    assert store.load_from_disk("s1")["sales_data"] == state.sales_data
+
+
+@pytest.fixture
+async def db_session():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        for model in (MarathonCheckpoint, CheckpointBlob):
+            await conn.run_sync(model.__table__.create)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_db_checkpoints_share_unchanged_blobs(tmp_path, db_session):
+    store = CheckpointStore(tmp_path, retained_states=1)
+    state = _state()
+
+    for stage in ("menu_extraction", "bcg_classification", "completed"):
+        state.current_stage = stage
+        await store.save_to_db(
+            db_session,
+            "s1",
+            encode_state(state),
+            compact=stage == "completed",
+            stage=stage,
+            status="completed",
+        )
+
+    blobs = (await db_session.execute(select(CheckpointBlob))).scalars().all()
+    assert len(blobs) == 1  # sales_data stored once
+
+    rows = (
+        await db_session.execute(select(MarathonCheckpoint).order_by(MarathonCheckpoint.id))
+    ).scalars().all()
+    assert [r.state_data.get("_compacted", False) for r in rows] == [True, True, False]
+
+    restored = await CheckpointStore(tmp_path).load_latest_from_db(db_session, "s1")
+    assert restored["current_stage"] == "completed"
+    assert restored["sales_data"] == state.sales_data
+
+
+def test_encode_state_falls_back_to_str():
+    np = pytest.importorskip("numpy")
+    state = _state(campaigns=[{"title": "Combo", "units": np.int64(3)}])
+
+    _, payload = encode_state(state)["campaigns"]
+    assert payload == '[{"title":"Combo","units":"3"}]'
+
+
+@pytest.mark.asyncio
+async def test_db_compaction_keeps_blobs_other_sessions_reference(tmp_path, db_session):
+    store = CheckpointStore(tmp_path, retained_states=1)
+    shared, changed = _state(), _state()
+    changed.sales_data = changed.sales_data[:100]
+
+    await store.save_to_db(
+        db_session, "s2", encode_state(shared), stage="menu_extraction", status="completed"
+    )
+    await store.save_to_db(
+        db_session, "s1", encode_state(shared), stage="menu_extraction", status="completed"
+    )
+    await store.save_to_db(
+        db_session,
+        "s1",
+        encode_state(changed),
+        compact=True,
+        stage="completed",
+        status="completed",
+    )
+
+    # s1 no longer needs the original sales blob, but s2 does
+    assert len((await db_session.execute(select(CheckpointBlob))).scalars().all()) == 2
+    restored = await store.load_latest_from_db(db_session, "s2")
+    assert restored["sales_data"] == shared.sales_data
+
+    await store.save_to_db(
+        db_session,
+        "s2",
+        encode_state(changed),
+        compact=True,
+        stage="completed",
+        status="completed",
+    )
+    assert len((await db_session.execute(select(CheckpointBlob))).scalars().all()) == 1
@@ -0,0 +1,65 @@
+import time
+
+import pytest
+
+from app.core.cache import CacheManager
+from app.core.disk_cache import DiskStore
+
+
+def test_entries_survive_reopen(tmp_path):
+    path = tmp_path / "cache.db"
+    store = DiskStore(str(path))
+    store.set("gemini:cache:a", {"answer": 42}, ttl=60, tags=["menu"])
+    store.close()
+
+    reopened = DiskStore(str(path))
+    entry = reopened.get("gemini:cache:a")
+    assert entry.value == {"answer": 42}
+    assert entry.tags == ["menu"]
+    assert reopened.stats()["bytes"] > 0
+
+
+def test_ttl_glob_clear_and_tags(tmp_path):
+    store = DiskStore(str(tmp_path / "cache.db"))
+    store.set("gemini:cache:old", 1, ttl=0.01)
+    store.set("gemini:cache:menu", 2, tags=["session-1"])
+    store.set("other:key", 3, tags=["session-1"])
+    time.sleep(0.02)
+
+    assert store.get("gemini:cache:old") is None
+    assert store.clear("gemini:cache:*") == 1
+    assert store.get("other:key").value == 3
+    assert store.invalidate_by_tag("session-1") == ["other:key"]
+    assert store.stats()["entries"] == 0
+    assert store.stats()["bytes"] == 0
+
+
+def test_compaction_evicts_least_recently_used(tmp_path):
+    store = DiskStore(str(tmp_path / "cache.db"), max_bytes=300)
+    for i in range(3):
+        store.set(f"k{i}", "x" * 80)
+    store.set("k3", "x" * 80)
+
+    assert store.get("k0") is None
+    assert store.get("k3") is not None
+    assert store.stats()["bytes"] <= 300
+    assert store.evictions >= 1
+
+
+@pytest.mark.asyncio
+async def test_cache_manager_uses_disk_tier_without_redis(tmp_path):
+    path = str(tmp_path / "app_cache.db")
+    manager = CacheManager(disk_path=path)
+    await manager.start()
+    await manager.set("bcg:1", {"stars": 3}, tags=["session-1"])
+    await manager.stop()
+
+    restarted = CacheManager(disk_path=path)
+    await restarted.start()
+    assert await restarted.get("bcg:1") == {"stars": 3}
+    assert "l2" in restarted.get_stats()
+
+    # Promoted L1 copy keeps its tag, so invalidation clears both tiers
+    await restarted.invalidate_by_tag("session-1")
+    assert await restarted.get("bcg:1") is None
+    await restarted.stop()
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from app.services.intelligence.enrichment_engine import EnrichmentRun, HostLimiter, fan_out
+
+
+@pytest.mark.asyncio
+async def test_step_deadline_yields_default_and_note():
+    run = EnrichmentRun(step_timeout=0.01)
+
+    async def slow_search():
+        await asyncio.sleep(1)
+        return {"results": []}
+
+    async def reviews():
+        return "Great tacos"
+
+    web_data, summary = await asyncio.gather(
+        run.step("web_search", slow_search(), default={}),
+        run.step("reviews", reviews(), default=None),
+    )
+    assert web_data == {}
+    assert summary == "Great tacos"
+    assert run.partial
+    assert run.notes() == ["Partial data: step 'web_search' timed out"]
+
+
+@pytest.mark.asyncio
+async def test_host_limiter_caps_concurrency_per_host():
+    limiter = HostLimiter(default_limit=2, limits={"places.googleapis.com": 1})
+    active = {"example.com": 0, "places.googleapis.com": 0}
+    peak = dict(active)
+
+    async def fetch(url):
+        host = HostLimiter.host_of(url)
+        async with limiter.slot(host):
+            active[host] += 1
+            peak[host] = max(peak[host], active[host])
+            await asyncio.sleep(0.01)
+            active[host] -= 1
+
+    await asyncio.gather(
+        *(fetch(f"https://example.com/{i}") for i in range(5)),
+        *(fetch(f"https://places.googleapis.com/v1/places/{i}") for i in range(3)),
+    )
+    assert peak == {"example.com": 2, "places.googleapis.com": 1}
+
+
+@pytest.mark.asyncio
+async def test_fan_out_keeps_order_and_returns_failures():
+    progress = []
+
+    async def enrich(name):
+        await asyncio.sleep(0.01 if name == "a" else 0)
+        if name == "b":
+            raise ValueError("no place details")
+        return name.upper()
+
+    async def on_done(completed, total):
+        progress.append((completed, total))
+
+    results = await fan_out(["a", "b", "c"], enrich, max_concurrency=3, on_done=on_done)
+    assert results[0] == "A" and results[2] == "C"
+    assert isinstance(results[1], ValueError)
+    assert progress[-1] == (3, 3)
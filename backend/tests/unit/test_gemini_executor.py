@@ -0,0 +1,153 @@
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.core.gemini_executor import (
+    GeminiRequestExecutor,
+    RequestPriority,
+    get_gemini_executor,
+    request_priority,
+    shutdown_gemini_executor,
+)
+from app.services.gemini.base_agent import GeminiBaseAgent
+
+
+@pytest.fixture
+def executor():
+    ex = GeminiRequestExecutor(max_concurrent_per_model=1, max_workers=4)
+    yield ex
+    ex.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_run_returns_result_on_worker_thread(executor):
+    result = await executor.run(threading.current_thread, model="m")
+    assert result.name.startswith("gemini")
+    assert executor.get_stats()["models"]["m"]["completed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_per_model_slots_limit_concurrency(executor):
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def call():
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+
+    await asyncio.gather(*(executor.run(call, model="m") for _ in range(3)))
+    assert peak == 1
+
+
+@pytest.mark.asyncio
+async def test_interactive_requests_overtake_background(executor):
+    order = []
+    gate = threading.Event()
+
+    blocker = asyncio.create_task(executor.run(gate.wait, model="m"))
+    await asyncio.sleep(0.01)
+
+    background = asyncio.create_task(
+        executor.run(order.append, "background", model="m", priority=RequestPriority.BACKGROUND)
+    )
+    interactive = asyncio.create_task(
+        executor.run(order.append, "interactive", model="m", priority=RequestPriority.INTERACTIVE)
+    )
+    await asyncio.sleep(0.01)
+    assert executor.get_stats()["models"]["m"]["queue_depth"] == 2
+
+    gate.set()
+    await asyncio.gather(blocker, background, interactive)
+    assert order == ["interactive", "background"]
+
+
+@pytest.mark.asyncio
+async def test_background_agent_calls_queue_behind_interactive(executor):
+    order = []
+    gate = threading.Event()
+
+    def generate_content(model, contents, config):
+        text = contents[0].parts[0].text
+        order.append(text)
+        return MagicMock(text=text, usage_metadata=None)
+
+    with patch("app.services.gemini.base_agent.genai.Client") as mock_client, patch(
+        "app.services.gemini.base_agent.get_gemini_executor", return_value=executor
+    ):
+        mock_client.return_value.models.generate_content.side_effect = generate_content
+        agent = GeminiBaseAgent()
+
+        blocker = asyncio.create_task(executor.run(gate.wait, model=agent.model_name))
+        await asyncio.sleep(0.01)
+
+        # Enrichment passes the priority; pipeline stages inherit it from their block
+        enrichment = asyncio.create_task(
+            agent.generate("enrichment", priority=RequestPriority.BACKGROUND, bypass_cache=True)
+        )
+        with request_priority(RequestPriority.BACKGROUND):
+            stage = asyncio.create_task(agent.generate("pipeline stage", bypass_cache=True))
+        await asyncio.sleep(0.01)
+        chat = asyncio.create_task(agent.generate_response("user question", bypass_cache=True))
+        await asyncio.sleep(0.01)
+
+        queued = executor.get_stats()["models"][agent.model_name]["queued_by_priority"]
+        assert queued == {"interactive": 1, "standard": 0, "background": 2}
+
+        gate.set()
+        await asyncio.gather(blocker, enrichment, stage, chat)
+        assert order == ["user question", "enrichment", "pipeline stage"]
+
+
+@pytest.mark.asyncio
+async def test_timeout_keeps_slot_until_call_finishes(executor):
+    gate = threading.Event()
+    with pytest.raises(asyncio.TimeoutError):
+        await executor.run(gate.wait, model="m", timeout=0.01)
+    assert executor.get_stats()["models"]["m"]["in_flight"] == 1
+
+    gate.set()
+    await asyncio.sleep(0.05)
+    stats = executor.get_stats()["models"]["m"]
+    assert stats["in_flight"] == 0
+    assert stats["timed_out"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_reads_chunks_on_worker_threads(executor):
+    threads = []
+
+    def chunks():
+        for i in range(3):
+            threads.append(threading.current_thread().name)
+            yield i
+
+    assert [chunk async for chunk in executor.stream(chunks, model="m")] == [0, 1, 2]
+    assert all(name.startswith("gemini") for name in threads)
+    assert executor.get_stats()["models"]["m"]["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_agents_use_the_executor_created_after_shutdown():
+    with patch("app.services.gemini.base_agent.genai.Client") as mock_client:
+        mock_client.return_value.models.generate_content_stream.return_value = iter(
+            [MagicMock(text="Hola"), MagicMock(text=" mundo")]
+        )
+        agent = GeminiBaseAgent()
+        shutdown_gemini_executor()
+
+        try:
+            assert agent.executor is get_gemini_executor()
+            assert [text async for text in agent.generate_stream("hi")] == ["Hola", " mundo"]
+            # The call plus one next() per chunk and one for the end of the stream
+            assert agent.executor.get_stats()["models"][agent.model_name]["completed"] == 4
+        finally:
+            shutdown_gemini_executor()
@@ -0,0 +1,167 @@
+import asyncio
+import json
+
+import httpcore
+import httpx
+
+from app.core.http_clients import (
+    CachingResolverBackend,
+    HTTPClientRegistry,
+    PooledTransport,
+    RetryPolicy,
+    install_network_backend,
+)
+
+FAST_RETRY = RetryPolicy(attempts=3, backoff_base=0.001, backoff_max=0.01)
+
+
+def _client(handler, retry=FAST_RETRY, per_host_limit=10):
+    transport = PooledTransport(
+        httpx.MockTransport(handler), retry=retry, per_host_limit=per_host_limit
+    )
+    return httpx.AsyncClient(transport=transport), transport
+
+
+def test_retries_retryable_statuses_and_connect_errors():
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        if len(calls) == 1:
+            raise httpx.ConnectError("refused", request=request)
+        if len(calls) == 2:
+            return httpx.Response(503, headers={"Retry-After": "0"})
+        return httpx.Response(200, json={"status": "OK"})
+
+    client, transport = _client(handler)
+    response = asyncio.run(client.get("https://maps.googleapis.com/geocode"))
+
+    assert response.json() == {"status": "OK"}
+    assert len(calls) == 3 and transport.retries == 2
+
+
+def test_post_is_only_retried_when_the_policy_allows_it():
+    calls = []
+
+    def handler(request):
+        calls.append(json.loads(request.content))
+        return httpx.Response(503)
+
+    client, _ = _client(handler)
+    response = asyncio.run(client.post("https://places.googleapis.com/v1/x", json={"a": 1}))
+    assert response.status_code == 503 and len(calls) == 1
+
+    policy = RetryPolicy(attempts=2, backoff_base=0.001, methods=frozenset({"POST"}))
+    client, _ = _client(handler, retry=policy)
+    calls.clear()
+    asyncio.run(client.post("https://places.googleapis.com/v1/x", json={"a": 1}))
+    # The body is sent again on the retry
+    assert calls == [{"a": 1}, {"a": 1}]
+
+
+def test_gives_up_after_the_last_attempt():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(429)
+
+    client, _ = _client(handler)
+    response = asyncio.run(client.get("https://places.googleapis.com/v1/places/abc"))
+
+    assert response.status_code == 429
+    assert len(calls) == FAST_RETRY.attempts
+
+
+class _Body(httpx.AsyncByteStream):
+    def __init__(self, data):
+        self.data = data
+
+    async def __aiter__(self):
+        await asyncio.sleep(0.01)
+        yield self.data
+
+
+def test_per_host_limit_holds_until_the_body_is_read():
+    in_flight = {"a.mx": 0, "b.mx": 0}
+    peak = {"a.mx": 0, "b.mx": 0}
+
+    async def handler(request):
+        host = request.url.host
+        in_flight[host] += 1
+        peak[host] = max(peak[host], in_flight[host])
+        await asyncio.sleep(0.01)
+        in_flight[host] -= 1
+        # Streamed like a network response, so the body is read after return
+        return httpx.Response(200, stream=_Body(b"ok"))
+
+    client, _ = _client(handler, per_host_limit=2)
+
+    async def run():
+        urls = [f"https://{host}/{i}" for i in range(5) for host in ("a.mx", "b.mx")]
+        return await asyncio.gather(*(client.get(url) for url in urls))
+
+    responses = asyncio.run(run())
+
+    assert all(r.text == "ok" for r in responses)
+    assert peak == {"a.mx": 2, "b.mx": 2}
+
+
+def test_dns_lookups_are_cached(monkeypatch):
+    resolver = CachingResolverBackend(ttl_seconds=60)
+    lookups = []
+
+    async def getaddrinfo(host, port, type=0):
+        lookups.append(host)
+        return [(2, 1, 6, "", ("10.0.0.1", port)), (2, 1, 6, "", ("10.0.0.1", port))]
+
+    async def run():
+        monkeypatch.setattr(asyncio.get_running_loop(), "getaddrinfo", getaddrinfo)
+        first = await resolver.resolve("maps.googleapis.com", 443)
+        second = await resolver.resolve("maps.googleapis.com", 443)
+        literal = await resolver.resolve("127.0.0.1", 443)
+        return first, second, literal
+
+    first, second, literal = asyncio.run(run())
+
+    assert first == second == ["10.0.0.1"]
+    assert literal == ["127.0.0.1"]
+    assert lookups == ["maps.googleapis.com"]
+    assert resolver.hits == 1
+
+
+def test_resolver_is_only_installed_on_supported_httpcore(monkeypatch):
+    resolver = CachingResolverBackend(ttl_seconds=60)
+
+    transport = httpx.AsyncHTTPTransport()
+    assert install_network_backend(transport, resolver)
+    assert transport._pool._network_backend is resolver
+
+    monkeypatch.setattr(httpcore, "__version__", "2.0.0")
+    transport = httpx.AsyncHTTPTransport()
+    assert not install_network_backend(transport, resolver)
+    assert transport._pool._network_backend is not resolver
+
+
+def test_registry_shares_clients_per_loop_and_closes_them():
+    registry = HTTPClientRegistry()
+
+    async def run():
+        first = registry.get("google_apis")
+        assert registry.get("google_apis") is first
+        assert registry.get("competitor_pages") is not first
+        return first
+
+    first = asyncio.run(run())
+
+    async def other_loop():
+        # Connections belong to the loop that opened them
+        client = registry.get("google_apis")
+        await registry.aclose()
+        return client
+
+    second = asyncio.run(other_loop())
+
+    assert second is not first
+    assert second.is_closed
+    assert registry.get_stats() == {}
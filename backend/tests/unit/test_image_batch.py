@@ -0,0 +1,65 @@
+import asyncio
+
+from app.core.image_batch import analyze_image_batch
+
+
+def test_batch_is_bounded_ordered_and_deduplicated():
+    images = [b"taco", b"flan", b"taco", b"sopa", b"agua", b"boom"]
+    calls = []
+    in_flight = 0
+    max_in_flight = 0
+    reported = []
+
+    async def analyze(image):
+        nonlocal in_flight, max_in_flight
+        calls.append(image)
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        # Earlier images take longer, so they finish last
+        await asyncio.sleep(0.01 * (6 - len(calls)))
+        in_flight -= 1
+        if image == b"boom":
+            raise ValueError("unreadable photo")
+        return {"name": image.decode()}
+
+    async def on_result(result, completed, total):
+        reported.append((result.index, completed, total))
+
+    results = asyncio.run(
+        analyze_image_batch(images, analyze, max_concurrency=2, on_result=on_result)
+    )
+
+    assert max_in_flight == 2
+    assert sorted(calls) == sorted(set(images))  # Each distinct image analyzed once
+    assert [r.index for r in results] == list(range(6))
+    assert [r.result["name"] for r in results[:5]] == ["taco", "flan", "taco", "sopa", "agua"]
+    assert results[2].duplicate_of == 0
+    assert results[2].result is not results[0].result
+
+    # A failed image does not sink the batch
+    assert not results[5].ok
+    assert "unreadable" in str(results[5].error)
+
+    # Every image is reported once, as it completes
+    assert sorted(index for index, _, _ in reported) == list(range(6))
+    assert [completed for _, completed, _ in reported] == list(range(1, 7))
+    assert reported[0][0] != 0
+
+
+def test_paths_are_keyed_by_content(tmp_path):
+    first, dup, other = tmp_path / "a.jpg", tmp_path / "b.jpg", tmp_path / "c.jpg"
+    first.write_bytes(b"same")
+    dup.write_bytes(b"same")
+    other.write_bytes(b"other")
+    calls = []
+
+    async def analyze(path):
+        calls.append(path)
+        return path
+
+    results = asyncio.run(
+        analyze_image_batch([str(first), str(dup), str(other)], analyze)
+    )
+
+    assert calls == [str(first), str(other)]
+    assert [r.result for r in results] == [str(first), str(first), str(other)]
@@ -0,0 +1,69 @@
+import asyncio
+
+from app.services.analysis.menu_engineering import (
+    AnalysisPeriod,
+    MenuEngineeringClassifier,
+    filter_sales_by_period,
+)
+from app.services.analysis.sales_frame import SalesFrame
+
+RECORDS = [
+    {"date": "01-01-24", "item_name": "Tacos", "quantity": 10, "price": 10.0, "cost": 3.0},
+    {"date": "20-02-24", "item_name": "tacos ", "units_sold": 5, "price": 12.0, "categoria": "Food"},
+    {"date": "21-02-24", "item_name": "Burrito", "units_sold": 2, "revenue": 30.0},
+    {"date": "22-02-24", "item_name": "Agua", "quantity": 20, "price": 2.0, "cost": 1.5},
+    {"date": None, "item_name": "", "product_name": "Flan", "quantity": 1, "price": 5.0, "cost": 4.8},
+]
+MENU = [{"name": "Burrito", "price": 0, "cost": 4.0, "category": "Food"}]
+
+
+def test_item_metrics_and_classification():
+    result = asyncio.run(
+        MenuEngineeringClassifier().analyze(MENU, RECORDS, AnalysisPeriod.ALL_TIME)
+    )
+    items = {item["name"]: item for item in result["items"]}
+
+    # Names are merged case/whitespace-insensitively, menu names win;
+    # items come sorted by total contribution
+    assert list(items) == ["tacos", "Burrito", "agua", "flan"]
+    assert items["tacos"]["units_sold"] == 15
+    assert items["tacos"]["price"] == 11.0  # mean of the record prices
+    assert items["tacos"]["total_revenue"] == 160.0
+    # No price anywhere: inferred from revenue / units
+    assert items["Burrito"]["price"] == 15.0
+    assert items["Burrito"]["cm_unitario"] == 11.0
+    assert items["Burrito"]["product_category"] == "Food"
+
+    thresholds = result["thresholds"]
+    assert thresholds["popularity_threshold"] == round(100 / 4 * 0.7, 2)
+    assert thresholds["total_units"] == 38
+    assert [items[n]["category"] for n in ("agua", "tacos", "Burrito", "flan")] == [
+        "plowhorse",
+        "star",
+        "puzzle",
+        "dog",
+    ]
+    assert result["summary"]["counts"]["dog"] == 1
+    assert result["data_quality"]["unique_items"] == 4
+
+
+def test_period_filter_is_a_mask_over_parsed_dates():
+    sales, start, end = filter_sales_by_period(RECORDS, AnalysisPeriod.LAST_30_DAYS)
+
+    assert isinstance(sales, SalesFrame)
+    assert sales.text("item_name").tolist() == ["tacos ", "Burrito", "Agua"]
+    assert (start.isoformat(), end.isoformat()) == ("2024-02-20T00:00:00", "2024-02-22T00:00:00")
+
+
+def test_all_periods_match_single_period_runs():
+    classifier = MenuEngineeringClassifier()
+    frame = SalesFrame.of(RECORDS)
+
+    results = asyncio.run(classifier.analyze_all_periods(MENU, frame))
+
+    assert list(results) == [period.value for period in AnalysisPeriod]
+    for period in AnalysisPeriod:
+        assert results[period.value] == asyncio.run(
+            classifier.analyze(MENU, RECORDS, period)
+        )
+    assert results["30d"]["total_records"] == 3
@@ -0,0 +1,155 @@
+import asyncio
+import json
+
+import httpx
+
+import app.services.analysis.pricing as pricing
+from app.core.cache import CacheManager
+from app.services.analysis.menu_html import extract_page_menu, parse_price
+from app.services.analysis.pricing import CompetitorIntelligenceService, CompetitorSource
+
+JSON_LD_PAGE = """<html><head><title>Lupita | Inicio</title>
+<script type="application/ld+json">
+{"@context": "https://schema.org", "@type": "Restaurant", "name": "Taqueria Lupita",
+ "hasMenu": {"@type": "Menu", "hasMenuSection": [
+   {"@type": "MenuSection", "name": "Tacos", "hasMenuItem": [
+     {"@type": "MenuItem", "name": "Pastor",
+      "offers": {"@type": "Offer", "price": "25.00", "priceCurrency": "MXN"}},
+     {"@type": "MenuItem", "name": "Suadero", "offers": {"@type": "Offer", "price": 28}}]}]}}
+</script></head>
+<body><nav>Inicio Menu Contacto</nav>
+<div itemscope itemtype="https://schema.org/MenuSection">
+  <h2 itemprop="name">Bebidas</h2>
+  <div itemprop="hasMenuItem" itemscope itemtype="https://schema.org/MenuItem">
+    <span itemprop="name">Horchata</span>
+    <span itemprop="description">Agua fresca</span>
+    <div itemprop="offers" itemscope itemtype="https://schema.org/Offer">
+      <meta itemprop="priceCurrency" content="MXN"><span itemprop="price">$30</span>
+    </div>
+  </div>
+</div>
+<script>var tracking = "$99";</script></body></html>"""
+
+TEXT_PAGE = """<html><head><style>body { color: red }</style></head><body>
+<header>Reservaciones $ 0 cargo</header>
+<h1>Fonda Dona Mary</h1><p>Nuestra historia empieza en 1985 en el barrio.</p>
+<h2>Comida corrida</h2><p>Sopa de fideo</p><p>$45.00</p>
+<p>Mole poblano ........ 120</p>
+<footer>Aviso de privacidad</footer></body></html>"""
+
+
+def test_structured_menu_and_menu_text_are_read_locally():
+    page = extract_page_menu(JSON_LD_PAGE)
+
+    assert page.restaurant_name == "Taqueria Lupita"
+    assert page.has_structured_menu
+    assert page.currency == "MXN"
+    assert page.categories == ["Tacos", "Bebidas"]
+    assert page.items[2] == {
+        "name": "Horchata", "price": 30.0, "category": "Bebidas", "description": "Agua fresca"
+    }
+    assert "tracking" not in page.text and "Inicio" not in page.text
+
+    page = extract_page_menu(TEXT_PAGE)
+    assert not page.items
+    assert page.menu_text.splitlines() == [
+        "Comida corrida", "Sopa de fideo", "$45.00", "Mole poblano ........ 120"
+    ]
+    assert "privacidad" not in page.text and "Reservaciones" not in page.text
+
+    assert [parse_price(v) for v in ["$1,250.00", "85,50", "1.250,00", "abc"]] == [
+        1250.0, 85.5, 1250.0, None
+    ]
+
+
+class _TextAgent:
+    def __init__(self):
+        self.prompts = []
+
+    async def _generate_content(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        return json.dumps({"items": [{"name": "Mole poblano", "price": 120}], "confidence": 0.8})
+
+    def _parse_json_response(self, text):
+        return json.loads(text)
+
+
+def test_url_menus_skip_the_llm_and_are_revalidated(monkeypatch):
+    cache = CacheManager()
+
+    async def get_cache_manager():
+        return cache
+
+    monkeypatch.setattr(pricing, "get_cache_manager", get_cache_manager)
+    pages = {"/lupita": JSON_LD_PAGE, "/mary": TEXT_PAGE}
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, text=pages[request.url.path], headers={"ETag": '"v1"'})
+
+    agent = _TextAgent()
+    service = CompetitorIntelligenceService(multimodal_agent=agent, reasoning_agent=object())
+    service.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def run():
+        lupita = await service._extract_from_url(CompetitorSource("url", "https://x.mx/lupita"))
+        mary = await service._extract_from_url(CompetitorSource("url", "https://x.mx/mary"))
+        again = await service._extract_from_url(CompetitorSource("url", "https://x.mx/lupita"))
+        return lupita, mary, again
+
+    lupita, mary, again = asyncio.run(run())
+
+    assert lupita.metadata["extraction_method"] == "structured_data"
+    assert lupita.competitor_name == "Taqueria Lupita"
+    assert lupita.price_range == {"min": 25.0, "max": 30.0}
+
+    # Only the text page went to the LLM, without the page boilerplate
+    (prompt,) = agent.prompts
+    assert "Mole poblano ........ 120" in prompt
+    assert "<" not in prompt.split("Menu text")[1].split("Extract all")[0]
+    assert mary.items == [{"name": "Mole poblano", "price": 120}]
+
+    # The second request is conditional and served from the cache
+    assert requests[-1].headers["if-none-match"] == '"v1"'
+    assert again.metadata["cached"] is True
+    assert again.items == lupita.items
+
+
+def test_empty_llm_answers_are_not_cached(monkeypatch):
+    cache = CacheManager()
+
+    async def get_cache_manager():
+        return cache
+
+    monkeypatch.setattr(pricing, "get_cache_manager", get_cache_manager)
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, text=TEXT_PAGE, headers={"ETag": '"v1"'})
+
+    agent = _TextAgent()
+    answers = iter(["not json", json.dumps({"items": [{"name": "Mole", "price": 120}]})])
+
+    async def generate(prompt, **kwargs):
+        return next(answers)
+
+    agent._generate_content = generate
+    agent._parse_json_response = lambda text: json.loads(text) if text.startswith("{") else {}
+    service = CompetitorIntelligenceService(multimodal_agent=agent, reasoning_agent=object())
+    service.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    source = CompetitorSource("url", "https://x.mx/mary")
+
+    async def run():
+        return [await service._extract_from_url(source) for _ in range(3)]
+
+    failed, recovered, cached = asyncio.run(run())
+
+    assert failed.items == []
+    # The failed answer was not reused: the page was fetched unconditionally
+    assert "if-none-match" not in requests[1].headers
+    assert recovered.items == [{"name": "Mole", "price": 120}]
+    assert cached.metadata["cached"] is True
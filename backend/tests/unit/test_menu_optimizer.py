@@ -0,0 +1,76 @@
+import asyncio
+
+import pandas as pd
+
+from app.services.analysis.menu_optimizer import (
+    MenuOptimizer,
+    OptimizationAction,
+    PriorityLevel,
+)
+
+
+def _metrics():
+    # Rotation quartiles are 0.2 and 0.825
+    return pd.DataFrame(
+        {
+            "item_name": ["star", "gem", "driver", "dud", "thin", "ok"],
+            "avg_price": [10.0, 20.0, 5.0, 8.0, 12.0, 11.0],
+            "rotation_score": [0.95, 0.05, 0.9, 0.1, 0.5, 0.6],
+            "margin": [0.7, 0.7, 0.3, 0.3, 0.5, 0.5],
+            "margin_score": [0.9, 0.9, 0.1, 0.1, 0.3, 0.6],
+            "combined_score": [0.8, 0.5, 0.4, 0.1, 0.35, 0.45],
+            "total_revenue": [100.0] * 6,
+        }
+    )
+
+
+def test_action_rules_apply_in_order():
+    plan = MenuOptimizer()._plan_item_optimizations(_metrics())
+    by_item = plan.set_index("item_name")
+
+    assert by_item["action"].to_dict() == {
+        "driver": OptimizationAction.INCREASE_PRICE,
+        "gem": OptimizationAction.PROMOTE,
+        "dud": OptimizationAction.REMOVE,
+        "star": OptimizationAction.INCREASE_PRICE,
+        "ok": OptimizationAction.MAINTAIN,
+        "thin": OptimizationAction.REPOSITION,
+    }
+    assert by_item.loc["driver", "priority"] == PriorityLevel.CRITICAL
+    assert by_item.loc["driver", "suggested_price"] == 5.5
+    assert by_item.loc["star", "suggested_price"] == 10.5
+    assert by_item.loc["gem", "suggested_price"] is None
+    assert by_item.loc["dud", "reasoning"].startswith("Low margin (30%)")
+
+    # Critical first, then high, medium and low; by combined score within
+    assert plan["item_name"].tolist() == [
+        "driver", "gem", "dud", "star", "thin", "ok"
+    ]
+
+
+def test_report_from_sales():
+    sales = pd.DataFrame(
+        {
+            "item_name": ["Tacos", "Tacos", "Agua", "Flan", "Sopa"],
+            "quantity": [10, 10, 5, 1, 2],
+            "revenue": [200.0, 200.0, 25.0, 6.0, 20.0],
+            "cost": [60.0, 60.0, 20.0, 5.0, 8.0],
+        }
+    )
+    menu = [
+        {"name": "Tacos", "price": 20.0, "category": "Food"},
+        {"name": "Agua", "price": 5.0, "category": "Drinks"},
+        {"name": "Flan", "price": 6.0, "category": "Food"},
+    ]
+
+    report = asyncio.run(MenuOptimizer().analyze(sales, menu, "s1"))
+
+    assert [o.item_name for o in report.item_optimizations][0] == "Flan"
+    assert report.items_to_remove == ["Flan"]
+    assert report.quick_wins[-1]["items"] == ["Flan"]
+
+    # Categories in order of first appearance (items are sorted by name)
+    drinks, food = report.category_summaries
+    assert (food.category, food.item_count, food.total_revenue) == ("Food", 2, 406.0)
+    assert drinks.avg_margin == 0.2
+    assert "below target" in drinks.recommendations[0]
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from app.services.analysis.model_registry import ModelRegistry
+
+
+class FakePredictor:
+    loads = 0
+
+    def __init__(self, model_dir, size=100):
+        FakePredictor.loads += 1
+        self.model_dir = model_dir
+        self.size = size
+        self.is_trained = False
+        self.trained_with = None
+
+    async def train(self, data):
+        await asyncio.sleep(0.01)
+        self.trained_with = data
+        self.is_trained = True
+
+    def footprint_bytes(self):
+        return self.size
+
+
+@pytest.fixture
+def registry(tmp_path):
+    FakePredictor.loads = 0
+    return ModelRegistry(
+        max_bytes=250,
+        idle_ttl_seconds=3600,
+        base_dir=str(tmp_path),
+        loaders={"sales": FakePredictor, "neural": FakePredictor},
+    )
+
+
+@pytest.mark.asyncio
+async def test_models_load_once_and_stay_warm(registry, tmp_path):
+    first, second = await asyncio.gather(
+        registry.get("sales", "session-1"), registry.get("sales", "session-1")
+    )
+    assert first is second
+    assert FakePredictor.loads == 1
+    assert first.model_dir == tmp_path / "scopes" / "session-1"
+
+    assert await registry.get("sales", "session-1") is first
+    assert (await registry.get("sales")).model_dir is None  # global scope
+
+
+@pytest.mark.asyncio
+async def test_train_swaps_in_new_version_without_touching_old(registry):
+    old = await registry.get("sales", "s1")
+    new = await registry.train("sales", "s1", ["row"])
+
+    assert new is not old
+    assert not old.is_trained
+    assert new.trained_with == ["row"]
+    assert await registry.get("sales", "s1") is new
+    assert registry.get_stats()["models"][0]["version"] == 2
+
+    newer = await registry.train("sales", "s1", ["row", "row"])
+    assert registry.get_stats()["models"][0]["version"] == 3
+    assert await registry.get("sales", "s1") is newer
+
+
+@pytest.mark.asyncio
+async def test_budget_and_idle_eviction(registry):
+    a = await registry.get("sales", "a")
+    await registry.get("sales", "b")
+    await registry.get("sales", "a")  # a is now most recently used
+    await registry.get("neural", "c")  # 300 bytes > 250, evicts b
+
+    scopes = {m["scope"] for m in registry.get_stats()["models"]}
+    assert scopes == {"a", "c"}
+    assert await registry.get("sales", "a") is a
+
+    registry.idle_ttl_seconds = 0
+    assert registry.evict_idle() == 2
+    assert registry.get_stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_get_deletes_idle_scopes_but_budget_eviction_keeps_files(registry, tmp_path):
+    for scope in ("a", "b"):
+        await registry.get("sales", scope)
+        (tmp_path / "scopes" / scope).mkdir(parents=True)
+    registry._entries[("sales", "a")].last_used -= 7200
+
+    await registry.get("sales", "b")
+    assert {m["scope"] for m in registry.get_stats()["models"]} == {"b"}
+    assert not (tmp_path / "scopes" / "a").exists()
+
+    await registry.get("sales", "c")
+    await registry.get("sales", "d")  # 300 bytes > 250, evicts b
+    assert {m["scope"] for m in registry.get_stats()["models"]} == {"c", "d"}
+    assert (tmp_path / "scopes" / "b").exists()
+
+
+def test_scope_is_sanitized_for_paths(registry, tmp_path):
+    key = registry._key("sales", "../etc")
+    assert registry._model_dir(key) == tmp_path / "scopes" / "___etc"
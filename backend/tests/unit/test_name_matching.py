@@ -0,0 +1,113 @@
+import asyncio
+
+import pandas as pd
+
+from app.services.analysis.menu_optimizer import MenuOptimizer
+from app.services.analysis.menu_engineering import AnalysisPeriod, MenuEngineeringClassifier
+from app.services.analysis.name_matching import (
+    NameMatcher,
+    candidates_fingerprint,
+    match_menu_to_sales,
+)
+
+SALES_NAMES = ["TACOS AL PASTOR (Orden)", "Café Americano", "Hamburguesa Doble", "Té"]
+
+
+def test_matcher_tiers():
+    matcher = NameMatcher(SALES_NAMES)
+
+    assert matcher.match("Café Americano") == "Café Americano"
+    assert matcher.match("cafe americano") == "Café Americano"  # normalized
+    assert matcher.match("Tacos al Pastor") == "TACOS AL PASTOR (Orden)"
+    assert matcher.match("Americano") == "Café Americano"  # substring
+    assert matcher.match("Hamburgesa Doble") == "Hamburguesa Doble"  # typo
+    assert matcher.match("Pollo Frito") is None
+    assert matcher.match("(Botella)") is None
+
+
+def test_variants_are_not_fuzzy_matched():
+    matcher = NameMatcher(["Combo 1", "Item 0", "Café Grande", "Agua 600ml"])
+
+    assert matcher.match("Combo 3") is None  # Trigram Dice 0.8
+    assert matcher.match("Item 2") is None
+    assert matcher.match("Café Chico") is None
+    assert matcher.match("Agua 1L") is None
+    assert matcher.match("Agua 600 ml") is None
+
+    # Exactly matched sales names are not also claimed by a fuzzy match
+    assert match_menu_to_sales(["Americano", "Café Americano"], SALES_NAMES) == {
+        "Americano": None,
+        "Café Americano": "Café Americano",
+    }
+
+
+def test_unsold_variant_does_not_take_over_the_sold_item():
+    sales = pd.DataFrame(
+        {
+            "item_name": ["Combo 1", "Combo 1"],
+            "quantity": [3, 2],
+            "revenue": [150.0, 100.0],
+            "cost": [60.0, 40.0],
+        }
+    )
+    menu = [{"name": "Combo 3", "price": 180.0}, {"name": "Combo 1", "price": 50.0}]
+
+    optimizer = MenuOptimizer()
+    columns = {name: name for name in ("item_name", "quantity", "revenue", "cost")}
+    merged = optimizer._merge_with_menu(optimizer._calculate_item_metrics(sales, columns), menu)
+
+    assert list(zip(merged["item_name"], merged["price"])) == [("Combo 1", 50.0)]
+
+
+def test_mapping_table_is_reused_per_sales_set():
+    table = {}
+    matches = match_menu_to_sales(["Americano", "Pollo Frito"], SALES_NAMES, table)
+
+    assert matches == {"Americano": "Café Americano", "Pollo Frito": None}
+    (known,) = table.values()
+    assert known == matches
+
+    # A table persisted by another worker is served as is, not rematched
+    sales_names = SALES_NAMES + ["Café de Olla"]
+    seeded = {candidates_fingerprint(sales_names): {"Americano": "Café de Olla"}}
+    assert match_menu_to_sales(["Americano"], sales_names, seeded) == {
+        "Americano": "Café de Olla"
+    }
+
+    # A different set of sales names gets its own entry
+    match_menu_to_sales(["Americano"], SALES_NAMES[:2], table)
+    assert len(table) == 2
+
+
+def test_menu_engineering_uses_matched_menu_costs():
+    records = [{"item_name": "HAMBURGUESA DOBLE (Combo)", "quantity": 4, "price": 10.0}]
+    menu = [{"name": "Hamburguesa Doble", "price": 10.0, "cost": 6.0, "category": "Food"}]
+
+    result = asyncio.run(
+        MenuEngineeringClassifier().analyze(menu, records, AnalysisPeriod.ALL_TIME)
+    )
+
+    (item,) = result["items"]
+    assert item["cost"] == 6.0
+    assert item["product_category"] == "Food"
+
+
+def test_read_only_stages_match_against_a_copy_of_the_table():
+    from app.services.orchestrator import AnalysisState, PipelineStage
+
+    state = AnalysisState(
+        session_id="s1",
+        current_stage=PipelineStage.BCG_CLASSIFICATION,
+        checkpoints=[],
+        thought_traces=[],
+    )
+    match_menu_to_sales(["Americano"], SALES_NAMES, state.name_matches)
+    shared = {key: dict(known) for key, known in state.name_matches.items()}
+
+    # What BCG classification and sales prediction do with their table
+    copy = state.name_matches_copy()
+    match_menu_to_sales(["Pollo Frito"], SALES_NAMES, copy)
+    match_menu_to_sales(["Té"], SALES_NAMES[:2], copy)
+
+    assert state.name_matches == shared
+    assert len(copy) == 2
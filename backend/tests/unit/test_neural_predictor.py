@@ -0,0 +1,61 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from app.services.analysis.neural_predictor import (  # noqa: E402
+    NeuralPredictor,
+    SalesLSTM,
+    SalesTransformer,
+)
+
+
+@pytest.fixture
+def predictor(tmp_path):
+    torch.manual_seed(0)
+    predictor = NeuralPredictor(model_dir=tmp_path)
+    predictor.lstm_model = SalesLSTM(input_size=5)
+    predictor.transformer_model = SalesTransformer(input_size=5)
+    predictor.feature_scaler = {0: (0.0, 60.0), 1: (0.0, 6.0), 3: (5.0, 30.0)}
+    predictor.target_scaler = (0.0, 60.0)
+    predictor.is_trained = True
+    return predictor
+
+
+@pytest.mark.asyncio
+async def test_batch_covers_every_item_and_scenario(predictor):
+    items = [
+        {"name": "Tacos", "price": 12, "avg_daily_units": 25},
+        {"name": "Burrito", "price": 15, "avg_daily_units": 10},
+    ]
+    scenarios = [{"name": "baseline"}, {"name": "promo", "promotion_active": True}]
+
+    result = await predictor.predict_batch(items, 7, scenarios, uncertainty_samples=8)
+
+    assert set(result["predictions"]) == {"Tacos", "Burrito"}
+    for item in result["predictions"].values():
+        assert set(item["predictions"]) == {"baseline", "promo"}
+        forecast = item["predictions"]["promo"]
+        assert len(forecast["daily_predictions"]) == 7
+        assert all(u >= 0 for u in forecast["uncertainty"])
+        assert all(p >= 0 for p in forecast["daily_predictions"])
+    # Models are left in eval mode after MC sampling
+    assert not predictor.lstm_model.training
+    assert not predictor.transformer_model.training
+
+
+def test_mc_samples_share_one_forward_pass_per_day(predictor):
+    calls = []
+    forward = predictor.lstm_model.forward
+
+    def counting_forward(x):
+        calls.append(x.shape[0])
+        return forward(x)
+
+    predictor.lstm_model.forward = counting_forward
+    window = predictor._build_prediction_sequence({"price": 12}, {}, 5)
+    X = torch.as_tensor(window[None].repeat(3, axis=0), dtype=torch.float32)
+
+    means, stds = predictor._predict_with_uncertainty(X, 5, 10, use_ensemble=True)
+
+    assert means.shape == stds.shape == (3, 5)
+    assert calls == [30] * 5
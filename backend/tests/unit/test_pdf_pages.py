@@ -0,0 +1,65 @@
+import asyncio
+
+import fitz
+
+from app.core.pdf_pages import PageRenderPool, render_page
+from app.services.analysis.menu_analyzer import MenuExtractor
+
+
+def _menu_pdf(path, pages=3):
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page {i + 1}: Tacos al pastor ........ 10.50")
+    doc.save(path)
+    doc.close()
+    return str(path)
+
+
+def test_pages_render_in_memory_and_in_order(tmp_path):
+    pdf_path = _menu_pdf(tmp_path / "menu.pdf")
+    pool = PageRenderPool(max_workers=2)
+    try:
+        pages = asyncio.run(pool.render(pdf_path, max_pages=2))
+    finally:
+        pool.shutdown()
+
+    assert [page.index for page in pages] == [0, 1]
+    assert pages[1].text.startswith("Page 2: Tacos")
+    assert pages[0].image[:2] == b"\xff\xd8"  # JPEG
+    # Nothing is written next to the upload
+    assert [p.name for p in tmp_path.iterdir()] == ["menu.pdf"]
+
+
+class _VisionAgent:
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def extract_menu_from_pdf(self, pdf_path, additional_context=None):
+        return {"items": []}
+
+    async def extract_menu_from_image(self, image, additional_context=None, mime_type=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        # Later pages answer first
+        page = int(additional_context.split("Page ")[1].split(":")[0])
+        await asyncio.sleep(0.01 * (4 - page))
+        self.in_flight -= 1
+        return {"items": [{"name": f"Item {page}", "price": 10.0}]}
+
+
+def test_vision_calls_run_concurrently_and_reassemble_in_page_order(tmp_path, monkeypatch):
+    pdf_path = _menu_pdf(tmp_path / "menu.pdf")
+
+    async def render_inline(self, pdf_path, max_pages=None, zoom=2.0, ocr=False):
+        return [render_page(pdf_path, i, zoom, ocr) for i in range(3)]
+
+    monkeypatch.setattr(PageRenderPool, "render", render_inline)
+    agent = _VisionAgent()
+    extractor = MenuExtractor(agent)
+
+    result = asyncio.run(extractor.extract_from_pdf_all_pages(pdf_path, use_ocr=False))
+
+    assert agent.max_in_flight == 3
+    assert [item["name"] for item in result["items"]] == ["Item 1", "Item 2", "Item 3"]
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from app.services.pipeline_scheduler import StageScheduler, StageSpec, build_dependencies
+
+
+async def _noop(*args):
+    return None
+
+
+def test_build_dependencies_hazards():
+    specs = [
+        StageSpec(stage="menu", handler=_noop, writes=frozenset({"menu_items"})),
+        StageSpec(stage="images", handler=_noop, writes=frozenset({"image_scores"})),
+        StageSpec(stage="analysis", handler=_noop, reads=frozenset({"menu_items"})),
+        StageSpec(
+            stage="sales",
+            handler=_noop,
+            reads=frozenset({"menu_items"}),
+            writes=frozenset({"menu_items", "sales_data"}),
+        ),
+    ]
+    deps = build_dependencies(specs)
+    assert deps["menu"] == set()
+    assert deps["images"] == set()
+    assert deps["analysis"] == {"menu"}
+    # Write-after-read: sales must wait for analysis to read the old menu
+    assert deps["sales"] == {"menu", "analysis"}
+
+
+@pytest.mark.asyncio
+async def test_independent_stages_run_concurrently():
+    running = 0
+    peak = 0
+
+    async def runner(spec):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    specs = [
+        StageSpec(stage=name, handler=_noop, writes=frozenset({name}))
+        for name in ("a", "b", "c", "d")
+    ]
+    await StageScheduler(specs, runner, max_concurrency=3).run()
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_dependent_stage_waits_and_skips_on_condition():
+    order = []
+    state = {"menu_items": []}
+
+    async def runner(spec):
+        await asyncio.sleep(0.01 if spec.stage == "menu" else 0)
+        if spec.stage == "menu":
+            state["menu_items"].append("Tacos")
+        order.append(spec.stage)
+
+    specs = [
+        StageSpec(stage="menu", handler=_noop, writes=frozenset({"menu_items"})),
+        StageSpec(
+            stage="bcg",
+            handler=_noop,
+            reads=frozenset({"menu_items"}),
+            condition=lambda: bool(state["menu_items"]),
+        ),
+        StageSpec(stage="campaigns", handler=_noop, condition=lambda: False),
+    ]
+    scheduler = StageScheduler(specs, runner)
+    await scheduler.run()
+    assert order == ["menu", "bcg"]
+    assert scheduler.skipped == ["campaigns"]
+
+
+@pytest.mark.asyncio
+async def test_failure_cancels_inflight_stages():
+    cancelled = False
+
+    async def runner(spec):
+        nonlocal cancelled
+        if spec.stage == "bad":
+            raise ValueError("boom")
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+
+    specs = [
+        StageSpec(stage="slow", handler=_noop, writes=frozenset({"x"})),
+        StageSpec(stage="bad", handler=_noop, writes=frozenset({"y"})),
+    ]
+    with pytest.raises(ValueError, match="boom"):
+        await StageScheduler(specs, runner).run()
+    assert cancelled
@@ -0,0 +1,219 @@
+import asyncio
+
+import app.services.intelligence.places_cache as places_cache
+from app.core.cache import CacheManager
+from app.services.intelligence.geocoding import GeocodingService
+from app.services.intelligence.location import PlaceResult, PlacesService
+from app.services.intelligence.places_cache import (
+    PlacesCache,
+    distance_m,
+    geohash_encode,
+    geohash_neighbours,
+    normalize_address,
+    tile_query,
+)
+
+# Polanco, CDMX
+LAT, LNG = 19.4326, -99.1942
+
+
+def _use_fresh_cache(monkeypatch):
+    cache = CacheManager()
+
+    async def get_cache_manager():
+        return cache
+
+    monkeypatch.setattr(places_cache, "get_cache_manager", get_cache_manager)
+
+
+def _place(n, lat, lng):
+    return PlaceResult(
+        place_id=f"p{n}", name=f"Fonda {n}", address="", latitude=lat, longitude=lng
+    )
+
+
+def test_geohash_and_tiles():
+    assert geohash_encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    assert len(set(geohash_neighbours("9g3qx"))) == 8
+
+    tile = tile_query(LAT, LNG, 500, "restaurant")
+    assert tile.cell == geohash_encode(LAT, LNG, 7)
+    assert tile.key == f"places_nearby:restaurant:{tile.cell}:{tile.radius}"
+    # The tile search covers the query circle of any point in the cell
+    assert distance_m(tile.latitude, tile.longitude, LAT, LNG) + 500 <= tile.radius
+    assert tile.radius % 50 == 0 and tile.radius < 700
+    # Tile searches never exceed the API's maximum radius
+    assert tile_query(LAT, LNG, 49000, "restaurant").radius <= 50000
+    assert tile_query(LAT, LNG, 49950, "restaurant") is None
+
+    assert normalize_address("  Av. Presidente  Masaryk 111, Polanco ") == normalize_address(
+        "av presidente masaryk 111 polanco"
+    )
+    assert normalize_address("Calle Río Lerma #4") == "calle rio lerma #4"
+
+
+def test_nearby_queries_are_answered_from_covering_tiles(monkeypatch):
+    _use_fresh_cache(monkeypatch)
+    service = PlacesService()
+    service.api_key = "key"
+    searches = []
+
+    async def search(latitude, longitude, radius, max_results):
+        searches.append((latitude, longitude, radius, max_results))
+        # One place next to the query point, one ~800m north
+        return [_place(1, LAT + 0.0005, LNG), _place(2, LAT + 0.0072, LNG)]
+
+    monkeypatch.setattr(service, "_search_nearby_v1", search)
+
+    async def run():
+        wide = await service.search_nearby_restaurants(LAT, LNG, radius_meters=1000)
+        # Same tile, smaller radius; then a point 300m away inside the wide circle
+        near = await service.search_nearby_restaurants(LAT, LNG, radius_meters=300)
+        shifted = await service.search_nearby_restaurants(LAT + 0.0027, LNG, radius_meters=300)
+        # A circle sticking out of every cached search goes to the API
+        await service.search_nearby_restaurants(LAT + 0.01, LNG, radius_meters=500)
+        return wide, near, shifted
+
+    wide, near, shifted = asyncio.run(run())
+
+    assert len(searches) == 2
+    assert searches[0][3] == 20
+    assert [p.place_id for p in wide] == ["p1", "p2"]
+    assert [p.place_id for p in near] == ["p1"]
+    assert [p.place_id for p in shifted] == ["p1"]
+
+
+def test_truncated_tile_searches_fall_back_to_the_exact_query(monkeypatch):
+    _use_fresh_cache(monkeypatch)
+    service = PlacesService()
+    service.api_key = "key"
+    searches = []
+
+    async def search(latitude, longitude, radius, max_results):
+        searches.append((latitude, longitude, radius, max_results))
+        # A dense block: every search hits its result cap
+        return [_place(n, LAT, LNG) for n in range(max_results)]
+
+    monkeypatch.setattr(service, "_search_nearby_v1", search)
+
+    async def run():
+        first = await service.search_nearby_restaurants(LAT, LNG, radius_meters=200, max_results=10)
+        again = await service.search_nearby_restaurants(LAT, LNG, radius_meters=200, max_results=10)
+        nearby = await service.search_nearby_restaurants(
+            LAT + 0.0001, LNG, radius_meters=200, max_results=10
+        )
+        return first, again, nearby
+
+    first, again, nearby = asyncio.run(run())
+
+    tile = tile_query(LAT, LNG, 200, "restaurant")
+    # The capped tile search is not served; the caller's own query is
+    assert searches[:2] == [
+        (tile.latitude, tile.longitude, tile.radius, 20),
+        (LAT, LNG, 200, 10),
+    ]
+    assert len(first) == 10
+    # Repeats come from the cache; the dense tile is not searched again
+    assert [p.place_id for p in again] == [p.place_id for p in first]
+    assert searches[2:] == [(LAT + 0.0001, LNG, 200, 10)]
+    assert len(nearby) == 10
+    assert asyncio.run(PlacesCache().get_nearby(LAT + 0.0001, LNG, 100, "restaurant")) is None
+
+
+def test_cold_queries_next_to_a_dense_tile_make_one_call(monkeypatch):
+    _use_fresh_cache(monkeypatch)
+    service = PlacesService()
+    service.api_key = "key"
+    searches = []
+
+    async def search(latitude, longitude, radius, max_results):
+        searches.append((latitude, longitude, radius, max_results))
+        return [_place(n, latitude, longitude) for n in range(max_results)]
+
+    monkeypatch.setattr(service, "_search_nearby_v1", search)
+
+    # ~220m north: a different tile of the same dense neighbourhood
+    north = LAT + 0.002
+    assert tile_query(north, LNG, 1500, "restaurant").cell != tile_query(
+        LAT, LNG, 1500, "restaurant"
+    ).cell
+
+    async def run():
+        await service.search_nearby_restaurants(LAT, LNG, radius_meters=1500, max_results=10)
+        first_calls = len(searches)
+        await service.search_nearby_restaurants(north, LNG, radius_meters=1500, max_results=10)
+        return first_calls
+
+    first_calls = asyncio.run(run())
+
+    # Only the first query in the area pays for the capped tile search
+    assert first_calls == 2
+    assert searches[2:] == [(north, LNG, 1500, 10)]
+
+
+def test_radius_too_large_to_tile_uses_the_exact_search(monkeypatch):
+    _use_fresh_cache(monkeypatch)
+    service = PlacesService()
+    service.api_key = "key"
+    searches = []
+
+    async def search(latitude, longitude, radius, max_results):
+        searches.append((latitude, longitude, radius, max_results))
+        return [_place(1, latitude, longitude)]
+
+    async def legacy(*args):
+        raise AssertionError("fell back to the legacy search")
+
+    monkeypatch.setattr(service, "_search_nearby_v1", search)
+    monkeypatch.setattr(service, "_search_nearby_legacy", legacy)
+
+    async def run():
+        first = await service.search_nearby_restaurants(LAT, LNG, radius_meters=49950)
+        again = await service.search_nearby_restaurants(LAT, LNG, radius_meters=49950)
+        return first, again
+
+    first, again = asyncio.run(run())
+
+    assert searches == [(LAT, LNG, 49950, 10)]
+    assert [p.place_id for p in again] == [p.place_id for p in first] == ["p1"]
+
+
+def test_geocoding_is_cached_by_normalized_address(monkeypatch):
+    _use_fresh_cache(monkeypatch)
+    service = GeocodingService()
+    service.api_key = "key"
+    calls = []
+
+    class _Client:
+        async def get(self, url, params):
+            calls.append(params["address"])
+            return _Response()
+
+    class _Response:
+        def json(self):
+            return {
+                "status": "OK",
+                "results": [
+                    {
+                        "geometry": {"location": {"lat": LAT, "lng": LNG}},
+                        "formatted_address": "Av. Presidente Masaryk 111, Polanco",
+                        "address_components": [
+                            {"types": ["locality"], "long_name": "Ciudad de México"}
+                        ],
+                    }
+                ],
+            }
+
+    monkeypatch.setattr(
+        "app.services.intelligence.geocoding.get_http_client", lambda *a, **k: _Client()
+    )
+
+    async def run():
+        first = await service.geocode("Av. Presidente Masaryk 111, Polanco")
+        second = await service.geocode("av presidente masaryk 111  polanco")
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert calls == ["Av. Presidente Masaryk 111, Polanco"]
+    assert second == first and second.city == "Ciudad de México"
@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.core.rate_limiter import RateLimiter
+
+
+@pytest.fixture
+def limiter():
+    with patch("app.core.rate_limiter.get_settings") as mock:
+        settings = MagicMock()
+        settings.gemini_rate_limit_rpm = 2
+        settings.gemini_rate_limit_tpm = 1000
+        settings.gemini_rate_limit_window = 0.2
+        settings.gemini_enable_cost_tracking = True
+        settings.gemini_budget_limit_usd = 10.0
+        settings.gemini_cost_per_1k_input_tokens = 0.01
+        settings.gemini_cost_per_1k_output_tokens = 0.03
+        mock.return_value = settings
+        yield RateLimiter()
+
+
+@pytest.mark.asyncio
+async def test_acquire_within_budget_is_immediate(limiter):
+    first = await limiter.acquire(100)
+    second = await limiter.acquire(100)
+    assert first and second
+    stats = limiter.get_usage_stats()
+    assert stats["requests_in_window"] == 2
+    assert stats["tokens_in_window"] == 200
+
+
+@pytest.mark.asyncio
+async def test_throttled_waiters_are_admitted_in_fifo_order(limiter):
+    await limiter.acquire(10)
+    await limiter.acquire(10)
+
+    order = []
+
+    async def caller(name):
+        await limiter.acquire(10)
+        order.append(name)
+
+    start = time.monotonic()
+    await asyncio.gather(caller("a"), caller("b"), caller("c"))
+    assert order == ["a", "b", "c"]
+    assert time.monotonic() - start >= 0.2
+
+
+@pytest.mark.asyncio
+async def test_waiting_does_not_block_other_limiter_calls(limiter):
+    await limiter.acquire(10)
+    await limiter.acquire(10)
+
+    waiter = asyncio.create_task(limiter.acquire(10))
+    await asyncio.sleep(0.01)
+    # Stats and cost recording stay responsive while a caller is throttled
+    assert limiter.get_usage_stats()["queued_requests"] == 1
+    limiter.record_call(input_tokens=10, output_tokens=10, model="test")
+    assert not waiter.done()
+    assert await waiter
+
+
+@pytest.mark.asyncio
+async def test_reconcile_adjusts_running_total(limiter):
+    reservation = await limiter.acquire(800)
+    limiter.record_call(
+        input_tokens=50, output_tokens=50, model="test", reservation=reservation
+    )
+    assert limiter.get_usage_stats()["tokens_in_window"] == 100
+    # Freed tokens are immediately usable
+    assert await asyncio.wait_for(limiter.acquire(800), timeout=0.05)
+
+
+@pytest.mark.asyncio
+async def test_budget_exceeded_returns_none(limiter):
+    limiter.daily_cost = 10.0
+    assert await limiter.acquire(10) is None
+    assert limiter.budget_exceeded
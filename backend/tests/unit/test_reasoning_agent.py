@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 import json
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -189,3 +190,78 @@ async def test_process_dispatch(reasoning_agent):
     
     with pytest.raises(ValueError):
         await reasoning_agent.process(task="unknown")
+
+def _position(position, confidence=0.9, action="Raise price"):
+    return json.dumps({
+        "position": position,
+        "reasoning": f"{position} reasoning",
+        "confidence": confidence,
+        "suggested_action": action,
+    })
+
+def _consensus():
+    return json.dumps({"consensus": "Raise price", "consensus_confidence": 0.9})
+
+@pytest.mark.asyncio
+async def test_debate_stops_when_agents_agree(reasoning_agent, mock_settings):
+    mock_settings.debate_max_rounds = 3
+    mock_settings.debate_consensus_confidence = 0.7
+    in_flight = 0
+    max_in_flight = 0
+
+    async def generate(prompt, **kwargs):
+        nonlocal in_flight, max_in_flight
+        if kwargs["feature"] == "multi_agent_consensus":
+            return _consensus()
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        # Agents only agree once they have seen each other's positions
+        if "OTHER EXPERTS' POSITIONS" in prompt:
+            return _position("agree")
+        return _position("disagree" if "CFO" in prompt else "agree")
+
+    reasoning_agent.generate.side_effect = generate
+
+    debate = await reasoning_agent.multi_agent_debate(
+        "Remove Sopa?", {"name": "Sopa"}, {}
+    )
+
+    assert max_in_flight == 3  # Perspectives of a round run concurrently
+    assert debate["rounds"] == 2
+    assert debate["agentsAgreed"] is True
+    assert [p["position"] for p in debate["perspectives"]] == ["agree"] * 3
+    assert reasoning_agent.generate.call_count == 7  # 2 rounds of 3 + moderator
+
+@pytest.mark.asyncio
+async def test_bcg_debates_run_in_parallel_and_keep_order(reasoning_agent, mock_settings):
+    mock_settings.debate_max_rounds = 2
+    mock_settings.debate_consensus_confidence = 0.7
+    in_flight = 0
+    max_in_flight = 0
+
+    async def generate(prompt, **kwargs):
+        nonlocal in_flight, max_in_flight
+        if kwargs["feature"] == "multi_agent_consensus":
+            return _consensus()
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return _position("agree")
+
+    reasoning_agent.generate.side_effect = generate
+    items = [
+        {"name": "Sopa", "category": "plowhorse"},
+        {"name": "Flan", "category": "dog"},
+        {"name": "Tacos", "category": "star"},
+        {"name": "Agua", "category": "puzzle"},
+    ]
+
+    debates = await reasoning_agent.run_bcg_debates(items, {}, max_debates=5)
+
+    # High priority first; one round each since the agents agree at once
+    assert [d["itemName"] for d in debates] == ["Flan", "Agua", "Sopa"]
+    assert all(d["rounds"] == 1 for d in debates)
+    assert max_in_flight == 9  # All perspectives of all debates at once
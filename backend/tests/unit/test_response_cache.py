@@ -0,0 +1,98 @@
+import time
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.services.gemini.base_agent import GeminiBaseAgent, GeminiCache
+
+
+def _cache(max_bytes=10_000, ttl_seconds=60):
+    return GeminiCache(max_bytes=max_bytes, ttl_seconds=ttl_seconds)
+
+
+def test_key_covers_config_and_images():
+    base = GeminiCache.make_key("p", "m", "QUICK", {"temperature": 0.5})
+    assert base == GeminiCache.make_key("p", "m", "QUICK", {"temperature": 0.5})
+    assert base != GeminiCache.make_key("p", "m", "DEEP", {"temperature": 0.5})
+    assert base != GeminiCache.make_key("p", "m", "QUICK", {"temperature": 0.7})
+    assert base != GeminiCache.make_key("p", "m", "QUICK", {"temperature": 0.5}, [b"img"])
+
+
+def test_lru_eviction_respects_byte_budget():
+    cache = _cache(max_bytes=3 * (GeminiCache.ENTRY_OVERHEAD_BYTES + 100))
+    for key in ("a", "b", "c"):
+        cache.set(key, key, size_bytes=100)
+    assert cache.get("a") == "a"  # "b" is now least recently used
+
+    cache.set("d", "d", size_bytes=100)
+    assert cache.get("b") is None
+    assert cache.get("a") == "a"
+    stats = cache.get_stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes_used"] <= cache.max_bytes
+
+
+def test_expired_entries_are_misses():
+    cache = _cache(ttl_seconds=0.01)
+    cache.set("k", "v", size_bytes=10, tokens=50)
+    assert cache.get("k") == "v"
+    time.sleep(0.02)
+    assert cache.get("k") is None
+    stats = cache.get_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["expirations"] == 1
+    assert stats["tokens_saved"] == 50
+
+
+@pytest.mark.asyncio
+async def test_generate_serves_repeat_prompts_from_cache():
+    with patch("app.services.gemini.base_agent.get_settings") as mock_settings, \
+         patch("app.services.gemini.base_agent.genai.Client") as mock_client:
+        settings = MagicMock()
+        settings.gemini_cache_max_size_mb = 1
+        settings.gemini_cache_ttl_seconds = 60
+        settings.gemini_timeout_seconds = 30
+        settings.thinking_level_quick_temp = 0.7
+        settings.thinking_level_quick_tokens = 1000
+        mock_settings.return_value = settings
+
+        response = MagicMock()
+        response.text = "Cached answer"
+        response.usage_metadata.total_token_count = 120
+        mock_client.return_value.models.generate_content.return_value = response
+
+        agent = GeminiBaseAgent()
+        assert await agent.generate("Same menu", thinking_level="QUICK") == "Cached answer"
+        assert await agent.generate("Same menu", thinking_level="QUICK") == "Cached answer"
+        assert await agent.generate("Same menu", thinking_level="QUICK", bypass_cache=True)
+
+        assert mock_client.return_value.models.generate_content.call_count == 2
+        stats = agent.response_cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["tokens_saved"] == 120
+
+
+@pytest.mark.asyncio
+async def test_pdf_and_image_calls_are_cached(tmp_path):
+    pdf = tmp_path / "menu.pdf"
+    pdf.write_bytes(b"%PDF-1.4 tacos")
+
+    with patch("app.services.gemini.base_agent.genai.Client") as mock_client:
+        client = mock_client.return_value
+        client.files.upload.return_value = MagicMock(uri="files/menu", **{"state.name": "ACTIVE"})
+        response = MagicMock()
+        response.text = '{"items": []}'
+        response.usage_metadata.total_token_count = 80
+        client.models.generate_content.return_value = response
+
+        agent = GeminiBaseAgent()
+        agent.response_cache.clear()
+        assert await agent._call_gemini_with_pdf("Extract", str(pdf)) is response
+        assert await agent._call_gemini_with_pdf("Extract", str(pdf)) is response
+        # Cache hits skip the upload as well as the generation
+        assert client.files.upload.call_count == 1
+
+        image = "dGFjb3M="  # base64 of b"tacos"
+        await agent._call_gemini_with_image("Describe", image)
+        await agent._call_gemini_with_image("Describe", image)
+        assert client.models.generate_content.call_count == 2
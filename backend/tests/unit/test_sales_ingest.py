@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+from app.services.analysis.date_parsing import infer_date_format, parse_date, parse_dates
+from app.services.analysis.sales_ingest import SalesFileError, read_sales_file
+
+
+def test_dominant_format_with_row_wise_fallback():
+    column = pd.Series(["03-02-24", "04-02-24", "2024-02-05", None, "not a date", "03-02-24"])
+
+    assert infer_date_format(column) == "%d-%m-%y"
+    parsed = parse_dates(column)
+    assert parsed.dt.strftime("%Y-%m-%d").tolist()[:3] == ["2024-02-03", "2024-02-04", "2024-02-05"]
+    assert parsed.isna().tolist() == [False, False, False, True, True, False]
+    # The scalar parser agrees with the vectorized one
+    assert parse_date("03-02-24") == parsed[0].to_pydatetime()
+
+
+def test_csv_is_read_in_chunks(tmp_path):
+    path = tmp_path / "sales.csv"
+    rows = ["Fecha,Producto,Cantidad,Price"]
+    rows += [f"{day:02d}/01/2024,Tacos,{day},10.5" for day in range(1, 26)]
+    rows += ["??,Tacos,1,10.5"]
+    path.write_text("\n".join(rows))
+
+    result = read_sales_file(path, chunk_rows=10)
+
+    assert result.chunks == 3
+    assert result.date_format == "%d/%m/%Y"
+    assert result.invalid_dates == 1
+    assert list(result.df.columns) == ["date", "item_name", "units_sold", "price"]
+    assert len(result.df) == 25
+    assert result.df["date"].max() == pd.Timestamp("2024-01-25")
+
+
+def test_missing_required_columns(tmp_path):
+    path = tmp_path / "sales.csv"
+    path.write_text("date,units_sold\n2024-01-01,3\n")
+
+    with pytest.raises(SalesFileError, match="item_name"):
+        read_sales_file(path)
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+from unittest.mock import patch
+
+from app.services.analysis.sales_predictor import SalesPredictor
+
+MENU = [{"name": f"Dish {i}", "price": 8 + i} for i in range(6)]
+SCENARIOS = [
+    {"name": "baseline"},
+    {"name": "promo", "promotion_active": True, "promotion_discount": 0.2},
+    {"name": "premium", "price_change_percent": 15, "marketing_boost": 1.5},
+]
+
+
+@pytest.fixture
+def predictor(tmp_path):
+    with patch.object(SalesPredictor, "MODEL_PATH", str(tmp_path / "model.joblib")):
+        yield SalesPredictor()
+
+
+def _reference_forecast(predictor, base_features, scenario, horizon_days):
+    """Original one-row-per-day loop the batched forecast must reproduce."""
+    start_date = datetime.now(timezone.utc).date()
+    predictions = []
+    for day in range(horizon_days):
+        features = predictor._build_features(
+            start_date + timedelta(days=day), base_features, scenario, predictions
+        )
+        X = pd.DataFrame([features])[predictor.feature_columns].fillna(0)
+        predictions.append(round(float(max(0, predictor.model.predict(X)[0])), 1))
+    return predictions
+
+
+@pytest.mark.asyncio
+async def test_batched_forecast_matches_step_by_step(predictor):
+    await predictor.train([], MENU)
+    items = [dict(item, avg_daily_units=12 + i) for i, item in enumerate(MENU)]
+
+    result = await predictor.predict_batch(items, horizon_days=10, scenarios=SCENARIOS)
+
+    for item, item_pred in zip(items, result["item_predictions"]):
+        base = {
+            "price": item["price"],
+            "image_score": 0.5,
+            "rolling_avg_7d": item["avg_daily_units"],
+            "rolling_avg_30d": item["avg_daily_units"],
+        }
+        for scenario in SCENARIOS:
+            expected = _reference_forecast(predictor, base, scenario, 10)
+            assert item_pred[scenario["name"]]["daily"] == pytest.approx(expected, abs=0.11)
+
+
+@pytest.mark.asyncio
+async def test_predict_single_item(predictor):
+    await predictor.train([], MENU)
+    result = await predictor.predict("Dish 0", 7, {"price": 8}, SCENARIOS[:1])
+    baseline = result["predictions"]["baseline"]
+    assert len(baseline["daily_predictions"]) == 7
+    assert baseline["total_units"] == float(round(sum(baseline["daily_predictions"])))
@@ -0,0 +1,43 @@
+import pytest
+
+from app.services.intelligence.competitor_finder import (
+    CompetitorProfile,
+    ScoutAction,
+    ScoutAgent,
+)
+
+
+def _profile(name):
+    return CompetitorProfile(
+        place_id=f"place-{name}",
+        name=name,
+        address="Main St",
+        distance_meters=100.0,
+        location={"lat": 0.0, "lng": 0.0},
+    )
+
+
+@pytest.mark.asyncio
+async def test_deep_analysis_failures_are_recorded():
+    agent = ScoutAgent()
+    analyzed = []
+
+    async def photos(profile):
+        if profile.name == "Broken":
+            raise RuntimeError("vision quota exhausted")
+
+    async def positioning(profile, our_menu):
+        analyzed.append(profile.name)
+
+    agent._analyze_competitor_photos = photos
+    agent._analyze_competitor_positioning = positioning
+
+    await agent._deep_analyze_competitors(
+        [_profile("Tacos"), _profile("Broken"), _profile("Pho")], None
+    )
+
+    assert analyzed == ["Tacos", "Pho"]
+    failure = agent.thought_traces[-1]
+    assert failure.action == ScoutAction.ANALYZE_PHOTOS
+    assert failure.confidence == 0.0
+    assert failure.observations == ["Broken: vision quota exhausted"]
@@ -0,0 +1,74 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from app.core.session_store import SessionStore
+
+
+@pytest.mark.asyncio
+async def test_saves_coalesce_into_one_atomic_write(tmp_path):
+    store = SessionStore(tmp_path, flush_delay=0.01)
+    store.sessions["s1"] = {"sales_data": [{"units": 1}]}
+
+    for i in range(5):
+        store.sessions["s1"]["step"] = i
+        store.save("s1")
+    assert not (tmp_path / "s1.json").exists()  # Nothing written inline
+
+    await asyncio.sleep(0.1)
+    assert store.flushes == 1
+    assert store.coalesced == 4
+    assert json.loads((tmp_path / "s1.json").read_text())["step"] == 4
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+@pytest.mark.asyncio
+async def test_load_serves_memory_until_file_changes(tmp_path):
+    store = SessionStore(tmp_path, flush_delay=0.01)
+    store.sessions["s1"] = {"status": "new"}
+    store.flush()  # Nothing dirty yet
+    store.save("s1")
+    store.flush("s1")
+
+    session = store.load("s1")
+    assert session is store.sessions["s1"]
+
+    # Another worker rewrites the file
+    path = tmp_path / "s1.json"
+    path.write_text(json.dumps({"status": "from-other-worker"}))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert store.load("s1") == {"status": "from-other-worker"}
+
+
+def test_save_without_event_loop_writes_through(tmp_path):
+    store = SessionStore(tmp_path)
+    store.sessions["s1"] = {"menu_items": []}
+    store.save("s1")
+    assert json.loads((tmp_path / "s1.json").read_text()) == {"menu_items": []}
+
+    # A fresh process reads it back from disk
+    assert SessionStore(tmp_path).load("s1") == {"menu_items": []}
+
+
+@pytest.mark.asyncio
+async def test_get_session_does_not_merge_orchestrator_state_into_the_cache(
+    client, monkeypatch
+):
+    from app.api import deps
+    from app.services.orchestrator import orchestrator
+
+    deps.sessions["s-read"] = {"status": "uploaded", "menu_items": []}
+    orch_state = {"status": "completed", "predictions": {"items": [1]}}
+    monkeypatch.setattr(orchestrator, "get_session_status", lambda session_id: orch_state)
+
+    try:
+        response = await client.get("/api/v1/session/s-read")
+        assert response.status_code == 200
+        assert response.json()["predictions"] == {"items": [1]}
+        assert deps.sessions["s-read"] == {"status": "uploaded", "menu_items": []}
+    finally:
+        deps.sessions.pop("s-read", None)
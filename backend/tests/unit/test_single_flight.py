@@ -0,0 +1,93 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.core.cache import CacheManager
+from app.core.single_flight import SingleFlight
+from app.services.gemini.base_agent import GeminiBaseAgent
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    group = SingleFlight()
+    calls = 0
+
+    async def extract():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"items": 12}
+
+    results = await asyncio.gather(*(group.do("menu-hash", extract) for _ in range(5)))
+    assert calls == 1
+    assert all(r == {"items": 12} for r in results)
+    assert group.get_stats() == {"in_flight": 0, "leaders": 1, "coalesced": 4}
+
+    # Finished keys are forgotten, so the next request runs again
+    await group.do("menu-hash", extract)
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_failure_propagates_to_every_waiter():
+    group = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("quota")
+
+    results = await asyncio.gather(
+        *(group.do("k", fail) for _ in range(3)), return_exceptions=True
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelling_one_waiter_keeps_shared_call_alive():
+    group = SingleFlight()
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    first = asyncio.create_task(group.do("k", slow))
+    second = asyncio.create_task(group.do("k", slow))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await second == "done"
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_computes_cold_key_once():
+    manager = CacheManager()
+    calls = 0
+
+    async def factory():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"stars": 3}
+
+    results = await asyncio.gather(
+        *(manager.get_or_set("bcg:session", factory) for _ in range(4))
+    )
+    assert calls == 1
+    assert results == [{"stars": 3}] * 4
+    assert await manager.get("bcg:session") == {"stars": 3}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_image_calls_share_one_request():
+    with patch("app.services.gemini.base_agent.genai.Client") as mock_client:
+        response = MagicMock()
+        response.text = ""  # Empty answers are not cached, so only coalescing dedupes
+        mock_client.return_value.models.generate_content.return_value = response
+
+        agent = GeminiBaseAgent()
+        results = await asyncio.gather(
+            *(agent._call_gemini_with_image("Describe", "Zmxhbg==") for _ in range(3))
+        )
+
+        assert all(r is response for r in results)
+        assert mock_client.return_value.models.generate_content.call_count == 1